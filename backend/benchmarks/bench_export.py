@@ -0,0 +1,101 @@
+"""Throughput of the streaming transcript export.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_export.py [--transcripts N] [--segments N]
+
+Stores N synthetic transcripts (zstd segments.bin plus a database row each),
+then streams the whole corpus as JSON Lines and as tar, reporting transcripts/s,
+MB/s of output and the growth of peak RSS during each export.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services.compression import ArtifactCodec
+from yt_dlp_mcp.services.export import ExportFormat, stream_export
+from yt_dlp_mcp.services.segment_file import write_segment_file
+from yt_dlp_mcp.types import TranscriptResult, TranscriptSegment
+
+
+def _populate(root: Path, db: Database, count: int, segments: int, codec: ArtifactCodec) -> None:
+    rng = random.Random(7)
+    vocabulary = [f"word{i}" for i in range(5_000)]
+    rows = []
+    for index in range(count):
+        video_dir = root / f"{index // 1000}" / f"vid{index}"
+        video_dir.mkdir(parents=True)
+        transcript_segments = [
+            TranscriptSegment(
+                start=i * 5.0,
+                end=i * 5.0 + 5.0,
+                text=" ".join(rng.choices(vocabulary, k=12)),
+                speaker=f"speaker_{i % 2}",
+            )
+            for i in range(segments)
+        ]
+        transcript = TranscriptResult(
+            text=" ".join(s.text for s in transcript_segments),
+            segments=transcript_segments,
+            language="en",
+        )
+        write_segment_file(video_dir / "segments.bin", transcript, codec)
+        rows.append(
+            (f"vid{index}", f"Title {index}", f"channel{index % 50}", "YouTube", str(video_dir))
+        )
+    with db.lock:
+        db.conn.executemany(
+            "INSERT INTO transcripts (video_id, title, channel, platform, path) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        db.conn.commit()
+
+
+def _max_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transcripts", type=int, default=100_000)
+    parser.add_argument("--segments", type=int, default=40)
+    args = parser.parse_args()
+
+    codec = ArtifactCodec()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        db = Database(root / "bench.sqlite3")
+        started = time.perf_counter()
+        _populate(root / "transcripts", db, args.transcripts, args.segments, codec)
+        print(
+            f"stored {args.transcripts} transcripts x {args.segments} segments "
+            f"in {time.perf_counter() - started:.1f} s"
+        )
+        transcripts = TranscriptsRepository(db)
+
+        formats: tuple[ExportFormat, ...] = ("jsonl", "tar")
+        print(f"{'format':<8}{'seconds':>10}{'transcripts/s':>16}{'MB/s':>10}{'peak RSS +MB':>15}")
+        for fmt in formats:
+            rss_before = _max_rss_kb()
+            started = time.perf_counter()
+            size = 0
+            for chunk in stream_export(transcripts, fmt, codec=codec):
+                size += len(chunk)
+            elapsed = time.perf_counter() - started
+            growth = (_max_rss_kb() - rss_before) / 1024
+            print(
+                f"{fmt:<8}{elapsed:>10.1f}{args.transcripts / elapsed:>16.0f}"
+                f"{size / elapsed / 1e6:>10.1f}{growth:>15.1f}"
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
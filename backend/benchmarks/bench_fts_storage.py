@@ -0,0 +1,155 @@
+"""Compare the legacy self-contained FTS table with the external-content index.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_fts_storage.py [--transcripts N] [--words N]
+
+Reports database size after inserting N synthetic transcripts, the time for the
+initial upserts, and the time to re-upsert the same transcripts unchanged.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+
+_LEGACY_SCHEMA = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE transcripts (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  video_id TEXT UNIQUE NOT NULL,
+  normalized_url TEXT UNIQUE,
+  url TEXT, title TEXT, channel TEXT, platform TEXT, duration REAL,
+  upload_date TEXT, description TEXT, thumbnail TEXT, view_count INTEGER,
+  speaker_count INTEGER, word_count INTEGER, confidence REAL,
+  transcribed_at TEXT NOT NULL DEFAULT (datetime('now')),
+  path TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE transcripts_fts USING fts5(
+  video_id UNINDEXED, title, channel, description, transcript_text
+);
+"""
+
+
+def _corpus(count: int, words: int) -> list[tuple[str, str, str]]:
+    rng = random.Random(7)
+    vocabulary = [f"word{i}" for i in range(20_000)]
+    description = " ".join(rng.choices(vocabulary, k=200))
+    return [
+        (f"vid{i}", " ".join(rng.choices(vocabulary, k=words)), description)
+        for i in range(count)
+    ]
+
+
+def _legacy_upsert(conn: sqlite3.Connection, video_id: str, text: str, description: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO transcripts(video_id, normalized_url, url, title, channel, description, path)
+        VALUES (?, ?, ?, ?, 'channel', ?, ?)
+        ON CONFLICT(video_id) DO UPDATE SET
+            title = excluded.title, description = excluded.description, path = excluded.path
+        """,
+        (video_id, video_id, video_id, f"Title {video_id}", description, f"/tmp/{video_id}"),
+    )
+    conn.execute("DELETE FROM transcripts_fts WHERE video_id = ?", (video_id,))
+    conn.execute(
+        """
+        INSERT INTO transcripts_fts(video_id, title, channel, description, transcript_text)
+        VALUES (?, ?, 'channel', ?, ?)
+        """,
+        (video_id, f"Title {video_id}", description, text),
+    )
+    conn.commit()
+
+
+def _size(path: Path, conn: sqlite3.Connection) -> int:
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return path.stat().st_size
+
+
+def _timed(fn: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def bench_legacy(root: Path, corpus: list[tuple[str, str, str]]) -> tuple[int, float, float]:
+    path = root / "legacy.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.executescript(_LEGACY_SCHEMA)
+
+    def run() -> None:
+        for video_id, text, description in corpus:
+            _legacy_upsert(conn, video_id, text, description)
+
+    initial = _timed(run)
+    repeat = _timed(run)
+    size = _size(path, conn)
+    conn.close()
+    return size, initial, repeat
+
+
+def bench_external(root: Path, corpus: list[tuple[str, str, str]]) -> tuple[int, float, float]:
+    path = root / "external.sqlite3"
+    db = Database(path)
+    repo = TranscriptsRepository(db)
+
+    def run() -> None:
+        for video_id, text, description in corpus:
+            repo.upsert(
+                video_id=video_id,
+                normalized_url=video_id,
+                url=video_id,
+                path=f"/tmp/{video_id}",
+                transcript_text=text,
+                title=f"Title {video_id}",
+                channel="channel",
+                platform=None,
+                duration=None,
+                upload_date=None,
+                description=description,
+                thumbnail=None,
+                view_count=None,
+                speaker_count=None,
+                word_count=None,
+                confidence=None,
+            )
+
+    initial = _timed(run)
+    repeat = _timed(run)
+    size = _size(path, db.conn)
+    db.close()
+    return size, initial, repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transcripts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=3000)
+    args = parser.parse_args()
+
+    corpus = _corpus(args.transcripts, args.words)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        results = {
+            "legacy fts": bench_legacy(root, corpus),
+            "external-content fts": bench_external(root, corpus),
+        }
+
+    print(f"{args.transcripts} transcripts x {args.words} words")
+    print(f"{'layout':<22}{'db size (MB)':>14}{'upsert (ms)':>14}{'re-upsert (ms)':>17}")
+    for name, (size, initial, repeat) in results.items():
+        per_initial = initial / len(corpus) * 1000
+        per_repeat = repeat / len(corpus) * 1000
+        print(f"{name:<22}{size / 1e6:>14.1f}{per_initial:>14.3f}{per_repeat:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare the four-file transcript layout with segments.bin, plain and zstd.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_segment_storage.py [--hours N] [--transcripts N]
+
+Persists synthetic long-podcast transcripts both ways and reports write time,
+bytes on disk and peak Python memory (tracemalloc) per transcript, plus the time
+to render markdown from segments.bin on first read.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from yt_dlp_mcp.services.compression import ArtifactCodec
+from yt_dlp_mcp.services.segment_file import write_segment_file
+from yt_dlp_mcp.services.storage import TranscriptRenderer, to_markdown, to_plain_text
+from yt_dlp_mcp.types import TranscriptResult, TranscriptSegment
+
+
+def _transcript(rng: random.Random, hours: float) -> TranscriptResult:
+    vocabulary = [f"word{i}" for i in range(5_000)]
+    segments = []
+    start = 0.0
+    while start < hours * 3600:
+        length = rng.uniform(2.0, 8.0)
+        text = " ".join(rng.choices(vocabulary, k=int(length * 2.5)))
+        speaker = f"speaker_{rng.randrange(3)}"
+        segments.append(
+            TranscriptSegment(start=start, end=start + length, text=text, speaker=speaker)
+        )
+        start += length + rng.uniform(0.0, 0.5)
+    return TranscriptResult(
+        text=" ".join(segment.text for segment in segments), segments=segments, language="en"
+    )
+
+
+def _write_legacy(
+    video_dir: Path, transcript: TranscriptResult, metadata: dict[str, object]
+) -> None:
+    payload = {
+        "text": transcript.text,
+        "language": transcript.language,
+        "segments": [
+            {"start": s.start, "end": s.end, "speaker": s.speaker, "text": s.text}
+            for s in transcript.segments
+        ],
+    }
+    (video_dir / "transcript.json").write_text(
+        json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8"
+    )
+    (video_dir / "transcript.md").write_text(to_markdown(transcript, metadata), encoding="utf-8")
+    (video_dir / "transcript.txt").write_text(to_plain_text(transcript), encoding="utf-8")
+
+
+def _write_compact(video_dir: Path, transcript: TranscriptResult, _: dict[str, object]) -> None:
+    write_segment_file(video_dir / "segments.bin", transcript)
+
+
+def _write_zstd(video_dir: Path, transcript: TranscriptResult, _: dict[str, object]) -> None:
+    write_segment_file(video_dir / "segments.bin", transcript, ArtifactCodec())
+
+
+def _measure(
+    root: Path,
+    transcripts: list[TranscriptResult],
+    write: Callable[[Path, TranscriptResult, dict[str, object]], None],
+) -> tuple[float, int, int]:
+    metadata: dict[str, object] = {"title": "Podcast", "channel": "Channel"}
+    elapsed = 0.0
+    peak = 0
+    for index, transcript in enumerate(transcripts):
+        video_dir = root / str(index)
+        video_dir.mkdir(parents=True)
+        tracemalloc.start()
+        started = time.perf_counter()
+        write(video_dir, transcript, metadata)
+        elapsed += time.perf_counter() - started
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    size = sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+    return elapsed / len(transcripts), size // len(transcripts), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--transcripts", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    transcripts = [_transcript(rng, args.hours) for _ in range(args.transcripts)]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        results = {
+            "four files": _measure(root / "legacy", transcripts, _write_legacy),
+            "segments.bin": _measure(root / "compact", transcripts, _write_compact),
+            "+ zstd": _measure(root / "zstd", transcripts, _write_zstd),
+        }
+        renderer = TranscriptRenderer()
+        started = time.perf_counter()
+        for index in range(len(transcripts)):
+            renderer.render(root / "compact" / str(index), "markdown")
+        render = (time.perf_counter() - started) / len(transcripts)
+        started = time.perf_counter()
+        for index in range(len(transcripts)):
+            renderer.render(root / "zstd" / str(index), "markdown")
+        render_zstd = (time.perf_counter() - started) / len(transcripts)
+
+    segments = len(transcripts[0].segments)
+    print(f"{args.transcripts} transcripts x {args.hours:g} h (~{segments} segments each)")
+    print(f"{'layout':<14}{'write (ms)':>12}{'disk (KB)':>12}{'peak mem (KB)':>16}")
+    for name, (elapsed, size, peak) in results.items():
+        print(f"{name:<14}{elapsed * 1000:>12.1f}{size / 1024:>12.0f}{peak / 1024:>16.0f}")
+    print(f"first markdown render from segments.bin: {render * 1000:.1f} ms")
+    print(f"first markdown render from zstd segments.bin: {render_zstd * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
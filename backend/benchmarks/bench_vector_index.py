@@ -0,0 +1,84 @@
+"""Build and query the segment vector index at scale.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_vector_index.py [--segments N] [--per-transcript N]
+
+Indexes N synthetic segments, then reports build throughput, on-disk size,
+semantic query latency and related-transcripts latency.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from yt_dlp_mcp.services.vector_index import VectorIndex
+
+
+def _segments(count: int, per_transcript: int) -> list[tuple[int, list[tuple[int, str]]]]:
+    rng = random.Random(7)
+    vocabulary = [f"word{i}" for i in range(20_000)]
+    transcripts = []
+    segment_id = 0
+    for transcript_id in range(1, count // per_transcript + 1):
+        segments = []
+        for _ in range(per_transcript):
+            segment_id += 1
+            segments.append((segment_id, " ".join(rng.choices(vocabulary, k=30))))
+        transcripts.append((transcript_id, segments))
+    return transcripts
+
+
+def _latency_ms(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"median {statistics.median(ordered) * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segments", type=int, default=100_000)
+    parser.add_argument("--per-transcript", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    corpus = _segments(args.segments, args.per_transcript)
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "vectors"
+        index = VectorIndex(root)
+
+        started = time.perf_counter()
+        index.index_many(corpus)
+        build = time.perf_counter() - started
+        size = sum(path.stat().st_size for path in root.iterdir())
+
+        query_times = []
+        for _ in range(args.queries):
+            _, segments = rng.choice(corpus)
+            text = rng.choice(segments)[1]
+            started = time.perf_counter()
+            index.search(index.embed_query(text), 10)
+            query_times.append(time.perf_counter() - started)
+
+        related_times = []
+        for _ in range(args.queries):
+            transcript_id = rng.choice(corpus)[0]
+            started = time.perf_counter()
+            index.related(transcript_id, 10)
+            related_times.append(time.perf_counter() - started)
+
+        stats = index.stats()
+
+    print(f"{stats['vectors']} segments in {len(corpus)} transcripts, dim {stats['dim']}")
+    print(f"build: {build:.1f} s ({stats['vectors'] / build:,.0f} segments/s)")
+    print(f"on-disk size: {size / 1e6:.1f} MB")
+    print(f"semantic query (top 10): {_latency_ms(query_times)}")
+    print(f"related transcripts (top 10): {_latency_ms(related_times)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,13 +13,50 @@ class Settings:
     port: int
     mcp_path: str
     health_path: str
+    load_path: str
+    export_path: str
     poll_interval_seconds: int
+    playlist_batch_size: int
+    playlist_idle_timeout_seconds: int
+    subscription_max_videos_per_sync: int
+    comments_max_per_video: int
+    comments_refresh_batch: int
+    comments_refresh_hours: float
     data_dir: Path
     database_path: Path
     assemblyai_api_key: str | None
     parakeet_url: str
     max_workers: int
-
+    write_batch_window_ms: int
+    query_cache_size: int
+    render_cache_mb: int
+    info_cache_search_ttl_seconds: int
+    info_cache_metadata_ttl_seconds: int
+    info_cache_comments_ttl_seconds: int
+    info_cache_stale_seconds: int
+    yt_search_max_concurrent: int
+    get_metadata_max_concurrent: int
+    get_comments_max_concurrent: int
+    tool_max_queue: int
+    tool_queue_timeout_seconds: float
+    compression_level: int
+    storage_backend: str
+    storage_root: Path | None
+    s3_endpoint_url: str | None
+    s3_bucket: str | None
+    s3_region: str
+    s3_access_key_id: str | None
+    s3_secret_access_key: str | None
+    s3_prefix: str
+    upload_workers: int
+    local_cache_mb: int
+    maintenance_interval_seconds: int
+    job_retention_days: int
+    audio_retention_days: int
+    audio_retention_mode: str
+    audio_opus_bitrate: str
+    fingerprint_seconds: int
+    fingerprint_max_bit_error_rate: float
 
 
 def _as_int(name: str, default: int) -> int:
@@ -29,6 +66,13 @@ def _as_int(name: str, default: int) -> int:
     return int(raw)
 
 
+def _as_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return float(raw)
+
+
 def _normalized_path(path: str) -> str:
     if not path.startswith("/"):
         path = f"/{path}"
@@ -42,16 +86,55 @@ def load_settings() -> Settings:
 
     assemblyai_api_key = os.getenv("ASSEMBLYAI_API_KEY", "").strip() or None
     parakeet_url = os.getenv("PARAKEET_URL", "http://parakeet:8000").strip()
+    storage_root = os.getenv("STORAGE_ROOT", "").strip()
 
     return Settings(
         host=os.getenv("HOST", "0.0.0.0"),
         port=_as_int("PORT", 3000),
         mcp_path=_normalized_path(os.getenv("MCP_PATH", "/mcp")),
         health_path=_normalized_path(os.getenv("HEALTH_PATH", "/healthz")),
+        load_path=_normalized_path(os.getenv("LOAD_PATH", "/load")),
+        export_path=_normalized_path(os.getenv("EXPORT_PATH", "/export")),
         poll_interval_seconds=_as_int("POLL_INTERVAL_SECONDS", 5),
+        playlist_batch_size=_as_int("PLAYLIST_BATCH_SIZE", 50),
+        playlist_idle_timeout_seconds=_as_int("PLAYLIST_IDLE_TIMEOUT_SECONDS", 120),
+        subscription_max_videos_per_sync=_as_int("SUBSCRIPTION_MAX_VIDEOS_PER_SYNC", 200),
+        comments_max_per_video=_as_int("COMMENTS_MAX_PER_VIDEO", 500),
+        comments_refresh_batch=_as_int("COMMENTS_REFRESH_BATCH", 100),
+        comments_refresh_hours=_as_float("COMMENTS_REFRESH_HOURS", 24),
         data_dir=data_dir,
         database_path=database_path,
         assemblyai_api_key=assemblyai_api_key,
         parakeet_url=parakeet_url,
         max_workers=_as_int("MAX_WORKERS", 10),
+        write_batch_window_ms=_as_int("WRITE_BATCH_WINDOW_MS", 2),
+        query_cache_size=_as_int("QUERY_CACHE_SIZE", 512),
+        render_cache_mb=_as_int("RENDER_CACHE_MB", 64),
+        info_cache_search_ttl_seconds=_as_int("INFO_CACHE_SEARCH_TTL_SECONDS", 3600),
+        info_cache_metadata_ttl_seconds=_as_int("INFO_CACHE_METADATA_TTL_SECONDS", 21600),
+        info_cache_comments_ttl_seconds=_as_int("INFO_CACHE_COMMENTS_TTL_SECONDS", 1800),
+        info_cache_stale_seconds=_as_int("INFO_CACHE_STALE_SECONDS", 86400),
+        yt_search_max_concurrent=_as_int("YT_SEARCH_MAX_CONCURRENT", 4),
+        get_metadata_max_concurrent=_as_int("GET_METADATA_MAX_CONCURRENT", 4),
+        get_comments_max_concurrent=_as_int("GET_COMMENTS_MAX_CONCURRENT", 2),
+        tool_max_queue=_as_int("TOOL_MAX_QUEUE", 8),
+        tool_queue_timeout_seconds=_as_float("TOOL_QUEUE_TIMEOUT_SECONDS", 10),
+        compression_level=_as_int("COMPRESSION_LEVEL", 3),
+        storage_backend=os.getenv("STORAGE_BACKEND", "local").strip().lower(),
+        storage_root=Path(storage_root).resolve() if storage_root else None,
+        s3_endpoint_url=os.getenv("S3_ENDPOINT_URL", "").strip() or None,
+        s3_bucket=os.getenv("S3_BUCKET", "").strip() or None,
+        s3_region=os.getenv("S3_REGION", "us-east-1").strip(),
+        s3_access_key_id=os.getenv("S3_ACCESS_KEY_ID", "").strip() or None,
+        s3_secret_access_key=os.getenv("S3_SECRET_ACCESS_KEY", "").strip() or None,
+        s3_prefix=os.getenv("S3_PREFIX", "").strip(),
+        upload_workers=_as_int("UPLOAD_WORKERS", 2),
+        local_cache_mb=_as_int("LOCAL_CACHE_MB", 0),
+        maintenance_interval_seconds=_as_int("MAINTENANCE_INTERVAL_SECONDS", 3600),
+        job_retention_days=_as_int("JOB_RETENTION_DAYS", 30),
+        audio_retention_days=_as_int("AUDIO_RETENTION_DAYS", 0),
+        audio_retention_mode=os.getenv("AUDIO_RETENTION_MODE", "opus").strip().lower(),
+        audio_opus_bitrate=os.getenv("AUDIO_OPUS_BITRATE", "24k").strip(),
+        fingerprint_seconds=_as_int("FINGERPRINT_SECONDS", 120),
+        fingerprint_max_bit_error_rate=_as_float("FINGERPRINT_MAX_BIT_ERROR_RATE", 0.25),
     )
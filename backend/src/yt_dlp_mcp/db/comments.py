@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import sqlite3
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.utils.cursor import NUMBER, decode_cursor, encode_cursor
+
+Page = tuple[list[dict[str, Any]], str | None]
+
+# A failed fetch is retried after this long.
+_FAILURE_RETRY_SECONDS = 900
+
+
+def _decode(row: sqlite3.Row) -> dict[str, Any]:
+    item = dict(row)
+    item["full_refresh"] = bool(item["full_refresh"])
+    return item
+
+
+class CommentsRepository:
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+    def track(self, url: str, normalized_url: str) -> tuple[dict[str, Any], bool]:
+        """The comment source for ``normalized_url`` and whether it was just created.
+
+        A source whose last fetch failed is queued again.
+        """
+
+        def op(conn: sqlite3.Connection) -> tuple[dict[str, Any], bool]:
+            row = conn.execute(
+                """
+                INSERT INTO comment_sources(id, url, normalized_url)
+                VALUES (?, ?, ?)
+                ON CONFLICT(normalized_url) DO NOTHING
+                RETURNING *
+                """,
+                (str(uuid.uuid4()), url, normalized_url),
+            ).fetchone()
+            if row is not None:
+                return _decode(row), True
+            existing = conn.execute(
+                """
+                UPDATE comment_sources
+                SET status = CASE status WHEN 'failed' THEN 'queued' ELSE status END
+                WHERE normalized_url = ?
+                RETURNING *
+                """,
+                (normalized_url,),
+            ).fetchone()
+            return _decode(existing), False
+
+        return self.db.write(op)
+
+    def get(self, source_id: str) -> dict[str, Any] | None:
+        row = self.db.conn.execute(
+            "SELECT * FROM comment_sources WHERE id = ?", (source_id,)
+        ).fetchone()
+        return _decode(row) if row is not None else None
+
+    def claim_next(self) -> dict[str, Any] | None:
+        """Mark the next queued source, or the next one due for a refresh, as fetching."""
+
+        def op(conn: sqlite3.Connection) -> dict[str, Any] | None:
+            row = conn.execute(
+                """
+                UPDATE comment_sources
+                SET status = 'fetching'
+                WHERE id = (
+                    SELECT id FROM comment_sources
+                    WHERE status = 'queued'
+                       OR (status IN ('ready', 'failed') AND next_refresh_at <= datetime('now'))
+                    ORDER BY status != 'queued', COALESCE(next_refresh_at, created_at)
+                    LIMIT 1
+                )
+                RETURNING *
+                """
+            ).fetchone()
+            return _decode(row) if row is not None else None
+
+        return self.db.write(op)
+
+    def requeue_interrupted(self) -> int:
+        """Put fetches cut off by a restart back in the queue."""
+
+        def op(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(
+                "UPDATE comment_sources SET status = 'queued' WHERE status = 'fetching'"
+            )
+            return int(cursor.rowcount)
+
+        return self.db.write(op)
+
+    def record_fetch(
+        self,
+        source_id: str,
+        *,
+        video_id: str | None,
+        title: str | None,
+        comments: Sequence[dict[str, Any]],
+        refresh_seconds: int,
+        full_refresh: bool,
+    ) -> int:
+        """Upsert fetched ``comments`` and schedule the next refresh; returns how many were new.
+
+        Comments already stored keep their row and get the latest text, likes
+        and pinned flag. ``full_refresh`` asks for the whole thread next time.
+        """
+        rows = [
+            (
+                source_id,
+                str(comment["id"]),
+                comment.get("parent") or "root",
+                comment.get("author"),
+                comment.get("author_id"),
+                comment.get("text") or "",
+                int(comment.get("like_count") or 0),
+                int(bool(comment.get("is_pinned"))),
+                comment.get("timestamp"),
+            )
+            for comment in comments
+            if comment.get("id")
+        ]
+        timestamps = [row[8] for row in rows if row[8] is not None]
+        newest = max(timestamps) if timestamps else None
+
+        def op(conn: sqlite3.Connection) -> int:
+            new = 0
+            for row in rows:
+                inserted = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO comments(
+                        source_id, comment_id, parent, author, author_id, text, like_count,
+                        is_pinned, timestamp
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    row,
+                ).rowcount
+                if inserted:
+                    new += 1
+                    continue
+                conn.execute(
+                    """
+                    UPDATE comments SET text = ?, like_count = ?, is_pinned = ?
+                    WHERE source_id = ? AND comment_id = ?
+                    """,
+                    (row[5], row[6], row[7], source_id, row[1]),
+                )
+            conn.execute(
+                """
+                UPDATE comment_sources
+                SET status = 'ready',
+                    video_id = COALESCE(?, video_id),
+                    title = COALESCE(?, title),
+                    fetched_at = datetime('now'),
+                    next_refresh_at = datetime('now', ? || ' seconds'),
+                    newest_timestamp = COALESCE(max(newest_timestamp, ?), newest_timestamp, ?),
+                    full_refresh = ?,
+                    comment_count = (SELECT COUNT(*) FROM comments WHERE source_id = ?),
+                    refreshes = refreshes + 1,
+                    last_new = ?,
+                    error = NULL
+                WHERE id = ?
+                """,
+                (
+                    video_id,
+                    title,
+                    refresh_seconds,
+                    newest,
+                    newest,
+                    int(full_refresh),
+                    source_id,
+                    new,
+                    source_id,
+                ),
+            )
+            return new
+
+        return self.db.write(op)
+
+    def mark_failed(self, source_id: str, error: str) -> None:
+        self.db.write(
+            lambda conn: conn.execute(
+                """
+                UPDATE comment_sources
+                SET status = 'failed',
+                    error = ?,
+                    next_refresh_at = datetime('now', ? || ' seconds')
+                WHERE id = ?
+                """,
+                (error[:2000], _FAILURE_RETRY_SECONDS, source_id),
+            )
+        )
+
+    def search_page(
+        self,
+        query: str,
+        limit: int = 20,
+        *,
+        video_id: str | None = None,
+        cursor: str | None = None,
+    ) -> Page:
+        """One page of ranked comment matches plus the cursor for the next page.
+
+        Pages are keyed on ``(score, rowid)``, and each item carries the cursor that
+        resumes right after it. Raises ValueError for an invalid cursor.
+        """
+        query = " ".join(query.split())
+        limit = max(1, min(limit, 50))
+        clauses: list[str] = []
+        params: list[Any] = []
+        if video_id:
+            clauses.append("s.video_id = ?")
+            params.append(video_id)
+        if cursor:
+            clauses.append("(bm25(comments_fts), c.id) > (?, ?)")
+            params.extend(decode_cursor(cursor, "comments", (NUMBER, int)))
+        where = "".join(f" AND {clause}" for clause in clauses)
+        rows = self.db.conn.execute(
+            f"""
+            SELECT
+                c.id,
+                s.video_id,
+                s.title,
+                c.comment_id,
+                c.parent,
+                c.author,
+                c.like_count,
+                c.is_pinned,
+                c.timestamp,
+                snippet(comments_fts, 0, '[', ']', ' ... ', 20) AS snippet,
+                bm25(comments_fts) AS score
+            FROM comments_fts
+            JOIN comments AS c ON c.id = comments_fts.rowid
+            JOIN comment_sources AS s ON s.id = c.source_id
+            WHERE comments_fts MATCH ?{where}
+            ORDER BY score, c.id
+            LIMIT ?
+            """,
+            (query, *params, limit + 1),
+        ).fetchall()
+        items = [dict(row) for row in rows[:limit]]
+        for item in items:
+            item["cursor"] = encode_cursor("comments", [item["score"], item.pop("id")])
+            item["is_pinned"] = bool(item["is_pinned"])
+        return items, items[-1]["cursor"] if len(rows) > limit else None
+
+    def pending(self) -> list[dict[str, Any]]:
+        """Sources whose first fetch has not finished yet."""
+        rows = self.db.conn.execute(
+            """
+            SELECT id, url, status FROM comment_sources
+            WHERE fetched_at IS NULL
+            ORDER BY created_at
+            """
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> dict[str, Any]:
+        row = self.db.conn.execute(
+            """
+            SELECT
+                COUNT(*) AS sources,
+                COALESCE(SUM(status IN ('queued', 'fetching')), 0) AS pending,
+                COALESCE(SUM(status = 'failed'), 0) AS failed,
+                COALESCE(SUM(status = 'ready' AND next_refresh_at <= datetime('now')), 0)
+                    AS due,
+                COALESCE(SUM(comment_count), 0) AS comments
+            FROM comment_sources
+            """
+        ).fetchone()
+        return dict(row)
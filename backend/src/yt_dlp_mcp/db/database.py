@@ -1,27 +1,335 @@
 from __future__ import annotations
 
 import sqlite3
+from collections.abc import Callable
+from concurrent.futures import Future
 from pathlib import Path
-from threading import Lock
+from threading import Lock, Thread, current_thread, local
+from typing import TypeVar
+
+from yt_dlp_mcp.db.write_queue import DEFAULT_BATCH_WINDOW_SECONDS, WriteQueue
+
+T = TypeVar("T")
+
+# Predicate of the partial unique index on active jobs. Upserts against that
+# index must repeat it verbatim; mirrors ``jobs.ACTIVE_STATUSES``.
+ACTIVE_JOB_STATUSES_SQL = "'queued', 'downloading', 'transcribing'"
+# Same for active playlist imports; mirrors ``playlists.ACTIVE_PLAYLIST_STATUSES``.
+ACTIVE_PLAYLIST_STATUSES_SQL = "'queued', 'listing'"
+
+# Full-text index over ``transcripts`` using it as external content: the text lives
+# only in ``transcripts.transcript_text`` and the triggers keep the index in sync.
+# The update trigger only re-indexes when an indexed column actually changed.
+_TRANSCRIPTS_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
+  video_id UNINDEXED,
+  title,
+  channel,
+  description,
+  transcript_text,
+  content='transcripts',
+  content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS transcripts_fts_ai AFTER INSERT ON transcripts BEGIN
+  INSERT INTO transcripts_fts(rowid, video_id, title, channel, description, transcript_text)
+  VALUES (new.id, new.video_id, new.title, new.channel, new.description, new.transcript_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcripts_fts_ad AFTER DELETE ON transcripts BEGIN
+  INSERT INTO transcripts_fts(
+    transcripts_fts, rowid, video_id, title, channel, description, transcript_text
+  )
+  VALUES (
+    'delete', old.id, old.video_id, old.title, old.channel, old.description, old.transcript_text
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcripts_fts_au
+AFTER UPDATE OF title, channel, description, transcript_text ON transcripts
+WHEN old.title IS NOT new.title
+  OR old.channel IS NOT new.channel
+  OR old.description IS NOT new.description
+  OR old.transcript_text IS NOT new.transcript_text
+BEGIN
+  INSERT INTO transcripts_fts(
+    transcripts_fts, rowid, video_id, title, channel, description, transcript_text
+  )
+  VALUES (
+    'delete', old.id, old.video_id, old.title, old.channel, old.description, old.transcript_text
+  );
+  INSERT INTO transcripts_fts(rowid, video_id, title, channel, description, transcript_text)
+  VALUES (new.id, new.video_id, new.title, new.channel, new.description, new.transcript_text);
+END;
+"""
+
+# Timestamped transcript segments with their own external-content FTS index, so a
+# phrase can be located without reading the whole transcript.
+_SEGMENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcript_segments (
+  id INTEGER PRIMARY KEY,
+  transcript_id INTEGER NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+  seq INTEGER NOT NULL,
+  start_time REAL NOT NULL,
+  end_time REAL NOT NULL,
+  speaker TEXT,
+  text TEXT NOT NULL,
+  UNIQUE(transcript_id, seq)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+  text,
+  content='transcript_segments',
+  content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS segments_fts_ai AFTER INSERT ON transcript_segments BEGIN
+  INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS segments_fts_ad AFTER DELETE ON transcript_segments BEGIN
+  INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS segments_fts_au AFTER UPDATE OF text ON transcript_segments BEGIN
+  INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+  INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+# Spectral fingerprints of the first minutes of each transcript's audio. Every
+# 32-bit sub-fingerprint is also indexed by value for approximate lookup.
+_FINGERPRINTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audio_fingerprints (
+  transcript_id INTEGER PRIMARY KEY REFERENCES transcripts(id) ON DELETE CASCADE,
+  frames BLOB NOT NULL,
+  created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS fingerprint_hashes (
+  hash INTEGER NOT NULL,
+  transcript_id INTEGER NOT NULL REFERENCES audio_fingerprints(transcript_id) ON DELETE CASCADE,
+  frame INTEGER NOT NULL,
+  PRIMARY KEY (hash, transcript_id, frame)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_fingerprint_hashes_transcript
+ON fingerprint_hashes(transcript_id);
+"""
+
+# Background playlist/channel listings. ``next_index`` is the 1-based playlist
+# position to resume from; every entry before it has been enqueued and recorded
+# in ``playlist_entries``.
+_PLAYLISTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlist_imports (
+  id TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  normalized_url TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued',
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  started_at TEXT,
+  completed_at TEXT,
+  error TEXT,
+  next_index INTEGER NOT NULL DEFAULT 1,
+  entries INTEGER NOT NULL DEFAULT 0,
+  enqueued INTEGER NOT NULL DEFAULT 0,
+  already_completed INTEGER NOT NULL DEFAULT 0,
+  already_active INTEGER NOT NULL DEFAULT 0,
+  poll_count INTEGER NOT NULL DEFAULT 0,
+  attempt INTEGER NOT NULL DEFAULT 0,
+  retry_after TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_playlist_imports_status_created_at
+ON playlist_imports(status, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_playlist_imports_normalized_url_status
+ON playlist_imports(normalized_url, status);
+
+CREATE TABLE IF NOT EXISTS playlist_entries (
+  playlist_id TEXT NOT NULL REFERENCES playlist_imports(id) ON DELETE CASCADE,
+  position INTEGER NOT NULL,
+  video_id TEXT NOT NULL,
+  title TEXT,
+  url TEXT NOT NULL,
+  job_id TEXT,
+  status TEXT NOT NULL,
+  deduplicated INTEGER NOT NULL,
+  PRIMARY KEY (playlist_id, position)
+) WITHOUT ROWID;
+"""
+
+# Channels and playlists checked on a schedule for new videos.
+# ``known_video_ids`` holds the newest ids already seen (JSON, newest first); a
+# sync lists from the top and stops at the first of them.
+_SUBSCRIPTIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+  id TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  normalized_url TEXT NOT NULL UNIQUE,
+  interval_seconds INTEGER NOT NULL,
+  backfill INTEGER NOT NULL DEFAULT 0,
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  next_sync_at TEXT NOT NULL DEFAULT (datetime('now')),
+  last_synced_at TEXT,
+  known_video_ids TEXT NOT NULL DEFAULT '[]',
+  syncs INTEGER NOT NULL DEFAULT 0,
+  failures INTEGER NOT NULL DEFAULT 0,
+  videos_enqueued INTEGER NOT NULL DEFAULT 0,
+  last_listed INTEGER,
+  last_new INTEGER,
+  last_enqueued INTEGER,
+  last_duration_seconds REAL,
+  last_error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_subscriptions_next_sync_at
+ON subscriptions(next_sync_at);
+"""
+
+# Videos whose comments are kept, and the comments themselves with an
+# external-content FTS index. ``newest_timestamp`` is the refresh watermark: a
+# refresh fetches the newest comments and, if they do not reach back to it,
+# the next refresh fetches the full thread again.
+_COMMENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS comment_sources (
+  id TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  normalized_url TEXT NOT NULL UNIQUE,
+  video_id TEXT,
+  title TEXT,
+  status TEXT NOT NULL DEFAULT 'queued',
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  fetched_at TEXT,
+  next_refresh_at TEXT,
+  newest_timestamp INTEGER,
+  full_refresh INTEGER NOT NULL DEFAULT 1,
+  comment_count INTEGER NOT NULL DEFAULT 0,
+  refreshes INTEGER NOT NULL DEFAULT 0,
+  last_new INTEGER,
+  error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_comment_sources_status_next_refresh_at
+ON comment_sources(status, next_refresh_at);
+
+CREATE INDEX IF NOT EXISTS idx_comment_sources_video_id ON comment_sources(video_id);
+
+CREATE TABLE IF NOT EXISTS comments (
+  id INTEGER PRIMARY KEY,
+  source_id TEXT NOT NULL REFERENCES comment_sources(id) ON DELETE CASCADE,
+  comment_id TEXT NOT NULL,
+  parent TEXT,
+  author TEXT,
+  author_id TEXT,
+  text TEXT NOT NULL,
+  like_count INTEGER NOT NULL DEFAULT 0,
+  is_pinned INTEGER NOT NULL DEFAULT 0,
+  timestamp INTEGER,
+  UNIQUE(source_id, comment_id)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+  text,
+  author,
+  content='comments',
+  content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS comments_fts_ai AFTER INSERT ON comments BEGIN
+  INSERT INTO comments_fts(rowid, text, author) VALUES (new.id, new.text, new.author);
+END;
+
+CREATE TRIGGER IF NOT EXISTS comments_fts_ad AFTER DELETE ON comments BEGIN
+  INSERT INTO comments_fts(comments_fts, rowid, text, author)
+  VALUES ('delete', old.id, old.text, old.author);
+END;
+
+CREATE TRIGGER IF NOT EXISTS comments_fts_au AFTER UPDATE OF text, author ON comments
+WHEN old.text IS NOT new.text OR old.author IS NOT new.author
+BEGIN
+  INSERT INTO comments_fts(comments_fts, rowid, text, author)
+  VALUES ('delete', old.id, old.text, old.author);
+  INSERT INTO comments_fts(rowid, text, author) VALUES (new.id, new.text, new.author);
+END;
+"""
+
+# Cached yt-dlp lookups (search, metadata, comments) as JSON, keyed by tool and
+# arguments. ``fetched_at`` is Unix time; ``fetch_seconds`` is what the lookup
+# cost, reported as time saved on every hit.
+_INFO_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS info_cache (
+  key TEXT PRIMARY KEY,
+  tool TEXT NOT NULL,
+  value TEXT NOT NULL,
+  fetched_at REAL NOT NULL,
+  fetch_seconds REAL NOT NULL
+) WITHOUT ROWID;
+"""
 
 
 class Database:
-    def __init__(self, path: Path) -> None:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        write_batch_window_seconds: float = DEFAULT_BATCH_WINDOW_SECONDS,
+    ) -> None:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = Lock()
-        self._conn = sqlite3.connect(str(path), check_same_thread=False)
-        self._conn.row_factory = sqlite3.Row
+        # The group-commit writer's connection; each other thread reads through its own.
+        self._conn = self._connect()
+        self._local = local()
+        # Every thread's read connection, so close() can release them all.
+        self._readers: dict[Thread, sqlite3.Connection] = {}
         self._initialize()
+        self._writes = WriteQueue(
+            self._conn,
+            self._lock,
+            batch_window_seconds=write_batch_window_seconds,
+        )
 
     @property
     def conn(self) -> sqlite3.Connection:
-        return self._conn
+        """This thread's connection.
+
+        sqlite3 connections share a statement cache, so two threads running the
+        same query on one connection can step the same statement at once.
+        WAL lets every thread read through a connection of its own instead.
+        """
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._lock:
+                # Pool threads come and go; drop the connections of finished ones.
+                for thread in [t for t in self._readers if not t.is_alive()]:
+                    self._readers.pop(thread).close()
+                self._readers[current_thread()] = conn
+        return conn
 
     @property
     def lock(self) -> Lock:
         return self._lock
 
+    @property
+    def writes(self) -> WriteQueue:
+        return self._writes
+
+    def submit_write(self, op: Callable[[sqlite3.Connection], T]) -> Future[T]:
+        """Queue ``op`` for the next group commit without waiting for it."""
+        return self._writes.submit(op)
+
+    def write(self, op: Callable[[sqlite3.Connection], T]) -> T:
+        """Run ``op`` in the next group commit and return once it is committed."""
+        return self._writes.submit(op).result()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
     def _initialize(self) -> None:
         with self._lock:
             self._conn.execute("PRAGMA journal_mode=WAL")
@@ -43,7 +351,8 @@ class Database:
                   result_path TEXT,
                   poll_count INTEGER NOT NULL DEFAULT 0,
                   attempt INTEGER NOT NULL DEFAULT 0,
-                  retry_after TEXT
+                  retry_after TEXT,
+                  priority INTEGER NOT NULL DEFAULT 0
                 );
 
                 CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at
@@ -69,19 +378,25 @@ class Database:
                   word_count INTEGER,
                   confidence REAL,
                   transcribed_at TEXT NOT NULL DEFAULT (datetime('now')),
-                  path TEXT NOT NULL
+                  path TEXT NOT NULL,
+                  transcript_text TEXT,
+                  audio_tiered_at TEXT
                 );
 
                 CREATE INDEX IF NOT EXISTS idx_transcripts_platform_channel
                 ON transcripts(platform, channel, transcribed_at DESC);
 
-                CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
-                  video_id UNINDEXED,
-                  title,
-                  channel,
-                  description,
-                  transcript_text
-                );
+                -- (transcribed_at, id) is the keyset used to page list_transcripts.
+                CREATE INDEX IF NOT EXISTS idx_transcripts_channel
+                ON transcripts(channel, transcribed_at, id);
+
+                CREATE INDEX IF NOT EXISTS idx_transcripts_transcribed_at
+                ON transcripts(transcribed_at, id);
+
+                -- Covers filter evaluation and facet counts without touching rows.
+                CREATE INDEX IF NOT EXISTS idx_transcripts_facets
+                ON transcripts(platform, channel, upload_date, duration);
+
                 """
             )
             # Migrations: add columns to existing databases that predate them
@@ -96,9 +411,164 @@ class Database:
                 )
             if "retry_after" not in cols:
                 self._conn.execute("ALTER TABLE jobs ADD COLUMN retry_after TEXT")
+            if "priority" not in cols:
+                self._conn.execute(
+                    "ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"
+                )
+            # The order claim_next takes queued jobs in.
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_jobs_status_priority_created_at
+                ON jobs(status, priority DESC, created_at)
+                """
+            )
+            # At most one active job per URL, so concurrent submissions attach to
+            # the same job (see JobsRepository.enqueue_or_attach). Duplicates left
+            # by older versions are failed first, keeping the oldest.
+            self._conn.execute(
+                f"""
+                UPDATE jobs
+                SET status = 'failed', completed_at = datetime('now'),
+                    error = 'Duplicate of an earlier active job for the same URL'
+                WHERE status IN ({ACTIVE_JOB_STATUSES_SQL})
+                  AND EXISTS (
+                    SELECT 1 FROM jobs AS older
+                    WHERE older.normalized_url = jobs.normalized_url
+                      AND older.status IN ({ACTIVE_JOB_STATUSES_SQL})
+                      AND (older.created_at, older.id) < (jobs.created_at, jobs.id)
+                  )
+                """
+            )
+            self._conn.execute(
+                f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_normalized_url
+                ON jobs(normalized_url) WHERE status IN ({ACTIVE_JOB_STATUSES_SQL})
+                """
+            )
 
+            cols = {row[1] for row in self._conn.execute("PRAGMA table_info(transcripts)")}
+            if "transcript_text" not in cols:
+                self._conn.execute("ALTER TABLE transcripts ADD COLUMN transcript_text TEXT")
+            if "audio_tiered_at" not in cols:
+                self._conn.execute("ALTER TABLE transcripts ADD COLUMN audio_tiered_at TEXT")
+            # Audio retention only walks transcripts whose audio it has not tiered yet.
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_transcripts_audio_untiered
+                ON transcripts(id) WHERE audio_tiered_at IS NULL
+                """
+            )
+
+            migrated_fts = self._migrate_transcripts_fts()
+            self._conn.executescript(_TRANSCRIPTS_FTS_SCHEMA)
+            self._conn.executescript(_SEGMENTS_SCHEMA)
+            self._conn.executescript(_FINGERPRINTS_SCHEMA)
+            self._conn.executescript(_PLAYLISTS_SCHEMA)
+            # At most one active import per URL (see PlaylistsRepository.create).
+            # Duplicates left by older versions are failed first, keeping the oldest.
+            self._conn.execute(
+                f"""
+                UPDATE playlist_imports
+                SET status = 'failed', completed_at = datetime('now'),
+                    error = 'Duplicate of an earlier active import for the same URL'
+                WHERE status IN ({ACTIVE_PLAYLIST_STATUSES_SQL})
+                  AND EXISTS (
+                    SELECT 1 FROM playlist_imports AS older
+                    WHERE older.normalized_url = playlist_imports.normalized_url
+                      AND older.status IN ({ACTIVE_PLAYLIST_STATUSES_SQL})
+                      AND (older.created_at, older.id)
+                        < (playlist_imports.created_at, playlist_imports.id)
+                  )
+                """
+            )
+            self._conn.execute(
+                f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_playlist_imports_active_normalized_url
+                ON playlist_imports(normalized_url)
+                WHERE status IN ({ACTIVE_PLAYLIST_STATUSES_SQL})
+                """
+            )
+            self._conn.executescript(_SUBSCRIPTIONS_SCHEMA)
+            self._conn.executescript(_INFO_CACHE_SCHEMA)
+            self._conn.executescript(_COMMENTS_SCHEMA)
             self._conn.commit()
 
+            if migrated_fts:
+                # The legacy FTS table held its own copy of every transcript; give
+                # the freed pages back to the filesystem once.
+                self._conn.execute("VACUUM")
+
+    def _migrate_transcripts_fts(self) -> bool:
+        """Convert a legacy self-contained ``transcripts_fts`` to external content.
+
+        Older databases stored the full text inside the FTS table. The text is moved
+        into ``transcripts.transcript_text`` and the index is rebuilt from there.
+        """
+        row = self._conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transcripts_fts'"
+        ).fetchone()
+        if row is None or "content=" in str(row[0]).replace(" ", ""):
+            return False
+
+        self._conn.execute(
+            """
+            UPDATE transcripts
+            SET transcript_text = (
+                SELECT f.transcript_text FROM transcripts_fts AS f
+                WHERE f.video_id = transcripts.video_id
+                LIMIT 1
+            )
+            WHERE transcript_text IS NULL
+            """
+        )
+        self._conn.execute("DROP TABLE transcripts_fts")
+        self._conn.commit()
+        self._conn.executescript(_TRANSCRIPTS_FTS_SCHEMA)
+        self._conn.execute("INSERT INTO transcripts_fts(transcripts_fts) VALUES ('rebuild')")
+        return True
+
+    def page_size(self) -> int:
+        return int(self._conn.execute("PRAGMA page_size").fetchone()[0])
+
+    def enable_incremental_vacuum(self) -> bool:
+        """Switch the file to ``auto_vacuum=INCREMENTAL``; returns True if it was changed.
+
+        The mode only takes effect after a full VACUUM, so this rewrites the file
+        once and should run while the service is idle.
+        """
+        with self._lock:
+            mode = int(self._conn.execute("PRAGMA auto_vacuum").fetchone()[0])
+            if mode == 2:
+                return False
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._conn.execute("VACUUM")
+            return True
+
+    def incremental_vacuum(self, max_pages: int = 0) -> int:
+        """Release up to ``max_pages`` free pages (0 = all); returns bytes released."""
+        with self._lock:
+            before = int(self._conn.execute("PRAGMA freelist_count").fetchone()[0])
+            if before == 0:
+                return 0
+            # incremental_vacuum returns one row per page; fetch to run it to completion.
+            self._conn.execute(f"PRAGMA incremental_vacuum({max(max_pages, 0)})").fetchall()
+            self._conn.commit()
+            after = int(self._conn.execute("PRAGMA freelist_count").fetchone()[0])
+        return (before - after) * self.page_size()
+
+    def checkpoint(self) -> int:
+        """Checkpoint and truncate the WAL; returns bytes released from the WAL file."""
+        wal_path = self.path.with_name(self.path.name + "-wal")
+        before = wal_path.stat().st_size if wal_path.exists() else 0
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        after = wal_path.stat().st_size if wal_path.exists() else 0
+        return max(before - after, 0)
+
     def close(self) -> None:
+        self._writes.stop()
         with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
             self._conn.close()
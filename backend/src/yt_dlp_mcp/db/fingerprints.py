@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterable, Sequence
+
+from yt_dlp_mcp.db.database import Database
+
+
+class FingerprintsRepository:
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+    def put(self, transcript_id: int, frames: bytes, hashes: Iterable[tuple[int, int]]) -> None:
+        """Store a transcript's fingerprint, replacing any earlier one.
+
+        ``frames`` holds every sub-fingerprint packed as little-endian uint32;
+        ``hashes`` are the ``(frame, value)`` pairs to index for lookup.
+        """
+        indexed = [(value, transcript_id, frame) for frame, value in hashes]
+
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM audio_fingerprints WHERE transcript_id = ?", (transcript_id,))
+            conn.execute(
+                "INSERT INTO audio_fingerprints(transcript_id, frames) VALUES (?, ?)",
+                (transcript_id, frames),
+            )
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO fingerprint_hashes(hash, transcript_id, frame)
+                VALUES (?, ?, ?)
+                """,
+                indexed,
+            )
+
+        self.db.write(op)
+
+    def get(self, transcript_id: int) -> bytes | None:
+        row = self.db.conn.execute(
+            "SELECT frames FROM audio_fingerprints WHERE transcript_id = ?", (transcript_id,)
+        ).fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def lookup(self, hashes: Sequence[int]) -> list[tuple[int, int, int]]:
+        """Every stored ``(hash, transcript_id, frame)`` whose hash is in ``hashes``."""
+        if not hashes:
+            return []
+        rows = self.db.conn.execute(
+            """
+            SELECT hash, transcript_id, frame FROM fingerprint_hashes
+            WHERE hash IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(sorted(set(hashes))),),
+        ).fetchall()
+        return [(int(row[0]), int(row[1]), int(row[2])) for row in rows]
+
+    def count(self) -> int:
+        row = self.db.conn.execute("SELECT COUNT(*) FROM audio_fingerprints").fetchone()
+        return int(row[0])
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from typing import Any
+
+from yt_dlp_mcp.db.database import Database
+
+
+class InfoCacheRepository:
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+    def get(self, key: str) -> tuple[Any, float, float] | None:
+        """The cached value for ``key`` with its ``fetched_at`` and ``fetch_seconds``."""
+        row = self.db.conn.execute(
+            "SELECT value, fetched_at, fetch_seconds FROM info_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row["value"]), float(row["fetched_at"]), float(row["fetch_seconds"])
+
+    def put(self, key: str, tool: str, value: Any, fetch_seconds: float) -> None:
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        self.db.write(
+            lambda conn: conn.execute(
+                """
+                INSERT INTO info_cache(key, tool, value, fetched_at, fetch_seconds)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    fetched_at = excluded.fetched_at,
+                    fetch_seconds = excluded.fetch_seconds
+                """,
+                (key, tool, encoded, time.time(), fetch_seconds),
+            )
+        )
+
+    def purge(self, max_age_seconds: dict[str, float]) -> int:
+        """Delete entries older than their tool's ``max_age_seconds``; returns the count."""
+
+        def op(conn: sqlite3.Connection) -> int:
+            now = time.time()
+            purged = 0
+            for tool, max_age in max_age_seconds.items():
+                purged += conn.execute(
+                    "DELETE FROM info_cache WHERE tool = ? AND fetched_at < ?",
+                    (tool, now - max_age),
+                ).rowcount
+            return purged
+
+        return self.db.write(op)
+
+    def count(self) -> int:
+        return int(self.db.conn.execute("SELECT COUNT(*) FROM info_cache").fetchone()[0])
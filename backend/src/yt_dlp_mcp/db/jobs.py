@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import sqlite3
 import uuid
+from collections.abc import Iterable, Sequence
 from typing import Any
 
-from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.database import ACTIVE_JOB_STATUSES_SQL, Database
 
 ACTIVE_STATUSES = ("queued", "downloading", "transcribing")
 
+# Claimed before anything of lower priority; equal priorities go oldest first.
+DEFAULT_PRIORITY = 0
+LOW_PRIORITY = -10
+
 MAX_ATTEMPTS = 3
 _BASE_RETRY_DELAY_SECONDS = 30
 _MAX_RETRY_DELAY_SECONDS = 600
@@ -17,26 +23,80 @@ class JobsRepository:
         self.db = db
 
     def enqueue(self, url: str, normalized_url: str) -> dict[str, Any]:
-        job_id = str(uuid.uuid4())
-        with self.db.lock:
-            self.db.conn.execute(
-                """
-                INSERT INTO jobs(id, url, normalized_url, status)
-                VALUES (?, ?, ?, 'queued')
-                """,
-                (job_id, url, normalized_url),
-            )
-            self.db.conn.commit()
-
-        job = self.get(job_id)
-        if job is None:
+        jobs = self.enqueue_many([(url, normalized_url)])
+        if not jobs:
             raise RuntimeError("Failed to create job")
-        return job
+        return jobs[0]
+
+    def enqueue_many(
+        self, items: Iterable[tuple[str, str]], *, priority: int = DEFAULT_PRIORITY
+    ) -> list[dict[str, Any]]:
+        """One active job per ``(url, normalized_url)`` pair, in input order.
+
+        See ``enqueue_or_attach``; a URL that already has an active job gets
+        that job back.
+        """
+        return [job for job, _ in self.enqueue_or_attach(items, priority=priority)]
+
+    def enqueue_or_attach(
+        self, items: Iterable[tuple[str, str]], *, priority: int = DEFAULT_PRIORITY
+    ) -> list[tuple[dict[str, Any], bool]]:
+        """Queue a job per ``(url, normalized_url)`` pair unless one is already active.
+
+        Runs as one transaction against the partial unique index on active
+        normalized URLs, so callers racing on the same URL, in this process or
+        another, all get the same job. Returns ``(job, created)`` in input
+        order; an attached job is raised to ``priority`` if it was lower.
+        """
+        rows = [
+            (str(uuid.uuid4()), url, normalized_url, priority) for url, normalized_url in items
+        ]
+        if not rows:
+            return []
+
+        def op(conn: sqlite3.Connection) -> list[tuple[dict[str, Any], bool]]:
+            results: list[tuple[dict[str, Any], bool]] = []
+            for row in rows:
+                inserted = conn.execute(
+                    f"""
+                    INSERT INTO jobs(id, url, normalized_url, status, priority)
+                    VALUES (?, ?, ?, 'queued', ?)
+                    ON CONFLICT(normalized_url) WHERE status IN ({ACTIVE_JOB_STATUSES_SQL})
+                    DO NOTHING
+                    RETURNING *
+                    """,
+                    row,
+                ).fetchone()
+                if inserted is not None:
+                    results.append((dict(inserted), True))
+                    continue
+                existing = conn.execute(
+                    f"""
+                    UPDATE jobs SET priority = max(priority, ?)
+                    WHERE normalized_url = ? AND status IN ({ACTIVE_JOB_STATUSES_SQL})
+                    RETURNING *
+                    """,
+                    (priority, row[2]),
+                ).fetchone()
+                results.append((dict(existing), False))
+            return results
+
+        return self.db.write(op)
 
     def get(self, job_id: str) -> dict[str, Any] | None:
         row = self.db.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
         return dict(row) if row is not None else None
 
+    def get_many(self, job_ids: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """Jobs keyed by id; unknown ids are absent."""
+        if not job_ids:
+            return {}
+        placeholders = ",".join("?" for _ in job_ids)
+        rows = self.db.conn.execute(
+            f"SELECT * FROM jobs WHERE id IN ({placeholders})", tuple(job_ids)
+        ).fetchall()
+        return {str(row["id"]): dict(row) for row in rows}
+
     def find_active_by_normalized_url(self, normalized_url: str) -> dict[str, Any] | None:
         placeholders = ",".join("?" for _ in ACTIVE_STATUSES)
         row = self.db.conn.execute(
@@ -50,51 +110,92 @@ class JobsRepository:
         ).fetchone()
         return dict(row) if row is not None else None
 
+    def find_active_many(self, normalized_urls: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """Active jobs keyed by normalized URL; URLs with none are absent."""
+        if not normalized_urls:
+            return {}
+        placeholders = ",".join("?" for _ in normalized_urls)
+        rows = self.db.conn.execute(
+            f"""
+            SELECT * FROM jobs
+            WHERE normalized_url IN ({placeholders}) AND status IN ({ACTIVE_JOB_STATUSES_SQL})
+            """,
+            tuple(normalized_urls),
+        ).fetchall()
+        return {str(row["normalized_url"]): dict(row) for row in rows}
+
+    def active_counts(self) -> dict[str, int]:
+        """Jobs per active status: the backlog this instance still has to work through."""
+        counts = dict.fromkeys(ACTIVE_STATUSES, 0)
+        rows = self.db.conn.execute(
+            f"""
+            SELECT status, COUNT(*) FROM jobs
+            WHERE status IN ({ACTIVE_JOB_STATUSES_SQL})
+            GROUP BY status
+            """
+        ).fetchall()
+        counts.update({str(status): int(count) for status, count in rows})
+        return counts
+
     def claim_next(self) -> dict[str, Any] | None:
-        with self.db.lock:
-            self.db.conn.execute("BEGIN IMMEDIATE")
-            row = self.db.conn.execute(
+        def op(conn: sqlite3.Connection) -> dict[str, Any] | None:
+            row = conn.execute(
                 """
-                SELECT * FROM jobs
-                WHERE status = 'queued'
-                  AND (retry_after IS NULL OR retry_after <= datetime('now'))
-                ORDER BY created_at ASC
-                LIMIT 1
+                UPDATE jobs
+                SET status = 'downloading', started_at = datetime('now')
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued'
+                      AND (retry_after IS NULL OR retry_after <= datetime('now'))
+                    ORDER BY priority DESC, created_at ASC
+                    LIMIT 1
+                )
+                RETURNING *
                 """
             ).fetchone()
-            if row is None:
-                self.db.conn.commit()
-                return None
+            return dict(row) if row is not None else None
 
-            job_id = row["id"]
-            self.db.conn.execute(
-                """
-                UPDATE jobs
-                SET status = 'downloading', started_at = datetime('now')
-                WHERE id = ?
-                """,
-                (job_id,),
-            )
-            self.db.conn.commit()
+        return self.db.write(op)
 
-        return self.get(str(job_id))
+    def increment_poll_count(self, job_id: str) -> dict[str, Any] | None:
+        """Bump the poll counter and return the updated row in the same write."""
 
-    def increment_poll_count(self, job_id: str) -> None:
-        with self.db.lock:
-            self.db.conn.execute(
-                "UPDATE jobs SET poll_count = poll_count + 1 WHERE id = ?",
+        def op(conn: sqlite3.Connection) -> dict[str, Any] | None:
+            row = conn.execute(
+                "UPDATE jobs SET poll_count = poll_count + 1 WHERE id = ? RETURNING *",
                 (job_id,),
-            )
-            self.db.conn.commit()
+            ).fetchone()
+            return dict(row) if row is not None else None
+
+        return self.db.write(op)
+
+    def increment_poll_counts(self, job_ids: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """``increment_poll_count`` for several jobs in one statement, keyed by id."""
+        if not job_ids:
+            return {}
+        placeholders = ",".join("?" for _ in job_ids)
+
+        def op(conn: sqlite3.Connection) -> dict[str, dict[str, Any]]:
+            rows = conn.execute(
+                f"""
+                UPDATE jobs SET poll_count = poll_count + 1
+                WHERE id IN ({placeholders})
+                RETURNING *
+                """,
+                tuple(job_ids),
+            ).fetchall()
+            return {str(row["id"]): dict(row) for row in rows}
+
+        return self.db.write(op)
 
     def set_status(self, job_id: str, status: str) -> None:
-        with self.db.lock:
-            self.db.conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (status, job_id))
-            self.db.conn.commit()
+        self.db.write(
+            lambda conn: conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (status, job_id))
+        )
 
     def mark_completed(self, job_id: str, video_id: str, result_path: str) -> None:
-        with self.db.lock:
-            self.db.conn.execute(
+        self.db.write(
+            lambda conn: conn.execute(
                 """
                 UPDATE jobs
                 SET status = 'completed', completed_at = datetime('now'), video_id = ?, result_path = ?, error = NULL
@@ -102,14 +203,14 @@ class JobsRepository:
                 """,
                 (video_id, result_path, job_id),
             )
-            self.db.conn.commit()
+        )
 
     def mark_failed(self, job_id: str, error: str, attempt: int = 0) -> None:
         next_attempt = attempt + 1
         if next_attempt < MAX_ATTEMPTS:
             delay = min(_BASE_RETRY_DELAY_SECONDS * (2 ** attempt), _MAX_RETRY_DELAY_SECONDS)
-            with self.db.lock:
-                self.db.conn.execute(
+            self.db.write(
+                lambda conn: conn.execute(
                     """
                     UPDATE jobs
                     SET status = 'queued', started_at = NULL, attempt = ?,
@@ -118,10 +219,10 @@ class JobsRepository:
                     """,
                     (next_attempt, str(delay), error[:2000], job_id),
                 )
-                self.db.conn.commit()
+            )
         else:
-            with self.db.lock:
-                self.db.conn.execute(
+            self.db.write(
+                lambda conn: conn.execute(
                     """
                     UPDATE jobs
                     SET status = 'failed', completed_at = datetime('now'), error = ?
@@ -129,4 +230,20 @@ class JobsRepository:
                     """,
                     (error[:2000], job_id),
                 )
-                self.db.conn.commit()
+            )
+
+    def purge_finished(self, older_than_days: int) -> int:
+        """Delete completed and failed jobs that finished more than N days ago."""
+
+        def op(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(
+                """
+                DELETE FROM jobs
+                WHERE status IN ('completed', 'failed')
+                  AND completed_at < datetime('now', ? || ' days')
+                """,
+                (str(-abs(older_than_days)),),
+            )
+            return int(cursor.rowcount)
+
+        return self.db.write(op)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import sqlite3
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from yt_dlp_mcp.db.database import ACTIVE_PLAYLIST_STATUSES_SQL, Database
+from yt_dlp_mcp.db.jobs import MAX_ATTEMPTS
+from yt_dlp_mcp.utils.cursor import decode_cursor, encode_cursor
+
+ACTIVE_PLAYLIST_STATUSES = ("queued", "listing")
+
+_BASE_RETRY_DELAY_SECONDS = 30
+_MAX_RETRY_DELAY_SECONDS = 600
+
+
+class PlaylistsRepository:
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+    def create(self, url: str, normalized_url: str) -> tuple[dict[str, Any], bool]:
+        """The active import of ``normalized_url`` and whether it was just created.
+
+        Runs against the partial unique index on active imports, so concurrent
+        calls for the same URL all get the same import.
+        """
+
+        def op(conn: sqlite3.Connection) -> tuple[dict[str, Any], bool]:
+            row = conn.execute(
+                f"""
+                INSERT INTO playlist_imports(id, url, normalized_url)
+                VALUES (?, ?, ?)
+                ON CONFLICT(normalized_url) WHERE status IN ({ACTIVE_PLAYLIST_STATUSES_SQL})
+                DO NOTHING
+                RETURNING *
+                """,
+                (str(uuid.uuid4()), url, normalized_url),
+            ).fetchone()
+            if row is not None:
+                return dict(row), True
+            existing = conn.execute(
+                f"""
+                SELECT * FROM playlist_imports
+                WHERE normalized_url = ? AND status IN ({ACTIVE_PLAYLIST_STATUSES_SQL})
+                """,
+                (normalized_url,),
+            ).fetchone()
+            return dict(existing), False
+
+        return self.db.write(op)
+
+    def get(self, playlist_id: str) -> dict[str, Any] | None:
+        row = self.db.conn.execute(
+            "SELECT * FROM playlist_imports WHERE id = ?", (playlist_id,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def claim_next(self) -> dict[str, Any] | None:
+        def op(conn: sqlite3.Connection) -> dict[str, Any] | None:
+            row = conn.execute(
+                """
+                UPDATE playlist_imports
+                SET status = 'listing', started_at = datetime('now')
+                WHERE id = (
+                    SELECT id FROM playlist_imports
+                    WHERE status = 'queued'
+                      AND (retry_after IS NULL OR retry_after <= datetime('now'))
+                    ORDER BY created_at ASC
+                    LIMIT 1
+                )
+                RETURNING *
+                """
+            ).fetchone()
+            return dict(row) if row is not None else None
+
+        return self.db.write(op)
+
+    def requeue_interrupted(self) -> int:
+        """Put listings cut off by a restart back in the queue; they resume at next_index."""
+
+        def op(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(
+                "UPDATE playlist_imports SET status = 'queued' WHERE status = 'listing'"
+            )
+            return int(cursor.rowcount)
+
+        return self.db.write(op)
+
+    def record_batch(
+        self, playlist_id: str, entries: Sequence[dict[str, Any]], next_index: int
+    ) -> None:
+        """Store enqueued ``entries`` and advance the resume cursor in one commit.
+
+        Each entry has the playlist ``position``, ``video_id``, ``title``, ``url``
+        and the enqueue result (``job_id``, ``status``, ``deduplicated``).
+        """
+        rows = [
+            (
+                playlist_id,
+                entry["position"],
+                entry["video_id"],
+                entry.get("title"),
+                entry["url"],
+                entry.get("job_id"),
+                entry["status"],
+                int(bool(entry["deduplicated"])),
+            )
+            for entry in entries
+        ]
+
+        def op(conn: sqlite3.Connection) -> None:
+            counts = {"enqueued": 0, "completed": 0, "active": 0}
+            for row in rows:
+                # A batch replayed after a crash keeps its first recording and
+                # is not counted twice.
+                inserted = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO playlist_entries(
+                        playlist_id, position, video_id, title, url, job_id, status,
+                        deduplicated
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    row,
+                ).rowcount
+                if not inserted:
+                    continue
+                if not row[7]:
+                    counts["enqueued"] += 1
+                elif row[6] == "completed":
+                    counts["completed"] += 1
+                else:
+                    counts["active"] += 1
+            conn.execute(
+                """
+                UPDATE playlist_imports
+                SET next_index = max(next_index, ?),
+                    entries = entries + ?,
+                    enqueued = enqueued + ?,
+                    already_completed = already_completed + ?,
+                    already_active = already_active + ?,
+                    -- Progress resets the retry budget: only consecutive failures count.
+                    attempt = 0
+                WHERE id = ?
+                """,
+                (
+                    next_index,
+                    sum(counts.values()),
+                    counts["enqueued"],
+                    counts["completed"],
+                    counts["active"],
+                    playlist_id,
+                ),
+            )
+
+        self.db.write(op)
+
+    def increment_poll_count(self, playlist_id: str) -> dict[str, Any] | None:
+        def op(conn: sqlite3.Connection) -> dict[str, Any] | None:
+            row = conn.execute(
+                """
+                UPDATE playlist_imports SET poll_count = poll_count + 1
+                WHERE id = ?
+                RETURNING *
+                """,
+                (playlist_id,),
+            ).fetchone()
+            return dict(row) if row is not None else None
+
+        return self.db.write(op)
+
+    def mark_completed(self, playlist_id: str) -> None:
+        self.db.write(
+            lambda conn: conn.execute(
+                """
+                UPDATE playlist_imports
+                SET status = 'completed', completed_at = datetime('now'), error = NULL
+                WHERE id = ?
+                """,
+                (playlist_id,),
+            )
+        )
+
+    def mark_failed(self, playlist_id: str, error: str, attempt: int = 0) -> None:
+        """Retry with backoff from the resume cursor, or fail after MAX_ATTEMPTS."""
+        next_attempt = attempt + 1
+        if next_attempt < MAX_ATTEMPTS:
+            delay = min(_BASE_RETRY_DELAY_SECONDS * (2**attempt), _MAX_RETRY_DELAY_SECONDS)
+            self.db.write(
+                lambda conn: conn.execute(
+                    """
+                    UPDATE playlist_imports
+                    SET status = 'queued', attempt = ?,
+                        retry_after = datetime('now', ? || ' seconds'), error = ?
+                    WHERE id = ?
+                    """,
+                    (next_attempt, str(delay), error[:2000], playlist_id),
+                )
+            )
+        else:
+            self.db.write(
+                lambda conn: conn.execute(
+                    """
+                    UPDATE playlist_imports
+                    SET status = 'failed', completed_at = datetime('now'), error = ?
+                    WHERE id = ?
+                    """,
+                    (error[:2000], playlist_id),
+                )
+            )
+
+    def entries_page(
+        self, playlist_id: str, limit: int = 100, cursor: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Recorded entries in playlist order, keyset-paged by position."""
+        limit = max(1, min(limit, 500))
+        after = 0
+        if cursor is not None:
+            (after,) = decode_cursor(cursor, "playlist_entries", (int,))
+        rows = self.db.conn.execute(
+            """
+            SELECT position, video_id, title, url, job_id, status, deduplicated
+            FROM playlist_entries
+            WHERE playlist_id = ? AND position > ?
+            ORDER BY position
+            LIMIT ?
+            """,
+            (playlist_id, int(after), limit + 1),
+        ).fetchall()
+        items = [{**dict(row), "deduplicated": bool(row["deduplicated"])} for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor("playlist_entries", [items[-1]["position"]])
+        return items, next_cursor
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from yt_dlp_mcp.db.database import Database
+
+# Newest video ids remembered per subscription. A sync stops at the first of
+# them it meets, so a few deleted or unlisted videos at the top do not force a
+# full re-listing.
+KNOWN_VIDEO_WINDOW = 50
+
+# A failed sync is retried after this long, or the subscription interval if shorter.
+_FAILURE_RETRY_SECONDS = 900
+
+
+def _decode(row: sqlite3.Row) -> dict[str, Any]:
+    item = dict(row)
+    item["known_video_ids"] = json.loads(item["known_video_ids"] or "[]")
+    item["backfill"] = bool(item["backfill"])
+    return item
+
+
+class SubscriptionsRepository:
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+    def create(
+        self, url: str, normalized_url: str, *, interval_seconds: int, backfill: bool
+    ) -> tuple[dict[str, Any], bool]:
+        """The subscription for ``normalized_url`` and whether it was just created."""
+
+        def op(conn: sqlite3.Connection) -> tuple[dict[str, Any], bool]:
+            row = conn.execute(
+                """
+                INSERT INTO subscriptions(id, url, normalized_url, interval_seconds, backfill)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(normalized_url) DO NOTHING
+                RETURNING *
+                """,
+                (str(uuid.uuid4()), url, normalized_url, interval_seconds, int(backfill)),
+            ).fetchone()
+            if row is not None:
+                return _decode(row), True
+            existing = conn.execute(
+                "SELECT * FROM subscriptions WHERE normalized_url = ?", (normalized_url,)
+            ).fetchone()
+            return _decode(existing), False
+
+        return self.db.write(op)
+
+    def get(self, subscription_id: str) -> dict[str, Any] | None:
+        row = self.db.conn.execute(
+            "SELECT * FROM subscriptions WHERE id = ?", (subscription_id,)
+        ).fetchone()
+        return _decode(row) if row is not None else None
+
+    def list_all(self) -> list[dict[str, Any]]:
+        rows = self.db.conn.execute("SELECT * FROM subscriptions ORDER BY created_at").fetchall()
+        return [_decode(row) for row in rows]
+
+    def delete(self, subscription_id: str) -> bool:
+        def op(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute("DELETE FROM subscriptions WHERE id = ?", (subscription_id,))
+            return cursor.rowcount > 0
+
+        return self.db.write(op)
+
+    def list_due(self, limit: int = 10) -> list[dict[str, Any]]:
+        rows = self.db.conn.execute(
+            """
+            SELECT * FROM subscriptions
+            WHERE next_sync_at <= datetime('now')
+            ORDER BY next_sync_at
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def record_sync(
+        self,
+        subscription_id: str,
+        *,
+        known_video_ids: Sequence[str],
+        listed: int,
+        new: int,
+        enqueued: int,
+        duration_seconds: float,
+    ) -> None:
+        known = json.dumps(list(known_video_ids)[:KNOWN_VIDEO_WINDOW])
+        self.db.write(
+            lambda conn: conn.execute(
+                """
+                UPDATE subscriptions
+                SET known_video_ids = ?,
+                    last_synced_at = datetime('now'),
+                    next_sync_at = datetime('now', interval_seconds || ' seconds'),
+                    syncs = syncs + 1,
+                    videos_enqueued = videos_enqueued + ?,
+                    last_listed = ?,
+                    last_new = ?,
+                    last_enqueued = ?,
+                    last_duration_seconds = ?,
+                    last_error = NULL
+                WHERE id = ?
+                """,
+                (known, enqueued, listed, new, enqueued, duration_seconds, subscription_id),
+            )
+        )
+
+    def record_failure(self, subscription_id: str, error: str) -> None:
+        self.db.write(
+            lambda conn: conn.execute(
+                """
+                UPDATE subscriptions
+                SET failures = failures + 1,
+                    last_error = ?,
+                    next_sync_at = datetime(
+                        'now', min(interval_seconds, ?) || ' seconds'
+                    )
+                WHERE id = ?
+                """,
+                (error[:2000], _FAILURE_RETRY_SECONDS, subscription_id),
+            )
+        )
+
+    def stats(self) -> dict[str, Any]:
+        row = self.db.conn.execute(
+            """
+            SELECT
+                COUNT(*) AS subscriptions,
+                COALESCE(SUM(syncs), 0) AS syncs,
+                COALESCE(SUM(failures), 0) AS failures,
+                COALESCE(SUM(videos_enqueued), 0) AS videos_enqueued,
+                COALESCE(SUM(next_sync_at <= datetime('now')), 0) AS due
+            FROM subscriptions
+            """
+        ).fetchone()
+        return dict(row)
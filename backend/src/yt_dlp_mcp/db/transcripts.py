@@ -1,28 +1,171 @@
 from __future__ import annotations
 
-from typing import Any
+import logging
+import sqlite3
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass, replace
+from typing import Any, TypeVar
 
 from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.types import TranscriptSegment
+from yt_dlp_mcp.utils.cache import LRUCache
+from yt_dlp_mcp.utils.cursor import NUMBER, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Called after commit with (transcript_id, [(segment_id, text), ...]).
+SegmentListener = Callable[[int, list[tuple[int, str]]], None]
+
+Page = tuple[list[dict[str, Any]], str | None]
+
+DEFAULT_QUERY_CACHE_SIZE = 512
+
+# Every transcripts column except the full transcript_text, which only exists to
+# back the full-text index and should not be loaded for metadata lookups.
+_METADATA_COLUMNS = """
+    id, video_id, normalized_url, url, title, channel, platform, duration, upload_date,
+    description, thumbnail, view_count, speaker_count, word_count, confidence,
+    transcribed_at, path
+"""
+
+# Fields returned by list_transcripts; the long description is left out.
+_LIST_COLUMNS = """
+    video_id, url, title, channel, platform, duration, upload_date, view_count,
+    speaker_count, word_count, transcribed_at, path
+"""
+
+FACET_LIMIT = 20
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptFilters:
+    """Structured filters applied inside search and list queries.
+
+    Upload dates use yt-dlp's ``YYYYMMDD`` form; ``YYYY-MM-DD`` is accepted too.
+    Duration bounds are in seconds and inclusive.
+    """
+
+    platform: str | None = None
+    channel: str | None = None
+    upload_date_from: str | None = None
+    upload_date_to: str | None = None
+    min_duration: float | None = None
+    max_duration: float | None = None
+
+    def to_sql(self, alias: str) -> tuple[list[str], list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if self.platform:
+            clauses.append(f"{alias}.platform = ?")
+            params.append(self.platform)
+        if self.channel:
+            clauses.append(f"{alias}.channel = ?")
+            params.append(self.channel)
+        if self.upload_date_from:
+            clauses.append(f"{alias}.upload_date >= ?")
+            params.append(self.upload_date_from.replace("-", ""))
+        if self.upload_date_to:
+            clauses.append(f"{alias}.upload_date <= ?")
+            params.append(self.upload_date_to.replace("-", ""))
+        if self.min_duration is not None:
+            clauses.append(f"{alias}.duration >= ?")
+            params.append(self.min_duration)
+        if self.max_duration is not None:
+            clauses.append(f"{alias}.duration <= ?")
+            params.append(self.max_duration)
+        return clauses, params
 
 
 class TranscriptsRepository:
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, *, query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE) -> None:
         self.db = db
+        # Search/list results keyed by (generation, query, filters). Every write
+        # bumps the generation, which makes all earlier entries unreachable.
+        self._query_cache: LRUCache[tuple[Any, ...], Any] = LRUCache(query_cache_size)
+        self._generation = 0
+        self._segment_listeners: list[SegmentListener] = []
+
+    def subscribe_segments(self, listener: SegmentListener) -> None:
+        """Register ``listener`` to be told whenever a transcript's segments are replaced."""
+        self._segment_listeners.append(listener)
+
+    def _notify_segments(self, transcript_id: int) -> None:
+        if not self._segment_listeners:
+            return
+        segments = self.list_segment_texts(transcript_id)
+        for listener in self._segment_listeners:
+            try:
+                listener(transcript_id, segments)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Segment listener failed for transcript %s", transcript_id)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def query_cache_stats(self) -> dict[str, Any]:
+        return {**self._query_cache.stats(), "generation": self._generation}
+
+    def _cached(self, key: tuple[Any, ...], compute: Callable[[], T]) -> T:
+        """Return ``compute()`` from the query cache. Callers must not mutate the result."""
+        generation = self._generation
+        cached: T | None = self._query_cache.get((generation, *key))
+        if cached is None:
+            cached = compute()
+            # Skip caching if a write landed while the query ran.
+            if generation == self._generation:
+                self._query_cache.put((generation, *key), cached)
+        return cached
+
+    def _invalidate(self) -> None:
+        # Called after commit so a reader can never cache pre-write rows under
+        # the new generation.
+        self._generation += 1
 
     def get_by_video_id(self, video_id: str) -> dict[str, Any] | None:
         row = self.db.conn.execute(
-            "SELECT * FROM transcripts WHERE video_id = ? LIMIT 1",
+            f"SELECT {_METADATA_COLUMNS} FROM transcripts WHERE video_id = ? LIMIT 1",
             (video_id,),
         ).fetchone()
         return dict(row) if row is not None else None
 
     def get_by_normalized_url(self, normalized_url: str) -> dict[str, Any] | None:
         row = self.db.conn.execute(
-            "SELECT * FROM transcripts WHERE normalized_url = ? LIMIT 1",
+            f"SELECT {_METADATA_COLUMNS} FROM transcripts WHERE normalized_url = ? LIMIT 1",
             (normalized_url,),
         ).fetchone()
         return dict(row) if row is not None else None
 
+    def find_existing(
+        self, normalized_urls: Sequence[str], video_ids: Sequence[str] = ()
+    ) -> list[dict[str, Any]]:
+        """Transcripts stored under any of ``normalized_urls`` or ``video_ids``, in one query."""
+        if not normalized_urls and not video_ids:
+            return []
+        url_placeholders = ",".join("?" for _ in normalized_urls)
+        id_placeholders = ",".join("?" for _ in video_ids)
+        rows = self.db.conn.execute(
+            f"""
+            SELECT {_METADATA_COLUMNS} FROM transcripts
+            WHERE normalized_url IN ({url_placeholders}) OR video_id IN ({id_placeholders})
+            """,
+            (*normalized_urls, *video_ids),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_by_video_ids(self, video_ids: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """Metadata keyed by video id; unknown ids are absent."""
+        if not video_ids:
+            return {}
+        placeholders = ",".join("?" for _ in video_ids)
+        rows = self.db.conn.execute(
+            f"SELECT {_METADATA_COLUMNS} FROM transcripts WHERE video_id IN ({placeholders})",
+            tuple(video_ids),
+        ).fetchall()
+        return {str(row["video_id"]): dict(row) for row in rows}
+
     def upsert(
         self,
         *,
@@ -42,15 +185,16 @@ class TranscriptsRepository:
         speaker_count: int | None,
         word_count: int | None,
         confidence: float | None,
+        segments: Sequence[TranscriptSegment] | None = None,
     ) -> None:
-        with self.db.lock:
-            self.db.conn.execute(
+        def op(conn: sqlite3.Connection) -> int:
+            row = conn.execute(
                 """
                 INSERT INTO transcripts(
                     video_id, normalized_url, url, title, channel, platform, duration,
                     upload_date, description, thumbnail, view_count,
-                    speaker_count, word_count, confidence, transcribed_at, path
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), ?)
+                    speaker_count, word_count, confidence, transcribed_at, path, transcript_text
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), ?, ?)
                 ON CONFLICT(video_id) DO UPDATE SET
                     normalized_url = excluded.normalized_url,
                     url = excluded.url,
@@ -66,7 +210,10 @@ class TranscriptsRepository:
                     word_count = excluded.word_count,
                     confidence = excluded.confidence,
                     transcribed_at = datetime('now'),
-                    path = excluded.path
+                    path = excluded.path,
+                    transcript_text = excluded.transcript_text,
+                    audio_tiered_at = NULL
+                RETURNING id
                 """,
                 (
                     video_id,
@@ -84,23 +231,195 @@ class TranscriptsRepository:
                     word_count,
                     confidence,
                     path,
-                ),
-            )
-            self.db.conn.execute("DELETE FROM transcripts_fts WHERE video_id = ?", (video_id,))
-            self.db.conn.execute(
-                """
-                INSERT INTO transcripts_fts(video_id, title, channel, description, transcript_text)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    video_id,
-                    title or "",
-                    channel or "",
-                    description or "",
                     transcript_text,
                 ),
+            ).fetchone()
+            # transcripts_fts and segments_fts are maintained by triggers.
+            if segments is not None:
+                self._replace_segments(conn, int(row["id"]), segments)
+            return int(row["id"])
+
+        transcript_id = self.db.write(op)
+        self._invalidate()
+        if segments is not None:
+            self._notify_segments(transcript_id)
+
+    def index_segments(self, video_id: str, segments: Sequence[TranscriptSegment]) -> None:
+        """Replace the indexed segments of an existing transcript."""
+
+        def op(conn: sqlite3.Connection) -> int | None:
+            row = conn.execute(
+                "SELECT id FROM transcripts WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._replace_segments(conn, int(row["id"]), segments)
+            return int(row["id"])
+
+        transcript_id = self.db.write(op)
+        if transcript_id is None:
+            return
+        self._invalidate()
+        self._notify_segments(transcript_id)
+
+    def _replace_segments(
+        self, conn: sqlite3.Connection, transcript_id: int, segments: Sequence[TranscriptSegment]
+    ) -> None:
+        conn.execute("DELETE FROM transcript_segments WHERE transcript_id = ?", (transcript_id,))
+        conn.executemany(
+            """
+            INSERT INTO transcript_segments(
+                transcript_id, seq, start_time, end_time, speaker, text
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (transcript_id, seq, segment.start, segment.end, segment.speaker, segment.text)
+                for seq, segment in enumerate(segments)
+            ],
+        )
+
+    def list_segment_texts(self, transcript_id: int) -> list[tuple[int, str]]:
+        rows = self.db.conn.execute(
+            "SELECT id, text FROM transcript_segments WHERE transcript_id = ? ORDER BY seq",
+            (transcript_id,),
+        ).fetchall()
+        return [(int(row["id"]), str(row["text"])) for row in rows]
+
+    def list_transcript_ids_with_segments(self) -> list[int]:
+        rows = self.db.conn.execute(
+            "SELECT DISTINCT transcript_id FROM transcript_segments ORDER BY transcript_id"
+        ).fetchall()
+        return [int(row[0]) for row in rows]
+
+    def get_segments(self, segment_ids: Sequence[int]) -> dict[int, dict[str, Any]]:
+        """Segments with their transcript's title and channel, keyed by segment id."""
+        if not segment_ids:
+            return {}
+        placeholders = ",".join("?" for _ in segment_ids)
+        rows = self.db.conn.execute(
+            f"""
+            SELECT
+                s.id, s.seq, s.start_time, s.end_time, s.speaker, s.text,
+                t.video_id, t.title, t.channel
+            FROM transcript_segments AS s
+            JOIN transcripts AS t ON t.id = s.transcript_id
+            WHERE s.id IN ({placeholders})
+            """,
+            tuple(segment_ids),
+        ).fetchall()
+        return {
+            int(row["id"]): {
+                "video_id": row["video_id"],
+                "title": row["title"],
+                "channel": row["channel"],
+                "segment": row["seq"],
+                "start": row["start_time"],
+                "end": row["end_time"],
+                "speaker": row["speaker"],
+                "text": row["text"],
+            }
+            for row in rows
+        }
+
+    def get_by_ids(
+        self, transcript_ids: Sequence[int], *, filters: TranscriptFilters | None = None
+    ) -> dict[int, dict[str, Any]]:
+        """List-projection metadata keyed by transcript row id, for rows matching ``filters``."""
+        if not transcript_ids:
+            return {}
+        clauses, params = (filters or TranscriptFilters()).to_sql("t")
+        where = "".join(f" AND {clause}" for clause in clauses)
+        placeholders = ",".join("?" for _ in transcript_ids)
+        rows = self.db.conn.execute(
+            f"""
+            SELECT t.id, {_LIST_COLUMNS} FROM transcripts AS t
+            WHERE t.id IN ({placeholders}){where}
+            """,
+            (*transcript_ids, *params),
+        ).fetchall()
+        result: dict[int, dict[str, Any]] = {}
+        for row in rows:
+            item = dict(row)
+            result[int(item.pop("id"))] = item
+        return result
+
+    def get_id(self, video_id: str) -> int | None:
+        row = self.db.conn.execute(
+            "SELECT id FROM transcripts WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        return int(row[0]) if row is not None else None
+
+    def list_unindexed_segments(
+        self, *, after_id: int = 0, limit: int = 100
+    ) -> list[dict[str, Any]]:
+        """Transcripts with no indexed segments, in id order, for backfilling."""
+        rows = self.db.conn.execute(
+            """
+            SELECT t.id, t.video_id, t.path FROM transcripts AS t
+            WHERE t.id > ?
+              AND NOT EXISTS (SELECT 1 FROM transcript_segments AS s WHERE s.transcript_id = t.id)
+            ORDER BY t.id
+            LIMIT ?
+            """,
+            (after_id, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_transcribed_before(
+        self, older_than_days: int, *, after_id: int = 0, limit: int = 100
+    ) -> list[dict[str, Any]]:
+        """Transcripts older than N days whose audio is not tiered yet, in id order."""
+        rows = self.db.conn.execute(
+            """
+            SELECT id, video_id, path FROM transcripts
+            WHERE audio_tiered_at IS NULL
+              AND id > ? AND transcribed_at < datetime('now', ? || ' days')
+            ORDER BY id
+            LIMIT ?
+            """,
+            (after_id, str(-abs(older_than_days)), limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_audio_tiered(self, transcript_ids: Sequence[int]) -> None:
+        """Record that audio retention is done with these transcripts until they are rewritten."""
+        if not transcript_ids:
+            return
+        self.db.write(
+            lambda conn: conn.executemany(
+                "UPDATE transcripts SET audio_tiered_at = datetime('now') WHERE id = ?",
+                [(transcript_id,) for transcript_id in transcript_ids],
             )
-            self.db.conn.commit()
+        )
+
+    def iter_transcripts(
+        self, filters: TranscriptFilters | None = None, *, batch_size: int = 500
+    ) -> Iterator[dict[str, Any]]:
+        """Metadata of every transcript matching ``filters``, in id order.
+
+        Rows are fetched ``batch_size`` at a time by keyset on id, so memory stays
+        flat however many transcripts match.
+        """
+        filters = filters or TranscriptFilters()
+        after_id = 0
+        while True:
+            clauses, params = filters.to_sql("t")
+            clauses.append("t.id > ?")
+            params.extend([after_id, batch_size])
+            rows = self.db.conn.execute(
+                f"""
+                SELECT {_METADATA_COLUMNS} FROM transcripts AS t
+                WHERE {" AND ".join(clauses)}
+                ORDER BY t.id
+                LIMIT ?
+                """,
+                tuple(params),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+            after_id = rows[-1]["id"]
 
     def list_transcripts(
         self,
@@ -108,45 +427,305 @@ class TranscriptsRepository:
         platform: str | None = None,
         channel: str | None = None,
         limit: int = 20,
+        filters: TranscriptFilters | None = None,
     ) -> list[dict[str, Any]]:
-        query = "SELECT * FROM transcripts"
-        clauses: list[str] = []
-        params: list[Any] = []
+        items, _ = self.list_transcripts_page(
+            platform=platform, channel=channel, limit=limit, filters=filters
+        )
+        return items
+
+    def list_transcripts_page(
+        self,
+        *,
+        platform: str | None = None,
+        channel: str | None = None,
+        limit: int = 20,
+        filters: TranscriptFilters | None = None,
+        cursor: str | None = None,
+    ) -> Page:
+        """One page of transcripts, newest first, plus the cursor for the next page.
 
-        if platform:
-            clauses.append("platform = ?")
-            params.append(platform)
-        if channel:
-            clauses.append("channel = ?")
-            params.append(channel)
+        Pages are keyed on ``(transcribed_at, id)`` so every page costs the same
+        index seek regardless of depth. Each item carries the cursor that resumes
+        right after it. Raises ValueError for an invalid cursor.
+        """
+        filters = _merge_filters(filters, platform=platform, channel=channel)
+        limit = max(1, min(limit, 100))
+        after = decode_cursor(cursor, "list", (str, int)) if cursor else None
+        items, next_cursor = self._cached(
+            ("list", filters, limit, cursor),
+            lambda: self._list_transcripts(filters, limit, after),
+        )
+        return [dict(item) for item in items], next_cursor
 
+    def _list_transcripts(
+        self, filters: TranscriptFilters, limit: int, after: list[Any] | None
+    ) -> Page:
+        query = f"SELECT t.id, {_LIST_COLUMNS} FROM transcripts AS t"
+        clauses, params = filters.to_sql("t")
+        if after is not None:
+            clauses.append("(t.transcribed_at, t.id) < (?, ?)")
+            params.extend(after)
         if clauses:
             query += " WHERE " + " AND ".join(clauses)
 
-        query += " ORDER BY transcribed_at DESC LIMIT ?"
-        params.append(max(1, min(limit, 100)))
+        query += " ORDER BY t.transcribed_at DESC, t.id DESC LIMIT ?"
+        params.append(limit + 1)
 
-        rows = self.db.conn.execute(query, tuple(params)).fetchall()
-        return [dict(row) for row in rows]
+        rows = [dict(row) for row in self.db.conn.execute(query, tuple(params)).fetchall()]
+        more = len(rows) > limit
+        rows = rows[:limit]
+        for row in rows:
+            row["cursor"] = encode_cursor("list", [row["transcribed_at"], row.pop("id")])
+        return rows, rows[-1]["cursor"] if more else None
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        *,
+        filters: TranscriptFilters | None = None,
+    ) -> list[dict[str, Any]]:
+        items, _ = self.search_page(query, limit, filters=filters)
+        return items
+
+    def search_page(
+        self,
+        query: str,
+        limit: int = 10,
+        *,
+        filters: TranscriptFilters | None = None,
+        cursor: str | None = None,
+    ) -> Page:
+        """One page of ranked matches plus the cursor for the next page.
+
+        Pages are keyed on ``(score, rowid)``. bm25 scores move whenever the corpus
+        changes, so the cursor also records the write generation it was taken at and
+        stops being valid after any write. Every page still ranks all matches. Each
+        item carries the cursor that resumes right after it. Raises ValueError for an
+        invalid or outdated cursor.
+        """
+        query = _normalize_query(query)
+        limit = max(1, min(limit, 50))
+        filters = filters or TranscriptFilters()
+        generation = self._generation
+        after = None
+        if cursor:
+            cursor_generation, *after = decode_cursor(cursor, "search", (int, NUMBER, int))
+            if cursor_generation != generation:
+                raise ValueError("Search results changed; restart from the first page")
+        items, next_cursor = self._cached(
+            ("search", query, filters, limit, cursor),
+            lambda: self._search(query, filters, limit, after, generation),
+        )
+        return [dict(item) for item in items], next_cursor
 
-    def search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+    def _search(
+        self,
+        query: str,
+        filters: TranscriptFilters,
+        limit: int,
+        after: list[Any] | None,
+        generation: int,
+    ) -> Page:
+        clauses, params = filters.to_sql("t")
+        if after is not None:
+            clauses.append("(bm25(transcripts_fts), t.id) > (?, ?)")
+            params.extend(after)
+        where = "".join(f" AND {clause}" for clause in clauses)
         rows = self.db.conn.execute(
-            """
+            f"""
             SELECT
+                t.id,
                 t.video_id,
                 t.title,
                 t.channel,
                 t.platform,
+                t.duration,
+                t.upload_date,
                 t.path,
                 t.transcribed_at,
                 snippet(transcripts_fts, 4, '[', ']', ' ... ', 20) AS snippet,
                 bm25(transcripts_fts) AS score
             FROM transcripts_fts
-            JOIN transcripts AS t ON t.video_id = transcripts_fts.video_id
-            WHERE transcripts_fts MATCH ?
-            ORDER BY score
+            JOIN transcripts AS t ON t.id = transcripts_fts.rowid
+            WHERE transcripts_fts MATCH ?{where}
+            ORDER BY score, t.id
             LIMIT ?
             """,
-            (query, max(1, min(limit, 50))),
+            (query, *params, limit + 1),
+        ).fetchall()
+        items = [dict(row) for row in rows[:limit]]
+        for item in items:
+            item["cursor"] = encode_cursor("search", [generation, item["score"], item.pop("id")])
+        return items, items[-1]["cursor"] if len(rows) > limit else None
+
+    def facets(
+        self, query: str | None = None, *, filters: TranscriptFilters | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Counts per platform, channel and upload year over the whole filtered result set.
+
+        With ``query`` the counts cover every full-text match, not just one page.
+        Channels are limited to the ``FACET_LIMIT`` most frequent.
+        """
+        normalized = _normalize_query(query) if query else None
+        filters = filters or TranscriptFilters()
+        rows: list[dict[str, Any]] = self._cached(
+            ("facets", normalized, filters), lambda: self._facets(normalized, filters)
+        )
+        grouped: dict[str, list[dict[str, Any]]] = {"platform": [], "channel": [], "year": []}
+        for row in rows:
+            grouped[row["facet"]].append({"value": row["value"], "count": row["count"]})
+        return grouped
+
+    def _facets(self, query: str | None, filters: TranscriptFilters) -> list[dict[str, Any]]:
+        clauses, params = filters.to_sql("t")
+        if query is not None:
+            source = "transcripts_fts JOIN transcripts AS t ON t.id = transcripts_fts.rowid"
+            clauses = ["transcripts_fts MATCH ?", *clauses]
+            params = [query, *params]
+        else:
+            source = "transcripts AS t"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        # One pass over the matches, then one GROUP BY per facet.
+        rows = self.db.conn.execute(
+            f"""
+            WITH matched AS MATERIALIZED (
+                SELECT t.platform, t.channel, substr(t.upload_date, 1, 4) AS year
+                FROM {source}
+                {where}
+            )
+            SELECT * FROM (
+                SELECT 'platform' AS facet, platform AS value, COUNT(*) AS count
+                FROM matched GROUP BY platform ORDER BY count DESC
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'channel', channel, COUNT(*) AS count
+                FROM matched GROUP BY channel ORDER BY count DESC LIMIT ?
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'year', year, COUNT(*) AS count
+                FROM matched GROUP BY year ORDER BY year DESC
+            )
+            """,
+            (*params, FACET_LIMIT),
         ).fetchall()
         return [dict(row) for row in rows]
+
+    def search_segments(
+        self,
+        query: str,
+        *,
+        limit: int = 10,
+        context: int = 1,
+        video_id: str | None = None,
+        filters: TranscriptFilters | None = None,
+    ) -> list[dict[str, Any]]:
+        """Match individual segments and return them with timestamps and neighbours.
+
+        ``context`` is the number of segments to include on each side of a hit.
+        """
+        query = _normalize_query(query)
+        limit = max(1, min(limit, 50))
+        context = max(0, min(context, 5))
+        filters = filters or TranscriptFilters()
+        hits: list[dict[str, Any]] = self._cached(
+            ("segments", query, limit, context, video_id or None, filters),
+            lambda: self._search_segments(
+                query, limit=limit, context=context, video_id=video_id, filters=filters
+            ),
+        )
+        return [dict(hit) for hit in hits]
+
+    def _search_segments(
+        self,
+        query: str,
+        *,
+        limit: int,
+        context: int,
+        video_id: str | None,
+        filters: TranscriptFilters,
+    ) -> list[dict[str, Any]]:
+        sql = """
+            SELECT
+                s.id,
+                s.transcript_id,
+                s.seq,
+                s.start_time,
+                s.end_time,
+                s.speaker,
+                s.text,
+                t.video_id,
+                t.title,
+                t.channel,
+                bm25(segments_fts) AS score
+            FROM segments_fts
+            JOIN transcript_segments AS s ON s.id = segments_fts.rowid
+            JOIN transcripts AS t ON t.id = s.transcript_id
+            WHERE segments_fts MATCH ?
+        """
+        params: list[Any] = [query]
+        if video_id:
+            sql += " AND t.video_id = ?"
+            params.append(video_id)
+        clauses, filter_params = filters.to_sql("t")
+        sql += "".join(f" AND {clause}" for clause in clauses)
+        params.extend(filter_params)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        rows = self.db.conn.execute(sql, tuple(params)).fetchall()
+
+        hits: list[dict[str, Any]] = []
+        for row in rows:
+            hit: dict[str, Any] = {
+                "video_id": row["video_id"],
+                "title": row["title"],
+                "channel": row["channel"],
+                "segment": row["seq"],
+                "start": row["start_time"],
+                "end": row["end_time"],
+                "speaker": row["speaker"],
+                "text": row["text"],
+                "score": row["score"],
+            }
+            if context:
+                neighbours = self.db.conn.execute(
+                    """
+                    SELECT seq, start_time, end_time, speaker, text FROM transcript_segments
+                    WHERE transcript_id = ? AND seq BETWEEN ? AND ? AND seq != ?
+                    ORDER BY seq
+                    """,
+                    (row["transcript_id"], row["seq"] - context, row["seq"] + context, row["seq"]),
+                ).fetchall()
+                hit["context"] = [
+                    {
+                        "segment": n["seq"],
+                        "start": n["start_time"],
+                        "end": n["end_time"],
+                        "speaker": n["speaker"],
+                        "text": n["text"],
+                    }
+                    for n in neighbours
+                ]
+            hits.append(hit)
+        return hits
+
+
+def _merge_filters(
+    filters: TranscriptFilters | None, *, platform: str | None, channel: str | None
+) -> TranscriptFilters:
+    filters = filters or TranscriptFilters()
+    if platform:
+        filters = replace(filters, platform=platform)
+    if channel:
+        filters = replace(filters, channel=channel)
+    return filters
+
+
+def _normalize_query(query: str) -> str:
+    # Only whitespace is folded: FTS5 operators (AND/OR/NOT/NEAR) are case-sensitive.
+    return " ".join(query.split())
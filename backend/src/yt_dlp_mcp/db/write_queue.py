@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from threading import Lock, Thread
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WriteOp = Callable[[sqlite3.Connection], Any]
+
+DEFAULT_BATCH_WINDOW_SECONDS = 0.002
+MAX_BATCH_SIZE = 512
+
+
+class WriteQueue:
+    """Group-commit writer for a shared SQLite connection.
+
+    Mutations are submitted as callables and executed by a single writer thread.
+    Everything that arrives within ``batch_window_seconds`` of the first pending
+    mutation is applied in one transaction, each op isolated by a savepoint so a
+    failing op does not poison the rest of the batch. Futures resolve only after
+    the batch has been committed.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        lock: Lock,
+        *,
+        batch_window_seconds: float = DEFAULT_BATCH_WINDOW_SECONDS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ) -> None:
+        self._conn = conn
+        self._lock = lock
+        self.batch_window_seconds = max(batch_window_seconds, 0.0)
+        self.max_batch_size = max(max_batch_size, 1)
+        self._pending: SimpleQueue[tuple[WriteOp, Future[Any]] | None] = SimpleQueue()
+        self._thread = Thread(target=self._run_loop, name="yt-dlp-mcp-db-writer", daemon=True)
+        self._closed = False
+        self.batches_committed = 0
+        self.ops_committed = 0
+        self._thread.start()
+
+    def submit(self, op: Callable[[sqlite3.Connection], T]) -> Future[T]:
+        if self._closed:
+            raise RuntimeError("Write queue is closed")
+        future: Future[T] = Future()
+        self._pending.put((op, future))
+        return future
+
+    def stop(self, timeout_seconds: float = 10.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.put(None)
+        self._thread.join(timeout=timeout_seconds)
+
+    def _run_loop(self) -> None:
+        while True:
+            first = self._pending.get()
+            if first is None:
+                return
+
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.batch_window_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._pending.get(timeout=remaining)
+                    else:
+                        item = self._pending.get_nowait()
+                except Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch: list[tuple[WriteOp, Future[Any]]]) -> None:
+        outcomes: list[tuple[Future[Any], bool, Any]] = []
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for op, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    self._conn.execute("SAVEPOINT write_op")
+                    try:
+                        value = op(self._conn)
+                    except Exception as exc:  # noqa: BLE001 - handed to the caller
+                        self._conn.execute("ROLLBACK TO write_op")
+                        self._conn.execute("RELEASE write_op")
+                        outcomes.append((future, False, exc))
+                    else:
+                        self._conn.execute("RELEASE write_op")
+                        outcomes.append((future, True, value))
+                self._conn.commit()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.exception("Group commit of %d writes failed", len(batch))
+                try:
+                    self._conn.rollback()
+                except sqlite3.Error:
+                    pass
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+
+        self.batches_committed += 1
+        self.ops_committed += len(outcomes)
+        for future, ok, payload in outcomes:
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(payload)
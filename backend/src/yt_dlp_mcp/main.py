@@ -1,38 +1,156 @@
 from __future__ import annotations
 
+import argparse
 import atexit
+import json
 import logging
+import sys
+from threading import Thread
+from typing import cast
 
 from fastmcp import FastMCP
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
 from yt_dlp_mcp.config import Settings, load_settings
+from yt_dlp_mcp.db.comments import CommentsRepository
 from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.fingerprints import FingerprintsRepository
+from yt_dlp_mcp.db.info_cache import InfoCacheRepository
 from yt_dlp_mcp.db.jobs import JobsRepository
-from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.db.playlists import PlaylistsRepository
+from yt_dlp_mcp.db.subscriptions import SubscriptionsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptFilters, TranscriptsRepository
 from yt_dlp_mcp.mcp.tools import ToolRegistry
+from yt_dlp_mcp.services.artifact_sync import ArtifactSync
+from yt_dlp_mcp.services.comment_ingest import CommentIngester
+from yt_dlp_mcp.services.compression import ArtifactCodec
 from yt_dlp_mcp.services.downloader import Downloader
-from yt_dlp_mcp.services.storage import StorageService
+from yt_dlp_mcp.services.export import (
+    EXPORT_FORMATS,
+    EXPORT_MEDIA_TYPES,
+    stream_export,
+)
+from yt_dlp_mcp.services.storage import StorageService, TranscriptRenderer
 from yt_dlp_mcp.services.fallback_transcriber import FallbackTranscriber
+from yt_dlp_mcp.services.fingerprint import AudioFingerprinter
+from yt_dlp_mcp.services.info_cache import CachedInfoService, InfoCachePolicy
 from yt_dlp_mcp.services.local_transcriber import LocalTranscriber
+from yt_dlp_mcp.services.maintenance import (
+    AudioRetentionMode,
+    MaintenancePolicy,
+    MaintenanceService,
+)
+from yt_dlp_mcp.services.object_store import LocalObjectStore, ObjectStore, S3ObjectStore
+from yt_dlp_mcp.services.playlist_import import PlaylistImporter
+from yt_dlp_mcp.services.subscriptions import SubscriptionScheduler
 from yt_dlp_mcp.services.transcriber import AssemblyAITranscriber
+from yt_dlp_mcp.services.vector_index import VectorIndex
+from yt_dlp_mcp.utils.admission import AdmissionController, AdmissionLimit
 from yt_dlp_mcp.worker import BackgroundWorker
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _artifact_codec(settings: Settings) -> ArtifactCodec:
+    return ArtifactCodec(settings.data_dir / "_zstd", level=settings.compression_level)
+
+
+def _object_store(settings: Settings) -> ObjectStore | None:
+    backend = settings.storage_backend
+    if backend == "local":
+        return None
+    if backend == "filesystem":
+        if settings.storage_root is None:
+            raise ValueError("STORAGE_BACKEND=filesystem requires STORAGE_ROOT")
+        return LocalObjectStore(settings.storage_root)
+    if backend == "s3":
+        if not (
+            settings.s3_endpoint_url
+            and settings.s3_bucket
+            and settings.s3_access_key_id
+            and settings.s3_secret_access_key
+        ):
+            raise ValueError(
+                "STORAGE_BACKEND=s3 requires S3_ENDPOINT_URL, S3_BUCKET, "
+                "S3_ACCESS_KEY_ID and S3_SECRET_ACCESS_KEY"
+            )
+        return S3ObjectStore(
+            endpoint_url=settings.s3_endpoint_url,
+            bucket=settings.s3_bucket,
+            access_key=settings.s3_access_key_id,
+            secret_key=settings.s3_secret_access_key,
+            region=settings.s3_region,
+            prefix=settings.s3_prefix,
+        )
+    raise ValueError("STORAGE_BACKEND must be 'local', 'filesystem' or 's3'")
+
+
+def _artifact_sync(settings: Settings) -> ArtifactSync | None:
+    store = _object_store(settings)
+    if store is None:
+        return None
+    return ArtifactSync(
+        store,
+        settings.data_dir,
+        upload_workers=settings.upload_workers,
+        cache_bytes=settings.local_cache_mb * 1024 * 1024,
+    )
+
+
 class AppRuntime:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
-        self.database = Database(settings.database_path)
+        self.database = Database(
+            settings.database_path,
+            write_batch_window_seconds=settings.write_batch_window_ms / 1000,
+        )
         self.jobs = JobsRepository(self.database)
-        self.transcripts = TranscriptsRepository(self.database)
+        self.playlists = PlaylistsRepository(self.database)
+        self.subscriptions = SubscriptionsRepository(self.database)
+        self.comments = CommentsRepository(self.database)
+        self.transcripts = TranscriptsRepository(
+            self.database, query_cache_size=settings.query_cache_size
+        )
+        self.vectors = VectorIndex(settings.data_dir / "vectors")
+        self.admission = AdmissionController(
+            {
+                tool: AdmissionLimit(
+                    max_concurrent=max(max_concurrent, 1),
+                    max_queue=max(settings.tool_max_queue, 0),
+                    queue_timeout_seconds=settings.tool_queue_timeout_seconds,
+                )
+                for tool, max_concurrent in (
+                    ("yt_search", settings.yt_search_max_concurrent),
+                    ("get_metadata", settings.get_metadata_max_concurrent),
+                    ("get_comments", settings.get_comments_max_concurrent),
+                )
+            }
+        )
+        self.info = CachedInfoService(
+            InfoCacheRepository(self.database),
+            policy=InfoCachePolicy(
+                search_ttl_seconds=settings.info_cache_search_ttl_seconds,
+                metadata_ttl_seconds=settings.info_cache_metadata_ttl_seconds,
+                comments_ttl_seconds=settings.info_cache_comments_ttl_seconds,
+                stale_seconds=settings.info_cache_stale_seconds,
+            ),
+            admission=self.admission,
+        )
+        self.transcripts.subscribe_segments(self.vectors.index_transcript)
 
         downloader_root = settings.data_dir / "_work"
         self.downloader = Downloader(downloader_root)
-        self.storage = StorageService(settings.data_dir)
+        self.codec = _artifact_codec(settings)
+        self.sync = _artifact_sync(settings)
+        self.storage = StorageService(settings.data_dir, self.codec, self.sync)
+        self.renderer = TranscriptRenderer(
+            cache_bytes=settings.render_cache_mb * 1024 * 1024,
+            codec=self.codec,
+            sync=self.sync,
+        )
 
         local = LocalTranscriber(parakeet_url=settings.parakeet_url)
         fallback = (
@@ -42,6 +160,17 @@ class AppRuntime:
         )
         self.transcriber = FallbackTranscriber(local=local, fallback=fallback)
 
+        self.fingerprints = FingerprintsRepository(self.database)
+        fingerprinter = (
+            AudioFingerprinter(
+                self.fingerprints,
+                seconds=settings.fingerprint_seconds,
+                max_bit_error_rate=settings.fingerprint_max_bit_error_rate,
+            )
+            if settings.fingerprint_seconds > 0
+            else None
+        )
+
         self.worker = BackgroundWorker(
             jobs=self.jobs,
             transcripts=self.transcripts,
@@ -50,37 +179,164 @@ class AppRuntime:
             storage=self.storage,
             poll_interval_seconds=settings.poll_interval_seconds,
             max_workers=settings.max_workers,
+            fingerprinter=fingerprinter,
+        )
+
+        self.playlist_importer = PlaylistImporter(
+            playlists=self.playlists,
+            jobs=self.jobs,
+            transcripts=self.transcripts,
+            poll_interval_seconds=settings.poll_interval_seconds,
+            batch_size=settings.playlist_batch_size,
+            idle_timeout_seconds=settings.playlist_idle_timeout_seconds,
+        )
+        self.subscription_scheduler = SubscriptionScheduler(
+            subscriptions=self.subscriptions,
+            jobs=self.jobs,
+            transcripts=self.transcripts,
+            max_videos_per_sync=settings.subscription_max_videos_per_sync,
+            idle_timeout_seconds=settings.playlist_idle_timeout_seconds,
+        )
+        self.comment_ingester = CommentIngester(
+            comments=self.comments,
+            poll_interval_seconds=settings.poll_interval_seconds,
+            max_comments=settings.comments_max_per_video,
+            refresh_batch=settings.comments_refresh_batch,
+            refresh_seconds=int(settings.comments_refresh_hours * 3600),
+        )
+
+        if settings.audio_retention_mode not in ("delete", "opus"):
+            raise ValueError("AUDIO_RETENTION_MODE must be 'delete' or 'opus'")
+        self.maintenance = MaintenanceService(
+            database=self.database,
+            jobs=self.jobs,
+            transcripts=self.transcripts,
+            work_root=downloader_root,
+            policy=MaintenancePolicy(
+                interval_seconds=settings.maintenance_interval_seconds,
+                job_retention_days=settings.job_retention_days,
+                audio_retention_days=settings.audio_retention_days,
+                audio_retention_mode=cast(AudioRetentionMode, settings.audio_retention_mode),
+                opus_bitrate=settings.audio_opus_bitrate,
+            ),
+            is_idle=self.worker.is_idle,
+            info_cache=self.info,
+            sync=self.sync,
         )
 
     def close(self) -> None:
+        self.maintenance.stop()
+        self.playlist_importer.stop()
+        self.subscription_scheduler.stop()
+        self.comment_ingester.stop()
         self.worker.stop()
+        self.info.close()
+        if self.sync is not None:
+            self.sync.close()
         self.database.close()
 
 
 def create_app(runtime: AppRuntime) -> FastMCP:
     mcp = FastMCP(name="yt-dlp-mcp")
 
-    tools = ToolRegistry(runtime.jobs, runtime.transcripts)
+    tools = ToolRegistry(
+        runtime.jobs,
+        runtime.transcripts,
+        runtime.vectors,
+        runtime.renderer,
+        playlists=runtime.playlists,
+        subscriptions=runtime.subscriptions,
+        info=runtime.info,
+        comments=runtime.comments,
+    )
     tools.register(mcp)
 
+    # Both bodies query SQLite, so they run off the event loop serving MCP calls.
     @mcp.custom_route(runtime.settings.health_path, methods=["GET"])
     async def health(_: Request) -> JSONResponse:
-        return JSONResponse(
-            {
-                "ok": True,
-                "worker_running": runtime.worker.is_running,
-                "db_path": str(runtime.settings.database_path),
-                "mcp_path": runtime.settings.mcp_path,
-            }
+        return JSONResponse(await run_in_threadpool(_health_report))
+
+    @mcp.custom_route(runtime.settings.load_path, methods=["GET"])
+    async def load(_: Request) -> JSONResponse:
+        """Active job counts only, polled by the sharding proxy."""
+        return JSONResponse({"jobs": await run_in_threadpool(runtime.jobs.active_counts)})
+
+    def _health_report() -> dict[str, object]:
+        return {
+            "ok": True,
+            "worker_running": runtime.worker.is_running,
+            "jobs": runtime.jobs.active_counts(),
+            "db_path": str(runtime.settings.database_path),
+            "mcp_path": runtime.settings.mcp_path,
+            "query_cache": runtime.transcripts.query_cache_stats(),
+            "render_cache": runtime.renderer.cache_stats(),
+            "info_cache": runtime.info.stats(),
+            "admission": runtime.admission.stats(),
+            "compression": runtime.codec.stats(),
+            "object_store": {
+                "backend": runtime.settings.storage_backend,
+                **(runtime.sync.stats() if runtime.sync is not None else {}),
+            },
+            "maintenance": runtime.maintenance.stats,
+            "subscriptions": runtime.subscriptions.stats(),
+            "comments": runtime.comments.stats(),
+            "vector_index": runtime.vectors.stats(),
+            "fingerprint": {
+                **runtime.worker.fingerprint_stats(),
+                "stored": runtime.fingerprints.count(),
+            },
+        }
+
+    @mcp.custom_route(runtime.settings.export_path, methods=["GET"])
+    async def export(request: Request) -> StreamingResponse | JSONResponse:
+        params = request.query_params
+        fmt = params.get("format", "jsonl")
+        if fmt not in EXPORT_FORMATS:
+            return JSONResponse(
+                {"error": "invalid_format", "message": "format must be 'jsonl' or 'tar'"},
+                status_code=400,
+            )
+        try:
+            filters = TranscriptFilters(
+                platform=params.get("platform"),
+                channel=params.get("channel"),
+                upload_date_from=params.get("upload_date_from"),
+                upload_date_to=params.get("upload_date_to"),
+                min_duration=_optional_float(params.get("min_duration")),
+                max_duration=_optional_float(params.get("max_duration")),
+            )
+        except ValueError as exc:
+            return JSONResponse({"error": "invalid_filter", "message": str(exc)}, status_code=400)
+        # A sync iterator: Starlette pulls it from a worker thread, chunk by chunk.
+        return StreamingResponse(
+            stream_export(
+                runtime.transcripts, fmt, filters, codec=runtime.codec, sync=runtime.sync
+            ),
+            media_type=EXPORT_MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f'attachment; filename="transcripts.{fmt}"'},
         )
 
     return mcp
 
 
+def _optional_float(raw: str | None) -> float | None:
+    return float(raw) if raw not in (None, "") else None
+
+
 def cli() -> None:
     settings = load_settings()
     runtime = AppRuntime(settings)
+    Thread(
+        target=runtime.vectors.sync,
+        args=(runtime.transcripts,),
+        name="yt-dlp-mcp-vector-sync",
+        daemon=True,
+    ).start()
     runtime.worker.start()
+    runtime.playlist_importer.start()
+    runtime.subscription_scheduler.start()
+    runtime.comment_ingester.start()
+    runtime.maintenance.start()
     atexit.register(runtime.close)
 
     app = create_app(runtime)
@@ -93,5 +349,72 @@ def cli() -> None:
     )
 
 
+def compress_cli() -> None:
+    """Bring stored transcript directories to the current storage format."""
+    parser = argparse.ArgumentParser(description=compress_cli.__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--train-dictionary",
+        action="store_true",
+        help="train a zstd dictionary on the stored corpus before compressing",
+    )
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    settings = load_settings()
+    sync = _artifact_sync(settings)
+    storage = StorageService(settings.data_dir, _artifact_codec(settings), sync)
+    if args.train_dictionary:
+        dict_id = storage.train_dictionary(max_samples=args.samples)
+        logger.info("Trained zstd dictionary %s", dict_id)
+    totals = storage.compact(workers=args.workers)
+    if sync is not None:
+        sync.close()
+    print(json.dumps(totals, indent=2))
+
+
+def export_cli() -> None:
+    """Stream stored transcripts to a file or stdout as JSON Lines or tar."""
+    parser = argparse.ArgumentParser(description=export_cli.__doc__)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--output", "-o", default="-", help="file to write, - for stdout")
+    parser.add_argument("--platform")
+    parser.add_argument("--channel")
+    parser.add_argument("--upload-date-from")
+    parser.add_argument("--upload-date-to")
+    parser.add_argument("--min-duration", type=float)
+    parser.add_argument("--max-duration", type=float)
+    args = parser.parse_args()
+
+    settings = load_settings()
+    database = Database(settings.database_path)
+    filters = TranscriptFilters(
+        platform=args.platform,
+        channel=args.channel,
+        upload_date_from=args.upload_date_from,
+        upload_date_to=args.upload_date_to,
+        min_duration=args.min_duration,
+        max_duration=args.max_duration,
+    )
+    chunks = stream_export(
+        TranscriptsRepository(database),
+        args.format,
+        filters,
+        codec=_artifact_codec(settings),
+        sync=_artifact_sync(settings),
+    )
+    try:
+        if args.output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, "wb") as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+    finally:
+        database.close()
+
+
 if __name__ == "__main__":
     cli()
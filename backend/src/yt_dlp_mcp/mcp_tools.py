@@ -1,186 +1,738 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import uuid
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Any
 
 from fastmcp import FastMCP
 from mcp.types import ToolAnnotations
 
+from yt_dlp_mcp.db.comments import CommentsRepository
 from yt_dlp_mcp.db.jobs import ACTIVE_STATUSES, JobsRepository
-from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.db.playlists import ACTIVE_PLAYLIST_STATUSES, PlaylistsRepository
+from yt_dlp_mcp.db.subscriptions import SubscriptionsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptFilters, TranscriptsRepository
+from yt_dlp_mcp.services.enqueue import enqueue_urls, find_urls
+from yt_dlp_mcp.services.info_cache import CachedInfoService
+from yt_dlp_mcp.services.storage import TranscriptRenderer, render_segments
+from yt_dlp_mcp.services.vector_index import VectorIndex
 from yt_dlp_mcp.services.youtube_info import YouTubeInfoService
-from yt_dlp_mcp.utils.url import normalize_url, extract_youtube_video_id
+from yt_dlp_mcp.types import TRANSCRIPT_FORMATS, TranscriptFormat
+from yt_dlp_mcp.utils.admission import BusyError
+from yt_dlp_mcp.utils.cursor import (
+    OPTIONAL_INT,
+    OPTIONAL_NUMBER,
+    decode_cursor,
+    encode_cursor,
+)
+from yt_dlp_mcp.utils.url import normalize_url
+
+
+# Segment hits fetched per requested semantic result, so that transcripts
+# with several matching segments and filtered-out rows do not starve the page.
+_SEMANTIC_OVERSAMPLE = 8
+
+# Most items a batch tool accepts in one call.
+MAX_BATCH_SIZE = 100
+
+
+def _job_status_response(
+    job: dict[str, Any], active_statuses: tuple[str, ...] = ACTIVE_STATUSES
+) -> dict[str, Any]:
+    """A job row as returned by job_status, with polling hints while it is active."""
+    if job["status"] not in active_statuses:
+        return job
+    poll_count = int(job.get("poll_count") or 0)
+    poll_retry_after = min(5 * (2 ** (poll_count // 3)), 60)
+    extras: dict[str, Any] = {"retry_after": poll_retry_after}
+    if job.get("retry_after"):
+        extras["waiting_until"] = job["retry_after"]
+        extras["attempt"] = int(job.get("attempt") or 0)
+    return {**job, **extras}
+
+
+def _subscription_response(subscription: dict[str, Any]) -> dict[str, Any]:
+    """A subscription row as returned by the subscription tools."""
+    response = {
+        key: value
+        for key, value in subscription.items()
+        if key not in {"id", "normalized_url", "known_video_ids"}
+    }
+    return {"subscription_id": subscription["id"], **response}
+
+
+def _etag(*parts: Any) -> str:
+    """A validator for a result derived from ``parts`` (its version and arguments)."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _not_modified(etag: str) -> dict[str, Any]:
+    """Returned instead of a result the caller already holds under ``etag``."""
+    return {"not_modified": True, "etag": etag}
+
+
+def _busy_response(exc: BusyError) -> dict[str, Any]:
+    """The error returned when a tool is at its concurrency and queue limits."""
+    return {
+        "error": "busy",
+        "tool": exc.name,
+        "retry_after": exc.retry_after,
+        "message": str(exc),
+    }
+
+
+def _batch_error(items: Sequence[Any], name: str) -> dict[str, Any] | None:
+    if not items:
+        return {"error": "empty_batch", "message": f"{name} must not be empty"}
+    if len(items) > MAX_BATCH_SIZE:
+        return {
+            "error": "batch_too_large",
+            "message": f"{name} accepts at most {MAX_BATCH_SIZE} items",
+        }
+    return None
 
 
 class ToolRegistry:
-    def __init__(self, jobs: JobsRepository, transcripts: TranscriptsRepository) -> None:
+    def __init__(
+        self,
+        jobs: JobsRepository,
+        transcripts: TranscriptsRepository,
+        vectors: VectorIndex | None = None,
+        renderer: TranscriptRenderer | None = None,
+        playlists: PlaylistsRepository | None = None,
+        subscriptions: SubscriptionsRepository | None = None,
+        info: CachedInfoService | YouTubeInfoService | None = None,
+        comments: CommentsRepository | None = None,
+    ) -> None:
         self.jobs = jobs
         self.transcripts = transcripts
+        self.vectors = vectors
+        self.renderer = renderer or TranscriptRenderer()
+        self.playlists = playlists or PlaylistsRepository(jobs.db)
+        self.subscriptions = subscriptions or SubscriptionsRepository(jobs.db)
+        self.info = info or YouTubeInfoService()
+        self.comments = comments or CommentsRepository(jobs.db)
+        # Search and list etags are versioned by the in-memory write generation,
+        # which restarts at 0 with the process; this keeps them from colliding.
+        self.instance_id = uuid.uuid4().hex
+
+    def semantic_search(
+        self, query: str, limit: int, filters: TranscriptFilters
+    ) -> list[dict[str, Any]]:
+        """Transcripts ranked by their best-matching segment vector."""
+        if self.vectors is None:
+            return []
+        limit = max(1, min(limit, 50))
+        hits = self.vectors.search(
+            self.vectors.embed_query(query), limit * _SEMANTIC_OVERSAMPLE
+        )
+        best: dict[int, tuple[int, float]] = {}
+        for segment_id, transcript_id, score in hits:
+            if transcript_id not in best:
+                best[transcript_id] = (segment_id, score)
+        transcripts = self.transcripts.get_by_ids(list(best), filters=filters)
+        ranked = [tid for tid in best if tid in transcripts][:limit]
+        segments = self.transcripts.get_segments([best[tid][0] for tid in ranked])
+        results: list[dict[str, Any]] = []
+        for tid in ranked:
+            segment_id, score = best[tid]
+            segment = segments.get(segment_id, {})
+            results.append(
+                {
+                    **transcripts[tid],
+                    "snippet": segment.get("text"),
+                    "start": segment.get("start"),
+                    "end": segment.get("end"),
+                    "score": round(score, 4),
+                }
+            )
+        return results
+
+    def related_transcripts(self, video_id: str, limit: int) -> list[dict[str, Any]] | None:
+        """Transcripts most similar to ``video_id``, or None if it is unknown."""
+        transcript_id = self.transcripts.get_id(video_id)
+        if transcript_id is None:
+            return None
+        if self.vectors is None:
+            return []
+        ranked = self.vectors.related(transcript_id, max(1, min(limit, 50)))
+        transcripts = self.transcripts.get_by_ids([tid for tid, _ in ranked])
+        return [
+            {**transcripts[tid], "score": round(score, 4)}
+            for tid, score in ranked
+            if tid in transcripts
+        ]
+
+    def transcribe_urls(self, urls: Sequence[str]) -> list[dict[str, Any]]:
+        """``transcribe`` for each of ``urls``, in order; see ``enqueue_urls``."""
+        return enqueue_urls(self.jobs, self.transcripts, urls)
+
+    def job_statuses(self, job_ids: Sequence[str]) -> list[dict[str, Any]]:
+        """``job_status`` for each of ``job_ids``: one read, one poll-count update."""
+        jobs = self.jobs.get_many(list(dict.fromkeys(job_ids)))
+        active = [job_id for job_id, job in jobs.items() if job["status"] in ACTIVE_STATUSES]
+        jobs.update(self.jobs.increment_poll_counts(active))
+        return [
+            _job_status_response(jobs[job_id])
+            if job_id in jobs
+            else {"error": "job_not_found", "job_id": job_id}
+            for job_id in job_ids
+        ]
+
+    def read(
+        self,
+        transcript: dict[str, Any],
+        format: TranscriptFormat = "markdown",
+        *,
+        start_time: float | None = None,
+        end_time: float | None = None,
+        offset: int | None = None,
+        limit: int | None = None,
+        max_tokens: int | None = None,
+    ) -> dict[str, Any]:
+        """The read_transcript response for a stored ``transcript`` row."""
+        video_id = str(transcript["video_id"])
+        base = Path(str(transcript["path"]))
+
+        window_args = (start_time, end_time, offset, limit, max_tokens)
+        if all(arg is None for arg in window_args):
+            return {
+                "video_id": video_id,
+                "title": transcript.get("title"),
+                "format": format,
+                "content": self.renderer.render(base, format) or "",
+            }
+
+        window = self.renderer.read_window(
+            base,
+            offset=offset,
+            limit=limit,
+            start_time=start_time,
+            end_time=end_time,
+            max_tokens=max_tokens,
+        )
+        if window is None or not window.segments:
+            return {
+                "video_id": video_id,
+                "title": transcript.get("title"),
+                "format": format,
+                "content": "",
+                "segments": None,
+                "next_cursor": None,
+            }
+        next_cursor = None
+        if window.next_offset is not None:
+            next_cursor = encode_cursor(
+                "read", [video_id, window.next_offset, end_time, limit, max_tokens]
+            )
+        return {
+            "video_id": video_id,
+            "title": transcript.get("title"),
+            "format": format,
+            "content": render_segments(window.segments, format, offset=window.offset),
+            "segments": {
+                "offset": window.offset,
+                "count": len(window.segments),
+                "total": window.total,
+                "start": window.segments[0].start,
+                "end": window.segments[-1].end,
+            },
+            "next_cursor": next_cursor,
+        }
 
     def register(self, mcp: FastMCP) -> None:
-        yt_info = YouTubeInfoService()
+        yt_info = self.info
         _ro = ToolAnnotations(readOnlyHint=True)
 
         @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
         def transcribe(url: str) -> dict[str, Any]:
-            normalized_url = normalize_url(url)
-
-            existing = self.transcripts.get_by_normalized_url(normalized_url)
-            if existing is None:
-                # Also check by video_id — catches cases where the same video was
-                # previously stored under a different URL form (e.g. /live/ vs /watch?v=)
-                video_id = extract_youtube_video_id(normalized_url)
-                if video_id:
-                    existing = self.transcripts.get_by_video_id(video_id)
-            if existing is not None:
-                return {
-                    "status": "completed",
-                    "deduplicated": True,
-                    "video_id": existing["video_id"],
-                    "transcript_path": existing["path"],
-                }
+            return self.transcribe_urls([url])[0]
 
-            active = self.jobs.find_active_by_normalized_url(normalized_url)
-            if active is not None:
-                return {
-                    "job_id": active["id"],
-                    "status": active["status"],
-                    "deduplicated": True,
-                }
+        @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+        def transcribe_many(urls: list[str]) -> dict[str, Any]:
+            """Queue several videos for transcription in one call.
+
+            Args:
+                urls: Video URLs (at most 100)
 
-            job = self.jobs.enqueue(url=url, normalized_url=normalized_url)
+            Returns:
+                One result per URL, in order, shaped like the transcribe response
+                plus the url; repeated URLs share one job.
+            """
+            if error := _batch_error(urls, "urls"):
+                return error
+            results = [
+                {"url": url, **result}
+                for url, result in zip(urls, self.transcribe_urls(urls))
+            ]
             return {
-                "job_id": job["id"],
-                "status": job["status"],
-                "deduplicated": False,
+                "count": len(results),
+                "enqueued": sum(1 for r in results if not r["deduplicated"]),
+                "already_completed": sum(1 for r in results if r["status"] == "completed"),
+                "already_active": sum(
+                    1 for r in results if r["deduplicated"] and r["status"] != "completed"
+                ),
+                "results": results,
             }
 
+        @mcp.tool(annotations=_ro)
+        def find_transcriptions(urls: list[str]) -> dict[str, Any]:
+            """Look up the transcript or active job of several URLs without queueing any.
+
+            Args:
+                urls: Video URLs (at most 100)
+
+            Returns:
+                One result per URL, in order: what transcribe would return for a
+                URL already completed or in progress, else transcription_not_found.
+            """
+            if error := _batch_error(urls, "urls"):
+                return error
+            results = [
+                {"url": url, **result}
+                if result
+                else {"error": "transcription_not_found", "url": url}
+                for url, result in zip(urls, find_urls(self.jobs, self.transcripts, urls))
+            ]
+            return {"count": len(results), "results": results}
+
         @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
         def transcribe_playlist(url: str) -> dict[str, Any]:
-            """Queue all videos in a playlist for transcription.
+            """Queue all videos in a playlist or channel for transcription.
+
+            The listing runs in the background: videos are enqueued in batches as
+            yt-dlp finds them, with dedup applied per video, and an interrupted
+            listing resumes where it stopped.
 
             Args:
                 url: Playlist URL (YouTube playlist, channel, etc.)
 
             Returns:
-                List of enqueued jobs (one per video), with dedup applied per-video.
+                A playlist_id to follow with playlist_status.
             """
-            try:
-                entries = yt_info.extract_playlist(url)
-            except RuntimeError as exc:
-                return {"error": "playlist_extraction_failed", "message": str(exc)}
-
-            if not entries:
-                return {"error": "empty_playlist", "message": "No videos found in playlist"}
-
-            results: list[dict[str, Any]] = []
-            for entry in entries:
-                video_url = entry["url"]
-                normalized = normalize_url(video_url)
-
-                existing = self.transcripts.get_by_normalized_url(normalized)
-                if existing is None:
-                    video_id = extract_youtube_video_id(normalized)
-                    if video_id:
-                        existing = self.transcripts.get_by_video_id(video_id)
-                if existing is not None:
-                    results.append({
-                        "video_url": video_url,
-                        "title": entry.get("title"),
-                        "status": "completed",
-                        "deduplicated": True,
-                        "video_id": existing["video_id"],
-                    })
-                    continue
-
-                active = self.jobs.find_active_by_normalized_url(normalized)
-                if active is not None:
-                    results.append({
-                        "video_url": video_url,
-                        "title": entry.get("title"),
-                        "job_id": active["id"],
-                        "status": active["status"],
-                        "deduplicated": True,
-                    })
-                    continue
-
-                job = self.jobs.enqueue(url=video_url, normalized_url=normalized)
-                results.append({
-                    "video_url": video_url,
-                    "title": entry.get("title"),
-                    "job_id": job["id"],
-                    "status": job["status"],
-                    "deduplicated": False,
-                })
+            playlist, created = self.playlists.create(url, normalize_url(url))
+            return {
+                "playlist_id": playlist["id"],
+                "playlist_url": playlist["url"],
+                "status": playlist["status"],
+                "deduplicated": not created,
+            }
+
+        @mcp.tool(annotations=_ro)
+        def playlist_status(
+            playlist_id: str, limit: int = 100, cursor: str | None = None
+        ) -> dict[str, Any]:
+            """Progress of a playlist import and the videos it has enqueued so far.
+
+            Args:
+                playlist_id: The playlist_id returned by transcribe_playlist
+                limit: Maximum number of videos to return (default: 100, max: 500)
+                cursor: next_cursor from a previous call, to fetch the following videos
 
+            Returns:
+                Status (queued, listing, completed or failed), counts of entries seen,
+                enqueued, already completed and already active, plus one page of
+                videos in playlist order with their job_id.
+            """
+            playlist = self.playlists.get(playlist_id)
+            if playlist is None:
+                return {"error": "playlist_not_found", "playlist_id": playlist_id}
+            if playlist["status"] in ACTIVE_PLAYLIST_STATUSES:
+                playlist = self.playlists.increment_poll_count(playlist_id) or playlist
+            try:
+                videos, next_cursor = self.playlists.entries_page(
+                    playlist_id, limit=limit, cursor=cursor
+                )
+            except (ValueError, TypeError) as exc:
+                return {"error": "invalid_cursor", "message": str(exc)}
             return {
-                "playlist_url": url,
-                "total_videos": len(entries),
-                "enqueued": sum(1 for r in results if not r.get("deduplicated") and r.get("job_id")),
-                "already_completed": sum(1 for r in results if r.get("status") == "completed" and r.get("deduplicated")),
-                "already_active": sum(1 for r in results if r.get("deduplicated") and r.get("job_id")),
-                "videos": results,
+                **_job_status_response(playlist, ACTIVE_PLAYLIST_STATUSES),
+                "videos": videos,
+                "next_cursor": next_cursor,
             }
 
+        @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+        def subscribe(
+            url: str, interval_hours: float = 24, backfill: bool = False
+        ) -> dict[str, Any]:
+            """Follow a channel or playlist and transcribe its new videos as they appear.
+
+            Each sync lists the channel newest first and stops at the first video
+            it has already seen. New videos are queued behind on-demand requests.
+
+            Args:
+                url: Channel or playlist URL
+                interval_hours: Hours between syncs (default: 24, min: 0.25)
+                backfill: Also transcribe the videos already published (up to the
+                    per-sync cap) instead of only those published from now on
+
+            Returns:
+                The subscription_id and its settings; subscribing to the same URL
+                again returns the existing subscription.
+            """
+            interval_seconds = int(max(interval_hours, 0.25) * 3600)
+            subscription, created = self.subscriptions.create(
+                url, normalize_url(url), interval_seconds=interval_seconds, backfill=backfill
+            )
+            return {**_subscription_response(subscription), "deduplicated": not created}
+
+        @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+        def unsubscribe(subscription_id: str) -> dict[str, Any]:
+            """Stop syncing a subscription; jobs it already queued are kept.
+
+            Args:
+                subscription_id: The subscription_id returned by subscribe
+            """
+            if not self.subscriptions.delete(subscription_id):
+                return {"error": "subscription_not_found", "subscription_id": subscription_id}
+            return {"subscription_id": subscription_id, "deleted": True}
+
+        @mcp.tool(annotations=_ro)
+        def list_subscriptions() -> dict[str, Any]:
+            """All subscriptions with their sync statistics.
+
+            Returns:
+                Per subscription: totals (syncs, failures, videos_enqueued), the last
+                sync's entries listed, new videos, enqueued jobs and duration, plus
+                last_synced_at, next_sync_at and last_error.
+            """
+            subscriptions = [_subscription_response(s) for s in self.subscriptions.list_all()]
+            return {"count": len(subscriptions), "subscriptions": subscriptions}
+
         @mcp.tool(annotations=_ro)
         def job_status(job_id: str) -> dict[str, Any]:
             job = self.jobs.get(job_id)
             if job is None:
                 return {"error": "job_not_found", "job_id": job_id}
             if job["status"] in ACTIVE_STATUSES:
-                self.jobs.increment_poll_count(job_id)
-                job = self.jobs.get(job_id)
-                poll_count = int(job.get("poll_count") or 0)
-                poll_retry_after = min(5 * (2 ** (poll_count // 3)), 60)
-                extras: dict[str, Any] = {"retry_after": poll_retry_after}
-                if job.get("retry_after"):
-                    extras["waiting_until"] = job["retry_after"]
-                    extras["attempt"] = int(job.get("attempt") or 0)
-                return {**job, **extras}
-            return job
+                job = self.jobs.increment_poll_count(job_id) or job
+            return _job_status_response(job)
+
+        @mcp.tool(annotations=_ro)
+        def job_status_many(job_ids: list[str]) -> dict[str, Any]:
+            """Check several jobs in one call.
+
+            Args:
+                job_ids: Job IDs returned by transcribe or transcribe_many (at most 100)
+
+            Returns:
+                One job_status result per ID, in order.
+            """
+            if error := _batch_error(job_ids, "job_ids"):
+                return error
+            results = self.job_statuses(job_ids)
+            return {"count": len(results), "results": results}
 
         @mcp.tool(annotations=_ro)
-        def search(query: str, limit: int = 10) -> dict[str, Any]:
+        def search(
+            query: str,
+            limit: int = 10,
+            platform: str | None = None,
+            channel: str | None = None,
+            upload_date_from: str | None = None,
+            upload_date_to: str | None = None,
+            min_duration: float | None = None,
+            max_duration: float | None = None,
+            facets: bool = True,
+            cursor: str | None = None,
+            mode: str = "lexical",
+            if_none_match: str | None = None,
+        ) -> dict[str, Any]:
+            """Search across transcripts, filtered inside the query.
+
+            Args:
+                query: Full-text search query
+                limit: Maximum number of results (default: 10, max: 50)
+                platform: Only transcripts from this platform (e.g. "Youtube")
+                channel: Only transcripts from this channel
+                upload_date_from: Earliest upload date, YYYYMMDD or YYYY-MM-DD
+                upload_date_to: Latest upload date, YYYYMMDD or YYYY-MM-DD
+                min_duration: Minimum duration in seconds
+                max_duration: Maximum duration in seconds
+                facets: Include platform/channel/year counts over all matches (default: true,
+                    first page only)
+                cursor: next_cursor from a previous call, to fetch the following page
+                mode: "lexical" for bm25 full-text ranking (default) or "semantic" for
+                    vector similarity of segments; semantic results have no cursor or facets
+                if_none_match: etag of an earlier identical call; if no transcript has
+                    changed since, only {"not_modified": true, "etag"} is returned
+
+            Returns:
+                Ranked matches with snippets, each with the cursor that resumes after
+                it, next_cursor when more remain, plus facet counts and an etag.
+            """
+            filters = TranscriptFilters(
+                platform=platform,
+                channel=channel,
+                upload_date_from=upload_date_from,
+                upload_date_to=upload_date_to,
+                min_duration=min_duration,
+                max_duration=max_duration,
+            )
+            etag = _etag(
+                self.instance_id,
+                self.transcripts.generation,
+                "search",
+                query,
+                limit,
+                filters,
+                facets,
+                cursor,
+                mode,
+            )
+            if if_none_match == etag:
+                return _not_modified(etag)
+            if mode == "semantic":
+                if self.vectors is None:
+                    return {"error": "semantic_unavailable", "message": "No vector index"}
+                return {
+                    "query": query,
+                    "mode": mode,
+                    "results": self.semantic_search(query, limit, filters),
+                    "next_cursor": None,
+                    "etag": etag,
+                }
+            if mode != "lexical":
+                return {"error": "invalid_mode", "message": "mode must be 'lexical' or 'semantic'"}
+            try:
+                results, next_cursor = self.transcripts.search_page(
+                    query, limit, filters=filters, cursor=cursor
+                )
+            except ValueError as exc:
+                return {"error": "invalid_cursor", "message": str(exc)}
+            response: dict[str, Any] = {
+                "query": query,
+                "results": results,
+                "next_cursor": next_cursor,
+                "etag": etag,
+            }
+            if facets and cursor is None:
+                response["facets"] = self.transcripts.facets(query, filters=filters)
+            return response
+
+        @mcp.tool(annotations=_ro)
+        def search_segments(
+            query: str,
+            limit: int = 10,
+            context: int = 1,
+            video_id: str | None = None,
+        ) -> dict[str, Any]:
+            """Search individual transcript segments and return timestamped hits.
+
+            Args:
+                query: Full-text search query
+                limit: Maximum number of hits (default: 10, max: 50)
+                context: Neighbouring segments to include on each side (default: 1, max: 5)
+                video_id: Restrict the search to one transcript
+
+            Returns:
+                Matching segments with start/end seconds, speaker, and surrounding context.
+            """
             return {
                 "query": query,
-                "results": self.transcripts.search(query=query, limit=limit),
+                "results": self.transcripts.search_segments(
+                    query, limit=limit, context=context, video_id=video_id
+                ),
             }
 
+        @mcp.tool(annotations=_ro)
+        def related_transcripts(video_id: str, limit: int = 10) -> dict[str, Any]:
+            """Find transcripts whose content is most similar to a given transcript.
+
+            Args:
+                video_id: The transcript to compare against
+                limit: Maximum number of results (default: 10, max: 50)
+
+            Returns:
+                Transcript metadata with a cosine similarity score, most similar first.
+            """
+            related = self.related_transcripts(video_id, limit)
+            if related is None:
+                return {"error": "transcript_not_found", "video_id": video_id}
+            return {"video_id": video_id, "count": len(related), "results": related}
+
         @mcp.tool(annotations=_ro)
         def list_transcripts(
             platform: str | None = None,
             channel: str | None = None,
             limit: int = 20,
+            upload_date_from: str | None = None,
+            upload_date_to: str | None = None,
+            min_duration: float | None = None,
+            max_duration: float | None = None,
+            facets: bool = False,
+            cursor: str | None = None,
+            if_none_match: str | None = None,
         ) -> dict[str, Any]:
-            items = self.transcripts.list_transcripts(platform=platform, channel=channel, limit=limit)
-            return {
+            """List transcripts, newest first.
+
+            Args:
+                platform: Only transcripts from this platform (e.g. "Youtube")
+                channel: Only transcripts from this channel
+                limit: Maximum number of results (default: 20, max: 100)
+                upload_date_from: Earliest upload date, YYYYMMDD or YYYY-MM-DD
+                upload_date_to: Latest upload date, YYYYMMDD or YYYY-MM-DD
+                min_duration: Minimum duration in seconds
+                max_duration: Maximum duration in seconds
+                facets: Include platform/channel/year counts over all matches (default: false)
+                cursor: next_cursor from a previous call, to fetch the following page
+                if_none_match: etag of an earlier identical call; if no transcript has
+                    changed since, only {"not_modified": true, "etag"} is returned
+
+            Returns:
+                Transcript metadata (without descriptions), each with the cursor that
+                resumes after it, next_cursor when more remain, optional facet counts and
+                an etag.
+            """
+            filters = TranscriptFilters(
+                platform=platform,
+                channel=channel,
+                upload_date_from=upload_date_from,
+                upload_date_to=upload_date_to,
+                min_duration=min_duration,
+                max_duration=max_duration,
+            )
+            etag = _etag(
+                self.instance_id,
+                self.transcripts.generation,
+                "list",
+                limit,
+                filters,
+                facets,
+                cursor,
+            )
+            if if_none_match == etag:
+                return _not_modified(etag)
+            try:
+                items, next_cursor = self.transcripts.list_transcripts_page(
+                    limit=limit, filters=filters, cursor=cursor
+                )
+            except ValueError as exc:
+                return {"error": "invalid_cursor", "message": str(exc)}
+            response: dict[str, Any] = {
                 "count": len(items),
                 "items": items,
+                "next_cursor": next_cursor,
+                "etag": etag,
             }
+            if facets:
+                response["facets"] = self.transcripts.facets(filters=filters)
+            return response
 
         @mcp.tool(annotations=_ro)
-        def read_transcript(video_id: str) -> dict[str, Any]:
-            """Read a transcript by video ID. Returns full speaker-diarized markdown.
+        def read_transcript(
+            video_id: str,
+            format: TranscriptFormat = "markdown",
+            start_time: float | None = None,
+            end_time: float | None = None,
+            offset: int | None = None,
+            limit: int | None = None,
+            max_tokens: int | None = None,
+            cursor: str | None = None,
+            if_none_match: str | None = None,
+        ) -> dict[str, Any]:
+            """Read a transcript by video ID, by default as speaker-diarized markdown.
+
+            Without window arguments the whole transcript is returned. With any of
+            them only the selected segments are returned, plus next_cursor while
+            more of the requested range remains.
 
             Args:
                 video_id: The video ID to read
+                format: "markdown" (default), "text", "json", "srt" or "vtt"
+                start_time: Start of a time window in seconds
+                end_time: End of a time window in seconds
+                offset: Index of the first segment to return (overrides start_time)
+                limit: Maximum number of segments to return
+                max_tokens: Approximate token budget for the returned text
+                cursor: next_cursor from a previous call, to continue the same window
+                if_none_match: etag of an earlier identical call; if the transcript has
+                    not been rewritten since, only {"not_modified": true, "etag"} is returned
 
             Returns:
-                Full markdown transcript with speaker labels and timestamps.
+                The transcript in the requested format and its etag; windowed reads
+                also report the segment range served and next_cursor.
             """
+            if format not in TRANSCRIPT_FORMATS:
+                return {
+                    "error": "invalid_format",
+                    "message": f"format must be one of {', '.join(TRANSCRIPT_FORMATS)}",
+                }
+            if cursor is not None:
+                try:
+                    cursor_video_id, offset, end_time, limit, max_tokens = decode_cursor(
+                        cursor, "read", (str, int, OPTIONAL_NUMBER, OPTIONAL_INT, OPTIONAL_INT)
+                    )
+                except (ValueError, TypeError) as exc:
+                    return {"error": "invalid_cursor", "message": str(exc)}
+                if cursor_video_id != video_id:
+                    return {"error": "invalid_cursor", "message": "Cursor is for another video"}
+
             transcript = self.transcripts.get_by_video_id(video_id)
             if transcript is None:
                 return {"error": "transcript_not_found", "video_id": video_id}
+            # A transcript only changes when it is stored again, which resets
+            # transcribed_at, so the row identifies the content without reading it.
+            etag = _etag(
+                transcript["id"],
+                transcript["transcribed_at"],
+                transcript["path"],
+                format,
+                start_time,
+                end_time,
+                offset,
+                limit,
+                max_tokens,
+            )
+            if if_none_match == etag:
+                return _not_modified(etag)
+            response = self.read(
+                transcript,
+                format,
+                start_time=start_time,
+                end_time=end_time,
+                offset=offset,
+                limit=limit,
+                max_tokens=max_tokens,
+            )
+            return response if "error" in response else {**response, "etag": etag}
 
-            base = Path(str(transcript["path"]))
-            file_path = base / "transcript.md"
-            content = file_path.read_text(encoding="utf-8") if file_path.exists() else ""
-            return {
-                "video_id": video_id,
-                "title": transcript.get("title"),
-                "content": content,
-            }
+        @mcp.tool(annotations=_ro)
+        def read_transcripts(
+            video_ids: list[str],
+            format: TranscriptFormat = "markdown",
+            max_tokens: int | None = None,
+        ) -> dict[str, Any]:
+            """Read several transcripts in one call.
+
+            Args:
+                video_ids: The video IDs to read (at most 100)
+                format: "markdown" (default), "text", "json", "srt" or "vtt"
+                max_tokens: Approximate token budget per transcript; a transcript cut
+                    short carries next_cursor for read_transcript to continue
+
+            Returns:
+                One read_transcript result per video ID, in order.
+            """
+            if error := _batch_error(video_ids, "video_ids"):
+                return error
+            if format not in TRANSCRIPT_FORMATS:
+                return {
+                    "error": "invalid_format",
+                    "message": f"format must be one of {', '.join(TRANSCRIPT_FORMATS)}",
+                }
+            transcripts = self.transcripts.get_by_video_ids(list(dict.fromkeys(video_ids)))
+            results = [
+                self.read(transcripts[video_id], format, max_tokens=max_tokens)
+                if video_id in transcripts
+                else {"error": "transcript_not_found", "video_id": video_id}
+                for video_id in video_ids
+            ]
+            return {"count": len(results), "results": results}
 
         @mcp.tool(annotations=_ro)
         def yt_search(query: str, limit: int = 10) -> dict[str, Any]:
@@ -196,22 +748,31 @@ class ToolRegistry:
             try:
                 results = yt_info.search(query=query, limit=limit)
                 return {"query": query, "count": len(results), "results": results}
+            except BusyError as exc:
+                return _busy_response(exc)
             except RuntimeError as exc:
                 return {"error": "search_failed", "message": str(exc)}
 
         @mcp.tool(annotations=_ro)
-        def get_metadata(url: str) -> dict[str, Any]:
+        def get_metadata(url: str, if_none_match: str | None = None) -> dict[str, Any]:
             """Get full metadata for a video.
 
             Args:
                 url: The video URL (YouTube, etc.)
+                if_none_match: etag of an earlier call; if the metadata is unchanged,
+                    only {"not_modified": true, "etag"} is returned
 
             Returns:
-                Complete video metadata from yt-dlp.
+                Complete video metadata from yt-dlp, with an etag.
             """
             try:
                 metadata = yt_info.get_metadata(url=url)
-                return {"url": url, "metadata": metadata}
+                etag = _etag(metadata)
+                if if_none_match == etag:
+                    return _not_modified(etag)
+                return {"url": url, "metadata": metadata, "etag": etag}
+            except BusyError as exc:
+                return _busy_response(exc)
             except RuntimeError as exc:
                 return {"error": "metadata_failed", "message": str(exc)}
 
@@ -230,5 +791,68 @@ class ToolRegistry:
             try:
                 comments = yt_info.get_comments(url=url, limit=limit, sort=sort)
                 return {"url": url, "count": len(comments), "sort": sort, "comments": comments}
+            except BusyError as exc:
+                return _busy_response(exc)
             except RuntimeError as exc:
                 return {"error": "comments_failed", "message": str(exc)}
+
+        @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+        def ingest_comments(url: str) -> dict[str, Any]:
+            """Store a video's comments so they can be searched with search_comments.
+
+            Comments are fetched in the background and refreshed daily with the
+            newest ones, so this returns at once.
+
+            Args:
+                url: The video URL (YouTube, etc.)
+
+            Returns:
+                A source_id and its status (queued, fetching, ready or failed) with
+                the stored comment count; ingesting the same URL again returns the
+                existing source.
+            """
+            source, created = self.comments.track(url, normalize_url(url))
+            return {
+                "source_id": source["id"],
+                "url": source["url"],
+                "video_id": source["video_id"],
+                "status": source["status"],
+                "comment_count": source["comment_count"],
+                "fetched_at": source["fetched_at"],
+                "next_refresh_at": source["next_refresh_at"],
+                "error": source["error"],
+                "deduplicated": not created,
+            }
+
+        @mcp.tool(annotations=_ro)
+        def search_comments(
+            query: str,
+            video_id: str | None = None,
+            limit: int = 20,
+            cursor: str | None = None,
+        ) -> dict[str, Any]:
+            """Full-text search over comments stored with ingest_comments.
+
+            Args:
+                query: Full-text search query
+                video_id: Only comments of this video
+                limit: Maximum number of results (default: 20, max: 50)
+                cursor: next_cursor from a previous call, to fetch the following page
+
+            Returns:
+                Ranked comments with snippets, each with the cursor that resumes after
+                it, and next_cursor when more remain, plus the sources whose first fetch
+                has not finished yet.
+            """
+            try:
+                results, next_cursor = self.comments.search_page(
+                    query, limit, video_id=video_id, cursor=cursor
+                )
+            except ValueError as exc:
+                return {"error": "invalid_cursor", "message": str(exc)}
+            return {
+                "query": query,
+                "results": results,
+                "next_cursor": next_cursor,
+                "pending": self.comments.pending(),
+            }
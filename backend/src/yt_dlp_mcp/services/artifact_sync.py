@@ -0,0 +1,233 @@
+"""Mirrors video directories to an object store and reads them back on demand.
+
+The local ``transcripts/`` tree stays the working copy every reader uses.
+``schedule_upload`` queues a directory for a background upload pool so the
+worker never waits on the network; ``ensure_local`` is the read-through side
+that downloads a directory's artifacts when they are not on this host. With
+``cache_bytes`` set, the least recently used directories that are safely in
+the store are dropped locally to keep the tree under that size; their audio
+then lives only in the store, where ``remote_audio`` and ``replace_audio`` let
+audio retention reach it.
+"""
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from yt_dlp_mcp.services.object_store import ObjectStore
+
+logger = logging.getLogger(__name__)
+
+# Written into a directory once all of its files are in the store.
+UPLOADED_MARKER = ".uploaded"
+
+
+class ArtifactSync:
+    def __init__(
+        self,
+        store: ObjectStore,
+        data_dir: Path,
+        *,
+        upload_workers: int = 2,
+        cache_bytes: int = 0,
+    ) -> None:
+        self.store = store
+        self.data_dir = data_dir
+        self.cache_bytes = cache_bytes
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(upload_workers, 1), thread_name_prefix="yt-dlp-mcp-upload"
+        )
+        self._lock = Lock()
+        self._pending: dict[Path, Future[None]] = {}
+        # Uploaded directories present locally, least recently used first, with sizes.
+        self._local: OrderedDict[Path, int] | None = None
+        self._local_bytes = 0
+        self._stats: dict[str, int] = {
+            "uploaded": 0,
+            "upload_failures": 0,
+            "uploaded_bytes": 0,
+            "fetched": 0,
+            "fetch_misses": 0,
+            "evicted": 0,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "pending_uploads": len(self._pending),
+                "cached_dirs": len(self._local or {}),
+                "cached_bytes": self._local_bytes,
+                "cache_bytes_limit": self.cache_bytes or None,
+            }
+
+    def key_prefix(self, video_dir: Path) -> str | None:
+        try:
+            return video_dir.resolve().relative_to(self.data_dir.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def schedule_upload(self, video_dir: Path) -> Future[None]:
+        """Upload every file of ``video_dir`` in the background."""
+        with self._lock:
+            future = self._executor.submit(self._upload, video_dir)
+            self._pending[video_dir] = future
+        future.add_done_callback(lambda _: self._upload_done(video_dir, future))
+        return future
+
+    def wait(self) -> None:
+        """Block until every scheduled upload has finished."""
+        while True:
+            with self._lock:
+                pending = list(self._pending.values())
+            if not pending:
+                return
+            for future in pending:
+                future.exception()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _upload(self, video_dir: Path) -> None:
+        prefix = self.key_prefix(video_dir)
+        if prefix is None:
+            raise ValueError(f"{video_dir} is outside {self.data_dir}")
+        (video_dir / UPLOADED_MARKER).unlink(missing_ok=True)
+        size = 0
+        names: set[str] = set()
+        for path in sorted(video_dir.iterdir()):
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            # Audio goes through put_file so large files use multipart upload.
+            self.store.put_file(f"{prefix}/{path.name}", path)
+            size += path.stat().st_size
+            names.add(path.name)
+        # Drop artifacts the directory no longer has, e.g. metadata.json after it
+        # was compressed, so a later fetch cannot bring them back. Audio missing
+        # locally may just have been evicted, so it goes only when replaced.
+        has_audio = any(name.startswith("audio") for name in names)
+        for key in list(self.store.list_keys(prefix + "/")):
+            name = key.rsplit("/", 1)[-1]
+            if name in names or (name.startswith("audio") and not has_audio):
+                continue
+            self.store.delete(key)
+        (video_dir / UPLOADED_MARKER).touch()
+        with self._lock:
+            self._stats["uploaded"] += 1
+            self._stats["uploaded_bytes"] += size
+        self._remember(video_dir, size)
+
+    def _upload_done(self, video_dir: Path, future: Future[None]) -> None:
+        with self._lock:
+            if self._pending.get(video_dir) is future:
+                del self._pending[video_dir]
+        exc = future.exception()
+        if exc is not None:
+            with self._lock:
+                self._stats["upload_failures"] += 1
+            logger.warning("Uploading %s failed: %s", video_dir, exc)
+
+    def ensure_local(self, video_dir: Path) -> bool:
+        """Make sure ``video_dir`` has its artifacts locally; False if the store lacks them too.
+
+        Audio is not downloaded: readers only need the transcript artifacts.
+        """
+        if any(path.name != UPLOADED_MARKER for path in _files(video_dir)):
+            self.touch(video_dir)
+            return True
+        prefix = self.key_prefix(video_dir)
+        if prefix is None:
+            return False
+        fetched = 0
+        for key in self.store.list_keys(prefix + "/"):
+            name = key.rsplit("/", 1)[-1]
+            if name.startswith("audio"):
+                continue
+            if self.store.get_file(key, video_dir / name):
+                fetched += (video_dir / name).stat().st_size
+        with self._lock:
+            self._stats["fetched" if fetched else "fetch_misses"] += 1
+        if not fetched:
+            return False
+        (video_dir / UPLOADED_MARKER).touch()
+        self._remember(video_dir, fetched)
+        return True
+
+    def remote_audio(self, video_dir: Path) -> list[Path]:
+        """Local paths of the audio ``video_dir`` has in the store but not on this host."""
+        prefix = self.key_prefix(video_dir)
+        if prefix is None:
+            return []
+        names = (key.rsplit("/", 1)[-1] for key in self.store.list_keys(prefix + "/"))
+        return [
+            video_dir / name
+            for name in names
+            if name.startswith("audio") and not (video_dir / name).exists()
+        ]
+
+    def fetch(self, path: Path) -> bool:
+        """Download one stored artifact to ``path``; False if the store lacks it."""
+        prefix = self.key_prefix(path.parent)
+        return prefix is not None and self.store.get_file(f"{prefix}/{path.name}", path)
+
+    def replace_audio(self, audio_path: Path, replacement: Path | None) -> None:
+        """Swap the stored copy of ``audio_path`` for ``replacement``, or delete it."""
+        prefix = self.key_prefix(audio_path.parent)
+        if prefix is None:
+            return
+        if replacement is not None:
+            self.store.put_file(f"{prefix}/{replacement.name}", replacement)
+        self.store.delete(f"{prefix}/{audio_path.name}")
+
+    def _local_index(self) -> OrderedDict[Path, int]:
+        # Built on first use from the markers on disk, oldest first.
+        if self._local is None:
+            markers = sorted(
+                self.data_dir.glob(f"transcripts/*/*/*/{UPLOADED_MARKER}"),
+                key=lambda marker: marker.stat().st_mtime,
+            )
+            self._local = OrderedDict()
+            for marker in markers:
+                size = sum(path.stat().st_size for path in _files(marker.parent))
+                self._local[marker.parent] = size
+                self._local_bytes += size
+        return self._local
+
+    def touch(self, video_dir: Path) -> None:
+        """Mark ``video_dir`` as recently read so it is evicted last."""
+        if not self.cache_bytes:
+            return
+        with self._lock:
+            local = self._local_index()
+            if video_dir in local:
+                local.move_to_end(video_dir)
+
+    def _remember(self, video_dir: Path, size: int) -> None:
+        if not self.cache_bytes:
+            return
+        evict: list[Path] = []
+        with self._lock:
+            local = self._local_index()
+            self._local_bytes += size - local.pop(video_dir, 0)
+            local[video_dir] = size
+            for candidate in list(local):
+                if self._local_bytes <= self.cache_bytes:
+                    break
+                if candidate == video_dir or candidate in self._pending:
+                    continue
+                self._local_bytes -= local.pop(candidate)
+                evict.append(candidate)
+            self._stats["evicted"] += len(evict)
+        for path in evict:
+            for child in _files(path):
+                child.unlink(missing_ok=True)
+
+
+def _files(video_dir: Path) -> list[Path]:
+    if not video_dir.is_dir():
+        return []
+    return [path for path in video_dir.iterdir() if path.is_file()]
@@ -0,0 +1,108 @@
+"""Background fetching of video comments into the searchable comments table.
+
+A tracked video first gets its newest ``max_comments`` comments. After that it
+is refreshed every ``refresh_seconds`` with only the newest ``refresh_batch``
+comments, which are upserted: new ones are added and known ones get their
+latest likes. yt-dlp cannot ask for comments after a timestamp, so if even the
+oldest comment of a refresh is newer than the stored watermark, comments may
+have been missed in between and the next refresh fetches the full thread again.
+"""
+from __future__ import annotations
+
+import logging
+from threading import Event, Thread
+from typing import Any
+
+from yt_dlp_mcp.db.comments import CommentsRepository
+from yt_dlp_mcp.services.youtube_info import YouTubeInfoService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_COMMENTS = 500
+DEFAULT_REFRESH_BATCH = 100
+DEFAULT_REFRESH_SECONDS = 24 * 3600
+
+
+class CommentIngester:
+    def __init__(
+        self,
+        *,
+        comments: CommentsRepository,
+        info: YouTubeInfoService | None = None,
+        poll_interval_seconds: float = 5,
+        max_comments: int = DEFAULT_MAX_COMMENTS,
+        refresh_batch: int = DEFAULT_REFRESH_BATCH,
+        refresh_seconds: int = DEFAULT_REFRESH_SECONDS,
+    ) -> None:
+        self.comments = comments
+        self.info = info or YouTubeInfoService()
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_comments = max(max_comments, 1)
+        self.refresh_batch = max(refresh_batch, 1)
+        self.refresh_seconds = max(refresh_seconds, 60)
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run_loop, name="yt-dlp-mcp-comments", daemon=True)
+
+    def start(self) -> None:
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self, timeout_seconds: float = 10.0) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout_seconds)
+
+    def _run_loop(self) -> None:
+        requeued = self.comments.requeue_interrupted()
+        if requeued:
+            logger.info("Resuming %d interrupted comment fetches", requeued)
+        while not self._stop_event.is_set():
+            if not self.run_once():
+                self._stop_event.wait(self.poll_interval_seconds)
+
+    def run_once(self) -> bool:
+        """Claim and fetch one queued or due source; False if none was."""
+        source = self.comments.claim_next()
+        if source is None:
+            return False
+        self.fetch(source)
+        return True
+
+    def fetch(self, source: dict[str, Any]) -> dict[str, Any]:
+        """Fetch and store comments of one claimed source; returns the fetch stats."""
+        source_id = str(source["id"])
+        watermark = source["newest_timestamp"]
+        full = bool(source["full_refresh"]) or watermark is None
+        try:
+            thread = self.info.get_comment_thread(
+                str(source["url"]),
+                max_comments=self.max_comments if full else self.refresh_batch,
+                sort="new",
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            message = str(exc).strip() or "Unknown comment fetch error"
+            logger.exception("Comment fetch for %s failed: %s", source_id, message)
+            self.comments.mark_failed(source_id, message)
+            return {"error": message}
+
+        comments = thread["comments"]
+        timestamps = [c["timestamp"] for c in comments if c.get("timestamp") is not None]
+        # A full batch that does not reach back to the watermark leaves a gap.
+        gap = (
+            not full
+            and len(comments) >= self.refresh_batch
+            and bool(timestamps)
+            and min(timestamps) > watermark
+        )
+        new = self.comments.record_fetch(
+            source_id,
+            video_id=thread.get("video_id"),
+            title=thread.get("title"),
+            comments=comments,
+            refresh_seconds=self.refresh_seconds,
+            full_refresh=gap,
+        )
+        logger.info(
+            "Stored %d new of %d fetched comments for %s", new, len(comments), source_id
+        )
+        return {"fetched": len(comments), "new": new, "full": full, "gap": gap}
@@ -0,0 +1,135 @@
+"""zstd compression of stored transcript artifacts.
+
+Whole-file artifacts such as ``metadata.json`` are written as ``<name>.zst``
+next to where the plain file used to be; ``segments.bin`` compresses its text
+blob block by block instead, so windowed reads stay cheap (see
+``segment_file``). Readers accept either form.
+
+An optional dictionary trained on the corpus improves the ratio of the many
+small files. Dictionaries are kept as ``<dict_id>.dict`` and every frame
+records the id it was written with, so files stay readable after a new
+dictionary is trained.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from threading import Lock
+
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+ZSTD_SUFFIX = ".zst"
+DEFAULT_LEVEL = 3
+DEFAULT_DICTIONARY_SIZE = 112 * 1024
+_ACTIVE_DICTIONARY_FILENAME = "active"
+
+
+def compressed_path(path: Path) -> Path:
+    return path.with_name(path.name + ZSTD_SUFFIX)
+
+
+class ArtifactCodec:
+    """Compresses artifacts at ``level`` (0 writes them plain) and reads both forms.
+
+    Compressor and decompressor objects are created per call: they are cheap
+    next to the shared, precomputed dictionary and are not safe to share
+    between threads.
+    """
+
+    def __init__(self, dictionary_dir: Path | None = None, *, level: int = DEFAULT_LEVEL) -> None:
+        self.dictionary_dir = dictionary_dir
+        self.level = level
+        self._dictionaries: dict[int, zstandard.ZstdCompressionDict] = {}
+        self._active: zstandard.ZstdCompressionDict | None = None
+        self._lock = Lock()
+        if dictionary_dir is not None and dictionary_dir.exists():
+            self._load_dictionaries(dictionary_dir)
+
+    @property
+    def enabled(self) -> bool:
+        return self.level > 0
+
+    @property
+    def dictionary_id(self) -> int | None:
+        return self._active.dict_id() if self._active is not None else None
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "level": self.level,
+            "dictionary_id": self.dictionary_id,
+            "dictionaries": len(self._dictionaries),
+        }
+
+    def compress(self, data: bytes) -> bytes:
+        active = self._active
+        if active is None:
+            return zstandard.ZstdCompressor(level=max(self.level, 1)).compress(data)
+        return zstandard.ZstdCompressor(dict_data=active).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        if not dict_id:
+            return zstandard.ZstdDecompressor().decompress(data)
+        dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            raise ValueError(f"zstd dictionary {dict_id} is not available")
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data)
+
+    def write(self, path: Path, data: bytes) -> Path:
+        """Atomically write ``data`` to ``path`` or its ``.zst`` twin; removes the other."""
+        target, stale = path, compressed_path(path)
+        if self.enabled:
+            target, stale = stale, path
+            data = self.compress(data)
+        tmp = target.with_name(f".{target.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        stale.unlink(missing_ok=True)
+        return target
+
+    def read(self, path: Path) -> bytes | None:
+        """Contents of ``path``, or of its ``.zst`` twin decompressed, or None."""
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        try:
+            data = compressed_path(path).read_bytes()
+        except FileNotFoundError:
+            return None
+        return self.decompress(data)
+
+    def train(self, samples: Iterable[bytes], size: int = DEFAULT_DICTIONARY_SIZE) -> int:
+        """Train a dictionary on ``samples``, save it and use it for new writes."""
+        if self.dictionary_dir is None:
+            raise ValueError("ArtifactCodec has no dictionary_dir to save a dictionary in")
+        dictionary = zstandard.train_dictionary(size, list(samples), level=max(self.level, 1))
+        dict_id = dictionary.dict_id()
+        self.dictionary_dir.mkdir(parents=True, exist_ok=True)
+        (self.dictionary_dir / f"{dict_id}.dict").write_bytes(dictionary.as_bytes())
+        (self.dictionary_dir / _ACTIVE_DICTIONARY_FILENAME).write_text(str(dict_id))
+        self._activate(dictionary)
+        return dict_id
+
+    def _load_dictionaries(self, dictionary_dir: Path) -> None:
+        for path in dictionary_dir.glob("*.dict"):
+            dictionary = zstandard.ZstdCompressionDict(path.read_bytes())
+            self._dictionaries[dictionary.dict_id()] = dictionary
+        active_path = dictionary_dir / _ACTIVE_DICTIONARY_FILENAME
+        if active_path.exists():
+            active = self._dictionaries.get(int(active_path.read_text().strip()))
+            if active is None:
+                logger.warning("Active zstd dictionary in %s is missing", dictionary_dir)
+            else:
+                self._activate(active)
+
+    def _activate(self, dictionary: zstandard.ZstdCompressionDict) -> None:
+        if self.enabled:
+            dictionary.precompute_compress(level=self.level)
+        with self._lock:
+            self._dictionaries[dictionary.dict_id()] = dictionary
+            self._active = dictionary
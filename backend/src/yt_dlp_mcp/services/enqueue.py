@@ -0,0 +1,106 @@
+"""Set-based deduplication and enqueueing of transcription requests."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from yt_dlp_mcp.db.jobs import DEFAULT_PRIORITY, JobsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.utils.url import extract_youtube_video_id, normalize_url
+
+
+def enqueue_urls(
+    jobs: JobsRepository,
+    transcripts: TranscriptsRepository,
+    urls: Sequence[str],
+    *,
+    priority: int = DEFAULT_PRIORITY,
+) -> list[dict[str, Any]]:
+    """The ``transcribe`` response for each of ``urls``, in order.
+
+    One query finds stored transcripts and one commit enqueues the rest at
+    ``priority``, attaching to any job already active for the same URL. A URL
+    repeated in ``urls`` is enqueued once; later copies are reported as
+    deduplicated onto the same job.
+    """
+    normalized = [normalize_url(url) for url in urls]
+    results = _completed(transcripts, normalized)
+
+    # Jobs to create or attach to, keyed by normalized URL so repeats share one.
+    pending: dict[str, list[dict[str, Any]]] = {}
+    first_url: dict[str, str] = {}
+    for url, original, result in zip(normalized, urls, results):
+        if result:
+            continue
+        pending.setdefault(url, []).append(result)
+        first_url.setdefault(url, original)
+
+    if pending:
+        attached = jobs.enqueue_or_attach(
+            ((first_url[url], url) for url in pending), priority=priority
+        )
+        for (job, created), waiting in zip(attached, pending.values()):
+            for index, result in enumerate(waiting):
+                result.update(
+                    job_id=job["id"],
+                    status=job["status"],
+                    deduplicated=not created or index > 0,
+                )
+    return results
+
+
+def find_urls(
+    jobs: JobsRepository, transcripts: TranscriptsRepository, urls: Sequence[str]
+) -> list[dict[str, Any]]:
+    """What ``transcribe`` would attach each of ``urls`` to, without queueing anything.
+
+    The stored transcript or active job a URL already has is reported as
+    ``enqueue_urls`` reports it; a URL with neither gets ``{}``.
+    """
+    normalized = [normalize_url(url) for url in urls]
+    results = _completed(transcripts, normalized)
+    active = jobs.find_active_many(
+        list(dict.fromkeys(url for url, result in zip(normalized, results) if not result))
+    )
+    for url, result in zip(normalized, results):
+        if not result and url in active:
+            result.update(job_id=active[url]["id"], status=active[url]["status"], deduplicated=True)
+    return results
+
+
+def _completed(
+    transcripts: TranscriptsRepository, normalized: Sequence[str]
+) -> list[dict[str, Any]]:
+    """The ``transcribe`` response for each stored URL of ``normalized``, else ``{}``."""
+    video_ids = {
+        url: video_id
+        for url in normalized
+        if (video_id := extract_youtube_video_id(url)) is not None
+    }
+    by_url: dict[str, dict[str, Any]] = {}
+    by_video_id: dict[str, dict[str, Any]] = {}
+    for row in transcripts.find_existing(
+        list(dict.fromkeys(normalized)), list(dict.fromkeys(video_ids.values()))
+    ):
+        by_url.setdefault(str(row["normalized_url"]), row)
+        by_video_id.setdefault(str(row["video_id"]), row)
+
+    results: list[dict[str, Any]] = []
+    for url in normalized:
+        # Also match by video_id — catches cases where the same video was
+        # previously stored under a different URL form (e.g. /live/ vs /watch?v=)
+        existing = by_url.get(url)
+        if existing is None and url in video_ids:
+            existing = by_video_id.get(video_ids[url])
+        if existing is not None:
+            results.append(
+                {
+                    "status": "completed",
+                    "deduplicated": True,
+                    "video_id": existing["video_id"],
+                    "transcript_path": existing["path"],
+                }
+            )
+        else:
+            results.append({})
+    return results
@@ -0,0 +1,166 @@
+"""Streaming bulk export of stored transcripts as JSON Lines or a tar archive.
+
+The pipeline is generators end to end: transcript rows are paged from the
+database by id, each transcript is loaded, serialized and dropped before the
+next one, and output is coalesced into fixed-size chunks. Memory stays flat
+however large the export.
+"""
+from __future__ import annotations
+
+import io
+import json
+import logging
+import tarfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Literal
+
+from yt_dlp_mcp.db.transcripts import TranscriptFilters, TranscriptsRepository
+from yt_dlp_mcp.services.artifact_sync import ArtifactSync
+from yt_dlp_mcp.services.compression import ArtifactCodec
+from yt_dlp_mcp.services.object_store import ObjectStoreError
+from yt_dlp_mcp.services.storage import (
+    load_transcript,
+    to_json,
+    to_markdown,
+    transcript_payload,
+)
+from yt_dlp_mcp.types import TranscriptResult
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["jsonl", "tar"]
+EXPORT_FORMATS: tuple[ExportFormat, ...] = ("jsonl", "tar")
+EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    "jsonl": "application/x-ndjson",
+    "tar": "application/x-tar",
+}
+CHUNK_SIZE = 64 * 1024
+
+# Row fields that only make sense inside this deployment.
+_INTERNAL_FIELDS = ("id", "path")
+
+
+@dataclass(slots=True)
+class ExportItem:
+    metadata: dict[str, Any]
+    transcript: TranscriptResult
+
+
+def iter_export_items(
+    transcripts: TranscriptsRepository,
+    filters: TranscriptFilters | None = None,
+    *,
+    codec: ArtifactCodec | None = None,
+    sync: ArtifactSync | None = None,
+) -> Iterator[ExportItem]:
+    """Stored transcripts matching ``filters``; rows whose files are gone are skipped."""
+    for row in transcripts.iter_transcripts(filters):
+        video_dir = Path(str(row["path"]))
+        try:
+            if sync is not None:
+                sync.ensure_local(video_dir)
+            transcript = load_transcript(video_dir, codec)
+        except (OSError, ValueError, ObjectStoreError) as exc:
+            logger.warning("Skipping %s in export: %s", row["video_id"], exc)
+            continue
+        if transcript is None:
+            logger.warning("Skipping %s in export: no transcript in %s", row["video_id"], row["path"])
+            continue
+        metadata = {key: value for key, value in row.items() if key not in _INTERNAL_FIELDS}
+        yield ExportItem(metadata=metadata, transcript=transcript)
+
+
+def iter_jsonl(items: Iterable[ExportItem]) -> Iterator[bytes]:
+    """One JSON object per transcript: its metadata plus language, text and segments."""
+    for item in items:
+        record = {**item.metadata, **transcript_payload(item.transcript)}
+        yield json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are taken out with ``drain()``."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        return len(chunk)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _tar_mtime(item: ExportItem) -> int:
+    transcribed_at = item.metadata.get("transcribed_at")
+    if not transcribed_at:
+        return 0
+    try:
+        parsed = datetime.fromisoformat(str(transcribed_at))
+    except ValueError:
+        return 0
+    return int(parsed.replace(tzinfo=parsed.tzinfo or UTC).timestamp())
+
+
+def iter_tar(items: Iterable[ExportItem]) -> Iterator[bytes]:
+    """A tar stream with ``{video_id}/metadata.json``, ``transcript.json`` and ``transcript.md``."""
+    sink = _ChunkSink()
+    with tarfile.open(fileobj=sink, mode="w|", format=tarfile.PAX_FORMAT) as archive:
+        for item in items:
+            video_id = str(item.metadata["video_id"])
+            members = {
+                "metadata.json": json.dumps(item.metadata, ensure_ascii=False, indent=2),
+                "transcript.json": to_json(item.transcript),
+                "transcript.md": to_markdown(item.transcript, item.metadata),
+            }
+            mtime = _tar_mtime(item)
+            for name, content in members.items():
+                data = content.encode("utf-8")
+                info = tarfile.TarInfo(f"{video_id}/{name}")
+                info.size = len(data)
+                info.mtime = mtime
+                archive.addfile(info, io.BytesIO(data))
+            # TarFile remembers every member it wrote; a stream never needs them.
+            archive.members.clear()  # type: ignore[attr-defined]
+            yield sink.drain()
+    yield sink.drain()
+
+
+def coalesce(chunks: Iterable[bytes], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Re-chunk ``chunks`` into pieces of at least ``size`` bytes (the last may be smaller)."""
+    buffer: list[bytes] = []
+    buffered = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def stream_export(
+    transcripts: TranscriptsRepository,
+    fmt: ExportFormat,
+    filters: TranscriptFilters | None = None,
+    *,
+    codec: ArtifactCodec | None = None,
+    sync: ArtifactSync | None = None,
+) -> Iterator[bytes]:
+    """The whole export as a stream of ``CHUNK_SIZE`` byte chunks."""
+    items = iter_export_items(transcripts, filters, codec=codec, sync=sync)
+    serialized = iter_tar(items) if fmt == "tar" else iter_jsonl(items)
+    return coalesce(serialized)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import logging
+import subprocess
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from yt_dlp_mcp.db.fingerprints import FingerprintsRepository
+from yt_dlp_mcp.types import TranscriptResult, TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 8000
+FRAME_SIZE = 2048
+HOP_SIZE = 400
+HOP_SECONDS = HOP_SIZE / SAMPLE_RATE
+QUERY_PHASES = 4
+# 33 log-spaced bands between these frequencies give 32 bits per frame.
+_BAND_EDGES_HZ = np.geomspace(300.0, 2000.0, 34)
+_FFT_CHUNK_FRAMES = 1024
+# Frames of silence or clipping all hash to these and would match anything.
+_UNINFORMATIVE = (0, 0xFFFFFFFF)
+
+Fingerprint = npt.NDArray[np.uint32]
+
+
+@dataclass(slots=True)
+class FingerprintMatch:
+    transcript_id: int
+    # Position in the stored audio that lines up with the start of the query.
+    offset_seconds: float
+    bit_error_rate: float
+    overlap_seconds: float
+
+
+def decode_audio(path: Path, seconds: float) -> npt.NDArray[np.float32] | None:
+    """First ``seconds`` of ``path`` as mono float32 PCM at ``SAMPLE_RATE``, via ffmpeg."""
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-t",
+        str(seconds),
+        "-i",
+        str(path),
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-f",
+        "f32le",
+        "pipe:1",
+    ]
+    try:
+        completed = subprocess.run(cmd, capture_output=True, check=False, timeout=300)
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        logger.warning("Decoding %s for fingerprinting failed: %s", path, exc)
+        return None
+    if completed.returncode != 0:
+        logger.warning(
+            "Decoding %s for fingerprinting failed: %s",
+            path,
+            completed.stderr.decode("utf-8", "replace").strip(),
+        )
+        return None
+    return np.frombuffer(completed.stdout, dtype="<f4").astype(np.float32)
+
+
+def compute_fingerprint(samples: npt.NDArray[np.float32]) -> Fingerprint:
+    """One 32-bit sub-fingerprint per ``HOP_SECONDS`` of audio.
+
+    Bit ``m`` of frame ``n`` is the sign of the change, from frame ``n-1`` to ``n``,
+    of the energy difference between bands ``m`` and ``m+1``. The signs survive
+    re-encoding, resampling and volume changes.
+    """
+    count = 1 + (len(samples) - FRAME_SIZE) // HOP_SIZE
+    if count < 2:
+        return np.empty(0, dtype=np.uint32)
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    freqs = np.fft.rfftfreq(FRAME_SIZE, 1.0 / SAMPLE_RATE)
+    edges = np.searchsorted(freqs, _BAND_EDGES_HZ)
+    offsets = np.arange(FRAME_SIZE)
+
+    energies = np.empty((count, len(edges) - 1), dtype=np.float64)
+    for start in range(0, count, _FFT_CHUNK_FRAMES):
+        stop = min(start + _FFT_CHUNK_FRAMES, count)
+        frames = samples[(np.arange(start, stop) * HOP_SIZE)[:, None] + offsets] * window
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        energies[start:stop] = np.add.reduceat(power, edges[:-1], axis=1)
+
+    band_diff = energies[:, :-1] - energies[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+    weights = np.uint64(1) << np.arange(bits.shape[1], dtype=np.uint64)
+    return (bits.astype(np.uint64) @ weights).astype(np.uint32)
+
+
+def bit_error_rate(a: Fingerprint, b: Fingerprint) -> float:
+    differing = np.unpackbits(np.bitwise_xor(a, b).view(np.uint8))
+    return float(differing.mean()) if differing.size else 1.0
+
+
+def shift_transcript(
+    transcript: TranscriptResult, offset_seconds: float, duration: float
+) -> TranscriptResult:
+    """Re-time ``transcript`` for audio that starts ``offset_seconds`` into it.
+
+    Segments falling outside ``[0, duration]`` of the new audio are dropped and
+    the ones straddling either edge are clipped.
+    """
+    segments = [
+        TranscriptSegment(
+            start=max(segment.start - offset_seconds, 0.0),
+            end=min(segment.end - offset_seconds, duration),
+            text=segment.text,
+            speaker=segment.speaker,
+        )
+        for segment in transcript.segments
+        if segment.end - offset_seconds > 0 and segment.start - offset_seconds < duration
+    ]
+    if len(segments) == len(transcript.segments):
+        text = transcript.text
+    else:
+        text = " ".join(segment.text.strip() for segment in segments)
+    return TranscriptResult(text=text, segments=segments, language=transcript.language)
+
+
+class AudioFingerprinter:
+    """Finds stored transcripts whose audio matches a newly downloaded file.
+
+    Lookup is the classic exact-sub-fingerprint vote: every query frame whose
+    32-bit value is indexed votes for ``(transcript, stored frame - query frame)``;
+    the best offsets are then verified by bit error rate over the overlap. The
+    query is fingerprinted at ``QUERY_PHASES`` sub-hop shifts so that audio cut
+    at an arbitrary point still lines up with the stored frame grid.
+    """
+
+    def __init__(
+        self,
+        repository: FingerprintsRepository,
+        *,
+        seconds: float = 120.0,
+        max_bit_error_rate: float = 0.25,
+        min_overlap_seconds: float = 20.0,
+        candidates: int = 5,
+    ) -> None:
+        self.repository = repository
+        self.seconds = seconds
+        self.max_bit_error_rate = max_bit_error_rate
+        self.min_overlap_frames = int(min_overlap_seconds / HOP_SECONDS)
+        self.candidates = candidates
+
+    def load_audio(self, path: Path) -> npt.NDArray[np.float32] | None:
+        """Decoded samples of the fingerprinted window, or None if unusable."""
+        samples = decode_audio(path, self.seconds)
+        if samples is None or len(samples) < self.min_overlap_frames * HOP_SIZE + FRAME_SIZE:
+            return None
+        return samples
+
+    def match(self, samples: npt.NDArray[np.float32]) -> FingerprintMatch | None:
+        """Best verified match for ``samples``, or None if nothing is close enough."""
+        phases = [
+            compute_fingerprint(samples[phase * HOP_SIZE // QUERY_PHASES :])
+            for phase in range(QUERY_PHASES)
+        ]
+        positions: dict[int, list[tuple[int, int]]] = {}
+        for phase, prints in enumerate(phases):
+            for frame, value in enumerate(prints.tolist()):
+                if value not in _UNINFORMATIVE:
+                    positions.setdefault(value, []).append((phase, frame))
+
+        votes: Counter[tuple[int, int, int]] = Counter()
+        for value, transcript_id, stored_frame in self.repository.lookup(list(positions)):
+            for phase, frame in positions[value]:
+                votes[(transcript_id, phase, stored_frame - frame)] += 1
+
+        best: FingerprintMatch | None = None
+        stored_cache: dict[int, Fingerprint] = {}
+        for (transcript_id, phase, offset), count in votes.most_common(self.candidates):
+            if count < 2:
+                break
+            if transcript_id not in stored_cache:
+                frames = self.repository.get(transcript_id)
+                if frames is None:
+                    continue
+                stored_cache[transcript_id] = np.frombuffer(frames, dtype="<u4")
+            stored = stored_cache[transcript_id]
+            prints = phases[phase]
+            query_start = max(0, -offset)
+            query_stop = min(len(prints), len(stored) - offset)
+            overlap = query_stop - query_start
+            if overlap < self.min_overlap_frames:
+                continue
+            ber = bit_error_rate(
+                prints[query_start:query_stop],
+                stored[query_start + offset : query_stop + offset],
+            )
+            if ber <= self.max_bit_error_rate and (best is None or ber < best.bit_error_rate):
+                shift = phase * HOP_SIZE // QUERY_PHASES
+                best = FingerprintMatch(
+                    transcript_id=transcript_id,
+                    offset_seconds=round(offset * HOP_SECONDS - shift / SAMPLE_RATE, 4),
+                    bit_error_rate=round(ber, 4),
+                    overlap_seconds=round(overlap * HOP_SECONDS, 2),
+                )
+        return best
+
+    def store(self, transcript_id: int, samples: npt.NDArray[np.float32]) -> None:
+        prints = compute_fingerprint(samples)
+        self.repository.put(
+            transcript_id,
+            prints.astype("<u4").tobytes(),
+            (
+                (frame, value)
+                for frame, value in enumerate(prints.tolist())
+                if value not in _UNINFORMATIVE
+            ),
+        )
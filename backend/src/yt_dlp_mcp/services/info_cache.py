@@ -0,0 +1,205 @@
+"""Persistent cache in front of the yt-dlp lookups behind yt_search, get_metadata
+and get_comments.
+
+Results are kept in SQLite per tool and arguments. A fresh entry is returned
+as is; one past its TTL but within ``stale_seconds`` is still returned at once
+while a background refresh replaces it (stale-while-revalidate). Identical
+lookups that miss at the same time share one yt-dlp run: the first caller
+fetches and the others wait for its result. Failures are never cached.
+
+yt-dlp runs are admitted per tool through an optional ``AdmissionController``;
+a lookup that cannot get a slot raises ``BusyError`` to the caller and to every
+lookup waiting on it.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, TypeVar
+
+from yt_dlp_mcp.db.info_cache import InfoCacheRepository
+from yt_dlp_mcp.services.youtube_info import YouTubeInfoService
+from yt_dlp_mcp.utils.admission import AdmissionController, BusyError
+from yt_dlp_mcp.utils.url import normalize_url
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TOOLS = ("yt_search", "get_metadata", "get_comments")
+
+
+@dataclass(frozen=True, slots=True)
+class InfoCachePolicy:
+    # 0 disables caching for that tool; concurrent lookups are still coalesced.
+    search_ttl_seconds: float = 3600
+    metadata_ttl_seconds: float = 6 * 3600
+    comments_ttl_seconds: float = 1800
+    # How long past its TTL an entry may still be served while it is refreshed.
+    stale_seconds: float = 24 * 3600
+
+    def ttl(self, tool: str) -> float:
+        return {
+            "yt_search": self.search_ttl_seconds,
+            "get_metadata": self.metadata_ttl_seconds,
+            "get_comments": self.comments_ttl_seconds,
+        }[tool]
+
+
+class CachedInfoService:
+    """``YouTubeInfoService`` lookups served through ``InfoCacheRepository``."""
+
+    def __init__(
+        self,
+        cache: InfoCacheRepository,
+        info: YouTubeInfoService | None = None,
+        *,
+        policy: InfoCachePolicy | None = None,
+        refresh_workers: int = 2,
+        admission: AdmissionController | None = None,
+    ) -> None:
+        self.cache = cache
+        self.info = info or YouTubeInfoService()
+        self.policy = policy or InfoCachePolicy()
+        self.admission = admission or AdmissionController({})
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(refresh_workers, 1), thread_name_prefix="yt-dlp-mcp-info-refresh"
+        )
+        self._lock = Lock()
+        # Lookups running now, with the future their followers wait on.
+        self._inflight: dict[str, Future[tuple[Any, float]]] = {}
+        self._stats: dict[str, dict[str, float]] = {
+            tool: {
+                "hits": 0,
+                "stale_hits": 0,
+                "misses": 0,
+                "coalesced": 0,
+                "refreshes": 0,
+                "errors": 0,
+                "saved_seconds": 0.0,
+            }
+            for tool in TOOLS
+        }
+
+    def search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        return self._lookup(
+            "yt_search", [query, limit], lambda: self.info.search(query=query, limit=limit)
+        )
+
+    def get_metadata(self, url: str) -> dict[str, Any]:
+        return self._lookup(
+            "get_metadata", [normalize_url(url)], lambda: self.info.get_metadata(url=url)
+        )
+
+    def get_comments(self, url: str, limit: int = 20, sort: str = "top") -> list[dict[str, Any]]:
+        return self._lookup(
+            "get_comments",
+            [normalize_url(url), limit, sort],
+            lambda: self.info.get_comments(url=url, limit=limit, sort=sort),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            tools = {tool: dict(counts) for tool, counts in self._stats.items()}
+            inflight = len(self._inflight)
+        totals: dict[str, float] = {}
+        for counts in tools.values():
+            counts["saved_seconds"] = round(counts["saved_seconds"], 3)
+            for name, value in counts.items():
+                totals[name] = totals.get(name, 0) + value
+        lookups = totals["hits"] + totals["stale_hits"] + totals["misses"]
+        served = totals["hits"] + totals["stale_hits"] + totals["coalesced"]
+        return {
+            **totals,
+            "saved_seconds": round(totals["saved_seconds"], 3),
+            "hit_rate": round(served / lookups, 4) if lookups else None,
+            "inflight": inflight,
+            "entries": self.cache.count(),
+            "tools": tools,
+        }
+
+    def purge_expired(self) -> int:
+        """Delete entries too old to be served even as stale."""
+        return self.cache.purge(
+            {tool: self.policy.ttl(tool) + self.policy.stale_seconds for tool in TOOLS}
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, tool: str, name: str, saved_seconds: float = 0.0) -> None:
+        with self._lock:
+            self._stats[tool][name] += 1
+            self._stats[tool]["saved_seconds"] += saved_seconds
+
+    def _lookup(self, tool: str, args: list[Any], fetch: Callable[[], T]) -> T:
+        key = f"{tool}:{json.dumps(args, ensure_ascii=False)}"
+        ttl = self.policy.ttl(tool)
+        cached = self.cache.get(key) if ttl > 0 else None
+        if cached is not None:
+            value, fetched_at, fetch_seconds = cached
+            age = time.time() - fetched_at
+            if age < ttl:
+                self._count(tool, "hits", fetch_seconds)
+                return value  # type: ignore[no-any-return]
+            if age < ttl + self.policy.stale_seconds:
+                self._count(tool, "stale_hits", fetch_seconds)
+                self._refresh(tool, key, fetch)
+                return value  # type: ignore[no-any-return]
+        self._count(tool, "misses")
+        result, _ = self._fetch_shared(tool, key, fetch)
+        return result  # type: ignore[no-any-return]
+
+    def _fetch_shared(
+        self, tool: str, key: str, fetch: Callable[[], Any]
+    ) -> tuple[Any, float]:
+        """Run ``fetch`` once for everyone asking for ``key`` meanwhile."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats[tool]["coalesced"] += 1
+        if not leader:
+            value, fetch_seconds = future.result()
+            with self._lock:
+                self._stats[tool]["saved_seconds"] += fetch_seconds
+            return value, fetch_seconds
+        try:
+            with self.admission.admit(tool):
+                started = time.monotonic()
+                value = fetch()
+                fetch_seconds = time.monotonic() - started
+            if self.policy.ttl(tool) > 0:
+                self.cache.put(key, tool, value, fetch_seconds)
+        except BaseException as exc:
+            if not isinstance(exc, BusyError):
+                self._count(tool, "errors")
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result((value, fetch_seconds))
+            return value, fetch_seconds
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(self, tool: str, key: str, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._stats[tool]["refreshes"] += 1
+        future = self._executor.submit(self._fetch_shared, tool, key, fetch)
+        future.add_done_callback(lambda done: _log_refresh_failure(key, done))
+
+
+def _log_refresh_failure(key: str, future: Future[tuple[Any, float]]) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Refreshing cached %s failed: %s", key, future.exception())
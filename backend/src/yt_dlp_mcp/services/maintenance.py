@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event, Thread
+from typing import Any, Literal
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.jobs import ACTIVE_STATUSES, JobsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services.artifact_sync import ArtifactSync
+from yt_dlp_mcp.services.info_cache import CachedInfoService
+
+logger = logging.getLogger(__name__)
+
+AudioRetentionMode = Literal["delete", "opus"]
+
+
+@dataclass(slots=True)
+class MaintenancePolicy:
+    interval_seconds: int = 3600
+    job_retention_days: int = 30
+    # 0 keeps audio forever.
+    audio_retention_days: int = 0
+    audio_retention_mode: AudioRetentionMode = "opus"
+    opus_bitrate: str = "24k"
+
+
+class MaintenanceService:
+    """Background housekeeping for the data volume.
+
+    Each pass, run only while ``is_idle()`` is true, purges old job rows and
+    expired lookup cache entries, removes work directories left behind by
+    failed jobs, applies audio retention, then releases free database pages
+    and truncates the WAL. Bytes reclaimed per duty are accumulated in ``stats``.
+
+    With ``sync`` set, audio retention also covers the object store: tiered
+    audio replaces its stored copy, and audio evicted from this host is deleted
+    from the store or fetched, transcoded and dropped locally again.
+    """
+
+    def __init__(
+        self,
+        *,
+        database: Database,
+        jobs: JobsRepository,
+        transcripts: TranscriptsRepository,
+        work_root: Path,
+        policy: MaintenancePolicy,
+        is_idle: Callable[[], bool],
+        info_cache: CachedInfoService | None = None,
+        sync: ArtifactSync | None = None,
+    ) -> None:
+        self.database = database
+        self.jobs = jobs
+        self.transcripts = transcripts
+        self.work_root = work_root
+        self.policy = policy
+        self.is_idle = is_idle
+        self.info_cache = info_cache
+        self.sync = sync
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run_loop, name="yt-dlp-mcp-maintenance", daemon=True)
+        self._stats: dict[str, Any] = {
+            "passes": 0,
+            "last_run_at": None,
+            "last_duration_seconds": None,
+            "jobs_purged": 0,
+            "info_cache_purged": 0,
+            "work_dirs_removed": 0,
+            "audio_files_tiered": 0,
+            "reclaimed_bytes": {"work_dirs": 0, "audio": 0, "database": 0, "wal": 0},
+        }
+
+    def start(self) -> None:
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self, timeout_seconds: float = 10.0) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout_seconds)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        reclaimed = dict(self._stats["reclaimed_bytes"])
+        return {
+            **self._stats,
+            "reclaimed_bytes": reclaimed,
+            "reclaimed_bytes_total": sum(reclaimed.values()),
+        }
+
+    def _run_loop(self) -> None:
+        while not self._stop_event.wait(self.policy.interval_seconds):
+            if not self.is_idle():
+                continue
+            try:
+                self.run_once()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Maintenance pass failed")
+
+    def run_once(self) -> dict[str, int]:
+        """Run every duty once and return the bytes reclaimed by each."""
+        started = time.monotonic()
+        reclaimed = {"work_dirs": 0, "audio": 0, "database": 0, "wal": 0}
+
+        if self.policy.job_retention_days > 0:
+            self._stats["jobs_purged"] += self.jobs.purge_finished(self.policy.job_retention_days)
+        if self.info_cache is not None:
+            self._stats["info_cache_purged"] += self.info_cache.purge_expired()
+
+        reclaimed["work_dirs"] = self._remove_stale_work_dirs()
+        if self.policy.audio_retention_days > 0:
+            reclaimed["audio"] = self._apply_audio_retention()
+
+        if self.is_idle():
+            self.database.enable_incremental_vacuum()
+            reclaimed["database"] = self.database.incremental_vacuum()
+            reclaimed["wal"] = self.database.checkpoint()
+
+        for key, value in reclaimed.items():
+            self._stats["reclaimed_bytes"][key] += value
+        self._stats["passes"] += 1
+        self._stats["last_run_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self._stats["last_duration_seconds"] = round(time.monotonic() - started, 3)
+        logger.info("Maintenance pass reclaimed %d bytes: %s", sum(reclaimed.values()), reclaimed)
+        return reclaimed
+
+    def _remove_stale_work_dirs(self) -> int:
+        """Delete ``_work/<job_id>`` directories whose job is no longer running."""
+        if not self.work_root.exists():
+            return 0
+        reclaimed = 0
+        for job_dir in self.work_root.iterdir():
+            if not job_dir.is_dir():
+                continue
+            job = self.jobs.get(job_dir.name)
+            if job is not None and job["status"] in ACTIVE_STATUSES:
+                continue
+            size = _tree_size(job_dir)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            if not job_dir.exists():
+                reclaimed += size
+                self._stats["work_dirs_removed"] += 1
+        return reclaimed
+
+    def _apply_audio_retention(self) -> int:
+        reclaimed = 0
+        after_id = 0
+        while not self._stop_event.is_set():
+            batch = self.transcripts.list_transcribed_before(
+                self.policy.audio_retention_days, after_id=after_id
+            )
+            if not batch:
+                break
+            tiered: list[int] = []
+            for row in batch:
+                after_id = int(row["id"])
+                size = self._tier_video_audio(Path(str(row["path"])))
+                if size is not None:
+                    reclaimed += size
+                    tiered.append(after_id)
+            # Tiered rows drop out of later passes; failed ones are retried.
+            self.transcripts.mark_audio_tiered(tiered)
+        return reclaimed
+
+    def _tier_video_audio(self, video_dir: Path) -> int | None:
+        """Tier every copy of a video's audio; returns bytes reclaimed, None if any failed."""
+        reclaimed = 0
+        failed = False
+        for audio_path in sorted(video_dir.glob("audio.*")):
+            size = self._tier_audio(audio_path)
+            failed |= size is None
+            reclaimed += size or 0
+        if self.sync is None:
+            return None if failed else reclaimed
+        for audio_path in self.sync.remote_audio(video_dir):
+            if self.policy.audio_retention_mode == "delete":
+                self.sync.replace_audio(audio_path, None)
+                self._stats["audio_files_tiered"] += 1
+            elif audio_path.suffix == ".opus":
+                continue
+            elif not self.sync.fetch(audio_path):
+                failed = True
+            else:
+                # Evicted audio is tiered in the store and dropped locally again.
+                try:
+                    size = self._tier_audio(audio_path)
+                finally:
+                    audio_path.unlink(missing_ok=True)
+                    audio_path.with_suffix(".opus").unlink(missing_ok=True)
+                failed |= size is None
+                reclaimed += size or 0
+        return None if failed else reclaimed
+
+    def _tier_audio(self, audio_path: Path) -> int | None:
+        """Delete or transcode one audio file; returns bytes reclaimed, None if it failed."""
+        if self.policy.audio_retention_mode == "delete":
+            size = audio_path.stat().st_size
+            if self.sync is not None:
+                self.sync.replace_audio(audio_path, None)
+            audio_path.unlink(missing_ok=True)
+            self._stats["audio_files_tiered"] += 1
+            return size
+
+        if audio_path.suffix == ".opus":
+            return 0
+        target = audio_path.with_suffix(".opus")
+        partial = audio_path.with_name("audio.partial.opus")
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            str(audio_path),
+            "-vn",
+            "-ac",
+            "1",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            self.policy.opus_bitrate,
+            str(partial),
+        ]
+        try:
+            completed = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=600)
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            partial.unlink(missing_ok=True)
+            logger.warning("Opus transcode of %s failed: %s", audio_path, exc)
+            return None
+        if completed.returncode != 0:
+            partial.unlink(missing_ok=True)
+            logger.warning("Opus transcode of %s failed: %s", audio_path, completed.stderr.strip())
+            return None
+
+        size_before = audio_path.stat().st_size
+        partial.replace(target)
+        if self.sync is not None:
+            self.sync.replace_audio(audio_path, target)
+        audio_path.unlink(missing_ok=True)
+        self._stats["audio_files_tiered"] += 1
+        return max(size_before - target.stat().st_size, 0)
+
+
+def _tree_size(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
@@ -0,0 +1,340 @@
+"""Object storage backends for transcript artifacts and audio.
+
+``ObjectStore`` is the interface; ``LocalObjectStore`` keeps objects as files
+under a root directory (a mounted volume, or a stand-in in tests) and
+``S3ObjectStore`` talks to any S3-compatible service over httpx with
+Signature Version 4, using multipart upload for large files.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import hmac
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Protocol, runtime_checkable
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+_EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+class ObjectStoreError(RuntimeError):
+    """Raised when the object store rejects or fails a request."""
+
+
+@runtime_checkable
+class ObjectStore(Protocol):
+    """Flat key → bytes storage. Keys are ``/``-separated relative paths."""
+
+    def put_bytes(self, key: str, data: bytes) -> None: ...
+
+    def put_file(self, key: str, path: Path) -> None: ...
+
+    def get_bytes(self, key: str) -> bytes | None: ...
+
+    def get_file(self, key: str, dest: Path) -> bool: ...
+
+    def list_keys(self, prefix: str) -> Iterator[str]: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class LocalObjectStore:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ObjectStoreError(f"Key escapes the store root: {key}")
+        return path
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def put_file(self, key: str, path: Path) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.tmp")
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, target)
+
+    def get_bytes(self, key: str) -> bytes | None:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def get_file(self, key: str, dest: Path) -> bool:
+        source = self._path(key)
+        if not source.exists():
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, dest)
+        return True
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        base = self._path(prefix) if prefix else self.root
+        if not base.is_dir():
+            return
+        for path in sorted(base.rglob("*")):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                yield path.relative_to(self.root).as_posix()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+def sign_v4(
+    *,
+    method: str,
+    host: str,
+    path: str,
+    query: dict[str, str],
+    headers: dict[str, str],
+    payload_sha256: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    amz_date: str,
+    service: str = "s3",
+) -> str:
+    """The ``Authorization`` header for an AWS Signature Version 4 request.
+
+    ``path`` must already be URI-encoded; every entry of ``headers`` is signed
+    along with ``host``.
+    """
+    signed = {name.lower(): " ".join(value.split()) for name, value in headers.items()}
+    signed["host"] = host
+    signed_names = ";".join(sorted(signed))
+    canonical_query = "&".join(
+        f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+        for name, value in sorted(query.items())
+    )
+    canonical_request = "\n".join(
+        [
+            method,
+            path,
+            canonical_query,
+            "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+            signed_names,
+            payload_sha256,
+        ]
+    )
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ]
+    )
+    key = f"AWS4{secret_key}".encode()
+    for part in (amz_date[:8], region, service, "aws4_request"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_names}, Signature={signature}"
+    )
+
+
+class S3ObjectStore:
+    """Path-style S3 client; works with AWS, MinIO, R2 and other compatible services."""
+
+    def __init__(
+        self,
+        *,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        prefix: str = "",
+        part_size: int = DEFAULT_PART_SIZE,
+        timeout_seconds: float = 60.0,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix.strip("/")
+        self.part_size = max(part_size, 5 * 1024 * 1024)
+        self._client = httpx.Client(timeout=timeout_seconds)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _signed(
+        self,
+        method: str,
+        key: str | None,
+        query: dict[str, str],
+        content: bytes,
+        headers: dict[str, str] | None,
+    ) -> tuple[str, dict[str, str]]:
+        """The URL and signed headers of one request."""
+        path = f"/{quote(self.bucket, safe='')}"
+        if key is not None:
+            path += "/" + quote(self._key(key), safe="/-_.~")
+        payload_sha256 = hashlib.sha256(content).hexdigest() if content else _EMPTY_SHA256
+        request_headers = {
+            **(headers or {}),
+            "x-amz-content-sha256": payload_sha256,
+            "x-amz-date": dt.datetime.now(dt.UTC).strftime("%Y%m%dT%H%M%SZ"),
+        }
+        request_headers["Authorization"] = sign_v4(
+            method=method,
+            host=self.host,
+            path=path,
+            query=query,
+            headers=request_headers,
+            payload_sha256=payload_sha256,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            region=self.region,
+            amz_date=request_headers["x-amz-date"],
+        )
+        url = self.endpoint_url + path
+        if query:
+            url += "?" + "&".join(
+                f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+                for name, value in sorted(query.items())
+            )
+        return url, request_headers
+
+    def _request(
+        self,
+        method: str,
+        key: str | None,
+        *,
+        query: dict[str, str] | None = None,
+        content: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        url, request_headers = self._signed(method, key, query or {}, content, headers)
+        try:
+            response = self._client.request(
+                method, url, content=content, headers=request_headers
+            )
+        except httpx.HTTPError as exc:
+            raise ObjectStoreError(f"S3 {method} {key or ''} failed: {exc}") from exc
+        _raise_for_status(method, key, response)
+        return response
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self._request("PUT", key, content=data)
+
+    def put_file(self, key: str, path: Path) -> None:
+        """Upload ``path``; files larger than one part use multipart upload."""
+        if path.stat().st_size <= self.part_size:
+            self.put_bytes(key, path.read_bytes())
+            return
+        response = self._request("POST", key, query={"uploads": ""})
+        upload_id = _xml_text(response.content, "UploadId")
+        etags: list[str] = []
+        try:
+            with path.open("rb") as handle:
+                while part := handle.read(self.part_size):
+                    response = self._request(
+                        "PUT",
+                        key,
+                        query={"partNumber": str(len(etags) + 1), "uploadId": upload_id},
+                        content=part,
+                    )
+                    etags.append(response.headers["ETag"])
+            body = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in enumerate(etags, start=1)
+            )
+            response = self._request(
+                "POST",
+                key,
+                query={"uploadId": upload_id},
+                content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+            )
+            # S3 can report a failed completion with status 200 and an Error body.
+            if b"<Error>" in response.content:
+                raise ObjectStoreError(f"S3 multipart upload of {key} failed: {response.text}")
+        except BaseException:
+            self._request("DELETE", key, query={"uploadId": upload_id})
+            raise
+
+    def get_bytes(self, key: str) -> bytes | None:
+        response = self._request("GET", key)
+        return None if response.status_code == 404 else response.content
+
+    def get_file(self, key: str, dest: Path) -> bool:
+        """Stream the object into ``dest``; multi-hour audio never sits in memory."""
+        url, headers = self._signed("GET", key, {}, b"", None)
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        try:
+            with self._client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 404:
+                    return False
+                if response.status_code >= 400:
+                    response.read()
+                    _raise_for_status("GET", key, response)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                with tmp.open("wb") as handle:
+                    for chunk in response.iter_bytes():
+                        handle.write(chunk)
+        except httpx.HTTPError as exc:
+            tmp.unlink(missing_ok=True)
+            raise ObjectStoreError(f"S3 GET {key} failed: {exc}") from exc
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, dest)
+        return True
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        strip = len(self.prefix) + 1 if self.prefix else 0
+        query = {"list-type": "2", "prefix": self._key(prefix)}
+        while True:
+            response = self._request("GET", None, query=query)
+            root = ET.fromstring(response.content)
+            for element in root.iter(f"{_S3_NS}Key"):
+                yield (element.text or "")[strip:]
+            token = root.findtext(f"{_S3_NS}NextContinuationToken")
+            if root.findtext(f"{_S3_NS}IsTruncated") != "true" or not token:
+                return
+            query = {**query, "continuation-token": token}
+
+    def delete(self, key: str) -> None:
+        self._request("DELETE", key)
+
+
+def _raise_for_status(method: str, key: str | None, response: httpx.Response) -> None:
+    """Raise ObjectStoreError for an error response; 404 is left to the caller."""
+    if response.status_code >= 400 and response.status_code != 404:
+        raise ObjectStoreError(
+            f"S3 {method} {key or ''} failed ({response.status_code}): {response.text[:400]}"
+        )
+
+
+def _xml_text(payload: bytes, tag: str) -> str:
+    root = ET.fromstring(payload)
+    value = root.findtext(f"{_S3_NS}{tag}") or root.findtext(tag)
+    if not value:
+        raise ObjectStoreError(f"S3 response is missing {tag}")
+    return value
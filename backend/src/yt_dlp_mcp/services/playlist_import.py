@@ -0,0 +1,130 @@
+"""Background ingestion of playlists and channels.
+
+Each import streams entries from yt-dlp as they are listed and enqueues them
+in batches with the set-based deduplication of ``enqueue_urls``. After every
+batch the import records the entries and its resume position in one commit,
+so a listing that fails, stalls or is cut off by a restart continues from
+the last recorded batch instead of starting over.
+"""
+from __future__ import annotations
+
+import logging
+from threading import Event, Thread
+from typing import Any
+
+from yt_dlp_mcp.db.jobs import JobsRepository
+from yt_dlp_mcp.db.playlists import PlaylistsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services.enqueue import enqueue_urls
+from yt_dlp_mcp.services.youtube_info import (
+    DEFAULT_PLAYLIST_IDLE_TIMEOUT_SECONDS,
+    YouTubeInfoService,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+
+
+class PlaylistImporter:
+    def __init__(
+        self,
+        *,
+        playlists: PlaylistsRepository,
+        jobs: JobsRepository,
+        transcripts: TranscriptsRepository,
+        info: YouTubeInfoService | None = None,
+        poll_interval_seconds: float = 5,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        idle_timeout_seconds: float = DEFAULT_PLAYLIST_IDLE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.playlists = playlists
+        self.jobs = jobs
+        self.transcripts = transcripts
+        self.info = info or YouTubeInfoService()
+        self.poll_interval_seconds = poll_interval_seconds
+        self.batch_size = max(batch_size, 1)
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run_loop, name="yt-dlp-mcp-playlists", daemon=True)
+
+    def start(self) -> None:
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self, timeout_seconds: float = 10.0) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout_seconds)
+
+    def _run_loop(self) -> None:
+        requeued = self.playlists.requeue_interrupted()
+        if requeued:
+            logger.info("Resuming %d interrupted playlist imports", requeued)
+        while not self._stop_event.is_set():
+            if not self.run_once():
+                self._stop_event.wait(self.poll_interval_seconds)
+
+    def run_once(self) -> bool:
+        """Claim and run one queued import; False if none was due."""
+        playlist = self.playlists.claim_next()
+        if playlist is None:
+            return False
+        playlist_id = str(playlist["id"])
+        try:
+            finished = self._import(playlist)
+        except Exception as exc:  # pylint: disable=broad-except
+            message = str(exc).strip() or "Unknown playlist import error"
+            # Recorded batches reset the attempt counter, so read it back.
+            current = self.playlists.get(playlist_id) or playlist
+            logger.exception("Playlist import %s failed: %s", playlist_id, message)
+            self.playlists.mark_failed(playlist_id, message, int(current.get("attempt") or 0))
+            return True
+        if finished:
+            self.playlists.mark_completed(playlist_id)
+            logger.info("Playlist import %s completed", playlist_id)
+        return True
+
+    def _import(self, playlist: dict[str, Any]) -> bool:
+        """Stream the listing from the resume position; False if stopped part way."""
+        playlist_id = str(playlist["id"])
+        batch: list[dict[str, Any]] = []
+        entries = self.info.iter_playlist(
+            str(playlist["url"]),
+            start=int(playlist["next_index"]),
+            idle_timeout=self.idle_timeout_seconds,
+        )
+        try:
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    self._flush(playlist_id, batch)
+                    batch = []
+                if self._stop_event.is_set():
+                    self._flush(playlist_id, batch)
+                    # Left in 'listing'; requeue_interrupted resumes it on start.
+                    return False
+        finally:
+            entries.close()
+        self._flush(playlist_id, batch)
+        return True
+
+    def _flush(self, playlist_id: str, batch: list[dict[str, Any]]) -> None:
+        if not batch:
+            return
+        results = enqueue_urls(self.jobs, self.transcripts, [entry["url"] for entry in batch])
+        recorded = [
+            {
+                "position": entry["position"],
+                "video_id": entry["video_id"],
+                "title": entry.get("title"),
+                "url": entry["url"],
+                "job_id": result.get("job_id"),
+                "status": result["status"],
+                "deduplicated": result["deduplicated"],
+            }
+            for entry, result in zip(batch, results)
+        ]
+        self.playlists.record_batch(
+            playlist_id, recorded, next_index=max(entry["position"] for entry in batch) + 1
+        )
@@ -0,0 +1,233 @@
+"""Compact array-backed transcript segment file (``segments.bin``).
+
+Layout, little-endian::
+
+    header      magic "YTSG", version u16, flags u16, segment count u32,
+                speaker table bytes u32, language bytes u32, full-text bytes u32
+    starts      float64[count]
+    ends        float64[count]
+    offsets     uint64[count + 1]   segment text boundaries within the text blob
+    speakers    int32[count]        index into the speaker table, -1 for none
+    speaker table                   NUL-separated UTF-8 names
+    language                        UTF-8
+    full text                       UTF-8, only when it differs from the joined segments
+                                    (flag bit 0)
+    block table                     only when the blob is compressed (flag bit 1):
+                                    block count u32, block size u32,
+                                    uint64[blocks + 1] frame boundaries
+    text blob                       UTF-8 segment texts back to back, or one zstd
+                                    frame per ``block size`` bytes of them
+
+Everything before the text blob is the offset index: about 28 bytes per
+segment. A window of segments is served by reading the index and then only
+the byte range of the blob, or the compressed blocks, it covers.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from yt_dlp_mcp.services.compression import ArtifactCodec
+from yt_dlp_mcp.types import TranscriptResult, TranscriptSegment
+
+SEGMENTS_FILENAME = "segments.bin"
+MAGIC = b"YTSG"
+VERSION = 2
+# Version 1 files are version 2 files without compressed blobs.
+_READABLE_VERSIONS = (1, 2)
+BLOCK_SIZE = 64 * 1024
+
+_HEADER = struct.Struct("<4sHHIIII")
+_BLOCK_TABLE = struct.Struct("<II")
+_FLAG_FULL_TEXT = 1
+_FLAG_COMPRESSED = 2
+
+
+def joined_text(segments: list[TranscriptSegment]) -> str:
+    return " ".join(segment.text.strip() for segment in segments if segment.text.strip())
+
+
+def write_segment_file(
+    path: Path, transcript: TranscriptResult, codec: ArtifactCodec | None = None
+) -> int:
+    """Write ``transcript`` to ``path`` atomically and return the file size.
+
+    With an enabled ``codec`` the text blob is compressed in ``BLOCK_SIZE`` blocks.
+    """
+    segments = transcript.segments
+    speaker_names: dict[str, int] = {}
+    speaker_ids = np.empty(len(segments), dtype="<i4")
+    texts: list[bytes] = []
+    for index, segment in enumerate(segments):
+        if segment.speaker is None:
+            speaker_ids[index] = -1
+        else:
+            speaker_ids[index] = speaker_names.setdefault(segment.speaker, len(speaker_names))
+        texts.append(segment.text.encode("utf-8"))
+
+    offsets = np.zeros(len(segments) + 1, dtype="<u8")
+    np.cumsum([len(text) for text in texts], out=offsets[1:])
+    speaker_table = b"\0".join(name.encode("utf-8") for name in speaker_names)
+    language = (transcript.language or "").encode("utf-8")
+    has_full_text = transcript.text != joined_text(segments)
+    full_text = transcript.text.encode("utf-8") if has_full_text else b""
+    blob = b"".join(texts)
+    flags = _FLAG_FULL_TEXT if has_full_text else 0
+    block_table = b""
+    if codec is not None and codec.enabled and blob:
+        frames = [
+            codec.compress(blob[start : start + BLOCK_SIZE])
+            for start in range(0, len(blob), BLOCK_SIZE)
+        ]
+        bounds = np.zeros(len(frames) + 1, dtype="<u8")
+        np.cumsum([len(frame) for frame in frames], out=bounds[1:])
+        block_table = _BLOCK_TABLE.pack(len(frames), BLOCK_SIZE) + bounds.tobytes()
+        blob = b"".join(frames)
+        flags |= _FLAG_COMPRESSED
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as handle:
+        handle.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                flags,
+                len(segments),
+                len(speaker_table),
+                len(language),
+                len(full_text),
+            )
+        )
+        handle.write(np.fromiter((s.start for s in segments), "<f8", len(segments)).tobytes())
+        handle.write(np.fromiter((s.end for s in segments), "<f8", len(segments)).tobytes())
+        handle.write(offsets.tobytes())
+        handle.write(speaker_ids.tobytes())
+        handle.write(speaker_table)
+        handle.write(language)
+        handle.write(full_text)
+        handle.write(block_table)
+        handle.write(blob)
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+@dataclass(slots=True)
+class SegmentFile:
+    """The offset index of a ``segments.bin``; segment texts are read on demand."""
+
+    path: Path
+    starts: npt.NDArray[np.float64]
+    ends: npt.NDArray[np.float64]
+    offsets: npt.NDArray[np.uint64]
+    speaker_ids: npt.NDArray[np.int32]
+    speakers: list[str]
+    language: str | None
+    full_text: str | None
+    blob_start: int
+    # Frame boundaries and uncompressed block size of a compressed blob.
+    blocks: npt.NDArray[np.uint64] | None = None
+    block_size: int = 0
+    codec: ArtifactCodec | None = None
+
+    @classmethod
+    def open(cls, path: Path, codec: ArtifactCodec | None = None) -> SegmentFile:
+        with path.open("rb") as handle:
+            header = handle.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            magic, version, flags, count, speakers_len, language_len, text_len = (
+                _HEADER.unpack(header)
+            )
+            if magic != MAGIC or version not in _READABLE_VERSIONS:
+                raise ValueError(f"{path} is not a readable segment file")
+            index = handle.read(count * 8 * 2 + (count + 1) * 8 + count * 4)
+            tail = handle.read(speakers_len + language_len + text_len)
+            blocks = None
+            block_size = 0
+            table_len = 0
+            if flags & _FLAG_COMPRESSED:
+                block_count, block_size = _BLOCK_TABLE.unpack(handle.read(_BLOCK_TABLE.size))
+                blocks = np.frombuffer(handle.read((block_count + 1) * 8), "<u8")
+                table_len = _BLOCK_TABLE.size + blocks.nbytes
+
+        starts = np.frombuffer(index, "<f8", count, 0)
+        ends = np.frombuffer(index, "<f8", count, count * 8)
+        offsets = np.frombuffer(index, "<u8", count + 1, count * 16)
+        speaker_ids = np.frombuffer(index, "<i4", count, count * 24 + 8)
+        speaker_table = tail[:speakers_len].decode("utf-8")
+        language = tail[speakers_len : speakers_len + language_len].decode("utf-8")
+        full_text = tail[speakers_len + language_len :].decode("utf-8")
+        return cls(
+            path=path,
+            starts=starts,
+            ends=ends,
+            offsets=offsets,
+            speaker_ids=speaker_ids,
+            speakers=speaker_table.split("\0") if speakers_len else [],
+            language=language or None,
+            full_text=full_text if flags & _FLAG_FULL_TEXT else None,
+            blob_start=_HEADER.size + len(index) + len(tail) + table_len,
+            blocks=blocks,
+            block_size=block_size,
+            codec=codec,
+        )
+
+    @property
+    def count(self) -> int:
+        return int(self.starts.size)
+
+    def text_bytes(self, start: int, stop: int) -> int:
+        """UTF-8 size of the texts of segments ``start`` to ``stop``."""
+        return int(self.offsets[stop] - self.offsets[start])
+
+    def segments(self, start: int = 0, stop: int | None = None) -> list[TranscriptSegment]:
+        stop = self.count if stop is None else min(stop, self.count)
+        start = max(0, min(start, stop))
+        if start == stop:
+            return []
+        base = int(self.offsets[start])
+        blob = self._read_blob(base, int(self.offsets[stop]))
+        result: list[TranscriptSegment] = []
+        for index in range(start, stop):
+            speaker_id = int(self.speaker_ids[index])
+            result.append(
+                TranscriptSegment(
+                    start=float(self.starts[index]),
+                    end=float(self.ends[index]),
+                    text=blob[
+                        int(self.offsets[index]) - base : int(self.offsets[index + 1]) - base
+                    ].decode("utf-8"),
+                    speaker=self.speakers[speaker_id] if speaker_id >= 0 else None,
+                )
+            )
+        return result
+
+    def _read_blob(self, begin: int, end: int) -> bytes:
+        """Bytes ``begin`` to ``end`` of the uncompressed text blob."""
+        with self.path.open("rb") as handle:
+            if self.blocks is None:
+                handle.seek(self.blob_start + begin)
+                return handle.read(end - begin)
+            first = begin // self.block_size
+            last = (end - 1) // self.block_size + 1
+            frames_start = int(self.blocks[first])
+            handle.seek(self.blob_start + frames_start)
+            frames = handle.read(int(self.blocks[last]) - frames_start)
+        codec = self.codec or ArtifactCodec()
+        bounds = [int(bound) - frames_start for bound in self.blocks[first : last + 1]]
+        data = b"".join(
+            codec.decompress(frames[lo:hi]) for lo, hi in itertools.pairwise(bounds)
+        )
+        skip = begin - first * self.block_size
+        return data[skip : skip + end - begin]
+
+    def to_result(self) -> TranscriptResult:
+        segments = self.segments()
+        text = self.full_text if self.full_text is not None else joined_text(segments)
+        return TranscriptResult(text=text, segments=segments, language=self.language)
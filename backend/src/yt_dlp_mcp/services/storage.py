@@ -1,14 +1,46 @@
 from __future__ import annotations
 
+import functools
 import json
+import logging
 import re
 import shutil
+import sys
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
-from yt_dlp_mcp.types import TranscriptResult
+import numpy as np
+import numpy.typing as npt
 
+from yt_dlp_mcp.services.artifact_sync import ArtifactSync
+from yt_dlp_mcp.services.compression import ArtifactCodec, compressed_path
+from yt_dlp_mcp.services.segment_file import (
+    BLOCK_SIZE,
+    SEGMENTS_FILENAME,
+    SegmentFile,
+    write_segment_file,
+)
+from yt_dlp_mcp.types import TranscriptFormat, TranscriptResult, TranscriptSegment
+from yt_dlp_mcp.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
 
 PAUSE_THRESHOLD_SECONDS = 2.0
+DEFAULT_RENDER_CACHE_SIZE = 256
+DEFAULT_RENDER_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_INDEX_CACHE_SIZE = 256
+# Rough UTF-8 bytes per model token, for token-budgeted reads.
+BYTES_PER_TOKEN = 4
+
+# Files written by persist() before segments.bin became the source of truth.
+_LEGACY_FILES: dict[TranscriptFormat, str] = {
+    "markdown": "transcript.md",
+    "text": "transcript.txt",
+    "json": "transcript.json",
+}
 
 
 def _sanitize_path_component(value: str, fallback: str) -> str:
@@ -26,6 +58,19 @@ def _format_timestamp(seconds: float) -> str:
     return f"{minutes:02d}:{secs:02d}"
 
 
+def _format_cue_time(seconds: float, separator: str) -> str:
+    millis = round(max(seconds, 0) * 1000)
+    hours, rem = divmod(millis, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    secs, millis = divmod(rem, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def _speaker_label(speaker: str) -> str:
+    # "speaker_0" → "Speaker 0"
+    return speaker.replace("speaker_", "Speaker ").replace("_", " ")
+
+
 def _format_duration(seconds: float | None) -> str | None:
     if seconds is None:
         return None
@@ -108,20 +153,26 @@ def to_markdown(
         lines.append(result.text or "")
         return "\n".join(lines).strip() + "\n"
 
+    lines.append(segments_to_markdown(result.segments))
+    return "\n".join(lines).strip() + "\n"
+
+
+def segments_to_markdown(segments: Sequence[TranscriptSegment]) -> str:
+    """Speaker blocks of the transcript body, without the metadata header."""
     # Merge consecutive segments from the same speaker into blocks.
     blocks: list[tuple[str, float, list[str]]] = []
-    for segment in result.segments:
+    for segment in segments:
         speaker = segment.speaker or "Speaker"
         if blocks and blocks[-1][0] == speaker:
             blocks[-1][2].append(segment.text)
         else:
             blocks.append((speaker, segment.start, [segment.text]))
 
+    lines: list[str] = []
     for i, (speaker, start, texts) in enumerate(blocks):
         if i > 0:
             lines.append("")
-        # Capitalize speaker labels like "speaker_0" → "Speaker 0"
-        label = speaker.replace("speaker_", "Speaker ").replace("_", " ")
+        label = _speaker_label(speaker)
         timestamp = _format_timestamp(start)
         lines.append(f"**{label}** [{timestamp}]")
         lines.append(" ".join(texts))
@@ -147,11 +198,395 @@ def to_plain_text(result: TranscriptResult) -> str:
     return "\n".join(lines).strip() + "\n"
 
 
+def to_json(result: TranscriptResult) -> str:
+    return json.dumps(transcript_payload(result), ensure_ascii=False, separators=(",", ":"))
+
+
+def transcript_payload(result: TranscriptResult) -> dict[str, Any]:
+    return {
+        "text": result.text,
+        "language": result.language,
+        "segments": [
+            {
+                "start": segment.start,
+                "end": segment.end,
+                "speaker": segment.speaker,
+                "text": segment.text,
+            }
+            for segment in result.segments
+        ],
+    }
+
+
+def to_srt(result: TranscriptResult, *, first_index: int = 1) -> str:
+    cues: list[str] = []
+    for index, segment in enumerate(result.segments, start=first_index):
+        start = _format_cue_time(segment.start, ",")
+        end = _format_cue_time(segment.end, ",")
+        text = segment.text.strip()
+        if segment.speaker:
+            text = f"[{_speaker_label(segment.speaker)}] {text}"
+        cues.append(f"{index}\n{start} --> {end}\n{text}\n")
+    return "\n".join(cues)
+
+
+def to_vtt(result: TranscriptResult) -> str:
+    cues = ["WEBVTT\n"]
+    for segment in result.segments:
+        start = _format_cue_time(segment.start, ".")
+        end = _format_cue_time(segment.end, ".")
+        text = segment.text.strip()
+        if segment.speaker:
+            text = f"<v {_speaker_label(segment.speaker)}>{text}"
+        cues.append(f"{start} --> {end}\n{text}\n")
+    return "\n".join(cues)
+
+
+def render_segments(
+    segments: list[TranscriptSegment], fmt: TranscriptFormat, *, offset: int = 0
+) -> str:
+    """``fmt`` rendering of a window of segments; ``offset`` is its first segment index.
+
+    Markdown has no metadata header here; SRT cues keep their numbering within
+    the whole transcript.
+    """
+    if fmt == "markdown":
+        return segments_to_markdown(segments)
+    result = TranscriptResult(text=" ".join(s.text.strip() for s in segments), segments=segments)
+    if fmt == "text":
+        return to_plain_text(result)
+    if fmt == "srt":
+        return to_srt(result, first_index=offset + 1)
+    if fmt == "vtt":
+        return to_vtt(result)
+    return to_json(result)
+
+
+def load_metadata(video_dir: Path, codec: ArtifactCodec | None = None) -> dict[str, object]:
+    data = (codec or ArtifactCodec()).read(video_dir / "metadata.json")
+    if data is None:
+        return {}
+    payload = json.loads(data)
+    return payload if isinstance(payload, dict) else {}
+
+
+def load_transcript(
+    video_dir: Path, codec: ArtifactCodec | None = None
+) -> TranscriptResult | None:
+    """Load the stored transcript of a video directory, if present.
+
+    Reads ``segments.bin`` and falls back to the ``transcript.json`` of older
+    directories. ``codec`` must know any dictionary the files were written with.
+    """
+    segments_path = video_dir / SEGMENTS_FILENAME
+    if segments_path.exists():
+        return SegmentFile.open(segments_path, codec).to_result()
+    data = (codec or ArtifactCodec()).read(video_dir / "transcript.json")
+    if data is None:
+        return None
+    payload = json.loads(data)
+    return TranscriptResult(
+        text=str(payload.get("text") or ""),
+        language=payload.get("language"),
+        segments=[
+            TranscriptSegment(
+                start=float(seg.get("start") or 0.0),
+                end=float(seg.get("end") or 0.0),
+                text=str(seg.get("text") or ""),
+                speaker=seg.get("speaker"),
+            )
+            for seg in payload.get("segments") or []
+        ],
+    )
+
+
+@dataclass(slots=True)
+class TranscriptWindow:
+    segments: list[TranscriptSegment]
+    offset: int
+    total: int
+    # First segment after this window, or None when the requested range is exhausted.
+    next_offset: int | None
+
+
+def select_window(
+    starts: npt.NDArray[np.float64],
+    ends: npt.NDArray[np.float64],
+    offsets: npt.NDArray[np.uint64],
+    *,
+    offset: int | None = None,
+    limit: int | None = None,
+    start_time: float | None = None,
+    end_time: float | None = None,
+    max_tokens: int | None = None,
+) -> tuple[int, int, int]:
+    """Resolve window arguments against a segment index.
+
+    Returns ``(start, stop, bound)``: the segments to serve and the end of the
+    requested range, so ``stop < bound`` means more remain. Time bounds select
+    segments overlapping ``[start_time, end_time)``; ``offset`` overrides the
+    start; at least one segment is served even if it exceeds ``max_tokens``.
+    """
+    total = int(starts.size)
+    bound = total
+    if end_time is not None:
+        bound = int(np.searchsorted(starts, end_time, side="left"))
+    if offset is not None:
+        start = max(0, offset)
+    elif start_time is not None:
+        start = int(np.searchsorted(ends, start_time, side="right"))
+    else:
+        start = 0
+    start = min(start, bound)
+    stop = bound if limit is None else min(bound, start + max(1, limit))
+    if max_tokens is not None and stop > start:
+        budget = int(offsets[start]) + max(1, max_tokens) * BYTES_PER_TOKEN
+        fits = int(np.searchsorted(offsets, budget, side="right")) - 1
+        stop = max(start + 1, min(stop, fits))
+    return start, stop, bound
+
+
+def _find_source(video_dir: Path, fmt: TranscriptFormat) -> Path | None:
+    source = video_dir / SEGMENTS_FILENAME
+    if source.exists():
+        return source
+    legacy_name = _LEGACY_FILES.get(fmt)
+    if legacy_name and (video_dir / legacy_name).exists():
+        return video_dir / legacy_name
+    if (video_dir / "transcript.json").exists():
+        return video_dir / "transcript.json"
+    return None
+
+
+class TranscriptRenderer:
+    """Renders stored transcripts on read and caches the output.
+
+    Entries are keyed by the source file's mtime, so a re-transcribed video is
+    never served stale, and evicted by their in-memory size.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = DEFAULT_RENDER_CACHE_SIZE,
+        index_cache_size: int = DEFAULT_INDEX_CACHE_SIZE,
+        *,
+        cache_bytes: int = DEFAULT_RENDER_CACHE_BYTES,
+        codec: ArtifactCodec | None = None,
+        sync: ArtifactSync | None = None,
+    ) -> None:
+        self.codec = codec or ArtifactCodec()
+        # Fetches directories that are only in the object store, if one is configured.
+        self.sync = sync
+        self._cache: LRUCache[tuple[str, str, int], str] = LRUCache(
+            cache_size, max_bytes=cache_bytes, weigh=sys.getsizeof
+        )
+        # Offset indexes of segments.bin files, for windowed reads.
+        self._indexes: LRUCache[tuple[str, int], SegmentFile] = LRUCache(index_cache_size)
+
+    def cache_stats(self) -> dict[str, object]:
+        return self._cache.stats()
+
+    def _source(self, video_dir: Path, fmt: TranscriptFormat) -> Path | None:
+        """The file ``fmt`` is rendered from: segments.bin, or a legacy transcript file."""
+        source = _find_source(video_dir, fmt)
+        if self.sync is None:
+            return source
+        if source is None:
+            return _find_source(video_dir, fmt) if self.sync.ensure_local(video_dir) else None
+        self.sync.touch(video_dir)
+        return source
+
+    def render(self, video_dir: Path, fmt: TranscriptFormat) -> str | None:
+        """``fmt`` rendering of the transcript in ``video_dir``, or None if there is none."""
+        source = self._source(video_dir, fmt)
+        if source is None:
+            return None
+        legacy_name = _LEGACY_FILES.get(fmt)
+        key = (str(video_dir), fmt, source.stat().st_mtime_ns)
+        rendered = self._cache.get(key)
+        if rendered is None:
+            if source.name == legacy_name:
+                rendered = source.read_text(encoding="utf-8")
+            else:
+                rendered = self._render(video_dir, fmt)
+            self._cache.put(key, rendered)
+        return rendered
+
+    def read_window(
+        self,
+        video_dir: Path,
+        *,
+        offset: int | None = None,
+        limit: int | None = None,
+        start_time: float | None = None,
+        end_time: float | None = None,
+        max_tokens: int | None = None,
+    ) -> TranscriptWindow | None:
+        """A slice of the stored segments, or None if ``video_dir`` has no transcript.
+
+        With ``segments.bin`` only its offset index and the selected byte range
+        are read; older directories are loaded whole.
+        """
+        select = functools.partial(
+            select_window,
+            offset=offset,
+            limit=limit,
+            start_time=start_time,
+            end_time=end_time,
+            max_tokens=max_tokens,
+        )
+        source = self._source(video_dir, "json")
+        if source is None:
+            return None
+        if source.name == SEGMENTS_FILENAME:
+            key = (str(source), source.stat().st_mtime_ns)
+            index = self._indexes.get(key)
+            if index is None:
+                index = SegmentFile.open(source, self.codec)
+                self._indexes.put(key, index)
+            start, stop, bound = select(index.starts, index.ends, index.offsets)
+            segments = index.segments(start, stop)
+            total = index.count
+        else:
+            transcript = load_transcript(video_dir, self.codec)
+            if transcript is None:
+                return None
+            sizes = [len(segment.text.encode("utf-8")) for segment in transcript.segments]
+            offsets = np.zeros(len(sizes) + 1, dtype=np.uint64)
+            np.cumsum(sizes, out=offsets[1:])
+            start, stop, bound = select(
+                np.array([segment.start for segment in transcript.segments], dtype=np.float64),
+                np.array([segment.end for segment in transcript.segments], dtype=np.float64),
+                offsets,
+            )
+            segments = transcript.segments[start:stop]
+            total = len(transcript.segments)
+        return TranscriptWindow(
+            segments=segments,
+            offset=start,
+            total=total,
+            next_offset=stop if stop < bound else None,
+        )
+
+    def _render(self, video_dir: Path, fmt: TranscriptFormat) -> str:
+        transcript = load_transcript(video_dir, self.codec)
+        transcript = transcript or TranscriptResult(text="", segments=[])
+        if fmt == "markdown":
+            return to_markdown(transcript, metadata=load_metadata(video_dir, self.codec))
+        if fmt == "text":
+            return to_plain_text(transcript)
+        if fmt == "srt":
+            return to_srt(transcript)
+        if fmt == "vtt":
+            return to_vtt(transcript)
+        return to_json(transcript)
+
+
+def _artifact_bytes(video_dir: Path) -> int:
+    return sum(
+        path.stat().st_size
+        for path in video_dir.iterdir()
+        if path.is_file() and not path.name.startswith("audio")
+    )
+
+
+def compact_video_dir(video_dir: Path, codec: ArtifactCodec) -> tuple[int, int]:
+    """Rewrite the artifacts of ``video_dir`` the way ``persist()`` writes them now.
+
+    Legacy ``transcript.*`` files become ``segments.bin``, blobs and metadata
+    are compressed (or decompressed) to match ``codec.level``. Returns the
+    artifact bytes before and after; audio is left alone.
+    """
+    before = _artifact_bytes(video_dir)
+    segments_path = video_dir / SEGMENTS_FILENAME
+    if segments_path.exists():
+        segment_file = SegmentFile.open(segments_path, codec)
+        has_text = segment_file.text_bytes(0, segment_file.count) > 0
+        if (segment_file.blocks is not None) != (codec.enabled and has_text):
+            write_segment_file(segments_path, segment_file.to_result(), codec)
+    else:
+        transcript = load_transcript(video_dir, codec)
+        if transcript is not None:
+            write_segment_file(segments_path, transcript, codec)
+            for legacy_name in _LEGACY_FILES.values():
+                (video_dir / legacy_name).unlink(missing_ok=True)
+                compressed_path(video_dir / legacy_name).unlink(missing_ok=True)
+
+    metadata_path = video_dir / "metadata.json"
+    stale = metadata_path if codec.enabled else compressed_path(metadata_path)
+    if stale.exists():
+        data = codec.read(metadata_path)
+        if data is not None:
+            codec.write(metadata_path, data)
+    return before, _artifact_bytes(video_dir)
+
+
 class StorageService:
-    def __init__(self, data_dir: Path) -> None:
+    def __init__(
+        self,
+        data_dir: Path,
+        codec: ArtifactCodec | None = None,
+        sync: ArtifactSync | None = None,
+    ) -> None:
         self.data_dir = data_dir
         self.transcripts_root = data_dir / "transcripts"
         self.transcripts_root.mkdir(parents=True, exist_ok=True)
+        # Writes stay uncompressed unless a codec is configured.
+        self.codec = codec or ArtifactCodec(level=0)
+        # Mirrors persisted directories to an object store, if one is configured.
+        self.sync = sync
+
+    def load_transcript(self, video_dir: Path) -> TranscriptResult | None:
+        if self.sync is not None:
+            self.sync.ensure_local(video_dir)
+        return load_transcript(video_dir, self.codec)
+
+    def video_dirs(self) -> Iterator[Path]:
+        """Every ``transcripts/{platform}/{channel}/{video_id}`` directory."""
+        for path in self.transcripts_root.glob("*/*/*"):
+            if path.is_dir():
+                yield path
+
+    def train_dictionary(self, max_samples: int = 2000) -> int:
+        """Train the codec's dictionary on metadata and transcript text of stored videos."""
+        samples: list[bytes] = []
+        for video_dir in self.video_dirs():
+            if len(samples) >= max_samples:
+                break
+            metadata = self.codec.read(video_dir / "metadata.json")
+            if metadata:
+                samples.append(metadata)
+            transcript = load_transcript(video_dir, self.codec)
+            if transcript is not None and transcript.segments:
+                text = "".join(segment.text for segment in transcript.segments)
+                samples.append(text.encode("utf-8")[:BLOCK_SIZE])
+        return self.codec.train(samples)
+
+    def compact(self, *, workers: int = 4) -> dict[str, int]:
+        """Run ``compact_video_dir`` over every stored video in parallel."""
+        totals = {"directories": 0, "errors": 0, "bytes_before": 0, "bytes_after": 0}
+
+        def compact_one(video_dir: Path) -> tuple[Path, tuple[int, int] | None]:
+            try:
+                return video_dir, compact_video_dir(video_dir, self.codec)
+            except (OSError, ValueError) as exc:
+                logger.warning("Compacting %s failed: %s", video_dir, exc)
+                return video_dir, None
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            for video_dir, result in pool.map(compact_one, self.video_dirs()):
+                totals["directories"] += 1
+                if result is None:
+                    totals["errors"] += 1
+                    continue
+                totals["bytes_before"] += result[0]
+                totals["bytes_after"] += result[1]
+                # Keep the object store in step with the rewritten files.
+                if self.sync is not None and result[0] != result[1]:
+                    self.sync.schedule_upload(video_dir)
+        if self.sync is not None:
+            self.sync.wait()
+        return totals
 
     def persist(
         self,
@@ -173,36 +608,21 @@ class StorageService:
         metadata_with_url["source_url"] = source_url
 
         metadata_path = video_dir / "metadata.json"
-        transcript_json_path = video_dir / "transcript.json"
-        transcript_md_path = video_dir / "transcript.md"
-        transcript_txt_path = video_dir / "transcript.txt"
+        segments_path = video_dir / SEGMENTS_FILENAME
         audio_dest_path = video_dir / f"audio{temp_audio_path.suffix}"
 
-        metadata_path.write_text(json.dumps(metadata_with_url, indent=2, sort_keys=True), encoding="utf-8")
-
-        transcript_payload = {
-            "text": transcript.text,
-            "language": transcript.language,
-            "segments": [
-                {
-                    "start": segment.start,
-                    "end": segment.end,
-                    "speaker": segment.speaker,
-                    "text": segment.text,
-                }
-                for segment in transcript.segments
-            ],
-        }
-        transcript_json_path.write_text(
-            json.dumps(transcript_payload, indent=2, sort_keys=True),
-            encoding="utf-8",
+        metadata_path = self.codec.write(
+            metadata_path,
+            json.dumps(metadata_with_url, indent=2, sort_keys=True).encode("utf-8"),
         )
-
-        markdown = to_markdown(transcript, metadata=metadata)
-        transcript_md_path.write_text(markdown, encoding="utf-8")
-        transcript_txt_path.write_text(to_plain_text(transcript), encoding="utf-8")
+        # Markdown, text and JSON are rendered from segments.bin on read.
+        write_segment_file(segments_path, transcript, self.codec)
+        for legacy_name in _LEGACY_FILES.values():
+            (video_dir / legacy_name).unlink(missing_ok=True)
 
         shutil.move(str(temp_audio_path), str(audio_dest_path))
+        if self.sync is not None:
+            self.sync.schedule_upload(video_dir)
 
         return {
             "video_id": video_id,
@@ -210,9 +630,7 @@ class StorageService:
             "channel": channel,
             "path": str(video_dir),
             "metadata_path": str(metadata_path),
-            "transcript_md_path": str(transcript_md_path),
-            "transcript_json_path": str(transcript_json_path),
-            "transcript_txt_path": str(transcript_txt_path),
+            "segments_path": str(segments_path),
             "audio_path": str(audio_dest_path),
             "normalized_url": normalized_url,
             "source_url": source_url,
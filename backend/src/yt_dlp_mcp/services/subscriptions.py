@@ -0,0 +1,134 @@
+"""Periodic delta sync of subscribed channels and playlists.
+
+Channel upload listings come newest first, so a sync streams entries only
+until it meets a video it has already seen and then stops yt-dlp. Each
+subscription remembers the newest ``KNOWN_VIDEO_WINDOW`` video ids; new ones
+are enqueued at ``LOW_PRIORITY`` so on-demand requests are transcribed first.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from threading import Event, Thread
+from typing import Any
+
+from yt_dlp_mcp.db.jobs import LOW_PRIORITY, JobsRepository
+from yt_dlp_mcp.db.subscriptions import KNOWN_VIDEO_WINDOW, SubscriptionsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services.enqueue import enqueue_urls
+from yt_dlp_mcp.services.youtube_info import (
+    DEFAULT_PLAYLIST_IDLE_TIMEOUT_SECONDS,
+    YouTubeInfoService,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_VIDEOS_PER_SYNC = 200
+
+
+class SubscriptionScheduler:
+    def __init__(
+        self,
+        *,
+        subscriptions: SubscriptionsRepository,
+        jobs: JobsRepository,
+        transcripts: TranscriptsRepository,
+        info: YouTubeInfoService | None = None,
+        poll_interval_seconds: float = 60,
+        max_videos_per_sync: int = DEFAULT_MAX_VIDEOS_PER_SYNC,
+        idle_timeout_seconds: float = DEFAULT_PLAYLIST_IDLE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.subscriptions = subscriptions
+        self.jobs = jobs
+        self.transcripts = transcripts
+        self.info = info or YouTubeInfoService()
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_videos_per_sync = max(max_videos_per_sync, 1)
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run_loop, name="yt-dlp-mcp-subscriptions", daemon=True)
+
+    def start(self) -> None:
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self, timeout_seconds: float = 10.0) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout_seconds)
+
+    def _run_loop(self) -> None:
+        while not self._stop_event.is_set():
+            if not self.run_once():
+                self._stop_event.wait(self.poll_interval_seconds)
+
+    def run_once(self) -> bool:
+        """Sync every subscription that is due; False if none was."""
+        due = self.subscriptions.list_due()
+        for subscription in due:
+            if self._stop_event.is_set():
+                break
+            self.sync(subscription)
+        return bool(due)
+
+    def sync(self, subscription: dict[str, Any]) -> dict[str, Any]:
+        """List new entries of one subscription, enqueue them and record the stats."""
+        subscription_id = str(subscription["id"])
+        started = time.monotonic()
+        known = list(subscription["known_video_ids"])
+        # The first sync only records where the listing starts, unless asked to
+        # backfill everything (up to the per-sync cap).
+        baseline = subscription["last_synced_at"] is None and not subscription["backfill"]
+        try:
+            new_entries, listed = self._list_new(subscription, set(known), baseline=baseline)
+            urls = [] if baseline else [entry["url"] for entry in new_entries]
+            results = enqueue_urls(self.jobs, self.transcripts, urls, priority=LOW_PRIORITY)
+        except Exception as exc:  # pylint: disable=broad-except
+            message = str(exc).strip() or "Unknown subscription sync error"
+            logger.exception("Subscription %s sync failed: %s", subscription_id, message)
+            self.subscriptions.record_failure(subscription_id, message)
+            return {"error": message}
+
+        new = 0 if baseline else len(new_entries)
+        enqueued = sum(not result["deduplicated"] for result in results)
+        duration_seconds = round(time.monotonic() - started, 3)
+        new_ids = [str(entry["video_id"]) for entry in new_entries]
+        self.subscriptions.record_sync(
+            subscription_id,
+            known_video_ids=list(dict.fromkeys(new_ids + known))[:KNOWN_VIDEO_WINDOW],
+            listed=listed,
+            new=new,
+            enqueued=enqueued,
+            duration_seconds=duration_seconds,
+        )
+        if enqueued:
+            logger.info("Subscription %s enqueued %d new videos", subscription_id, enqueued)
+        return {
+            "listed": listed,
+            "new": new,
+            "enqueued": enqueued,
+            "duration_seconds": duration_seconds,
+        }
+
+    def _list_new(
+        self, subscription: dict[str, Any], known: set[str], *, baseline: bool
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Entries listed before the first known one, and how many were listed."""
+        limit = KNOWN_VIDEO_WINDOW if baseline else self.max_videos_per_sync
+        new_entries: list[dict[str, Any]] = []
+        listed = 0
+        entries = self.info.iter_playlist(
+            str(subscription["url"]), idle_timeout=self.idle_timeout_seconds
+        )
+        try:
+            for entry in entries:
+                listed += 1
+                if str(entry["video_id"]) in known:
+                    break
+                new_entries.append(entry)
+                if len(new_entries) >= limit:
+                    break
+        finally:
+            # Stops yt-dlp instead of listing the rest of the channel.
+            entries.close()
+        return new_entries, listed
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import re
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 256
+DF_BUCKETS = 1 << 20
+SEARCH_CHUNK_ROWS = 65536
+SYNC_BATCH_TRANSCRIPTS = 50
+COMPACT_MIN_DEAD_ROWS = 4096
+_INITIAL_CAPACITY = 4096
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+class HashingEmbedder:
+    """Offline text embedding: hashed unigram+bigram TF-IDF, randomly projected.
+
+    Every feature is hashed into ``DF_BUCKETS`` document-frequency buckets and,
+    with a second hash, onto one signed coordinate of a ``dim``-wide vector, which
+    is a sparse random projection of the full hashed TF-IDF vector. IDF comes from
+    the bucket counts at embedding time, so vectors drift slightly as the corpus
+    grows; that is acceptable for ranking neighbours.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM) -> None:
+        self.dim = dim
+
+    @staticmethod
+    def features(text: str) -> Counter[int]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in itertools.pairwise(tokens)]
+        return Counter(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+
+    def embed(
+        self, features: Counter[int], df: npt.NDArray[np.int32], docs: int
+    ) -> npt.NDArray[np.float32]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not features:
+            return vector
+        keys = np.fromiter(features.keys(), dtype=np.uint64, count=len(features))
+        tf = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        idf = np.log((1 + docs) / (1 + df[keys % DF_BUCKETS].astype(np.float32))) + 1.0
+        mixed = (keys * np.uint64(2654435761)) & np.uint64(0xFFFFFFFF)
+        sign = np.where(mixed & np.uint64(0x80000000), 1.0, -1.0).astype(np.float32)
+        coords = (mixed % np.uint64(self.dim)).astype(np.intp)
+        np.add.at(vector, coords, sign * (1.0 + np.log(tf)) * idf)
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class VectorIndex:
+    """Memory-mapped segment vectors for semantic search and related transcripts.
+
+    Files under ``root``: ``vectors.f32`` (capacity x dim), ``rows.i64``
+    (segment id, transcript id per vector; transcript id -1 marks a replaced
+    segment), ``df.i32`` (document frequency per hash bucket), ``postings.i64``
+    (bucket, count pairs each transcript added to ``df.i32``), ``ranges.i64``
+    (transcript id, row start/stop, postings start/stop; transcript id -1 marks a
+    replaced entry) and ``meta.json``.
+
+    Re-indexing a transcript tombstones its old rows, subtracts its postings from
+    the document frequencies and appends new rows. Once tombstoned rows outnumber
+    live ones the files are compacted in place.
+    """
+
+    def __init__(self, root: Path, *, dim: int = DEFAULT_DIM) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        meta_path = self.root / "meta.json"
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        self.dim = int(meta.get("dim", dim))
+        self.count = int(meta.get("count", 0))
+        self.docs = int(meta.get("docs", 0))
+        self.live = int(meta.get("live", self.count))
+        self.postings = int(meta.get("postings", 0))
+        self.entries = int(meta.get("ranges", 0))
+        self.embedder = HashingEmbedder(self.dim)
+        self._df = self._open("df.i32", np.int32, (DF_BUCKETS,))
+        capacity = max(int(meta.get("capacity", 0)), _INITIAL_CAPACITY)
+        self._vectors = self._open("vectors.f32", np.float32, (capacity, self.dim))
+        self._rows = self._open("rows.i64", np.int64, (capacity, 2))
+        capacity = max(int(meta.get("postings_capacity", 0)), _INITIAL_CAPACITY)
+        self._postings = self._open("postings.i64", np.int64, (capacity, 2))
+        capacity = max(int(meta.get("ranges_capacity", 0)), _INITIAL_CAPACITY)
+        self._ranges = self._open("ranges.i64", np.int64, (capacity, 5))
+        # transcript id -> its live entry in ``ranges.i64``
+        self._entries: dict[int, int] = {}
+        if "ranges" not in meta and self.count:
+            self._rebuild_ranges()
+        else:
+            tids = np.asarray(self._ranges[: self.entries, 0])
+            for entry in np.flatnonzero(tids >= 0):
+                self._entries[int(tids[entry])] = int(entry)
+
+    @property
+    def capacity(self) -> int:
+        return int(self._vectors.shape[0])
+
+    def _open(
+        self, name: str, dtype: type[np.generic], shape: tuple[int, ...]
+    ) -> np.memmap[Any, np.dtype[Any]]:
+        path = self.root / name
+        needed = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not path.exists() or path.stat().st_size < needed:
+            with path.open("ab") as handle:
+                handle.truncate(needed)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        self._vectors.flush()
+        self._rows.flush()
+        self._vectors = self._open("vectors.f32", np.float32, (capacity, self.dim))
+        self._rows = self._open("rows.i64", np.int64, (capacity, 2))
+
+    def _grow_table(
+        self, name: str, table: np.memmap[Any, np.dtype[Any]], needed: int
+    ) -> np.memmap[Any, np.dtype[Any]]:
+        capacity = int(table.shape[0])
+        while capacity < needed:
+            capacity *= 2
+        if capacity == table.shape[0]:
+            return table
+        table.flush()
+        return self._open(name, np.int64, (capacity, table.shape[1]))
+
+    def _rebuild_ranges(self) -> None:
+        """Derive ``ranges.i64`` from ``rows.i64`` for an index written before it existed.
+
+        Such an index has no postings, so document frequencies of transcripts
+        replaced later are not subtracted; rebuilding the directory fixes that.
+        """
+        tids = np.asarray(self._rows[: self.count, 1])
+        starts = np.flatnonzero(np.diff(tids, prepend=-2))
+        stops = np.append(starts[1:], self.count)
+        runs = [
+            (int(tids[start]), int(start), int(stop), 0, 0)
+            for start, stop in zip(starts, stops)
+            if tids[start] >= 0
+        ]
+        self._ranges = self._grow_table("ranges.i64", self._ranges, len(runs))
+        if runs:
+            self._ranges[: len(runs)] = runs
+        self.entries = len(runs)
+        self._entries = {run[0]: entry for entry, run in enumerate(runs)}
+
+    def _save_meta(self) -> None:
+        self._vectors.flush()
+        self._rows.flush()
+        self._df.flush()
+        self._postings.flush()
+        self._ranges.flush()
+        meta = {
+            "dim": self.dim,
+            "count": self.count,
+            "docs": self.docs,
+            "live": self.live,
+            "postings": self.postings,
+            "ranges": self.entries,
+            "capacity": self.capacity,
+            "postings_capacity": int(self._postings.shape[0]),
+            "ranges_capacity": int(self._ranges.shape[0]),
+        }
+        tmp = self.root / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        tmp.replace(self.root / "meta.json")
+
+    def indexed_transcript_ids(self) -> set[int]:
+        with self._lock:
+            return set(self._entries)
+
+    def index_transcript(self, transcript_id: int, segments: Sequence[tuple[int, str]]) -> None:
+        """Replace the vectors of one transcript with ``(segment_id, text)`` pairs."""
+        self.index_many([(transcript_id, segments)])
+
+    def index_many(self, transcripts: Iterable[tuple[int, Sequence[tuple[int, str]]]]) -> None:
+        with self._lock:
+            for transcript_id, segments in transcripts:
+                self._tombstone(transcript_id)
+                if not segments:
+                    continue
+                features = [self.embedder.features(text) for _, text in segments]
+                # Document frequency is counted per segment.
+                buckets = np.fromiter(
+                    itertools.chain.from_iterable(features), dtype=np.uint64
+                ) % np.uint64(DF_BUCKETS)
+                buckets, counts = np.unique(buckets.astype(np.int64), return_counts=True)
+                self._df[buckets] += counts.astype(np.int32)
+                self.docs += len(segments)
+
+                start = self.count
+                stop = start + len(segments)
+                self._grow(stop)
+                self._vectors[start:stop] = np.stack(
+                    [self.embedder.embed(counter, self._df, self.docs) for counter in features]
+                )
+                self._rows[start:stop] = [
+                    (segment_id, transcript_id) for segment_id, _ in segments
+                ]
+                self.count = stop
+                self.live += len(segments)
+
+                post_start = self.postings
+                post_stop = post_start + len(buckets)
+                self._postings = self._grow_table("postings.i64", self._postings, post_stop)
+                self._postings[post_start:post_stop] = np.column_stack([buckets, counts])
+                self.postings = post_stop
+
+                self._ranges = self._grow_table("ranges.i64", self._ranges, self.entries + 1)
+                self._ranges[self.entries] = (transcript_id, start, stop, post_start, post_stop)
+                self._entries[transcript_id] = self.entries
+                self.entries += 1
+            dead = self.count - self.live
+            if dead >= COMPACT_MIN_DEAD_ROWS and dead > self.live:
+                self._compact()
+            self._save_meta()
+
+    def sync(self, transcripts: TranscriptsRepository) -> int:
+        """Index transcripts whose segments are stored but not yet vectorised."""
+        indexed = self.indexed_transcript_ids()
+        missing = [
+            tid for tid in transcripts.list_transcript_ids_with_segments() if tid not in indexed
+        ]
+        for start in range(0, len(missing), SYNC_BATCH_TRANSCRIPTS):
+            batch = missing[start : start + SYNC_BATCH_TRANSCRIPTS]
+            self.index_many((tid, transcripts.list_segment_texts(tid)) for tid in batch)
+        if missing:
+            logger.info("Vector index backfilled %d transcripts", len(missing))
+        return len(missing)
+
+    def compact(self) -> None:
+        """Drop tombstoned rows, postings and entries from the files."""
+        with self._lock:
+            self._compact()
+            self._save_meta()
+
+    def _tombstone(self, transcript_id: int) -> None:
+        entry = self._entries.pop(transcript_id, None)
+        if entry is None:
+            return
+        _, start, stop, post_start, post_stop = (int(value) for value in self._ranges[entry])
+        self._rows[start:stop, 1] = -1
+        self._ranges[entry, 0] = -1
+        self.live -= stop - start
+        self.docs -= stop - start
+        postings = np.asarray(self._postings[post_start:post_stop])
+        self._df[postings[:, 0]] -= postings[:, 1].astype(np.int32)
+
+    def _compact(self) -> None:
+        # Entries are appended in row and postings order, so every block moves
+        # towards the front and can be copied in place.
+        live = sorted(self._entries.items(), key=lambda item: item[1])
+        row = post = 0
+        kept: list[tuple[int, int, int, int, int]] = []
+        for transcript_id, entry in live:
+            _, start, stop, post_start, post_stop = (int(value) for value in self._ranges[entry])
+            size, post_size = stop - start, post_stop - post_start
+            if start != row:
+                self._vectors[row : row + size] = self._vectors[start:stop]
+                self._rows[row : row + size] = self._rows[start:stop]
+            if post_start != post and post_size:
+                self._postings[post : post + post_size] = self._postings[post_start:post_stop]
+            kept.append((transcript_id, row, row + size, post, post + post_size))
+            row += size
+            post += post_size
+        if kept:
+            self._ranges[: len(kept)] = kept
+        logger.info("Vector index compacted %d rows to %d", self.count, row)
+        self.count = self.live = row
+        self.postings = post
+        self.entries = len(kept)
+        self._entries = {item[0]: entry for entry, item in enumerate(kept)}
+
+    def embed_query(self, text: str) -> npt.NDArray[np.float32]:
+        return self.embedder.embed(self.embedder.features(text), self._df, self.docs)
+
+    def search(
+        self, vector: npt.NDArray[np.float32], limit: int
+    ) -> list[tuple[int, int, float]]:
+        """Top ``limit`` live segments by cosine similarity, as (segment, transcript, score)."""
+        with self._lock:
+            count = self.count
+            best_scores = np.empty(0, dtype=np.float32)
+            best_rows = np.empty(0, dtype=np.int64)
+            for start in range(0, count, SEARCH_CHUNK_ROWS):
+                stop = min(start + SEARCH_CHUNK_ROWS, count)
+                scores = self._vectors[start:stop] @ vector
+                scores[self._rows[start:stop, 1] < 0] = -np.inf
+                k = min(limit, stop - start)
+                top = np.argpartition(-scores, k - 1)[:k]
+                best_scores = np.concatenate([best_scores, scores[top]])
+                best_rows = np.concatenate([best_rows, top + start])
+            order = np.argsort(-best_scores)[:limit]
+            return [
+                (int(self._rows[row, 0]), int(self._rows[row, 1]), float(best_scores[i]))
+                for i, row in zip(order, best_rows[order])
+                if np.isfinite(best_scores[i])
+            ]
+
+    def related(self, transcript_id: int, limit: int) -> list[tuple[int, float]]:
+        """Transcripts ranked by similarity of their mean segment vector to ``transcript_id``'s."""
+        with self._lock:
+            count = self.count
+            entry = self._entries.get(transcript_id)
+            if entry is None:
+                return []
+            start, stop = (int(value) for value in self._ranges[entry, 1:3])
+            tids = np.asarray(self._rows[:count, 1])
+            centroid = np.asarray(self._vectors[start:stop]).mean(axis=0)
+            norm = float(np.linalg.norm(centroid))
+            if norm == 0:
+                return []
+            centroid /= norm
+
+            live = tids >= 0
+            size = int(tids.max()) + 1
+            sums = np.zeros(size, dtype=np.float64)
+            for start in range(0, count, SEARCH_CHUNK_ROWS):
+                stop = min(start + SEARCH_CHUNK_ROWS, count)
+                chunk_live = live[start:stop]
+                scores = self._vectors[start:stop] @ centroid
+                sums += np.bincount(
+                    tids[start:stop][chunk_live], weights=scores[chunk_live], minlength=size
+                )
+            counts = np.bincount(tids[live], minlength=size)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = np.where(counts > 0, sums / counts, -np.inf)
+            means[transcript_id] = -np.inf
+            k = min(limit, int(np.isfinite(means).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-means, k - 1)[:k]
+            top = top[np.argsort(-means[top])]
+            return [(int(tid), float(means[tid])) for tid in top]
+
+    def stats(self) -> dict[str, int]:
+        return {"vectors": self.count, "live": self.live, "dim": self.dim}
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 import json
+import os
+import select
 import subprocess
+import tempfile
+from collections.abc import Generator, Iterator
 from typing import Any
 
+# A listing that produces no new entry for this long is considered stuck.
+DEFAULT_PLAYLIST_IDLE_TIMEOUT_SECONDS = 120
+
 
 class YouTubeInfoService:
     """Stateless service wrapping yt-dlp for search, metadata, and comments."""
@@ -68,40 +75,50 @@ class YouTubeInfoService:
         raw = json.loads(completed.stdout)
         return {k: raw[k] for k in self._METADATA_KEYS if k in raw}
 
-    def extract_playlist(self, url: str) -> list[dict[str, Any]]:
-        """Extract video entries from a playlist URL using --flat-playlist."""
+    def iter_playlist(
+        self,
+        url: str,
+        *,
+        start: int = 1,
+        idle_timeout: float = DEFAULT_PLAYLIST_IDLE_TIMEOUT_SECONDS,
+    ) -> Generator[dict[str, Any], None, None]:
+        """Stream the entries of a playlist or channel as yt-dlp lists them.
+
+        Entries carry their 1-based playlist ``position``; ``start`` skips the
+        entries before that position, so an interrupted listing can resume.
+        There is no overall deadline, only ``idle_timeout`` between lines.
+        """
         cmd = [
             "yt-dlp",
             "--flat-playlist",
+            "--lazy-playlist",
+            "--playlist-items",
+            f"{max(start, 1)}:",
+            # One JSON object per entry: titles may contain tabs or newlines.
             "--print",
-            "%(id)s\t%(title)s\t%(uploader)s\t%(duration)s\t%(url)s",
+            "%(.{playlist_index,id,title,uploader,duration,url})j",
             "--no-download",
             "--no-warnings",
             "--quiet",
             url,
         ]
-        completed = self._run_ytdlp(cmd, timeout=30)
-
-        entries: list[dict[str, Any]] = []
-        for line in completed.stdout.strip().splitlines():
-            parts = line.split("\t", 4)
-            if len(parts) < 5:
-                continue
-            video_id, title, uploader, duration, video_url = parts
-            if not video_id or video_id == "NA":
-                continue
-            entries.append({
-                "video_id": video_id,
-                "title": title if title != "NA" else None,
-                "channel": uploader if uploader != "NA" else None,
-                "duration": _safe_int(duration),
-                "url": video_url if video_url != "NA" else f"https://www.youtube.com/watch?v={video_id}",
-            })
-        return entries
+        for line in _stream_lines(cmd, idle_timeout=idle_timeout):
+            entry = _playlist_entry(line)
+            if entry is not None:
+                yield entry
 
     def get_comments(
         self, url: str, limit: int = 20, sort: str = "top"
     ) -> list[dict[str, Any]]:
+        comments: list[dict[str, Any]] = self.get_comment_thread(
+            url, max_comments=limit, sort=sort
+        )["comments"]
+        return comments
+
+    def get_comment_thread(
+        self, url: str, *, max_comments: int, sort: str = "top", timeout: int = 120
+    ) -> dict[str, Any]:
+        """The video's ``video_id`` and up to ``max_comments`` of its comments."""
         cmd = [
             "yt-dlp",
             "--dump-json",
@@ -110,10 +127,10 @@ class YouTubeInfoService:
             "--no-playlist",
             "--write-comments",
             "--extractor-args",
-            f"youtube:comment_sort={sort};max_comments={limit},all,all",
+            f"youtube:comment_sort={sort};max_comments={max_comments},all,all",
             url,
         ]
-        completed = self._run_ytdlp(cmd, timeout=120)
+        completed = self._run_ytdlp(cmd, timeout=timeout)
         data = json.loads(completed.stdout)
 
         raw_comments = data.get("comments") or []
@@ -130,10 +147,64 @@ class YouTubeInfoService:
                 "parent": c.get("parent", "root"),
                 "timestamp": c.get("timestamp"),
             })
-        return comments
+        return {"video_id": data.get("id"), "title": data.get("title"), "comments": comments}
+
+
+def _stream_lines(cmd: list[str], *, idle_timeout: float) -> Iterator[str]:
+    """Lines of ``cmd``'s stdout as they are written; the process is killed on early exit."""
+    # stderr goes to a file so a chatty process cannot block on a full pipe.
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        assert process.stdout is not None
+        fd = process.stdout.fileno()
+        pending = b""
+        try:
+            while True:
+                ready, _, _ = select.select([fd], [], [], idle_timeout)
+                if not ready:
+                    raise RuntimeError(f"yt-dlp produced no output for {idle_timeout:g}s")
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    yield line.decode("utf-8", errors="replace")
+            if pending:
+                yield pending.decode("utf-8", errors="replace")
+            if process.wait(timeout=idle_timeout) != 0:
+                stderr.seek(0)
+                message = stderr.read().decode("utf-8", errors="replace").strip()
+                raise RuntimeError(message or "yt-dlp failed")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+
+def _playlist_entry(line: str) -> dict[str, Any] | None:
+    """One ``iter_playlist`` entry from a line of its ``--print`` JSON, or None."""
+    try:
+        raw = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(raw, dict):
+        return None
+    video_id = raw.get("id")
+    position = _safe_int(raw.get("playlist_index"))
+    if not isinstance(video_id, str) or not video_id or position is None:
+        return None
+    return {
+        "position": position,
+        "video_id": video_id,
+        "title": raw.get("title"),
+        "channel": raw.get("uploader"),
+        "duration": _safe_int(raw.get("duration")),
+        "url": raw.get("url") or f"https://www.youtube.com/watch?v={video_id}",
+    }
 
 
-def _safe_int(value: str) -> int | None:
+def _safe_int(value: Any) -> int | None:
     try:
         return int(value)
     except (ValueError, TypeError):
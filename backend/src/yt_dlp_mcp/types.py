@@ -4,7 +4,8 @@ from dataclasses import dataclass
 from typing import Literal
 
 JobStatus = Literal["queued", "downloading", "transcribing", "completed", "failed"]
-TranscriptFormat = Literal["markdown", "json", "text"]
+TranscriptFormat = Literal["markdown", "json", "text", "srt", "vtt"]
+TRANSCRIPT_FORMATS: tuple[TranscriptFormat, ...] = ("markdown", "json", "text", "srt", "vtt")
 
 
 @dataclass(slots=True)
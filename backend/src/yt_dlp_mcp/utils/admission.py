@@ -0,0 +1,119 @@
+"""Per-name concurrency and queue-depth limits for blocking calls."""
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Condition
+from typing import Any
+
+# Assumed duration of a call before any has finished, for retry hints.
+_INITIAL_DURATION_SECONDS = 5.0
+_MAX_RETRY_AFTER_SECONDS = 60
+
+
+class BusyError(Exception):
+    """Raised instead of queueing when a name is at its limits."""
+
+    def __init__(self, name: str, retry_after: int) -> None:
+        super().__init__(f"{name} is busy, retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionLimit:
+    max_concurrent: int
+    # Calls that may wait for a slot; any more are rejected at once.
+    max_queue: int = 0
+    # How long a queued call waits for a slot before it is rejected.
+    queue_timeout_seconds: float = 10.0
+
+
+class _State:
+    def __init__(self, limit: AdmissionLimit) -> None:
+        self.limit = limit
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.avg_seconds = _INITIAL_DURATION_SECONDS
+
+
+class AdmissionController:
+    """Bounds how many calls per name run at once and how many may wait.
+
+    Names without a limit are admitted unconditionally.
+    """
+
+    def __init__(self, limits: dict[str, AdmissionLimit]) -> None:
+        self._condition = Condition()
+        self._states = {name: _State(limit) for name, limit in limits.items()}
+
+    @contextmanager
+    def admit(self, name: str) -> Iterator[None]:
+        """Hold a slot for ``name`` while the block runs; raise BusyError if none frees up."""
+        state = self._states.get(name)
+        if state is None:
+            yield
+            return
+        self._acquire(name, state)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._condition:
+                state.running -= 1
+                state.avg_seconds = 0.8 * state.avg_seconds + 0.2 * elapsed
+                self._condition.notify_all()
+
+    def _acquire(self, name: str, state: _State) -> None:
+        limit = state.limit
+        with self._condition:
+            if state.running >= limit.max_concurrent:
+                if state.waiting >= limit.max_queue:
+                    state.rejected += 1
+                    raise BusyError(name, self._retry_after(state))
+                state.waiting += 1
+                state.queued += 1
+                deadline = time.monotonic() + limit.queue_timeout_seconds
+                try:
+                    while state.running >= limit.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            state.timed_out += 1
+                            raise BusyError(name, self._retry_after(state))
+                        self._condition.wait(remaining)
+                finally:
+                    state.waiting -= 1
+            state.running += 1
+            state.admitted += 1
+
+    @staticmethod
+    def _retry_after(state: _State) -> int:
+        # Time for the calls ahead, running and queued, to drain through the slots.
+        ahead = state.running + state.waiting
+        estimate = state.avg_seconds * ahead / state.limit.max_concurrent
+        return min(max(math.ceil(estimate), 1), _MAX_RETRY_AFTER_SECONDS)
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                name: {
+                    "max_concurrent": state.limit.max_concurrent,
+                    "max_queue": state.limit.max_queue,
+                    "running": state.running,
+                    "waiting": state.waiting,
+                    "admitted": state.admitted,
+                    "queued": state.queued,
+                    "rejected": state.rejected,
+                    "timed_out": state.timed_out,
+                    "avg_seconds": round(state.avg_seconds, 3),
+                }
+                for name, state in self._states.items()
+            }
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+from typing import Any
+
+
+class LRUCache[K: Hashable, V]:
+    """Thread-safe least-recently-used cache with hit/miss counters.
+
+    With ``max_bytes`` entries are also evicted until the total ``weigh(value)``
+    fits; a single value heavier than that is not cached at all.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        *,
+        max_bytes: int | None = None,
+        weigh: Callable[[V], int] | None = None,
+    ) -> None:
+        self.maxsize = max(maxsize, 0)
+        self.max_bytes = max_bytes
+        self._weigh = weigh
+        self._items: OrderedDict[K, V] = OrderedDict()
+        self._weights: dict[K, int] = {}
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        if self.maxsize == 0:
+            return
+        weight = 0
+        if self.max_bytes is not None:
+            weight = self._weigh(value) if self._weigh is not None else 1
+            if weight > self.max_bytes:
+                return
+        with self._lock:
+            self._bytes += weight - self._weights.get(key, 0)
+            self._weights[key] = weight
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                evicted, _ = self._items.popitem(last=False)
+                self._bytes -= self._weights.pop(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._weights.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats: dict[str, Any] = {
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+        if self.max_bytes is not None:
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
@@ -0,0 +1,61 @@
+"""Opaque keyset pagination cursors."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any, TypeGuard
+
+# Accepted types of one keyset value, as passed to isinstance.
+ValueType = type | tuple[type, ...]
+
+NUMBER: ValueType = (int, float)
+OPTIONAL_INT: ValueType = (int, type(None))
+OPTIONAL_NUMBER: ValueType = (int, float, type(None))
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def encode_cursor(kind: str, key: list[Any]) -> str:
+    payload = json.dumps({"k": kind, "v": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+    token: str, kind: str, shape: Sequence[ValueType] | None = None
+) -> list[Any]:
+    """Return the keyset values of ``token``; raise ValueError if it is not a ``kind`` cursor.
+
+    Values must be JSON scalars and, with ``shape``, exactly one per entry of
+    ``shape`` and of the types it names, so they can be bound into SQL as is.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(payload, dict) or payload.get("k") != kind:
+        raise ValueError(f"Not a {kind} cursor")
+    values = payload.get("v")
+    if not _is_keyset(values, shape):
+        raise ValueError("Malformed cursor")
+    return values
+
+
+def _is_keyset(values: Any, shape: Sequence[ValueType] | None) -> TypeGuard[list[Any]]:
+    if not isinstance(values, list):
+        return False
+    if shape is None:
+        return all(isinstance(value, _SCALARS) for value in values)
+    if len(values) != len(shape):
+        return False
+    # bool is an int to isinstance, but never a valid keyset number.
+    return all(
+        isinstance(value, expected) and (not isinstance(value, bool) or _allows_bool(expected))
+        for value, expected in zip(values, shape)
+    )
+
+
+def _allows_bool(expected: ValueType) -> bool:
+    return bool in (expected if isinstance(expected, tuple) else (expected,))
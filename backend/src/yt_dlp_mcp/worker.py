@@ -4,17 +4,21 @@ import logging
 import shutil
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from threading import Event, Thread
+from threading import Event, Lock, Thread
 
 from yt_dlp_mcp.db.jobs import JobsRepository
 from yt_dlp_mcp.db.transcripts import TranscriptsRepository
 from yt_dlp_mcp.services.downloader import Downloader
+from yt_dlp_mcp.services.fingerprint import AudioFingerprinter, FingerprintMatch, shift_transcript
 from yt_dlp_mcp.services.storage import StorageService
 from yt_dlp_mcp.services.transcriber import Transcriber
+from yt_dlp_mcp.types import TranscriptResult
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_MAX_WORKERS = 10
+# Slack allowed when checking that a matched recording covers the new one.
+REUSE_TOLERANCE_SECONDS = 5.0
 
 
 class BackgroundWorker:
@@ -28,6 +32,7 @@ class BackgroundWorker:
         storage: StorageService,
         poll_interval_seconds: int,
         max_workers: int = DEFAULT_MAX_WORKERS,
+        fingerprinter: AudioFingerprinter | None = None,
     ) -> None:
         self.jobs = jobs
         self.transcripts = transcripts
@@ -36,24 +41,57 @@ class BackgroundWorker:
         self.storage = storage
         self.poll_interval_seconds = poll_interval_seconds
         self.max_workers = max_workers
+        self.fingerprinter = fingerprinter
+        # Counted from the job pool threads, so only touched under the lock.
+        self._fingerprint_stats = {"checked": 0, "matched": 0, "reused": 0}
+        self._stats_lock = Lock()
         self._stop_event = Event()
         self._thread = Thread(target=self._run_loop, name="yt-dlp-mcp-worker", daemon=True)
+        # Kept apart from the claim loop so queued jobs do not wait on a large corpus.
+        self._backfill_thread = Thread(
+            target=self._run_backfill, name="yt-dlp-mcp-segment-backfill", daemon=True
+        )
         self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yt-dlp-job")
         self._active_count = 0
 
     def start(self) -> None:
         if not self._thread.is_alive():
             self._thread.start()
+        if self._backfill_thread.ident is None:
+            self._backfill_thread.start()
 
     def stop(self, timeout_seconds: float = 10.0) -> None:
         self._stop_event.set()
         self._executor.shutdown(wait=True, cancel_futures=True)
         self._thread.join(timeout=timeout_seconds)
+        if self._backfill_thread.is_alive():
+            self._backfill_thread.join(timeout=timeout_seconds)
 
     @property
     def is_running(self) -> bool:
         return self._thread.is_alive() and not self._stop_event.is_set()
 
+    @property
+    def active_jobs(self) -> int:
+        return self._active_count
+
+    def is_idle(self) -> bool:
+        return self._active_count == 0
+
+    def fingerprint_stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return dict(self._fingerprint_stats)
+
+    def _count_fingerprint(self, name: str) -> None:
+        with self._stats_lock:
+            self._fingerprint_stats[name] += 1
+
+    def _run_backfill(self) -> None:
+        try:
+            self._backfill_segment_index()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Segment index backfill failed")
+
     def _run_loop(self) -> None:
         while not self._stop_event.is_set():
             if self._active_count >= self.max_workers:
@@ -87,7 +125,16 @@ class BackgroundWorker:
         self.jobs.set_status(job_id, "transcribing")
 
         audio_path = Path(download.audio_path)
-        transcript_result = self.transcriber.transcribe(audio_path)
+        samples = self.fingerprinter.load_audio(audio_path) if self.fingerprinter else None
+        transcript_result = None
+        if self.fingerprinter is not None and samples is not None:
+            self._count_fingerprint("checked")
+            match = self.fingerprinter.match(samples)
+            if match is not None:
+                self._count_fingerprint("matched")
+                transcript_result = self._reuse_matched_transcript(match, download.metadata)
+        if transcript_result is None:
+            transcript_result = self.transcriber.transcribe(audio_path)
 
         persisted = self.storage.persist(
             metadata=download.metadata,
@@ -117,13 +164,65 @@ class BackgroundWorker:
             speaker_count=len(speakers) if speakers else None,
             word_count=word_count,
             confidence=None,
+            segments=transcript_result.segments,
         )
+        if self.fingerprinter is not None and samples is not None:
+            transcript_id = self.transcripts.get_id(str(persisted["video_id"]))
+            if transcript_id is not None:
+                self.fingerprinter.store(transcript_id, samples)
         self.jobs.mark_completed(job_id, str(persisted["video_id"]), str(persisted["path"]))
 
         work_dir = self.downloader.work_root / job_id
         if work_dir.exists():
             shutil.rmtree(work_dir, ignore_errors=True)
 
+    def _reuse_matched_transcript(
+        self, match: FingerprintMatch, metadata: dict[str, object]
+    ) -> TranscriptResult | None:
+        """The matched transcript re-timed to the new audio, if it covers all of it."""
+        existing = self.transcripts.get_by_ids([match.transcript_id]).get(match.transcript_id)
+        if existing is None:
+            return None
+        duration = self._as_float(metadata.get("duration"))
+        existing_duration = self._as_float(existing.get("duration"))
+        if duration is None or existing_duration is None:
+            return None
+        offset = match.offset_seconds
+        if (
+            offset < -REUSE_TOLERANCE_SECONDS
+            or offset + duration > existing_duration + REUSE_TOLERANCE_SECONDS
+        ):
+            return None
+        stored = self.storage.load_transcript(Path(str(existing["path"])))
+        if stored is None:
+            return None
+        logger.info(
+            "Reusing transcript of %s at offset %.2fs (bit error rate %.3f)",
+            existing["video_id"],
+            offset,
+            match.bit_error_rate,
+        )
+        self._count_fingerprint("reused")
+        return shift_transcript(stored, offset, duration)
+
+    def _backfill_segment_index(self) -> None:
+        """Index segments of transcripts stored before the segment index existed."""
+        after_id = 0
+        indexed = 0
+        while not self._stop_event.is_set():
+            batch = self.transcripts.list_unindexed_segments(after_id=after_id)
+            if not batch:
+                break
+            for row in batch:
+                after_id = int(row["id"])
+                transcript = self.storage.load_transcript(Path(str(row["path"])))
+                if transcript is None or not transcript.segments:
+                    continue
+                self.transcripts.index_segments(str(row["video_id"]), transcript.segments)
+                indexed += 1
+        if indexed:
+            logger.info("Backfilled segment index for %d transcripts", indexed)
+
     @staticmethod
     def _as_str(value: object) -> str | None:
         if value is None:
@@ -0,0 +1,71 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Database:
+    return Database(tmp_path / "test.sqlite3")
+
+
+@pytest.fixture
+def transcripts(db: Database) -> TranscriptsRepository:
+    return TranscriptsRepository(db)
+
+
+@pytest.fixture
+def add_transcript(transcripts: TranscriptsRepository) -> Callable[..., int]:
+    """Upserts a transcript of ``text`` and returns its row id.
+
+    Metadata gets placeholder values; keyword arguments override any upsert
+    field, and ``repo`` writes through another repository.
+    """
+
+    def add_transcript(
+        video_id: str,
+        text: str = "text",
+        *,
+        repo: TranscriptsRepository = transcripts,
+        **overrides: Any,
+    ) -> int:
+        fields: dict[str, Any] = {
+            "video_id": video_id,
+            "normalized_url": f"https://example.com/{video_id}",
+            "url": f"https://example.com/{video_id}",
+            "path": f"/tmp/{video_id}",
+            "transcript_text": text,
+            "title": f"Title {video_id}",
+            "channel": "demo channel",
+            "platform": "youtube",
+            "duration": None,
+            "upload_date": None,
+            "description": None,
+            "thumbnail": None,
+            "view_count": None,
+            "speaker_count": None,
+            "word_count": len(text.split()),
+            "confidence": None,
+        }
+        fields.update(overrides)
+        repo.upsert(**fields)
+        transcript_id = repo.get_id(video_id)
+        assert transcript_id is not None
+        return transcript_id
+
+    return add_transcript
+
+
+@pytest.fixture
+def make_due(db: Database) -> Callable[[str, str], None]:
+    """Moves ``column`` of every row in ``table`` one second into the past."""
+
+    def make_due(table: str, column: str) -> None:
+        db.conn.execute(f"UPDATE {table} SET {column} = datetime('now', '-1 second')")
+        db.conn.commit()
+
+    return make_due
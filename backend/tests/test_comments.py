@@ -0,0 +1,124 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from yt_dlp_mcp.db.comments import CommentsRepository
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.services.comment_ingest import CommentIngester
+from yt_dlp_mcp.utils.cursor import encode_cursor
+
+URL = "https://www.youtube.com/watch?v=abc"
+
+
+class CommentThread:
+    """A video whose comments are returned newest first."""
+
+    def __init__(self, count: int) -> None:
+        self.comments: list[dict[str, Any]] = []
+        self.calls: list[tuple[int, str]] = []
+        self.post(count)
+
+    def post(self, count: int, text: str = "great video") -> None:
+        start = len(self.comments)
+        self.comments[:0] = [
+            {
+                "id": f"c{i}",
+                "text": f"{text} number {i}",
+                "author": f"@user{i}",
+                "like_count": i,
+                "parent": "root",
+                "timestamp": 1_700_000_000 + i * 60,
+            }
+            for i in range(start + count - 1, start - 1, -1)
+        ]
+
+    def get_comment_thread(
+        self, url: str, *, max_comments: int, sort: str = "top", **_: Any
+    ) -> dict[str, Any]:
+        self.calls.append((max_comments, sort))
+        return {"video_id": "abc", "title": "A video", "comments": self.comments[:max_comments]}
+
+
+def _ingester(db: Database, thread: CommentThread) -> tuple[CommentsRepository, CommentIngester]:
+    comments = CommentsRepository(db)
+    ingester = CommentIngester(
+        comments=comments,
+        info=thread,  # type: ignore[arg-type]
+        max_comments=50,
+        refresh_batch=10,
+    )
+    return comments, ingester
+
+
+def test_ingested_comments_are_searchable_page_by_page(db: Database) -> None:
+    thread = CommentThread(30)
+    comments, ingester = _ingester(db, thread)
+    source, created = comments.track(URL, URL)
+    assert created and source["status"] == "queued"
+    assert comments.track(URL, URL)[1] is False
+    assert comments.pending() == [{"id": source["id"], "url": URL, "status": "queued"}]
+
+    assert ingester.run_once()
+    assert not ingester.run_once()
+    assert thread.calls == [(50, "new")]
+    stored = comments.get(source["id"])
+    assert stored is not None
+    assert (stored["status"], stored["video_id"], stored["comment_count"]) == ("ready", "abc", 30)
+    assert comments.pending() == []
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        page, cursor = comments.search_page("great", 8, cursor=cursor)
+        seen.extend(item["comment_id"] for item in page)
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 30
+    page, _ = comments.search_page("number 7", video_id="abc")
+    assert page[0]["comment_id"] == "c7" and "[7]" in page[0]["snippet"]
+    assert comments.search_page("great", video_id="other")[0] == []
+    for values in ([1.5], ["x", 1], [0.5, "2"], [0.5, True]):
+        with pytest.raises(ValueError):
+            comments.search_page("great", cursor=encode_cursor("comments", values))
+
+
+def test_refresh_adds_only_new_comments_and_refetches_after_a_gap(
+    db: Database, make_due: Callable[[str, str], None]
+) -> None:
+    thread = CommentThread(30)
+    comments, ingester = _ingester(db, thread)
+    source, _ = comments.track(URL, URL)
+    ingester.run_once()
+    watermark = comments.get(source["id"])["newest_timestamp"]  # type: ignore[index]
+
+    # A refresh fetches the newest batch only and upserts it.
+    thread.post(3, "fresh")
+    thread.comments[5]["like_count"] = 999
+    make_due("comment_sources", "next_refresh_at")
+    assert ingester.run_once()
+    assert thread.calls[-1] == (10, "new")
+    refreshed = comments.get(source["id"])
+    assert refreshed is not None
+    assert (refreshed["last_new"], refreshed["comment_count"]) == (3, 33)
+    assert refreshed["newest_timestamp"] > watermark
+    assert not refreshed["full_refresh"]
+    assert [item["comment_id"] for item in comments.search_page("fresh")[0]] != []
+    likes = db.conn.execute(
+        "SELECT like_count FROM comments WHERE comment_id = ?", (thread.comments[5]["id"],)
+    ).fetchone()[0]
+    assert likes == 999
+
+    # More new comments than one batch holds: the next refresh is a full fetch.
+    thread.post(15, "burst")
+    make_due("comment_sources", "next_refresh_at")
+    ingester.run_once()
+    gapped = comments.get(source["id"])
+    assert gapped is not None
+    assert (gapped["last_new"], gapped["full_refresh"]) == (10, True)
+    make_due("comment_sources", "next_refresh_at")
+    ingester.run_once()
+    assert thread.calls[-1] == (50, "new")
+    healed = comments.get(source["id"])
+    assert healed is not None
+    assert (healed["last_new"], healed["comment_count"], healed["full_refresh"]) == (5, 48, False)
@@ -0,0 +1,110 @@
+import io
+import json
+import tarfile
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from yt_dlp_mcp.db.transcripts import TranscriptFilters, TranscriptsRepository
+from yt_dlp_mcp.services.compression import ArtifactCodec
+from yt_dlp_mcp.services.export import coalesce, stream_export
+from yt_dlp_mcp.services.storage import StorageService
+from yt_dlp_mcp.types import TranscriptResult, TranscriptSegment
+
+
+def _store(
+    tmp_path: Path,
+    storage: StorageService,
+    add_transcript: Callable[..., int],
+    video_id: str,
+    channel: str,
+) -> None:
+    audio = tmp_path / f"{video_id}.mp3"
+    audio.write_bytes(b"audio")
+    transcript = TranscriptResult(
+        text=f"hello from {video_id}",
+        language="en",
+        segments=[
+            TranscriptSegment(start=0.0, end=2.0, text=f"hello from {video_id}", speaker="A")
+        ],
+    )
+    persisted = storage.persist(
+        metadata={"id": video_id, "title": f"Title {video_id}", "channel": channel},
+        normalized_url=f"https://example.com/{video_id}",
+        source_url=f"https://example.com/{video_id}",
+        transcript=transcript,
+        temp_audio_path=audio,
+    )
+    add_transcript(
+        video_id,
+        transcript.text,
+        path=str(persisted["path"]),
+        channel=channel,
+        platform="YouTube",
+        duration=2.0,
+        upload_date="20240101",
+        speaker_count=1,
+        segments=transcript.segments,
+    )
+
+
+@pytest.fixture
+def codec() -> ArtifactCodec:
+    return ArtifactCodec()
+
+
+@pytest.fixture
+def library(tmp_path: Path, codec: ArtifactCodec, add_transcript: Callable[..., int]) -> None:
+    """Five stored transcripts in alternating channels."""
+    storage = StorageService(tmp_path / "data", codec)
+    for index in range(5):
+        _store(
+            tmp_path, storage, add_transcript, f"vid{index}", "Even" if index % 2 == 0 else "Odd"
+        )
+
+
+@pytest.mark.usefixtures("library")
+def test_iter_transcripts_pages_by_id(transcripts: TranscriptsRepository) -> None:
+    rows = list(transcripts.iter_transcripts(batch_size=2))
+    assert [row["video_id"] for row in rows] == [f"vid{i}" for i in range(5)]
+    odd = transcripts.iter_transcripts(TranscriptFilters(channel="Odd"), batch_size=1)
+    assert [row["video_id"] for row in odd] == ["vid1", "vid3"]
+
+
+@pytest.mark.usefixtures("library")
+def test_export_jsonl_streams_filtered_records(
+    transcripts: TranscriptsRepository, codec: ArtifactCodec
+) -> None:
+    missing = transcripts.get_by_video_id("vid2")
+    assert missing is not None
+    for child in Path(str(missing["path"])).iterdir():
+        child.unlink()
+
+    even = TranscriptFilters(channel="Even")
+    chunks = list(stream_export(transcripts, "jsonl", even, codec=codec))
+    records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [record["video_id"] for record in records] == ["vid0", "vid4"]
+    assert records[0]["segments"] == [
+        {"start": 0.0, "end": 2.0, "speaker": "A", "text": "hello from vid0"}
+    ]
+    assert records[0]["language"] == "en"
+    assert "path" not in records[0]
+
+
+@pytest.mark.usefixtures("library")
+def test_export_tar_contains_rendered_files(
+    transcripts: TranscriptsRepository, codec: ArtifactCodec
+) -> None:
+    data = b"".join(stream_export(transcripts, "tar", codec=codec))
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        names = archive.getnames()
+        markdown = archive.extractfile("vid3/transcript.md")
+        assert markdown is not None
+        assert markdown.read().decode().startswith("# Title vid3")
+    assert len(names) == 15
+    assert names[:3] == ["vid0/metadata.json", "vid0/transcript.json", "vid0/transcript.md"]
+
+
+def test_coalesce_rechunks() -> None:
+    assert list(coalesce([b"ab", b"", b"cd", b"e"], size=3)) == [b"abcd", b"e"]
@@ -0,0 +1,152 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.fingerprints import FingerprintsRepository
+from yt_dlp_mcp.db.jobs import JobsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services.fingerprint import SAMPLE_RATE, AudioFingerprinter, shift_transcript
+from yt_dlp_mcp.services.storage import StorageService
+from yt_dlp_mcp.types import DownloadResult, TranscriptResult, TranscriptSegment
+from yt_dlp_mcp.worker import BackgroundWorker
+
+
+def _audio(seed: int, seconds: float) -> npt.NDArray[np.float32]:
+    """Noise whose spectral envelope changes every 100 ms, loosely like speech."""
+    rng = np.random.default_rng(seed)
+    step = SAMPLE_RATE // 10
+    blocks = []
+    envelope = np.ones(step + 1)
+    for _ in range(int(seconds * 10)):
+        bands = np.exp(rng.normal(0, 1.5, step // 20 + 1)).repeat(20)[: step + 1]
+        envelope = 0.7 * envelope + 0.3 * bands
+        spectrum = np.fft.rfft(rng.normal(0, 1, step * 2)) * envelope
+        blocks.append(np.fft.irfft(spectrum)[:step])
+    samples = np.concatenate(blocks)
+    return (samples / np.abs(samples).max()).astype(np.float32)
+
+
+def test_fingerprint_matches_shifted_noisy_copy(
+    db: Database, transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    fingerprinter = AudioFingerprinter(FingerprintsRepository(db))
+    original = _audio(1, 90)
+    fingerprinter.store(add_transcript("orig", duration=120.0), original)
+    fingerprinter.store(add_transcript("other", duration=120.0), _audio(2, 90))
+
+    rng = np.random.default_rng(3)
+    start = int(7.33 * SAMPLE_RATE)
+    clip = original[start:] * 0.5 + rng.normal(0, 0.005, len(original) - start)
+    match = fingerprinter.match(clip.astype(np.float32))
+    assert match is not None
+    assert match.transcript_id == transcripts.get_id("orig")
+    assert abs(match.offset_seconds - 7.33) < 0.02
+    assert match.bit_error_rate < 0.2
+
+    intro = np.concatenate([_audio(9, 3.2), original])
+    match = fingerprinter.match(intro)
+    assert match is not None
+    assert abs(match.offset_seconds + 3.2) < 0.02
+
+    assert fingerprinter.match(_audio(4, 90)) is None
+
+
+def test_shift_transcript_clips_to_new_audio() -> None:
+    transcript = TranscriptResult(
+        text="one two three four",
+        language="en",
+        segments=[
+            TranscriptSegment(start=float(i * 10), end=float(i * 10 + 10), text=word, speaker="A")
+            for i, word in enumerate(["one", "two", "three", "four"])
+        ],
+    )
+    shifted = shift_transcript(transcript, 15.0, 20.0)
+    assert [(s.start, s.end, s.text) for s in shifted.segments] == [
+        (0.0, 5.0, "two"),
+        (5.0, 15.0, "three"),
+        (15.0, 20.0, "four"),
+    ]
+    assert shifted.text == "two three four"
+    assert shifted.language == "en"
+
+
+class ClipDownloader:
+    def __init__(self, work_root: Path) -> None:
+        self.work_root = work_root
+        self.video_id = ""
+        self.duration = 0.0
+
+    def download(self, *, url: str, job_id: str) -> DownloadResult:
+        job_dir = self.work_root / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        audio_path = job_dir / f"{self.video_id}.mp3"
+        audio_path.write_bytes(b"fake-audio")
+        return DownloadResult(
+            metadata={"id": self.video_id, "duration": self.duration, "extractor_key": "YouTube"},
+            audio_path=str(audio_path),
+        )
+
+
+class ArrayFingerprinter(AudioFingerprinter):
+    """Reads samples registered per video id instead of decoding with ffmpeg."""
+
+    def __init__(
+        self, repository: FingerprintsRepository, audio: dict[str, npt.NDArray[np.float32]]
+    ) -> None:
+        super().__init__(repository)
+        self.audio = audio
+
+    def load_audio(self, path: Path) -> npt.NDArray[np.float32] | None:
+        return self.audio.get(path.stem)
+
+
+class CountingTranscriber:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def transcribe(self, _: Path) -> TranscriptResult:
+        self.calls += 1
+        return TranscriptResult(
+            text="intro talk outro",
+            segments=[
+                TranscriptSegment(start=0.0, end=30.0, text="intro", speaker="A"),
+                TranscriptSegment(start=30.0, end=60.0, text="talk", speaker="A"),
+                TranscriptSegment(start=60.0, end=90.0, text="outro", speaker="B"),
+            ],
+        )
+
+
+def test_worker_reuses_transcript_of_matching_audio(
+    tmp_path: Path, db: Database, transcripts: TranscriptsRepository
+) -> None:
+    jobs = JobsRepository(db)
+    original = _audio(1, 90)
+    audio = {"orig": original, "reupload": original[35 * SAMPLE_RATE :]}
+    downloader = ClipDownloader(tmp_path / "work")
+    transcriber = CountingTranscriber()
+    worker = BackgroundWorker(
+        jobs=jobs,
+        transcripts=transcripts,
+        downloader=downloader,  # type: ignore[arg-type]
+        transcriber=transcriber,  # type: ignore[arg-type]
+        storage=StorageService(tmp_path / "data"),
+        poll_interval_seconds=5,
+        fingerprinter=ArrayFingerprinter(FingerprintsRepository(db), audio),
+    )
+
+    for video_id, duration in (("orig", 90.0), ("reupload", 55.0)):
+        downloader.video_id, downloader.duration = video_id, duration
+        job = jobs.enqueue(f"https://example.com/{video_id}", f"https://example.com/{video_id}")
+        worker._process_job(
+            job_id=str(job["id"]),
+            url=f"https://example.com/{video_id}",
+            normalized_url=f"https://example.com/{video_id}",
+        )
+
+    assert transcriber.calls == 1
+    assert worker.fingerprint_stats() == {"checked": 2, "matched": 1, "reused": 1}
+    hits = transcripts.search_segments("talk", video_id="reupload")
+    assert [(hit["start"], hit["end"]) for hit in hits] == [(0.0, 25.0)]
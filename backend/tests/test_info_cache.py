@@ -0,0 +1,176 @@
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.info_cache import InfoCacheRepository
+from yt_dlp_mcp.services.info_cache import CachedInfoService, InfoCachePolicy
+from yt_dlp_mcp.utils.admission import AdmissionController, AdmissionLimit, BusyError
+
+
+class SlowInfo:
+    """Counts lookups; metadata calls block until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.calls: dict[str, int] = {"search": 0, "metadata": 0, "comments": 0}
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        self.calls["search"] += 1
+        return [{"video_id": f"{query}{i}", "n": self.calls["search"]} for i in range(limit)]
+
+    def get_metadata(self, url: str) -> dict[str, Any]:
+        self.calls["metadata"] += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("yt-dlp failed")
+        return {"id": url[-3:], "version": self.calls["metadata"]}
+
+    def get_comments(self, url: str, limit: int = 20, sort: str = "top") -> list[dict[str, Any]]:
+        self.calls["comments"] += 1
+        return [{"id": str(i), "sort": sort} for i in range(limit)]
+
+
+def _service(
+    db: Database, policy: InfoCachePolicy | None = None
+) -> tuple[SlowInfo, CachedInfoService]:
+    info = SlowInfo()
+    service = CachedInfoService(
+        InfoCacheRepository(db), info, policy=policy  # type: ignore[arg-type]
+    )
+    return info, service
+
+
+def _age(db: Database, seconds: float) -> None:
+    db.conn.execute("UPDATE info_cache SET fetched_at = fetched_at - ?", (seconds,))
+    db.conn.commit()
+
+
+def test_cached_lookups_survive_restart_and_expire(db: Database) -> None:
+    info, service = _service(db)
+    assert service.search("cats", 3) == service.search("cats", 3)
+    assert info.calls["search"] == 1
+    service.search("cats", 5)
+    assert info.calls["search"] == 2
+
+    url = "https://www.youtube.com/watch?v=abc"
+    service.get_comments(url, 2, "new")
+    service.get_comments(url, 2, "top")
+    service.get_comments(url, 2, "new")
+    assert info.calls["comments"] == 2
+
+    # Entries are in the database, so a new service instance starts warm.
+    restarted = CachedInfoService(InfoCacheRepository(db), info)  # type: ignore[arg-type]
+    restarted.search("cats", 3)
+    assert info.calls["search"] == 2
+    stats = restarted.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 0, 1.0)
+
+    # Past TTL and the stale window an entry is fetched again, then purged.
+    _age(db, 3600 + 86400 + 1)
+    assert service.purge_expired() == 4
+    restarted.search("cats", 3)
+    assert info.calls["search"] == 3
+    service.close()
+    restarted.close()
+
+
+def test_stale_entry_is_served_while_refreshed(db: Database) -> None:
+    info, service = _service(db)
+    url = "https://www.youtube.com/watch?v=abc"
+    assert service.get_metadata(url)["version"] == 1
+    _age(db, 6 * 3600 + 1)
+
+    info.release.clear()
+    started = time.monotonic()
+    assert service.get_metadata(url)["version"] == 1
+    assert time.monotonic() - started < 1
+    deadline = time.monotonic() + 5
+    while info.calls["metadata"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    info.release.set()
+    while service.stats()["inflight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.get_metadata(url)["version"] == 2
+    stats = service.stats()["tools"]["get_metadata"]
+    assert (stats["stale_hits"], stats["refreshes"], stats["hits"]) == (1, 1, 1)
+    service.close()
+
+
+def test_concurrent_misses_share_one_fetch(db: Database) -> None:
+    info, service = _service(db, InfoCachePolicy(metadata_ttl_seconds=0))
+    url = "https://www.youtube.com/watch?v=xyz"
+    info.release.clear()
+    results: list[dict[str, Any]] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(service.get_metadata(url)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while service.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    info.release.set()
+    for thread in threads:
+        thread.join()
+    assert info.calls["metadata"] == 1
+    assert results == [{"id": "xyz", "version": 1}] * 8
+    assert service.stats()["coalesced"] == 7
+    # With a TTL of 0 nothing is stored.
+    assert service.stats()["entries"] == 0
+
+    info.fail = True
+    with pytest.raises(RuntimeError):
+        service.get_metadata(url)
+    assert service.stats()["errors"] == 1
+    service.close()
+
+
+def test_lookups_over_the_admission_limits_are_rejected(db: Database) -> None:
+    info = SlowInfo()
+    admission = AdmissionController(
+        {"get_metadata": AdmissionLimit(max_concurrent=1, max_queue=1, queue_timeout_seconds=5)}
+    )
+    service = CachedInfoService(
+        InfoCacheRepository(db), info, admission=admission  # type: ignore[arg-type]
+    )
+    info.release.clear()
+    results: list[Any] = []
+
+    def lookup(video_id: str) -> None:
+        try:
+            results.append(service.get_metadata(f"https://www.youtube.com/watch?v={video_id}"))
+        except BusyError as exc:
+            results.append(exc)
+
+    threads = [threading.Thread(target=lookup, args=(f"v{i:02d}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while admission.stats()["get_metadata"]["waiting"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # One call runs and one waits, so a third is turned away without waiting.
+    started = time.monotonic()
+    with pytest.raises(BusyError) as busy:
+        service.get_metadata("https://www.youtube.com/watch?v=v99")
+    assert time.monotonic() - started < 1
+    assert busy.value.name == "get_metadata" and busy.value.retry_after >= 1
+
+    info.release.set()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 2 and not any(isinstance(r, BusyError) for r in results)
+    stats = admission.stats()["get_metadata"]
+    assert (stats["admitted"], stats["queued"], stats["rejected"]) == (2, 1, 1)
+    assert (stats["running"], stats["waiting"]) == (0, 0)
+    assert service.stats()["errors"] == 0
+    # Lookups with no limit configured are not admission-controlled.
+    service.search("cats", 2)
+    assert "yt_search" not in admission.stats()
+    service.close()
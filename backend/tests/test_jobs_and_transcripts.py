@@ -1,20 +1,31 @@
+import sqlite3
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
+
+import pytest
 
 from yt_dlp_mcp.db.database import Database
 from yt_dlp_mcp.db.jobs import JobsRepository
-from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptFilters, TranscriptsRepository
+from yt_dlp_mcp.services.enqueue import enqueue_urls
+from yt_dlp_mcp.types import TranscriptSegment
+from yt_dlp_mcp.utils.cursor import encode_cursor
 
 
-def test_job_lifecycle(tmp_path: Path) -> None:
-    db = Database(tmp_path / "test.sqlite3")
+def test_job_lifecycle(db: Database) -> None:
     jobs = JobsRepository(db)
 
     created = jobs.enqueue("https://example.com/v/1", "https://example.com/v/1")
     assert created["status"] == "queued"
+    assert jobs.active_counts() == {"queued": 1, "downloading": 0, "transcribing": 0}
 
     claimed = jobs.claim_next()
     assert claimed is not None
     assert claimed["status"] == "downloading"
+    assert jobs.active_counts() == {"queued": 0, "downloading": 1, "transcribing": 0}
 
     jobs.set_status(str(claimed["id"]), "transcribing")
     transcribing = jobs.get(str(claimed["id"]))
@@ -26,31 +37,293 @@ def test_job_lifecycle(tmp_path: Path) -> None:
     assert completed is not None
     assert completed["status"] == "completed"
     assert completed["video_id"] == "video1"
+    assert sum(jobs.active_counts().values()) == 0
 
 
-def test_transcripts_search(tmp_path: Path) -> None:
-    db = Database(tmp_path / "test.sqlite3")
-    repo = TranscriptsRepository(db)
+def test_enqueue_many_single_commit(db: Database) -> None:
+    jobs = JobsRepository(db)
+
+    before = db.writes.batches_committed
+    created = jobs.enqueue_many(
+        (f"https://example.com/v/{i}", f"https://example.com/v/{i}") for i in range(50)
+    )
+    assert db.writes.batches_committed == before + 1
+    assert [job["url"] for job in created] == [f"https://example.com/v/{i}" for i in range(50)]
+    assert all(job["status"] == "queued" for job in created)
+    assert jobs.get(str(created[-1]["id"])) == created[-1]
+
+
+def test_concurrent_submissions_share_one_job(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.sqlite3", write_batch_window_seconds=0.001)
+    jobs, transcripts = JobsRepository(db), TranscriptsRepository(db)
+    url = "https://www.youtube.com/watch?v=same"
+    start = threading.Barrier(32)
+
+    def submit(i: int) -> list[dict[str, Any]]:
+        start.wait()
+        return enqueue_urls(jobs, transcripts, [url, f"https://example.com/v/{i}"])
+
+    for _ in range(5):
+        db.conn.execute("DELETE FROM jobs")
+        db.conn.commit()
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(submit, range(32)))
+        shared = [result[0] for result in results]
+        assert len({result["job_id"] for result in shared}) == 1
+        assert sum(not result["deduplicated"] for result in shared) == 1
+        counts = db.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT normalized_url) FROM jobs"
+        ).fetchone()
+        assert tuple(counts) == (33, 33)
+
+    # The index holds for any writer, not only this repository.
+    other = sqlite3.connect(tmp_path / "test.sqlite3")
+    with pytest.raises(sqlite3.IntegrityError):
+        other.execute(
+            "INSERT INTO jobs(id, url, normalized_url) SELECT 'dup', url, normalized_url "
+            "FROM jobs WHERE id = ?",
+            (shared[0]["job_id"],),
+        )
+    other.close()
+
+    # Once the job has finished, the URL can be queued again.
+    jobs.mark_failed(str(shared[0]["job_id"]), "boom", attempt=99)
+    again, created = jobs.enqueue_or_attach([(url, url)])[0]
+    assert created and again["id"] != shared[0]["job_id"]
+
+
+def test_duplicate_active_jobs_are_resolved_on_open(tmp_path: Path) -> None:
+    path = tmp_path / "test.sqlite3"
+    db = Database(path)
+    db.conn.execute("DROP INDEX idx_jobs_active_normalized_url")
+    for job_id, created_at in (("b", "2024-01-02"), ("a", "2024-01-01")):
+        db.conn.execute(
+            "INSERT INTO jobs(id, url, normalized_url, created_at) VALUES (?, 'u', 'u', ?)",
+            (job_id, created_at),
+        )
+    db.conn.commit()
+    db.close()
+
+    reopened = JobsRepository(Database(path))
+    assert (reopened.get("a") or {})["status"] == "queued"
+    assert (reopened.get("b") or {})["status"] == "failed"
+    assert reopened.enqueue("u", "u")["id"] == "a"
+
 
-    repo.upsert(
-        video_id="vid1",
-        normalized_url="https://example.com/1",
-        url="https://example.com/1",
-        path="/tmp/vid1",
-        transcript_text="hello this is a transcription test",
-        title="Demo title",
-        channel="demo channel",
-        platform="youtube",
-        duration=12.3,
-        upload_date="20250101",
-        description="description text",
-        thumbnail=None,
-        view_count=1,
-        speaker_count=1,
-        word_count=6,
-        confidence=None,
+def test_close_releases_every_read_connection(db: Database) -> None:
+    readers = [db.conn]
+
+    def read() -> None:
+        readers.append(db.conn)
+        db.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()
+
+    for _ in range(3):
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+    # Each new reader closes the connections of threads that have finished.
+    assert len(db._readers) == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        readers[1].execute("SELECT 1")
+
+    db.close()
+    for reader in readers:
+        with pytest.raises(sqlite3.ProgrammingError):
+            reader.execute("SELECT 1")
+
+
+def test_concurrent_writes_are_group_committed(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.sqlite3", write_batch_window_seconds=0.05)
+    jobs = JobsRepository(db)
+    created = jobs.enqueue_many(
+        (f"https://example.com/v/{i}", f"https://example.com/v/{i}") for i in range(20)
     )
 
-    results = repo.search("transcription", limit=5)
+    before = db.writes.batches_committed
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        list(pool.map(lambda job: jobs.set_status(str(job["id"]), "transcribing"), created))
+
+    assert db.writes.batches_committed - before < len(created)
+    statuses = {(jobs.get(str(job["id"])) or {}).get("status") for job in created}
+    assert statuses == {"transcribing"}
+
+
+def test_failed_write_does_not_abort_batch(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.sqlite3", write_batch_window_seconds=0.05)
+    jobs = JobsRepository(db)
+
+    bad = db.submit_write(lambda conn: conn.execute("INSERT INTO missing_table VALUES (1)"))
+    good = jobs.enqueue("https://example.com/v/1", "https://example.com/v/1")
+
+    with pytest.raises(sqlite3.OperationalError):
+        bad.result()
+    assert jobs.get(str(good["id"])) is not None
+
+
+def test_transcripts_search(
+    transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    add_transcript("vid1", "hello this is a transcription test")
+
+    results = transcripts.search("transcription", limit=5)
     assert len(results) == 1
     assert results[0]["video_id"] == "vid1"
+
+
+def test_reupsert_reindexes_changed_text(
+    db: Database, transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    add_transcript("vid1", "the quick brown fox")
+    add_transcript("vid1", "a lazy dog sleeps")
+
+    assert transcripts.search("fox") == []
+    assert [r["video_id"] for r in transcripts.search("lazy")] == ["vid1"]
+    assert "transcript_text" not in transcripts.list_transcripts()[0]
+    db.conn.execute("INSERT INTO transcripts_fts(transcripts_fts) VALUES ('integrity-check')")
+
+
+def test_legacy_fts_table_is_migrated(tmp_path: Path, add_transcript: Callable[..., int]) -> None:
+    path = tmp_path / "legacy.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE transcripts (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          video_id TEXT UNIQUE NOT NULL,
+          normalized_url TEXT UNIQUE,
+          url TEXT, title TEXT, channel TEXT, platform TEXT, duration REAL,
+          upload_date TEXT, description TEXT, thumbnail TEXT, view_count INTEGER,
+          speaker_count INTEGER, word_count INTEGER, confidence REAL,
+          transcribed_at TEXT NOT NULL DEFAULT (datetime('now')),
+          path TEXT NOT NULL
+        );
+        CREATE VIRTUAL TABLE transcripts_fts USING fts5(
+          video_id UNINDEXED, title, channel, description, transcript_text
+        );
+        INSERT INTO transcripts(video_id, title, channel, path)
+        VALUES ('old1', 'Legacy', 'chan', '/tmp/old1');
+        INSERT INTO transcripts_fts(video_id, title, channel, description, transcript_text)
+        VALUES ('old1', 'Legacy', 'chan', '', 'migrated searchable words');
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    db = Database(path)
+    repo = TranscriptsRepository(db)
+
+    fts_sql = db.conn.execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'transcripts_fts'"
+    ).fetchone()[0]
+    assert "content='transcripts'" in fts_sql
+    assert [r["video_id"] for r in repo.search("searchable")] == ["old1"]
+
+    add_transcript("old1", "fresh replacement words", repo=repo)
+    assert repo.search("searchable") == []
+    assert [r["video_id"] for r in repo.search("replacement")] == ["old1"]
+
+
+def test_search_segments_returns_timestamps_and_context(
+    transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    segments = [
+        TranscriptSegment(start=0.0, end=4.0, text="welcome to the show", speaker="A"),
+        TranscriptSegment(start=4.0, end=9.5, text="today we talk about sqlite", speaker="B"),
+        TranscriptSegment(start=9.5, end=12.0, text="and full text search", speaker="A"),
+    ]
+    add_transcript("vid1", "welcome to the show today we talk about sqlite", segments=segments)
+
+    hits = transcripts.search_segments("sqlite", context=1)
+    assert len(hits) == 1
+    assert hits[0]["start"] == 4.0
+    assert hits[0]["end"] == 9.5
+    assert hits[0]["speaker"] == "B"
+    assert [n["segment"] for n in hits[0]["context"]] == [0, 2]
+
+    add_transcript("vid1", "replaced", segments=[TranscriptSegment(0.0, 1.0, "replaced")])
+    assert transcripts.search_segments("sqlite") == []
+    assert transcripts.search_segments("replaced")[0]["video_id"] == "vid1"
+
+
+def test_query_cache_hits_and_invalidates_on_upsert(
+    transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    add_transcript("vid1", "cached words here")
+
+    first = transcripts.search("cached   words")
+    second = transcripts.search("cached words")
+    assert first == second
+    stats = transcripts.query_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    add_transcript("vid2", "more cached words")
+    assert {r["video_id"] for r in transcripts.search("cached words")} == {"vid1", "vid2"}
+    assert transcripts.query_cache_stats()["misses"] == 2
+    assert len(transcripts.list_transcripts()) == 2
+
+
+def test_filtered_search_and_facets(
+    transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    add_transcript("a", "shared topic", channel="alpha", upload_date="20240105", duration=60.0)
+    add_transcript("b", "shared topic", channel="alpha", upload_date="20250310", duration=600.0)
+    add_transcript("c", "shared topic", channel="beta", upload_date="20250601", duration=1200.0)
+
+    filters = TranscriptFilters(upload_date_from="2025-01-01", min_duration=300)
+    assert {r["video_id"] for r in transcripts.search("shared", filters=filters)} == {"b", "c"}
+    assert [r["video_id"] for r in transcripts.list_transcripts(channel="beta")] == ["c"]
+    assert "description" not in transcripts.list_transcripts()[0]
+
+    facets = transcripts.facets("shared")
+    assert facets["channel"] == [
+        {"value": "alpha", "count": 2},
+        {"value": "beta", "count": 1},
+    ]
+    assert facets["year"] == [{"value": "2025", "count": 2}, {"value": "2024", "count": 1}]
+    assert transcripts.facets(filters=TranscriptFilters(channel="beta"))["platform"] == [
+        {"value": "youtube", "count": 1}
+    ]
+
+
+def test_keyset_pagination_walks_every_row_once(
+    transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    for i in range(7):
+        add_transcript(f"vid{i}", "paged content")
+
+    for fetch in (
+        lambda cursor: transcripts.list_transcripts_page(limit=3, cursor=cursor),
+        lambda cursor: transcripts.search_page("paged", 3, cursor=cursor),
+    ):
+        seen: list[str] = []
+        cursor = None
+        pages = 0
+        while True:
+            items, cursor = fetch(cursor)
+            seen.extend(item["video_id"] for item in items)
+            pages += 1
+            if cursor is None:
+                break
+        assert pages == 3
+        assert sorted(seen) == [f"vid{i}" for i in range(7)]
+
+        # An item's own cursor resumes right after it.
+        items, _ = fetch(None)
+        assert fetch(items[1]["cursor"])[0][0] == items[2]
+
+    with pytest.raises(ValueError):
+        transcripts.search_page("paged", cursor=transcripts.list_transcripts_page(limit=1)[1])
+
+    # Any write can reorder bm25 scores, so search cursors taken before it expire.
+    _, cursor = transcripts.search_page("paged", 3)
+    assert transcripts.search_page("paged", 3, cursor=cursor)[1] is not None
+    add_transcript("vid7", "paged content again")
+    with pytest.raises(ValueError, match="restart"):
+        transcripts.search_page("paged", 3, cursor=cursor)
+
+    # Well-formed cursors of the right kind but the wrong shape never reach SQL.
+    for values in ([1], ["x", {"a": 1}], [1.5, "2"], [True, 1], [0.5, 1, 2], [0, 1, 2, 3]):
+        with pytest.raises(ValueError):
+            transcripts.search_page("paged", cursor=encode_cursor("search", values))
+        with pytest.raises(ValueError):
+            transcripts.list_transcripts_page(cursor=encode_cursor("list", values))
@@ -0,0 +1,149 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.jobs import JobsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services import maintenance
+from yt_dlp_mcp.services.artifact_sync import ArtifactSync
+from yt_dlp_mcp.services.maintenance import (
+    AudioRetentionMode,
+    MaintenancePolicy,
+    MaintenanceService,
+)
+from yt_dlp_mcp.services.object_store import LocalObjectStore
+
+
+def _age_transcripts(db: Database) -> None:
+    db.conn.execute("UPDATE transcripts SET transcribed_at = datetime('now', '-10 days')")
+    db.conn.commit()
+
+
+def test_maintenance_pass_reclaims_space(
+    tmp_path: Path,
+    db: Database,
+    transcripts: TranscriptsRepository,
+    add_transcript: Callable[..., int],
+) -> None:
+    jobs = JobsRepository(db)
+
+    old = jobs.enqueue("https://example.com/old", "https://example.com/old")
+    jobs.mark_completed(str(old["id"]), "old", "/tmp/old")
+    failed = jobs.enqueue("https://example.com/failed", "https://example.com/failed")
+    active = jobs.enqueue("https://example.com/active", "https://example.com/active")
+    db.conn.execute(
+        "UPDATE jobs SET completed_at = datetime('now', '-40 days') WHERE id = ?", (old["id"],)
+    )
+    db.conn.execute("UPDATE jobs SET status = 'failed' WHERE id = ?", (failed["id"],))
+    db.conn.commit()
+
+    work_root = tmp_path / "_work"
+    for job in (failed, active):
+        (work_root / str(job["id"])).mkdir(parents=True)
+        (work_root / str(job["id"]) / "partial.m4a").write_bytes(b"x" * 1000)
+
+    video_dir = tmp_path / "transcripts" / "vid1"
+    video_dir.mkdir(parents=True)
+    (video_dir / "audio.mp3").write_bytes(b"a" * 5000)
+    add_transcript("vid1", path=str(video_dir))
+    _age_transcripts(db)
+
+    service = MaintenanceService(
+        database=db,
+        jobs=jobs,
+        transcripts=transcripts,
+        work_root=work_root,
+        policy=MaintenancePolicy(
+            job_retention_days=30, audio_retention_days=7, audio_retention_mode="delete"
+        ),
+        is_idle=lambda: True,
+    )
+    reclaimed = service.run_once()
+
+    assert jobs.get(str(old["id"])) is None
+    assert jobs.get(str(active["id"])) is not None
+    assert not (work_root / str(failed["id"])).exists()
+    assert (work_root / str(active["id"])).exists()
+    assert not (video_dir / "audio.mp3").exists()
+    assert reclaimed["work_dirs"] == 1000
+    assert reclaimed["audio"] == 5000
+    assert db.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert service.stats["jobs_purged"] == 1
+    assert service.stats["reclaimed_bytes_total"] >= 6000
+
+
+def _fake_ffmpeg(cmd: list[str], **_: Any) -> Any:
+    Path(cmd[-1]).write_bytes(b"o" * 100)
+    return type("Completed", (), {"returncode": 0, "stderr": ""})()
+
+
+_STORED_AFTER_RETENTION: dict[AudioRetentionMode, list[str]] = {
+    "delete": ["evicted/transcript.txt", "local/transcript.txt"],
+    "opus": [
+        "evicted/audio.opus",
+        "evicted/transcript.txt",
+        "local/audio.opus",
+        "local/transcript.txt",
+    ],
+}
+
+
+@pytest.mark.parametrize("mode", ["delete", "opus"])
+def test_audio_retention_reaches_the_object_store(
+    tmp_path: Path,
+    db: Database,
+    transcripts: TranscriptsRepository,
+    add_transcript: Callable[..., int],
+    monkeypatch: pytest.MonkeyPatch,
+    mode: AudioRetentionMode,
+) -> None:
+    monkeypatch.setattr(maintenance.subprocess, "run", _fake_ffmpeg)
+    data_dir = tmp_path / "data"
+    store = LocalObjectStore(tmp_path / "store")
+    # Small enough that only the most recent directory stays local.
+    sync = ArtifactSync(store, data_dir, cache_bytes=6000)
+    channel_dir = data_dir / "transcripts" / "Youtube" / "chan"
+    for video_id in ("evicted", "local"):
+        video_dir = channel_dir / video_id
+        video_dir.mkdir(parents=True)
+        (video_dir / "audio.mp3").write_bytes(b"a" * 5000)
+        (video_dir / "transcript.txt").write_text("text", encoding="utf-8")
+        add_transcript(video_id, path=str(video_dir))
+        sync.schedule_upload(video_dir).result()
+    _age_transcripts(db)
+    assert not (channel_dir / "evicted" / "audio.mp3").exists()
+
+    service = MaintenanceService(
+        database=db,
+        jobs=JobsRepository(db),
+        transcripts=transcripts,
+        work_root=tmp_path / "_work",
+        policy=MaintenancePolicy(audio_retention_days=7, audio_retention_mode=mode),
+        is_idle=lambda: True,
+        sync=sync,
+    )
+    service.run_once()
+    assert service.stats["audio_files_tiered"] == 2
+    stored = sorted(store.list_keys(""))
+    assert stored == [f"transcripts/Youtube/chan/{key}" for key in _STORED_AFTER_RETENTION[mode]]
+    # Evicted audio is tiered in the store without staying on this host.
+    assert not any((channel_dir / "evicted").glob("audio.*"))
+
+    # Tiered videos are not looked at again, locally or in the store.
+    assert transcripts.list_transcribed_before(7) == []
+    with monkeypatch.context() as patched:
+        patched.setattr(sync, "remote_audio", None)
+        service.run_once()
+    # Rewriting a transcript makes its audio eligible again.
+    add_transcript("evicted", path=str(channel_dir / "evicted"))
+    _age_transcripts(db)
+    assert [row["video_id"] for row in transcripts.list_transcribed_before(7)] == ["evicted"]
+
+    # A later upload of the evicted directory keeps its stored audio.
+    assert sync.ensure_local(channel_dir / "evicted")
+    sync.schedule_upload(channel_dir / "evicted").result()
+    assert sorted(store.list_keys("")) == stored
+    sync.close()
@@ -0,0 +1,167 @@
+import json
+import os
+import sys
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.jobs import JobsRepository
+from yt_dlp_mcp.db.playlists import PlaylistsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services.playlist_import import PlaylistImporter
+from yt_dlp_mcp.services.youtube_info import YouTubeInfoService
+
+
+class FlakyListing:
+    """Lists ``count`` videos, failing once after ``fail_after`` entries."""
+
+    def __init__(self, count: int, fail_after: int) -> None:
+        self.count = count
+        self.fail_after = fail_after
+        self.starts: list[int] = []
+
+    def iter_playlist(self, url: str, *, start: int = 1, **_: Any) -> Iterator[dict[str, Any]]:
+        self.starts.append(start)
+        for position in range(start, self.count + 1):
+            if self.fail_after and position > self.fail_after:
+                self.fail_after = 0
+                raise RuntimeError("connection reset")
+            yield {
+                "position": position,
+                "video_id": f"v{position}",
+                "title": f"Video {position}",
+                "url": f"https://www.youtube.com/watch?v=v{position}",
+            }
+
+
+@pytest.fixture
+def playlists(db: Database) -> PlaylistsRepository:
+    return PlaylistsRepository(db)
+
+
+def test_failed_listing_resumes_from_last_batch(
+    db: Database, playlists: PlaylistsRepository, transcripts: TranscriptsRepository
+) -> None:
+    jobs = JobsRepository(db)
+    listing = FlakyListing(count=25, fail_after=12)
+    importer = PlaylistImporter(
+        playlists=playlists,
+        jobs=jobs,
+        transcripts=transcripts,
+        info=listing,  # type: ignore[arg-type]
+        batch_size=5,
+    )
+    playlist, _ = playlists.create("https://youtube.com/@chan", "https://youtube.com/@chan")
+
+    assert importer.run_once()
+    failed = playlists.get(playlist["id"])
+    assert failed is not None
+    assert failed["status"] == "queued" and failed["error"] == "connection reset"
+    # Two full batches were recorded before the failure; the partial one was not.
+    assert (failed["next_index"], failed["entries"], failed["attempt"]) == (11, 10, 1)
+
+    db.conn.execute("UPDATE playlist_imports SET retry_after = NULL")
+    db.conn.commit()
+    assert importer.run_once()
+    done = playlists.get(playlist["id"])
+    assert done is not None
+    assert listing.starts == [1, 11]
+    assert (done["status"], done["entries"], done["enqueued"]) == ("completed", 25, 25)
+    assert done["error"] is None
+
+    videos, next_cursor = playlists.entries_page(playlist["id"], limit=20)
+    assert [video["position"] for video in videos] == list(range(1, 21))
+    rest, last_cursor = playlists.entries_page(playlist["id"], limit=20, cursor=next_cursor)
+    assert [video["position"] for video in rest] == list(range(21, 26))
+    assert last_cursor is None
+    assert len(jobs.get_many([str(video["job_id"]) for video in videos + rest])) == 25
+
+
+def test_interrupted_listing_is_requeued_and_batches_are_not_double_counted(
+    playlists: PlaylistsRepository,
+) -> None:
+    playlist, _ = playlists.create("https://youtube.com/@chan", "https://youtube.com/@chan")
+    claimed = playlists.claim_next()
+    assert claimed is not None and claimed["status"] == "listing"
+    assert playlists.claim_next() is None
+
+    entry = {
+        "position": 1,
+        "video_id": "v1",
+        "url": "https://www.youtube.com/watch?v=v1",
+        "job_id": "j1",
+        "status": "queued",
+        "deduplicated": False,
+    }
+    playlists.record_batch(playlist["id"], [entry], next_index=2)
+    playlists.record_batch(playlist["id"], [{**entry, "deduplicated": True}], next_index=2)
+    row = playlists.get(playlist["id"])
+    assert row is not None
+    assert (row["entries"], row["enqueued"], row["already_active"]) == (1, 1, 0)
+
+    assert playlists.requeue_interrupted() == 1
+    resumed = playlists.claim_next()
+    assert resumed is not None and resumed["next_index"] == 2
+
+
+def test_concurrent_imports_of_one_url_share_one_import(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.sqlite3", write_batch_window_seconds=0.001)
+    playlists = PlaylistsRepository(db)
+    url = "https://youtube.com/playlist?list=x"
+    start = threading.Barrier(16)
+
+    def create(_: int) -> tuple[dict[str, Any], bool]:
+        start.wait()
+        return playlists.create(url, url)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(create, range(16)))
+    assert len({playlist["id"] for playlist, _ in results}) == 1
+    assert sum(created for _, created in results) == 1
+
+    # Once the import has finished, the URL can be imported again.
+    playlists.mark_completed(results[0][0]["id"])
+    again, created = playlists.create(url, url)
+    assert created and again["id"] != results[0][0]["id"]
+
+
+def test_iter_playlist_keeps_tabs_and_newlines_in_titles(tmp_path: Path, monkeypatch: Any) -> None:
+    entries = [
+        {"playlist_index": 1, "id": "a", "title": "Tabs\tand\nnewlines", "uploader": "U\tV",
+         "duration": 61.0, "url": "https://www.youtube.com/watch?v=a"},
+        {"playlist_index": 2, "id": "b", "title": None, "uploader": None, "duration": None,
+         "url": None},
+        {"playlist_index": None, "id": "c"},
+    ]
+    script = tmp_path / "yt-dlp"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        + "".join(f"print({json.dumps(json.dumps(entry))})\n" for entry in entries),
+        encoding="utf-8",
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    assert list(YouTubeInfoService().iter_playlist("https://example.com/list")) == [
+        {
+            "position": 1,
+            "video_id": "a",
+            "title": "Tabs\tand\nnewlines",
+            "channel": "U\tV",
+            "duration": 61,
+            "url": "https://www.youtube.com/watch?v=a",
+        },
+        {
+            "position": 2,
+            "video_id": "b",
+            "title": None,
+            "channel": None,
+            "duration": None,
+            "url": "https://www.youtube.com/watch?v=b",
+        },
+    ]
@@ -0,0 +1,251 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from yt_dlp_mcp.services.compression import ArtifactCodec
+from yt_dlp_mcp.services.segment_file import SegmentFile, write_segment_file
+from yt_dlp_mcp.services.storage import (
+    StorageService,
+    TranscriptRenderer,
+    load_metadata,
+    load_transcript,
+    render_segments,
+    select_window,
+    to_json,
+    to_markdown,
+    to_plain_text,
+    to_srt,
+    to_vtt,
+)
+from yt_dlp_mcp.types import TranscriptResult, TranscriptSegment
+from yt_dlp_mcp.utils.cache import LRUCache
+
+_TRANSCRIPT = TranscriptResult(
+    text="Grüß dich. Hello there! Bye.",
+    language="de",
+    segments=[
+        TranscriptSegment(start=0.0, end=1.5, text="Grüß dich.", speaker="speaker_0"),
+        TranscriptSegment(start=1.5, end=4.25, text="Hello there!", speaker="speaker_1"),
+        TranscriptSegment(start=4.25, end=5.0, text="Bye.", speaker=None),
+    ],
+)
+
+
+def test_segment_file_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "segments.bin"
+    write_segment_file(path, _TRANSCRIPT)
+
+    segment_file = SegmentFile.open(path)
+    assert segment_file.count == 3
+    assert segment_file.speakers == ["speaker_0", "speaker_1"]
+    assert segment_file.full_text is None
+    assert segment_file.to_result() == _TRANSCRIPT
+    assert segment_file.segments(1, 2) == _TRANSCRIPT.segments[1:2]
+    assert segment_file.text_bytes(0, 1) == len("Grüß dich.".encode())
+
+    custom = TranscriptResult(text="different text", segments=_TRANSCRIPT.segments[:1])
+    write_segment_file(path, custom)
+    assert SegmentFile.open(path).to_result() == custom
+
+    write_segment_file(path, TranscriptResult(text="", segments=[]))
+    assert SegmentFile.open(path).to_result() == TranscriptResult(text="", segments=[])
+
+
+def test_persist_writes_segments_and_renders_lazily(tmp_path: Path) -> None:
+    storage = StorageService(tmp_path / "data")
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"audio")
+    metadata: dict[str, object] = {"id": "vid1", "title": "Video 1", "channel": "Chan"}
+    persisted = storage.persist(
+        metadata=metadata,
+        normalized_url="https://example.com/vid1",
+        source_url="https://example.com/vid1",
+        transcript=_TRANSCRIPT,
+        temp_audio_path=audio,
+    )
+    video_dir = Path(str(persisted["path"]))
+    assert sorted(p.name for p in video_dir.iterdir()) == [
+        "audio.mp3",
+        "metadata.json",
+        "segments.bin",
+    ]
+
+    renderer = TranscriptRenderer()
+    markdown = renderer.render(video_dir, "markdown")
+    assert markdown == to_markdown(
+        _TRANSCRIPT,
+        metadata={
+            **metadata,
+            "normalized_url": "https://example.com/vid1",
+            "source_url": "https://example.com/vid1",
+        },
+    )
+    assert renderer.render(video_dir, "text") == to_plain_text(_TRANSCRIPT)
+    assert json.loads(renderer.render(video_dir, "json") or "")["language"] == "de"
+    assert renderer.render(video_dir, "markdown") is markdown
+    assert renderer.cache_stats()["hits"] == 1
+
+
+def test_renderer_serves_legacy_layout(tmp_path: Path) -> None:
+    video_dir = tmp_path / "legacy"
+    video_dir.mkdir()
+    (video_dir / "transcript.md").write_text("# Legacy\n", encoding="utf-8")
+    (video_dir / "transcript.json").write_text(
+        json.dumps({"text": "hi", "segments": [{"start": 0, "end": 1, "text": "hi"}]}),
+        encoding="utf-8",
+    )
+
+    renderer = TranscriptRenderer()
+    assert renderer.render(video_dir, "markdown") == "# Legacy\n"
+    assert renderer.render(video_dir, "text") == "hi\n"
+    transcript = load_transcript(video_dir)
+    assert transcript is not None
+    assert [segment.text for segment in transcript.segments] == ["hi"]
+    assert renderer.render(tmp_path, "markdown") is None
+
+
+def test_select_window_time_range_limit_and_budget() -> None:
+    starts = np.arange(10, dtype=np.float64) * 10
+    ends = starts + 10
+    offsets = np.arange(11, dtype=np.uint64) * 40
+
+    assert select_window(starts, ends, offsets) == (0, 10, 10)
+    assert select_window(starts, ends, offsets, start_time=25, end_time=55) == (2, 6, 6)
+    assert select_window(starts, ends, offsets, offset=3, limit=2) == (3, 5, 10)
+    assert select_window(starts, ends, offsets, offset=8, limit=5) == (8, 10, 10)
+    assert select_window(starts, ends, offsets, start_time=20, max_tokens=25) == (2, 4, 10)
+    assert select_window(starts, ends, offsets, max_tokens=1) == (0, 1, 10)
+    assert select_window(starts, ends, offsets, start_time=500) == (10, 10, 10)
+
+
+def test_read_window_continues_from_offset(tmp_path: Path) -> None:
+    segments = [
+        TranscriptSegment(start=i * 10.0, end=i * 10.0 + 10, text=f"part {i}", speaker="A")
+        for i in range(6)
+    ]
+    transcript = TranscriptResult(text=" ".join(s.text for s in segments), segments=segments)
+    compact = tmp_path / "compact"
+    compact.mkdir()
+    write_segment_file(compact / "segments.bin", transcript)
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    (legacy / "transcript.json").write_text(to_json(transcript), encoding="utf-8")
+
+    renderer = TranscriptRenderer()
+    for video_dir in (compact, legacy):
+        window = renderer.read_window(video_dir, start_time=15, end_time=45, limit=2)
+        assert window is not None
+        assert window.segments == segments[1:3]
+        assert (window.offset, window.total, window.next_offset) == (1, 6, 3)
+
+        rest = renderer.read_window(video_dir, offset=window.next_offset, end_time=45, limit=2)
+        assert rest is not None
+        assert rest.segments == segments[3:5]
+        assert rest.next_offset is None
+
+    assert renderer.read_window(tmp_path, limit=1) is None
+
+
+def test_subtitle_formats() -> None:
+    assert to_srt(_TRANSCRIPT) == (
+        "1\n00:00:00,000 --> 00:00:01,500\n[Speaker 0] Grüß dich.\n\n"
+        "2\n00:00:01,500 --> 00:00:04,250\n[Speaker 1] Hello there!\n\n"
+        "3\n00:00:04,250 --> 00:00:05,000\nBye.\n"
+    )
+    assert to_vtt(_TRANSCRIPT) == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\n<v Speaker 0>Grüß dich.\n\n"
+        "00:00:01.500 --> 00:00:04.250\n<v Speaker 1>Hello there!\n\n"
+        "00:00:04.250 --> 00:00:05.000\nBye.\n"
+    )
+    assert render_segments(_TRANSCRIPT.segments[2:], "srt", offset=2).startswith("3\n")
+
+
+def test_render_cache_evicts_by_size(tmp_path: Path) -> None:
+    renderer = TranscriptRenderer(cache_bytes=500)
+    video_dir = tmp_path / "vid"
+    video_dir.mkdir()
+    write_segment_file(video_dir / "segments.bin", _TRANSCRIPT)
+
+    for fmt in ("srt", "vtt", "json", "srt"):
+        assert renderer.render(video_dir, fmt)
+    stats = renderer.cache_stats()
+    assert stats["bytes"] <= 500
+    assert stats["size"] < 3
+    assert stats["hits"] == 0
+
+    cache: LRUCache[str, str] = LRUCache(10, max_bytes=9, weigh=len)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.put("a", "aa")
+    cache.put("c", "cccc")
+    cache.put("huge", "x" * 10)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), cache.get("huge")) == ("aa", "cccc", None)
+    assert cache.stats()["bytes"] == 6
+
+
+def test_compressed_segment_file_reads_windows_across_blocks(tmp_path: Path) -> None:
+    segments = [
+        TranscriptSegment(
+            start=float(i), end=i + 1.0, text=f"segment {i} " + "lorem ipsum " * 4, speaker="A"
+        )
+        for i in range(3000)
+    ]
+    transcript = TranscriptResult(text=" ".join(s.text.strip() for s in segments), segments=segments)
+    path = tmp_path / "segments.bin"
+    plain_size = write_segment_file(path, transcript)
+    compressed_size = write_segment_file(path, transcript, ArtifactCodec())
+
+    segment_file = SegmentFile.open(path)
+    assert segment_file.blocks is not None and len(segment_file.blocks) > 2
+    assert compressed_size < plain_size / 3
+    assert segment_file.segments(1500, 1600) == segments[1500:1600]
+    assert segment_file.segments(2999) == segments[2999:]
+    assert segment_file.to_result() == transcript
+
+
+def test_compact_converts_legacy_and_plain_directories(tmp_path: Path) -> None:
+    plain = StorageService(tmp_path / "data")
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"audio")
+    metadata: dict[str, object] = {"id": "vid1", "title": "Video 1", "channel": "Chan"}
+    persisted = plain.persist(
+        metadata=metadata,
+        normalized_url="https://example.com/vid1",
+        source_url="https://example.com/vid1",
+        transcript=_TRANSCRIPT,
+        temp_audio_path=audio,
+    )
+    legacy = plain.transcripts_root / "YouTube" / "Chan" / "old"
+    legacy.mkdir(parents=True)
+    (legacy / "transcript.json").write_text(to_json(_TRANSCRIPT), encoding="utf-8")
+    (legacy / "transcript.md").write_text("# Old\n", encoding="utf-8")
+    (legacy / "metadata.json").write_text(json.dumps({"title": "Old"}), encoding="utf-8")
+
+    codec = ArtifactCodec(tmp_path / "data" / "_zstd")
+    storage = StorageService(tmp_path / "data", codec)
+    for index in range(200):
+        extra = storage.transcripts_root / "YouTube" / "Chan" / f"extra{index}"
+        extra.mkdir()
+        payload = {"id": f"extra{index}", "title": f"Episode {index}", "channel": "Chan"}
+        (extra / "metadata.json").write_text(json.dumps(payload), encoding="utf-8")
+    dict_id = storage.train_dictionary()
+    totals = storage.compact(workers=4)
+    assert totals["directories"] == 202
+    assert totals["errors"] == 0
+
+    video_dir = Path(str(persisted["path"]))
+    assert sorted(p.name for p in video_dir.iterdir()) == [
+        "audio.mp3",
+        "metadata.json.zst",
+        "segments.bin",
+    ]
+    assert sorted(p.name for p in legacy.iterdir()) == ["metadata.json.zst", "segments.bin"]
+
+    reader = TranscriptRenderer(codec=ArtifactCodec(tmp_path / "data" / "_zstd"))
+    assert reader.codec.dictionary_id == dict_id
+    assert reader.render(legacy, "markdown") == to_markdown(_TRANSCRIPT, {"title": "Old"})
+    assert load_metadata(video_dir, reader.codec)["title"] == "Video 1"
+    assert load_transcript(video_dir, reader.codec) == _TRANSCRIPT
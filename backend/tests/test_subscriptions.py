@@ -0,0 +1,120 @@
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.jobs import LOW_PRIORITY, JobsRepository
+from yt_dlp_mcp.db.subscriptions import SubscriptionsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptsRepository
+from yt_dlp_mcp.services.subscriptions import SubscriptionScheduler
+
+
+class ChannelListing:
+    """A channel whose uploads are listed newest first."""
+
+    def __init__(self, video_ids: list[str]) -> None:
+        self.video_ids = video_ids
+        self.consumed = 0
+
+    def upload(self, *video_ids: str) -> None:
+        self.video_ids[:0] = reversed(video_ids)
+
+    def iter_playlist(self, url: str, *, start: int = 1, **_: Any) -> Iterator[dict[str, Any]]:
+        self.consumed = 0
+        for position, video_id in enumerate(self.video_ids[start - 1 :], start=start):
+            self.consumed += 1
+            yield {
+                "position": position,
+                "video_id": video_id,
+                "title": video_id,
+                "url": f"https://www.youtube.com/watch?v={video_id}",
+            }
+
+
+def _unavailable(url: str, **_: Any) -> Iterator[dict[str, Any]]:
+    raise RuntimeError("channel unavailable")
+    yield {}
+
+
+def _scheduler(
+    db: Database, listing: ChannelListing
+) -> tuple[SubscriptionsRepository, JobsRepository, SubscriptionScheduler]:
+    subscriptions = SubscriptionsRepository(db)
+    jobs = JobsRepository(db)
+    scheduler = SubscriptionScheduler(
+        subscriptions=subscriptions,
+        jobs=jobs,
+        transcripts=TranscriptsRepository(db),
+        info=listing,  # type: ignore[arg-type]
+    )
+    return subscriptions, jobs, scheduler
+
+
+def test_sync_enqueues_only_videos_newer_than_last_seen(
+    db: Database, make_due: Callable[[str, str], None]
+) -> None:
+    listing = ChannelListing([f"old{i}" for i in range(100)])
+    subscriptions, jobs, scheduler = _scheduler(db, listing)
+    subscription, created = subscriptions.create(
+        "https://youtube.com/@chan", "https://youtube.com/@chan",
+        interval_seconds=3600, backfill=False,
+    )
+    assert created
+    assert subscriptions.create(
+        "https://youtube.com/@chan", "https://youtube.com/@chan",
+        interval_seconds=60, backfill=True,
+    ) == (subscription, False)
+
+    # The first sync records a baseline and enqueues nothing.
+    assert scheduler.run_once()
+    assert jobs.claim_next() is None
+    baseline = subscriptions.get(subscription["id"])
+    assert baseline is not None
+    assert baseline["known_video_ids"][:2] == ["old0", "old1"]
+    assert (baseline["syncs"], baseline["last_new"], baseline["last_enqueued"]) == (1, 0, 0)
+    assert not scheduler.run_once()
+
+    listing.upload("new1", "new2", "new3")
+    make_due("subscriptions", "next_sync_at")
+    assert scheduler.run_once()
+    # Listing stopped at the first known video instead of walking the channel.
+    assert listing.consumed == 4
+    synced = subscriptions.get(subscription["id"])
+    assert synced is not None
+    assert (synced["last_listed"], synced["last_new"], synced["last_enqueued"]) == (4, 3, 3)
+    assert synced["videos_enqueued"] == 3 and synced["last_error"] is None
+    assert synced["known_video_ids"][:4] == ["new3", "new2", "new1", "old0"]
+    assert len(synced["known_video_ids"]) == 50
+
+    queued = db.conn.execute("SELECT normalized_url, priority FROM jobs").fetchall()
+    assert sorted(row["normalized_url"][-4:] for row in queued) == ["new1", "new2", "new3"]
+    assert {row["priority"] for row in queued} == {LOW_PRIORITY}
+
+    # Subscription jobs wait behind on-demand ones.
+    jobs.enqueue_many([("https://youtu.be/ondemand", "https://www.youtube.com/watch?v=ondemand")])
+    claimed = jobs.claim_next()
+    assert claimed is not None and claimed["normalized_url"].endswith("ondemand")
+
+
+def test_backfill_and_failed_sync(db: Database) -> None:
+    listing = ChannelListing([f"v{i}" for i in range(10)])
+    subscriptions, _, scheduler = _scheduler(db, listing)
+    scheduler.max_videos_per_sync = 4
+    subscription, _ = subscriptions.create(
+        "https://youtube.com/@chan", "https://youtube.com/@chan",
+        interval_seconds=3600, backfill=True,
+    )
+
+    stats = scheduler.sync(subscription)
+    assert (stats["listed"], stats["new"], stats["enqueued"]) == (4, 4, 4)
+
+    listing.iter_playlist = _unavailable  # type: ignore[method-assign]
+    assert scheduler.sync(subscription) == {"error": "channel unavailable"}
+    failed = subscriptions.get(subscription["id"])
+    assert failed is not None
+    assert (failed["syncs"], failed["failures"]) == (1, 1)
+    assert failed["last_error"] == "channel unavailable"
+    assert subscriptions.stats()["failures"] == 1
+
+    assert subscriptions.delete(subscription["id"])
+    assert subscriptions.list_all() == []
+    assert db.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 4
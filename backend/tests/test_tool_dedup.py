@@ -1,10 +1,16 @@
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any
 
 from yt_dlp_mcp.db.database import Database
 from yt_dlp_mcp.db.jobs import JobsRepository
+from yt_dlp_mcp.db.playlists import PlaylistsRepository
 from yt_dlp_mcp.db.transcripts import TranscriptsRepository
 from yt_dlp_mcp.mcp_tools import ToolRegistry
+from yt_dlp_mcp.services.playlist_import import PlaylistImporter
+from yt_dlp_mcp.services.segment_file import write_segment_file
+from yt_dlp_mcp.services.youtube_info import YouTubeInfoService
+from yt_dlp_mcp.types import TranscriptResult, TranscriptSegment
 
 
 class DummyMCP:
@@ -22,28 +28,17 @@ class DummyMCP:
         return decorator
 
 
-def test_transcribe_returns_existing_transcript(tmp_path: Path) -> None:
-    db = Database(tmp_path / "test.sqlite3")
+def test_transcribe_returns_existing_transcript(
+    db: Database, transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
     jobs = JobsRepository(db)
-    transcripts = TranscriptsRepository(db)
 
-    transcripts.upsert(
-        video_id="abc",
+    add_transcript(
+        "abc",
+        "sample",
         normalized_url="https://youtube.com/watch?v=abc",
         url="https://youtube.com/watch?v=abc",
         path="/tmp/transcript/abc",
-        transcript_text="sample",
-        title="A",
-        channel="B",
-        platform="YouTube",
-        duration=None,
-        upload_date=None,
-        description=None,
-        thumbnail=None,
-        view_count=None,
-        speaker_count=None,
-        word_count=1,
-        confidence=None,
     )
 
     mcp = DummyMCP()
@@ -53,3 +48,222 @@ def test_transcribe_returns_existing_transcript(tmp_path: Path) -> None:
     assert response["deduplicated"] is True
     assert response["status"] == "completed"
     assert response["video_id"] == "abc"
+
+
+def test_transcribe_playlist_returns_handle_and_imports_in_batches(
+    db: Database, transcripts: TranscriptsRepository, monkeypatch: Any
+) -> None:
+    jobs = JobsRepository(db)
+    active = jobs.enqueue("https://youtube.com/watch?v=b", "https://youtube.com/watch?v=b")
+
+    entries = [
+        {
+            "position": position,
+            "video_id": vid,
+            "title": vid,
+            "url": f"https://www.youtube.com/watch?v={vid}",
+        }
+        for position, vid in enumerate(("a", "b", "c", "a"), start=1)
+    ]
+
+    def iter_playlist(self: Any, url: str, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        yield from entries
+
+    monkeypatch.setattr(YouTubeInfoService, "iter_playlist", iter_playlist)
+
+    mcp = DummyMCP()
+    playlists = PlaylistsRepository(db)
+    ToolRegistry(jobs, transcripts, playlists=playlists).register(mcp)  # type: ignore[arg-type]
+
+    handle = mcp.tools["transcribe_playlist"]("https://youtube.com/playlist?list=x")
+    assert handle["status"] == "queued" and handle["deduplicated"] is False
+    again = mcp.tools["transcribe_playlist"]("https://youtube.com/playlist?list=x")
+    assert again["playlist_id"] == handle["playlist_id"] and again["deduplicated"] is True
+
+    importer = PlaylistImporter(playlists=playlists, jobs=jobs, transcripts=transcripts)
+    before = db.writes.batches_committed
+    assert importer.run_once()
+    # Claim, one enqueue commit, one progress commit, completion.
+    assert db.writes.batches_committed == before + 4
+
+    response = mcp.tools["playlist_status"](handle["playlist_id"])
+    assert response["status"] == "completed"
+    assert (response["entries"], response["enqueued"], response["already_active"]) == (4, 2, 2)
+    videos = response["videos"]
+    assert videos[1]["job_id"] == active["id"]
+    assert videos[0]["job_id"] == videos[3]["job_id"]
+    assert mcp.tools["playlist_status"]("missing")["error"] == "playlist_not_found"
+
+
+def test_read_transcript_window_cursor(
+    tmp_path: Path,
+    db: Database,
+    transcripts: TranscriptsRepository,
+    add_transcript: Callable[..., int],
+) -> None:
+    jobs = JobsRepository(db)
+    video_dir = tmp_path / "abc"
+    video_dir.mkdir()
+    segments = [
+        TranscriptSegment(start=i * 10.0, end=i * 10.0 + 10, text=f"part {i}", speaker="A")
+        for i in range(5)
+    ]
+    write_segment_file(
+        video_dir / "segments.bin",
+        TranscriptResult(text=" ".join(s.text for s in segments), segments=segments),
+    )
+    add_transcript(
+        "abc",
+        "sample",
+        normalized_url="https://youtube.com/watch?v=abc",
+        url="https://youtube.com/watch?v=abc",
+        path=str(video_dir),
+    )
+
+    mcp = DummyMCP()
+    ToolRegistry(jobs, transcripts).register(mcp)  # type: ignore[arg-type]
+    read = mcp.tools["read_transcript"]
+
+    assert "part 4" in read("abc")["content"]
+    first = read("abc", limit=3)
+    assert first["segments"]["offset"] == 0
+    assert first["segments"]["count"] == 3
+    assert "part 2" in first["content"] and "part 3" not in first["content"]
+
+    rest = read("abc", cursor=first["next_cursor"])
+    assert rest["segments"]["offset"] == 3
+    assert rest["segments"]["count"] == 2
+    assert rest["next_cursor"] is None
+
+    assert read("other", cursor=first["next_cursor"])["error"] == "invalid_cursor"
+    assert read("abc", cursor="garbage")["error"] == "invalid_cursor"
+
+    srt = read("abc", format="srt", offset=3, limit=1)
+    assert srt["content"] == "4\n00:00:30,000 --> 00:00:40,000\n[A] part 3\n"
+    assert read("abc", format="vtt")["content"].startswith("WEBVTT\n")
+    assert read("abc", format="pdf")["error"] == "invalid_format"
+
+    # Results the caller already holds are revalidated without being resent.
+    etag = first["etag"]
+    assert read("abc", limit=3, if_none_match=etag) == {"not_modified": True, "etag": etag}
+    assert read("abc", limit=2, if_none_match=etag)["etag"] != etag
+    listed = mcp.tools["list_transcripts"]()
+    assert mcp.tools["list_transcripts"](if_none_match=listed["etag"])["not_modified"]
+    found = mcp.tools["search"]("sample")
+    assert mcp.tools["search"]("sample", if_none_match=found["etag"])["not_modified"]
+
+    # Storing the transcript again changes every etag.
+    add_transcript(
+        "abc",
+        "sample again",
+        normalized_url="https://youtube.com/watch?v=abc",
+        url="https://youtube.com/watch?v=abc",
+        path=str(video_dir),
+    )
+    db.conn.execute("UPDATE transcripts SET transcribed_at = datetime('now', '+1 minute')")
+    db.conn.commit()
+    assert "content" in read("abc", limit=3, if_none_match=etag)
+    assert "items" in mcp.tools["list_transcripts"](if_none_match=listed["etag"])
+    assert "results" in mcp.tools["search"]("sample", if_none_match=found["etag"])
+
+
+def test_transcribe_many_uses_set_based_queries(
+    db: Database, transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    jobs = JobsRepository(db)
+    add_transcript(
+        "done",
+        "sample",
+        normalized_url="https://youtube.com/live/done",
+        url="https://youtube.com/live/done",
+        path="/tmp/transcript/done",
+    )
+    active = jobs.enqueue("https://youtube.com/watch?v=busy", "https://youtube.com/watch?v=busy")
+
+    mcp = DummyMCP()
+    ToolRegistry(jobs, transcripts).register(mcp)  # type: ignore[arg-type]
+
+    urls = [
+        "https://www.youtube.com/watch?v=done",
+        "https://www.youtube.com/watch?v=busy",
+        "https://www.youtube.com/watch?v=new",
+        "https://youtu.be/new",
+        "https://www.youtube.com/watch?v=other",
+    ]
+    # A lookup reports what is already there and queues nothing.
+    before = db.writes.batches_committed
+    found = mcp.tools["find_transcriptions"](urls)["results"]
+    assert db.writes.batches_committed == before
+    assert found[0]["status"] == "completed" and found[0]["video_id"] == "done"
+    assert found[1]["job_id"] == active["id"] and found[1]["deduplicated"] is True
+    assert found[2:] == [{"error": "transcription_not_found", "url": url} for url in urls[2:]]
+
+    statements: list[str] = []
+    db.conn.set_trace_callback(statements.append)
+    response = mcp.tools["transcribe_many"](urls)
+    db.conn.set_trace_callback(None)
+
+    # Active jobs are found inside the enqueue commit, not by a separate query.
+    assert db.writes.batches_committed == before + 1
+    assert sum(s.lstrip().startswith("SELECT") for s in statements) == 1
+    results = response["results"]
+    assert [r["url"] for r in results] == urls
+    assert results[0]["status"] == "completed" and results[0]["video_id"] == "done"
+    assert results[1]["job_id"] == active["id"] and results[1]["deduplicated"] is True
+    assert results[2]["deduplicated"] is False
+    assert results[3]["job_id"] == results[2]["job_id"] and results[3]["deduplicated"] is True
+    assert results[4]["status"] == "queued"
+    assert (response["enqueued"], response["already_completed"], response["already_active"]) == (
+        2,
+        1,
+        2,
+    )
+    assert mcp.tools["transcribe_many"]([])["error"] == "empty_batch"
+
+
+def test_job_status_many_and_read_transcripts(
+    tmp_path: Path,
+    db: Database,
+    transcripts: TranscriptsRepository,
+    add_transcript: Callable[..., int],
+) -> None:
+    jobs = JobsRepository(db)
+    queued = jobs.enqueue("https://example.com/a", "https://example.com/a")
+    finished = jobs.enqueue("https://example.com/b", "https://example.com/b")
+    jobs.mark_completed(finished["id"], "b", "/tmp/b")
+
+    for video_id in ("one", "two"):
+        video_dir = tmp_path / video_id
+        video_dir.mkdir()
+        segments = [
+            TranscriptSegment(start=i * 10.0, end=i * 10.0 + 10, text=f"{video_id} {i}")
+            for i in range(20)
+        ]
+        write_segment_file(
+            video_dir / "segments.bin",
+            TranscriptResult(text=" ".join(s.text for s in segments), segments=segments),
+        )
+        add_transcript(video_id, "sample", path=str(video_dir), title=video_id.title())
+
+    mcp = DummyMCP()
+    ToolRegistry(jobs, transcripts).register(mcp)  # type: ignore[arg-type]
+
+    before = db.writes.batches_committed
+    statuses = mcp.tools["job_status_many"]([queued["id"], finished["id"], "missing"])
+    assert db.writes.batches_committed == before + 1
+    assert statuses["results"][0]["poll_count"] == 1
+    assert statuses["results"][0]["retry_after"] == 5
+    assert statuses["results"][1]["status"] == "completed"
+    assert statuses["results"][2] == {"error": "job_not_found", "job_id": "missing"}
+
+    read = mcp.tools["read_transcripts"]
+    whole = read(["two", "missing", "one"], format="text")["results"]
+    assert [r.get("title") for r in whole] == ["Two", None, "One"]
+    assert "two 19" in whole[0]["content"]
+    assert whole[1] == {"error": "transcript_not_found", "video_id": "missing"}
+
+    capped = read(["one"], max_tokens=20)["results"][0]
+    assert capped["segments"]["count"] < 20
+    rest = mcp.tools["read_transcript"]("one", cursor=capped["next_cursor"])
+    assert rest["segments"]["offset"] == capped["segments"]["count"]
+    assert read(["one"], format="pdf")["error"] == "invalid_format"
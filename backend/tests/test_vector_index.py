@@ -0,0 +1,123 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from yt_dlp_mcp.db.database import Database
+from yt_dlp_mcp.db.jobs import JobsRepository
+from yt_dlp_mcp.db.transcripts import TranscriptFilters, TranscriptsRepository
+from yt_dlp_mcp.mcp_tools import ToolRegistry
+from yt_dlp_mcp.services import vector_index
+from yt_dlp_mcp.services.vector_index import VectorIndex
+from yt_dlp_mcp.types import TranscriptSegment
+
+_TOPICS = {
+    "cooking": [
+        "whisk the eggs with sugar and butter before baking the cake",
+        "preheat the oven and bake the bread dough until golden",
+    ],
+    "baking": [
+        "bake the cake after you whisk eggs butter and sugar together",
+        "golden bread comes from a hot oven and well proofed dough",
+    ],
+    "rockets": [
+        "the rocket engine burns liquid oxygen and kerosene at launch",
+        "orbital velocity requires the second stage to burn for minutes",
+    ],
+}
+
+
+def _segments(texts: list[str]) -> list[TranscriptSegment]:
+    return [
+        TranscriptSegment(start=i * 10.0, end=i * 10.0 + 9, text=text)
+        for i, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture
+def vectors(tmp_path: Path, transcripts: TranscriptsRepository) -> VectorIndex:
+    vectors = VectorIndex(tmp_path / "vectors")
+    transcripts.subscribe_segments(vectors.index_transcript)
+    return vectors
+
+
+@pytest.fixture
+def tools(db: Database, transcripts: TranscriptsRepository, vectors: VectorIndex) -> ToolRegistry:
+    return ToolRegistry(JobsRepository(db), transcripts, vectors)
+
+
+def test_upsert_updates_vector_index_incrementally(
+    vectors: VectorIndex, tools: ToolRegistry, add_transcript: Callable[..., int]
+) -> None:
+    for video_id, texts in _TOPICS.items():
+        add_transcript(video_id, " ".join(texts), segments=_segments(texts))
+    assert vectors.stats()["live"] == 6
+
+    related = tools.related_transcripts("cooking", limit=5)
+    assert related is not None
+    assert [item["video_id"] for item in related] == ["baking", "rockets"]
+    assert tools.related_transcripts("missing", limit=5) is None
+
+    # Re-upserting replaces the transcript's vectors instead of duplicating them.
+    text = "kerosene and liquid oxygen feed the rocket engine"
+    add_transcript("rockets", text, segments=_segments([text]))
+    assert vectors.stats() == {"vectors": 7, "live": 5, "dim": 256}
+
+    results = tools.semantic_search("rocket engine oxygen", 2, TranscriptFilters())
+    assert results[0]["video_id"] == "rockets"
+    assert results[0]["snippet"] == "kerosene and liquid oxygen feed the rocket engine"
+    assert results[0]["start"] == 0.0
+
+
+def test_semantic_search_applies_filters(
+    tools: ToolRegistry, add_transcript: Callable[..., int]
+) -> None:
+    for video_id, channel in (("cooking", "kitchen"), ("baking", "bakery")):
+        texts = _TOPICS[video_id]
+        add_transcript(video_id, " ".join(texts), channel=channel, segments=_segments(texts))
+
+    results = tools.semantic_search("bake a cake", 5, TranscriptFilters(channel="bakery"))
+    assert [item["video_id"] for item in results] == ["baking"]
+
+
+def test_vector_index_persists_and_syncs(
+    tmp_path: Path, transcripts: TranscriptsRepository, add_transcript: Callable[..., int]
+) -> None:
+    for video_id, texts in _TOPICS.items():
+        add_transcript(video_id, " ".join(texts), segments=_segments(texts))
+
+    vectors = VectorIndex(tmp_path / "vectors")
+    assert vectors.sync(transcripts) == 3
+    assert vectors.sync(transcripts) == 0
+
+    reopened = VectorIndex(tmp_path / "vectors")
+    assert reopened.stats() == vectors.stats()
+    hits = reopened.search(reopened.embed_query("second stage orbital velocity"), 1)
+    assert hits[0][1] == transcripts.get_id("rockets")
+
+
+def test_reindexing_keeps_frequencies_and_compacts(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(vector_index, "COMPACT_MIN_DEAD_ROWS", 4)
+    segments = {
+        tid: list(enumerate(texts, start=tid * 10))
+        for tid, texts in enumerate(_TOPICS.values(), start=1)
+    }
+    fresh = VectorIndex(tmp_path / "fresh")
+    fresh.index_many(segments.items())
+
+    churned = VectorIndex(tmp_path / "churned")
+    churned.index_many(segments.items())
+    for _ in range(4):
+        churned.index_transcript(3, segments[3])
+    assert churned.stats() == {"vectors": 6, "live": 6, "dim": 256}
+    assert churned.docs == fresh.docs
+    assert np.array_equal(churned._df, fresh._df)
+
+    churned.index_transcript(1, [])
+    reopened = VectorIndex(tmp_path / "churned")
+    assert reopened.indexed_transcript_ids() == {2, 3}
+    assert [tid for tid, _ in reopened.related(2, 5)] == [3]
+    hits = reopened.search(reopened.embed_query("second stage orbital velocity"), 1)
+    assert hits[0][:2] == (31, 3)
@@ -1,3 +1,5 @@
+import threading
+import time
 from pathlib import Path
 
 from yt_dlp_mcp.db.database import Database
@@ -38,10 +40,10 @@ class FakeTranscriber:
         )
 
 
-def test_worker_processes_job(tmp_path: Path) -> None:
-    db = Database(tmp_path / "test.sqlite3")
+def test_worker_processes_job(
+    tmp_path: Path, db: Database, transcripts: TranscriptsRepository
+) -> None:
     jobs = JobsRepository(db)
-    transcripts = TranscriptsRepository(db)
     downloader = FakeDownloader(tmp_path / "work")
     transcriber = FakeTranscriber()
     storage = StorageService(tmp_path / "data")
@@ -72,3 +74,75 @@ def test_worker_processes_job(tmp_path: Path) -> None:
     saved = transcripts.get_by_video_id("vid1")
     assert saved is not None
     assert Path(str(saved["path"])).exists()
+
+
+def test_worker_backfills_segment_index(
+    tmp_path: Path, db: Database, transcripts: TranscriptsRepository
+) -> None:
+    jobs = JobsRepository(db)
+    storage = StorageService(tmp_path / "data")
+    worker = BackgroundWorker(
+        jobs=jobs,
+        transcripts=transcripts,
+        downloader=FakeDownloader(tmp_path / "work"),  # type: ignore[arg-type]
+        transcriber=FakeTranscriber(),  # type: ignore[arg-type]
+        storage=storage,
+        poll_interval_seconds=5,
+    )
+
+    job = jobs.enqueue("https://example.com/video", "https://example.com/video")
+    worker._process_job(
+        job_id=str(job["id"]),
+        url="https://example.com/video",
+        normalized_url="https://example.com/video",
+    )
+    db.conn.execute("DELETE FROM transcript_segments")
+    db.conn.commit()
+    assert transcripts.search_segments("hello") == []
+
+    worker._backfill_segment_index()
+    hits = transcripts.search_segments("hello")
+    assert [(hit["video_id"], hit["start"], hit["speaker"]) for hit in hits] == [("vid1", 0.0, "A")]
+
+
+def test_segment_backfill_does_not_hold_up_queued_jobs(
+    tmp_path: Path, db: Database, transcripts: TranscriptsRepository
+) -> None:
+    jobs = JobsRepository(db)
+    storage = StorageService(tmp_path / "data")
+    worker = BackgroundWorker(
+        jobs=jobs,
+        transcripts=transcripts,
+        downloader=FakeDownloader(tmp_path / "work"),  # type: ignore[arg-type]
+        transcriber=FakeTranscriber(),  # type: ignore[arg-type]
+        storage=storage,
+        poll_interval_seconds=5,
+    )
+    first = jobs.enqueue("https://example.com/first", "https://example.com/first")
+    worker._process_job(
+        job_id=str(first["id"]),
+        url="https://example.com/first",
+        normalized_url="https://example.com/first",
+    )
+    db.conn.execute("DELETE FROM transcript_segments")
+    db.conn.commit()
+
+    # The backfill stalls on its first transcript until released.
+    release = threading.Event()
+    load_transcript = storage.load_transcript
+
+    def slow_load(path: Path) -> TranscriptResult | None:
+        release.wait(10)
+        return load_transcript(path)
+
+    storage.load_transcript = slow_load  # type: ignore[method-assign]
+    queued = jobs.enqueue("https://example.com/second", "https://example.com/second")
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while (jobs.get(str(queued["id"])) or {}).get("status") != "completed":
+            assert time.monotonic() < deadline, "queued job waited on the backfill"
+            time.sleep(0.02)
+    finally:
+        release.set()
+        worker.stop()
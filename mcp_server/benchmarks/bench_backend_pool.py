@@ -0,0 +1,132 @@
+"""Per-call latency of proxied tool calls with and without the session pool.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_backend_pool.py [--calls N] [--concurrency N]
+
+Starts a local streamable-HTTP backend with a trivial tool, then makes the same
+calls once with a new session per call (a full MCP initialize handshake each
+time) and once through ``BackendPool``, sequentially and from ``--concurrency``
+concurrent callers, reporting mean/p50/p95 latency per call. Finally the
+backend is restarted under the pool to show that dropped sessions reconnect.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import uvicorn
+from fastmcp import Client, FastMCP
+from fastmcp.client.transports import StreamableHttpTransport
+
+from server import BackendClient, BackendPool
+
+HOST = "127.0.0.1"
+
+
+def _backend() -> FastMCP:
+    app = FastMCP("bench-backend")
+
+    @app.tool()
+    def echo(value: int) -> dict[str, Any]:
+        return {"value": value}
+
+    return app
+
+
+class _LocalBackend:
+    def __init__(self, port: int) -> None:
+        self.port = port
+        self.url = f"http://{HOST}:{port}/mcp"
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        config = uvicorn.Config(
+            _backend().http_app(path="/mcp"), host=HOST, port=self.port, log_level="error"
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        if self._server is not None and self._thread is not None:
+            self._server.should_exit = True
+            self._thread.join()
+
+
+async def _fresh_call(url: str, value: int) -> None:
+    async with Client(StreamableHttpTransport(url)) as client:
+        await client.call_tool("echo", {"value": value})
+
+
+async def _measure(
+    call: Callable[[int], Awaitable[Any]], calls: int, concurrency: int
+) -> list[float]:
+    latencies: list[float] = []
+
+    async def caller(offset: int) -> None:
+        for value in range(offset, calls, concurrency):
+            started = time.perf_counter()
+            await call(value)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(caller(offset) for offset in range(concurrency)))
+    return latencies
+
+
+def _report(label: str, latencies: list[float], elapsed: float) -> None:
+    ordered = sorted(latencies)
+    print(
+        f"{label:<24}{statistics.fmean(ordered):>10.2f}{ordered[len(ordered) // 2]:>10.2f}"
+        f"{ordered[int(len(ordered) * 0.95)]:>10.2f}{len(ordered) / elapsed:>12.0f}"
+    )
+
+
+async def _run(url: str, backend: _LocalBackend, calls: int, concurrency: int) -> None:
+    def factory() -> BackendClient:
+        return Client(StreamableHttpTransport(url))
+
+    pool = BackendPool(factory, size=concurrency)
+    print(f"{'mode':<24}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'calls/s':>12}")
+    for workers in sorted({1, concurrency}):
+        for label, call in (
+            ("new session", lambda value: _fresh_call(url, value)),
+            ("pooled", lambda value: pool.call_tool("echo", {"value": value})),
+        ):
+            started = time.perf_counter()
+            latencies = await _measure(call, calls, workers)
+            _report(f"{label} x{workers}", latencies, time.perf_counter() - started)
+
+    # Sessions held by the pool die with the backend; the next calls reconnect.
+    backend.stop()
+    backend.start()
+    before = pool.stats()["reconnects"]
+    await _measure(lambda value: pool.call_tool("echo", {"value": value}), concurrency, concurrency)
+    print(f"after backend restart: {pool.stats()['reconnects'] - before} reconnects, {pool.stats()}")
+    await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    backend = _LocalBackend(args.port)
+    backend.start()
+    try:
+        asyncio.run(_run(backend.url, backend, args.calls, max(args.concurrency, 1)))
+    finally:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
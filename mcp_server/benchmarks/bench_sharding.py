@@ -0,0 +1,358 @@
+"""Routing, merging and placement of ``ShardRouter`` across local backends.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_sharding.py [--shards N] [--videos N] [--port P]
+
+Starts ``--shards`` local streamable-HTTP backends, each a small stand-in for
+the real backend that keeps its transcripts in memory and reports its backlog
+on ``/healthz``, and drives them through ``ShardRouter``:
+
+- transcribes ``--videos`` YouTube URLs and reports how they spread over shards;
+- reads every transcript back by video_id, counting reads the owner missed;
+- pages through search and list_transcripts and checks the merged order
+  against one sorted list of every transcript, and that an etag revalidates;
+- reports a backlog on one shard and shows new work spilling past it;
+- measures the share of keys that move when a shard is added to the ring.
+
+A failed check raises AssertionError.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import statistics
+import threading
+import time
+import uuid
+from functools import partial
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import uvicorn
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from server import (
+    BackendPool,
+    HashRing,
+    ShardRouter,
+    _make_backend_client,
+    _probe_backend_load,
+    _shard_key,
+)
+
+HOST = "127.0.0.1"
+# Shared by every stand-in so transcription times are distinct across shards.
+_CLOCK = itertools.count(1)
+
+
+def _score(video_id: str) -> float:
+    """A stable stand-in for a bm25 rank, lower first."""
+    digest = hashlib.blake2b(video_id.encode(), digest_size=4).digest()
+    return -int.from_bytes(digest, "big") / 2**32
+
+
+class _Store:
+    def __init__(self) -> None:
+        self.transcripts: dict[str, dict[str, Any]] = {}
+        self.jobs: dict[str, str] = {}
+        self.backlog = 0
+        self.generation = 0
+
+    def transcribe(self, url: str) -> dict[str, Any]:
+        parts = urlsplit(url)
+        video_id = dict(parse_qsl(parts.query)).get("v") or parts.path.strip("/").split("/")[-1]
+        if video_id in self.transcripts:
+            return {"status": "completed", "deduplicated": True, "video_id": video_id}
+        self.generation += 1
+        tick = next(_CLOCK)
+        self.transcripts[video_id] = {
+            "video_id": video_id,
+            "title": f"Video {video_id}",
+            "platform": "Youtube",
+            "score": _score(video_id),
+            "transcribed_at": f"2026-01-01 00:00:{tick:06d}",
+        }
+        job_id = str(uuid.uuid4())
+        self.jobs[job_id] = video_id
+        return {"job_id": job_id, "status": "queued", "deduplicated": False}
+
+    def page(
+        self, key: str, descending: bool, limit: int, cursor: str | None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        rows = sorted(
+            self.transcripts.values(),
+            key=lambda row: (row[key], row["video_id"]),
+            reverse=descending,
+        )
+        if cursor is not None:
+            after = tuple(json.loads(cursor))
+            rows = [
+                row
+                for row in rows
+                if ((row[key], row["video_id"]) < after) == descending
+                and (row[key], row["video_id"]) != after
+            ]
+        items, more = rows[:limit], len(rows) > limit
+        next_cursor = json.dumps([items[-1][key], items[-1]["video_id"]]) if more else None
+        return [dict(item) for item in items], next_cursor
+
+    def etag(self, *parts: Any) -> str:
+        return hashlib.blake2b(
+            json.dumps([self.generation, *parts]).encode(), digest_size=8
+        ).hexdigest()
+
+
+def _backend(store: _Store) -> FastMCP:
+    app = FastMCP("bench-shard")
+
+    @app.tool()
+    def transcribe(url: str) -> dict[str, Any]:
+        return store.transcribe(url)
+
+    @app.tool()
+    def transcribe_many(urls: list[str]) -> dict[str, Any]:
+        results = [{"url": url, **store.transcribe(url)} for url in urls]
+        enqueued = sum(1 for result in results if not result["deduplicated"])
+        return {
+            "count": len(results),
+            "enqueued": enqueued,
+            "already_completed": len(results) - enqueued,
+            "already_active": 0,
+            "results": results,
+        }
+
+    @app.tool()
+    def read_transcript(video_id: str, format: str = "markdown") -> dict[str, Any]:
+        if video_id not in store.transcripts:
+            return {"error": "transcript_not_found", "video_id": video_id}
+        return {"video_id": video_id, "format": format, "content": f"# {video_id}"}
+
+    @app.tool()
+    def read_transcripts(video_ids: list[str], format: str = "markdown") -> dict[str, Any]:
+        results = [read_transcript(video_id, format) for video_id in video_ids]
+        return {"count": len(results), "results": results}
+
+    @app.tool()
+    def job_status(job_id: str) -> dict[str, Any]:
+        if job_id not in store.jobs:
+            return {"error": "job_not_found", "job_id": job_id}
+        return {"job_id": job_id, "status": "completed", "video_id": store.jobs[job_id]}
+
+    @app.tool()
+    def search(
+        query: str,
+        limit: int = 10,
+        facets: bool = True,
+        cursor: str | None = None,
+        mode: str = "lexical",
+        if_none_match: str | None = None,
+    ) -> dict[str, Any]:
+        etag = store.etag("search", query, limit, facets, cursor)
+        if if_none_match == etag:
+            return {"not_modified": True, "etag": etag}
+        results, next_cursor = store.page("score", False, limit, cursor)
+        response: dict[str, Any] = {
+            "query": query,
+            "results": results,
+            "next_cursor": next_cursor,
+            "etag": etag,
+        }
+        if facets and cursor is None:
+            response["facets"] = {
+                "platform": [{"value": "Youtube", "count": len(store.transcripts)}]
+            }
+        return response
+
+    @app.tool()
+    def list_transcripts(limit: int = 20, cursor: str | None = None) -> dict[str, Any]:
+        items, next_cursor = store.page("transcribed_at", True, limit, cursor)
+        return {"count": len(items), "items": items, "next_cursor": next_cursor}
+
+    @app.custom_route("/healthz", methods=["GET"])
+    async def health(_: Request) -> JSONResponse:
+        return JSONResponse({"ok": True, "jobs": {"queued": store.backlog}})
+
+    return app
+
+
+class _LocalBackend:
+    def __init__(self, port: int) -> None:
+        self.port = port
+        self.url = f"http://{HOST}:{port}/mcp"
+        self.store = _Store()
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        config = uvicorn.Config(
+            _backend(self.store).http_app(path="/mcp"),
+            host=HOST,
+            port=self.port,
+            log_level="error",
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        if self._server is not None and self._thread is not None:
+            self._server.should_exit = True
+            self._thread.join()
+
+
+def _url(i: int) -> str:
+    forms = (
+        "https://www.youtube.com/watch?v={}",
+        "https://youtu.be/{}",
+        "https://m.youtube.com/watch?v={}&si=share",
+    )
+    return forms[i % len(forms)].format(f"vid{i:05d}")
+
+
+def _router(backends: list[_LocalBackend], **kwargs: Any) -> ShardRouter:
+    return ShardRouter(
+        [backend.url for backend in backends],
+        lambda url: BackendPool(partial(_make_backend_client, url), size=8),
+        _probe_backend_load,
+        **kwargs,
+    )
+
+
+async def _walk(router: ShardRouter, name: str, args: dict[str, Any], key: str) -> list[str]:
+    seen: list[str] = []
+    cursor = None
+    while True:
+        response = await router.call_tool(name, {**args, **({"cursor": cursor} if cursor else {})})
+        assert "error" not in response, response
+        seen.extend(item["video_id"] for item in response[key])
+        cursor = response["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+async def _run(backends: list[_LocalBackend], videos: int) -> None:
+    router = _router(backends, load_ttl_seconds=0)
+    stores = {backend.url: backend.store for backend in backends}
+
+    # Placement onto idle shards: videos land on their ring owner unless a batch
+    # fills an owner past the load bound.
+    started = time.perf_counter()
+    for offset in range(0, videos, 50):
+        batch = [_url(i) for i in range(offset, min(offset + 50, videos))]
+        response = await router.call_tool("transcribe_many", {"urls": batch})
+        assert response["count"] == len(batch), response
+    print(f"transcribed {videos} videos in {time.perf_counter() - started:.2f}s")
+    for url, store in stores.items():
+        print(f"  {url}: {len(store.transcripts)} transcripts")
+    on_owner = sum(
+        1
+        for url, store in stores.items()
+        for video_id in store.transcripts
+        if router.ring.owner(video_id) == url
+    )
+    print(f"  on their ring owner: {on_owner} of {videos}, {router.stats()['spilled']} spilled")
+
+    # Reads by video_id go to the owner; only spilled videos need a fallback.
+    latencies = []
+    for i in range(videos):
+        started = time.perf_counter()
+        response = await router.call_tool("read_transcript", {"video_id": f"vid{i:05d}"})
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert "error" not in response, response
+    missing = await router.call_tool("read_transcript", {"video_id": "unknown"})
+    print(
+        f"read_transcript: mean {statistics.fmean(latencies):.2f} ms, "
+        f"fallbacks {router.stats()['fallbacks'] - 1} (+1 for an unknown id: {missing['error']})"
+    )
+    batch = {"video_ids": [f"vid{i:05d}" for i in range(0, videos, max(videos // 40, 1))]}
+    response = await router.call_tool("read_transcripts", batch)
+    assert all("error" not in result for result in response["results"]), response
+    print(f"read_transcripts: {response['count']} results, all found")
+
+    # Fan-out pages merged in rank and recency order, each video exactly once.
+    expected = sorted(
+        (video_id for store in stores.values() for video_id in store.transcripts),
+        key=lambda video_id: (_score(video_id), video_id),
+    )
+    seen = await _walk(router, "search", {"query": "video", "limit": 7}, "results")
+    assert seen == expected, "search pages are not in merged rank order"
+    print(f"search: {len(seen)} results over all pages in merged order")
+    first = await router.call_tool("search", {"query": "video", "limit": 7})
+    total = sum(entry["count"] for entry in first["facets"]["platform"])
+    revalidated = await router.call_tool(
+        "search", {"query": "video", "limit": 7, "if_none_match": first["etag"]}
+    )
+    assert total == len(expected), (total, len(expected))
+    assert revalidated.get("not_modified"), revalidated
+    print(f"  facets count {total}, etag revalidates")
+    listed = await _walk(router, "list_transcripts", {"limit": 9}, "items")
+    newest_first = [
+        row["video_id"]
+        for row in sorted(
+            (row for store in stores.values() for row in store.transcripts.values()),
+            key=lambda row: (row["transcribed_at"], row["video_id"]),
+            reverse=True,
+        )
+    ]
+    assert listed == newest_first, "list_transcripts pages are not newest first"
+    print(f"list_transcripts: {len(listed)} items newest first")
+
+    # A backlog on one shard: new videos it owns spill to the next shard along the ring.
+    busy = backends[0]
+    busy.store.backlog = 50
+    before = dict(router.stats())
+    extra = [_url(i) for i in range(videos, videos + 60)]
+    owned = sum(1 for url in extra if router.ring.owner(_shard_key(url)) == busy.url)
+    held = len(busy.store.transcripts)
+    await router.call_tool("transcribe_many", {"urls": extra})
+    assert len(busy.store.transcripts) - held < owned, "nothing spilled past the backlog"
+    print(
+        f"with a backlog of 50 on {busy.url}: it owns {owned} of 60 new videos, "
+        f"took {len(busy.store.transcripts) - held}; "
+        f"spilled {router.stats()['spilled'] - before['spilled']}"
+    )
+    spilled_id = next(
+        _shard_key(url) for url in extra if router.ring.owner(_shard_key(url)) == busy.url
+    )
+    response = await router.call_tool("read_transcript", {"video_id": spilled_id})
+    assert "error" not in response, response
+    print("  a spilled video is still readable")
+    await router.close()
+
+    # Adding a shard moves only the keys of the ring segments it takes over.
+    keys = [f"vid{i:05d}" for i in range(20000)]
+    urls = [backend.url for backend in backends]
+    ring, grown = HashRing(urls), HashRing([*urls, "http://new-shard/mcp"])
+    moved = sum(1 for key in keys if ring.owner(key) != grown.owner(key))
+    print(
+        f"adding shard {len(urls) + 1}: {moved / len(keys):.1%} of keys move "
+        f"(ideal {1 / (len(urls) + 1):.1%})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--videos", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8770)
+    args = parser.parse_args()
+
+    backends = [_LocalBackend(args.port + i) for i in range(max(args.shards, 2))]
+    for backend in backends:
+        backend.start()
+    try:
+        asyncio.run(_run(backends, args.videos))
+    finally:
+        for backend in backends:
+            backend.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,36 +6,932 @@ proxies all tool calls to the backend service protected by Cloudflare Access.
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import bisect
+import hashlib
+import json
+import logging
+import math
 import os
-from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from contextlib import AsyncExitStack
+from functools import partial
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+import anyio
+import httpx
 from fastmcp import Client, FastMCP
 from fastmcp.client.transports import StreamableHttpTransport
+from fastmcp.exceptions import McpError, ToolError
 from mcp.types import ToolAnnotations
 
 BACKEND_URL = os.environ.get("BACKEND_URL", "https://yt-cli.pantainos.net/mcp")
+# Shards of the backend; a comma-separated list that defaults to BACKEND_URL alone.
+BACKEND_URLS = [
+    url.strip() for url in os.environ.get("BACKEND_URLS", BACKEND_URL).split(",") if url.strip()
+]
+BACKEND_LOAD_PATH = os.environ.get("BACKEND_LOAD_PATH", "/load")
 CF_CLIENT_ID = os.environ.get("CF_ACCESS_CLIENT_ID", "")
 CF_CLIENT_SECRET = os.environ.get("CF_ACCESS_CLIENT_SECRET", "")
+BACKEND_POOL_SIZE = int(os.environ.get("BACKEND_POOL_SIZE", "8"))
+BACKEND_KEEPALIVE_SECONDS = float(os.environ.get("BACKEND_KEEPALIVE_SECONDS", "30"))
+BACKEND_IDLE_TIMEOUT_SECONDS = float(os.environ.get("BACKEND_IDLE_TIMEOUT_SECONDS", "300"))
+BACKEND_ACQUIRE_TIMEOUT_SECONDS = float(os.environ.get("BACKEND_ACQUIRE_TIMEOUT_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "1024"))
+CACHE_TRANSCRIPT_TTL_SECONDS = float(os.environ.get("CACHE_TRANSCRIPT_TTL_SECONDS", "86400"))
+CACHE_METADATA_TTL_SECONDS = float(os.environ.get("CACHE_METADATA_TTL_SECONDS", "3600"))
+CACHE_SEARCH_TTL_SECONDS = float(os.environ.get("CACHE_SEARCH_TTL_SECONDS", "60"))
+SHARD_VIRTUAL_NODES = int(os.environ.get("SHARD_VIRTUAL_NODES", "128"))
+SHARD_LOAD_FACTOR = float(os.environ.get("SHARD_LOAD_FACTOR", "1.25"))
+SHARD_LOAD_SLACK = int(os.environ.get("SHARD_LOAD_SLACK", "10"))
+SHARD_LOAD_TTL_SECONDS = float(os.environ.get("SHARD_LOAD_TTL_SECONDS", "5"))
 
+logger = logging.getLogger(__name__)
 
-def _make_backend_client() -> Client:
-    """Create a backend MCP client with Cloudflare Access headers."""
+BackendClient = Client[StreamableHttpTransport]
+
+
+def _access_headers() -> dict[str, str]:
+    """Cloudflare Access service token headers, if configured."""
     headers = {}
     if CF_CLIENT_ID and CF_CLIENT_SECRET:
         headers["CF-Access-Client-Id"] = CF_CLIENT_ID
         headers["CF-Access-Client-Secret"] = CF_CLIENT_SECRET
+    return headers
+
 
-    transport = StreamableHttpTransport(BACKEND_URL, headers=headers)
+def _make_backend_client(url: str = BACKEND_URL) -> BackendClient:
+    """Create a backend MCP client with Cloudflare Access headers."""
+    transport = StreamableHttpTransport(url, headers=_access_headers())
     return Client(transport)
 
 
-@asynccontextmanager
-async def _backend_session() -> AsyncIterator[Client]:
-    """Context manager for backend client sessions."""
-    client = _make_backend_client()
-    async with client:
-        yield client
+async def _probe_backend_load(url: str) -> int:
+    """Active jobs of the backend at ``url``, from its load endpoint."""
+    parts = urlsplit(url)
+    load_url = urlunsplit((parts.scheme, parts.netloc, BACKEND_LOAD_PATH, "", ""))
+    async with httpx.AsyncClient(headers=_access_headers(), timeout=5) as client:
+        response = await client.get(load_url)
+        response.raise_for_status()
+        return sum(int(count) for count in response.json().get("jobs", {}).values())
+
+
+class BackendBusyError(Exception):
+    """No backend session became free within the acquire timeout."""
+
+
+# Failures of the session rather than of the call: the connection, or the
+# stream the backend answered on, is gone.
+_SESSION_ERRORS = (
+    httpx.HTTPError,
+    OSError,
+    RuntimeError,
+    anyio.BrokenResourceError,
+    anyio.ClosedResourceError,
+)
+
+
+class BackendPool:
+    """Initialized backend sessions reused across tool calls.
+
+    Opening a session costs a full MCP initialize handshake through Cloudflare
+    Access, so sessions are opened on demand and kept. At most ``size`` calls
+    run at once, each on a session of its own; more wait up to
+    ``acquire_timeout_seconds`` for one. A keepalive task pings idle sessions
+    and closes those that fail or have not been used for
+    ``idle_timeout_seconds``. A call that fails other than with a tool or
+    protocol error drops its session and is retried once on a new one; every
+    backend tool is idempotent.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], BackendClient],
+        *,
+        size: int = 8,
+        keepalive_seconds: float = 30,
+        idle_timeout_seconds: float = 300,
+        acquire_timeout_seconds: float = 30,
+    ) -> None:
+        self._factory = factory
+        self.size = max(size, 1)
+        self.keepalive_seconds = keepalive_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.acquire_timeout_seconds = acquire_timeout_seconds
+        self._slots = asyncio.Semaphore(self.size)
+        # Idle sessions with when they were last used, most recent last.
+        self._idle: list[tuple[BackendClient, float]] = []
+        self._sessions: dict[BackendClient, AsyncExitStack] = {}
+        # Closes started from synchronous code, kept referenced until they finish.
+        self._closing: set[asyncio.Task[None]] = set()
+        self._keepalive: asyncio.Task[None] | None = None
+        self._stats = {
+            "calls": 0,
+            "in_use": 0,
+            "opened": 0,
+            "reused": 0,
+            "reconnects": 0,
+            "closed": 0,
+            "rejected": 0,
+        }
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> Any:
+        if self._keepalive is None or self._keepalive.done():
+            self._keepalive = asyncio.create_task(self._keepalive_loop())
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout_seconds)
+        except TimeoutError:
+            self._stats["rejected"] += 1
+            raise BackendBusyError(f"All {self.size} backend sessions are busy") from None
+        self._stats["calls"] += 1
+        self._stats["in_use"] += 1
+        try:
+            try:
+                return await self._call_on(await self._checkout(), name, args)
+            except (ToolError, McpError):
+                raise
+            except _SESSION_ERRORS as exc:
+                # Most likely a session the backend or a proxy has dropped.
+                logger.warning("Backend session failed, reconnecting: %s", exc)
+                self._stats["reconnects"] += 1
+                return await self._call_on(await self._open(), name, args)
+        finally:
+            self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._stats, "size": self.size, "idle": len(self._idle)}
+
+    async def close(self) -> None:
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            await self._close(client)
+        await asyncio.gather(*self._closing)
+
+    async def _call_on(self, client: BackendClient, name: str, args: dict[str, Any]) -> Any:
+        """Call on ``client``; it goes back to the pool unless the session failed."""
+        try:
+            result = await client.call_tool(name, args)
+        except (ToolError, McpError):
+            self._checkin(client)
+            raise
+        except BaseException:
+            await self._close(client)
+            raise
+        self._checkin(client)
+        return result
+
+    async def _checkout(self) -> BackendClient:
+        if self._idle:
+            self._stats["reused"] += 1
+            return self._idle.pop()[0]
+        return await self._open()
+
+    def _checkin(self, client: BackendClient) -> None:
+        if len(self._idle) >= self.size:
+            task = asyncio.create_task(self._close(client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+            return
+        self._idle.append((client, time.monotonic()))
+
+    async def _open(self) -> BackendClient:
+        client = self._factory()
+        stack = AsyncExitStack()
+        await stack.enter_async_context(client)
+        self._sessions[client] = stack
+        self._stats["opened"] += 1
+        return client
+
+    async def _close(self, client: BackendClient) -> None:
+        stack = self._sessions.pop(client, None)
+        if stack is None:
+            return
+        self._stats["closed"] += 1
+        try:
+            await stack.aclose()
+        except Exception:  # pylint: disable=broad-except
+            logger.debug("Closing a backend session failed", exc_info=True)
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_seconds)
+            now = time.monotonic()
+            # Taken out while pinged, so calls meanwhile open new sessions
+            # instead of sharing one with the ping.
+            idle, self._idle = self._idle, []
+            alive: list[tuple[BackendClient, float]] = []
+            for client, last_used in idle:
+                if now - last_used > self.idle_timeout_seconds or not await self._ping(client):
+                    await self._close(client)
+                else:
+                    alive.append((client, last_used))
+            room = max(self.size - len(self._idle), 0)
+            self._idle[:0] = alive[:room]
+            for client, _ in alive[room:]:
+                await self._close(client)
+
+    async def _ping(self, client: BackendClient) -> bool:
+        try:
+            await asyncio.wait_for(client.ping(), timeout=10)
+        except McpError:
+            # The backend answered, just not with a pong.
+            return True
+        except _SESSION_ERRORS:
+            return False
+        return True
+
+
+class ResponseCache:
+    """Backend results kept in the proxy per tool and arguments.
+
+    A result younger than its tool's TTL is served without calling the
+    backend. An older one is revalidated: the call is forwarded with the
+    result's ``etag`` as ``if_none_match`` and a ``not_modified`` reply renews
+    it without the body crossing the tunnel. Only results carrying an etag are
+    kept, at most ``max_entries`` of them, least recently used evicted first.
+    """
+
+    def __init__(self, ttls: dict[str, float], *, max_entries: int = 1024) -> None:
+        self.ttls = ttls
+        self.max_entries = max(max_entries, 0)
+        self._entries: OrderedDict[str, tuple[dict[str, Any], str, float]] = OrderedDict()
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0}
+
+    async def call(
+        self,
+        name: str,
+        args: dict[str, Any],
+        forward: Callable[[str, dict[str, Any]], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        ttl = self.ttls.get(name, 0)
+        if ttl <= 0 or self.max_entries == 0:
+            return await forward(name, args)
+        key = f"{name}:{json.dumps(args, sort_keys=True, separators=(',', ':'))}"
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            response = await forward(name, args)
+        else:
+            result, etag, stored_at = entry
+            if time.monotonic() - stored_at < ttl:
+                self._stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return result
+            response = await forward(name, {**args, "if_none_match": etag})
+            if response.get("not_modified") and response.get("etag") == etag:
+                self._stats["revalidated"] += 1
+                self._store(key, result, etag)
+                return result
+            self._stats["misses"] += 1
+        new_etag = response.get("etag")
+        if isinstance(new_etag, str) and "error" not in response:
+            self._store(key, response, new_etag)
+        else:
+            self._entries.pop(key, None)
+        return response
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["revalidated"] + self._stats["misses"]
+        served = self._stats["hits"] + self._stats["revalidated"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": round(served / lookups, 4) if lookups else None,
+        }
+
+    def _store(self, key: str, result: dict[str, Any], etag: str) -> None:
+        self._entries[key] = (result, etag, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Upper bound of the backend's batch tools; larger batches go to one shard,
+# which rejects them with the backend's own error.
+_MAX_BATCH = 100
+
+_YT_HOSTS = frozenset({"youtube.com", "m.youtube.com", "youtu.be"})
+
+
+def _shard_key(url: str) -> str:
+    """The ring key of a video URL: its YouTube video ID, else the normalized URL.
+
+    Mirrors the backend's normalize_url, so a YouTube video is stored on the
+    shard that reads by its video_id are routed to.
+    """
+    parts = urlsplit(url.strip())
+    if not parts.scheme:
+        parts = urlsplit(f"https://{url.strip()}")
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/")
+    if host in _YT_HOSTS:
+        video_id: str | None = None
+        if host == "youtu.be":
+            video_id = path.strip("/")
+        elif path == "/watch":
+            video_id = dict(parse_qsl(parts.query)).get("v")
+        else:
+            for prefix in ("/shorts/", "/embed/", "/v/", "/live/"):
+                if path.startswith(prefix):
+                    video_id = path[len(prefix) :].strip("/")
+        if video_id:
+            return video_id
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def _route_key(args: dict[str, Any]) -> str:
+    if "url" in args:
+        return _shard_key(str(args["url"]))
+    return str(args.get("video_id") or args.get("query") or "")
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of keys onto shards.
+
+    Each shard sits at ``replicas`` points of a ring of 64-bit hashes and a key
+    belongs to the first shard clockwise from its own hash, so adding or
+    removing a shard only moves the keys of the ring segments it gains or loses.
+    """
+
+    def __init__(self, shards: Sequence[str], *, replicas: int = 128) -> None:
+        self.shards = list(dict.fromkeys(shards))
+        if not self.shards:
+            raise ValueError("A hash ring needs at least one shard")
+        points = sorted(
+            (_ring_hash(f"{shard}#{i}"), shard)
+            for shard in self.shards
+            for i in range(max(replicas, 1))
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def owner(self, key: str) -> str:
+        return self._owners[bisect.bisect(self._hashes, _ring_hash(key)) % len(self._owners)]
+
+    def preference(self, key: str) -> list[str]:
+        """Every shard once, in ring order from the owner of ``key`` on."""
+        start = bisect.bisect(self._hashes, _ring_hash(key))
+        order: list[str] = []
+        for i in range(len(self._owners)):
+            shard = self._owners[(start + i) % len(self._owners)]
+            if shard not in order:
+                order.append(shard)
+                if len(order) == len(self.shards):
+                    break
+        return order
+
+
+# Tools that must always reach the same shard for the same key. A playlist
+# import stays with its owner, which holds the dedup of its active imports.
+_OWNED = frozenset(
+    {
+        "transcribe_playlist",
+        "subscribe",
+        "ingest_comments",
+        "get_metadata",
+        "get_comments",
+        "yt_search",
+    }
+)
+# Lookups by key or ID, with the error a shard returns when it does not hold it.
+_LOCATED = {
+    "read_transcript": "transcript_not_found",
+    "related_transcripts": "transcript_not_found",
+    "job_status": "job_not_found",
+    "playlist_status": "playlist_not_found",
+    "unsubscribe": "subscription_not_found",
+}
+# Batched lookups: the list argument, the ID field of each result and the
+# per-item not-found error.
+_PER_ITEM = {
+    "read_transcripts": ("video_ids", "video_id", "transcript_not_found"),
+    "job_status_many": ("job_ids", "job_id", "job_not_found"),
+}
+# The error a fan-out reports for a shard that could not be reached.
+_UNAVAILABLE = "shard_unavailable"
+# Ranked or ordered pages merged across shards: item list and sort field.
+_MERGED = {
+    "search": ("results", "score"),
+    "search_segments": ("results", "score"),
+    "search_comments": ("results", "score"),
+    "list_transcripts": ("items", "transcribed_at"),
+}
+
+
+def _pack(value: dict[str, Any]) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _unpack(token: str) -> dict[str, Any]:
+    try:
+        value = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(value, dict):
+        raise TypeError("Malformed cursor")
+    return value
+
+
+def _pick(responses: Sequence[dict[str, Any]], missing: str) -> dict[str, Any]:
+    """The first success, else the first error other than ``missing``, else ``missing``."""
+    for response in responses:
+        if "error" not in response:
+            return response
+    for response in responses:
+        if response.get("error") != missing:
+            return response
+    return responses[0]
+
+
+def _unavailable(shard: str, exc: BaseException) -> dict[str, Any]:
+    logger.warning("Shard %s is unavailable: %s", shard, exc)
+    return {"error": _UNAVAILABLE, "shard": shard, "message": str(exc) or type(exc).__name__}
+
+
+def _reachable(
+    shards: Sequence[str], responses: Sequence[dict[str, Any]]
+) -> tuple[list[int], list[str]]:
+    """Indexes of the responses from reachable shards, and the shards that were not."""
+    reachable = [i for i, r in enumerate(responses) if r.get("error") != _UNAVAILABLE]
+    return reachable, [s for s, r in zip(shards, responses) if r.get("error") == _UNAVAILABLE]
+
+
+def _merge_facets(facets: Sequence[dict[str, list[dict[str, Any]]]]) -> dict[str, Any]:
+    """Add up per-shard facet counts, ordered as the backend orders them."""
+    merged: dict[str, Any] = {}
+    for name in dict.fromkeys(name for shard_facets in facets for name in shard_facets):
+        counts: dict[Any, int] = {}
+        for shard_facets in facets:
+            for entry in shard_facets.get(name, []):
+                counts[entry["value"]] = counts.get(entry["value"], 0) + int(entry["count"])
+        if name == "year":
+            ordered = sorted(counts.items(), key=lambda entry: str(entry[0] or ""), reverse=True)
+        else:
+            ordered = sorted(counts.items(), key=lambda entry: entry[1], reverse=True)
+        if name == "channel":
+            ordered = ordered[: max(len(shard_facets.get(name, [])) for shard_facets in facets)]
+        merged[name] = [{"value": value, "count": count} for value, count in ordered]
+    return merged
+
+
+class ShardRouter:
+    """Backend tool calls routed across shards, each with a BackendPool of its own.
+
+    Transcripts are placed by consistent hashing on the video ID, or on the
+    normalized URL where there is none, so a read by video_id goes straight to
+    the shard holding the transcript; when that shard does not have it, the
+    other shards are asked. New transcription work goes to the owner unless its
+    backlog of active jobs exceeds both ``load_slack`` and ``load_factor`` times
+    the average, and then to the next shard along the ring within that bound
+    (consistent hashing with bounded loads), so the least-loaded shards absorb
+    bursts without scattering every video. A video the owner already has a
+    transcript or active job for stays with it. Backlogs come from ``load_probe``
+    and are cached for ``load_ttl_seconds``. Searches and listings fan out to every shard and are
+    merged by score or recency; their cursors and etags hold one position or
+    etag per shard. A shard that cannot be reached is left out of a fan-out and
+    listed under ``unavailable_shards`` rather than failing the whole call.
+    With a single shard every call passes straight through.
+    """
+
+    def __init__(
+        self,
+        shards: Sequence[str],
+        pool_factory: Callable[[str], BackendPool],
+        load_probe: Callable[[str], Awaitable[int]],
+        *,
+        replicas: int = 128,
+        load_factor: float = 1.25,
+        load_slack: int = 10,
+        load_ttl_seconds: float = 5,
+    ) -> None:
+        self.ring = HashRing(shards, replicas=replicas)
+        self.shards = self.ring.shards
+        self.pools = {shard: pool_factory(shard) for shard in self.shards}
+        self._load_probe = load_probe
+        self.load_factor = max(load_factor, 1.0)
+        self.load_slack = max(load_slack, 1)
+        self.load_ttl_seconds = load_ttl_seconds
+        self._loads: dict[str, int | None] = {}
+        self._loads_at = -math.inf
+        self._loads_lock = asyncio.Lock()
+        self._stats = {"placed_on_owner": 0, "spilled": 0, "fallbacks": 0, "fan_outs": 0}
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> dict[str, Any]:
+        if len(self.shards) == 1:
+            return await self._call(self.shards[0], name, args)
+        if name == "transcribe":
+            url = str(args.get("url") or "")
+            return await self._call((await self._place_urls([url]))[_shard_key(url)], name, args)
+        if name == "transcribe_many":
+            return await self._transcribe_many(args)
+        if name in _LOCATED:
+            return await self._locate(name, args, _LOCATED[name])
+        if name in _PER_ITEM:
+            return await self._per_item(name, args, *_PER_ITEM[name])
+        if name in _MERGED:
+            return await self._merged(name, args, *_MERGED[name])
+        if name == "list_subscriptions":
+            return await self._list_subscriptions(args)
+        return await self._call(self.ring.owner(_route_key(args)), name, args)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "shards": {
+                shard: {**pool.stats(), "load": self._loads.get(shard)}
+                for shard, pool in self.pools.items()
+            },
+        }
+
+    async def close(self) -> None:
+        for pool in self.pools.values():
+            await pool.close()
+
+    async def _call(self, shard: str, name: str, args: dict[str, Any]) -> dict[str, Any]:
+        try:
+            result = await self.pools[shard].call_tool(name, args)
+        except BackendBusyError as exc:
+            return {"error": "busy", "retry_after": 1, "message": str(exc)}
+        except _SESSION_ERRORS as exc:
+            return _unavailable(shard, exc)
+        return _extract_result(result)
+
+    async def _fan_out(
+        self, shards: Sequence[str], name: str, args: Sequence[dict[str, Any]] | dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        """Call ``name`` on every one of ``shards``, with one args dict each or shared.
+
+        Failures other than the backend's own tool errors become ``shard_unavailable``
+        responses, so one shard cannot fail the calls the others answer.
+        """
+        self._stats["fan_outs"] += 1
+        per_shard = [args] * len(shards) if isinstance(args, dict) else list(args)
+        results = await asyncio.gather(
+            *(self._call(shard, name, shard_args) for shard, shard_args in zip(shards, per_shard)),
+            return_exceptions=True,
+        )
+        responses: list[dict[str, Any]] = []
+        for shard, result in zip(shards, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, (ToolError, McpError)) or not isinstance(result, Exception):
+                    raise result
+                result = _unavailable(shard, result)
+            responses.append(result)
+        return responses
+
+    async def _loads_now(self) -> dict[str, int | None]:
+        async with self._loads_lock:
+            if time.monotonic() - self._loads_at >= self.load_ttl_seconds:
+                probed = await asyncio.gather(
+                    *(self._load_probe(shard) for shard in self.shards), return_exceptions=True
+                )
+                for shard, load in zip(self.shards, probed):
+                    if isinstance(load, BaseException):
+                        logger.warning("Probing the load of %s failed: %s", shard, load)
+                        self._loads[shard] = None
+                    else:
+                        self._loads[shard] = load
+                self._loads_at = time.monotonic()
+            return self._loads
+
+    async def _place(self, keys: Sequence[str]) -> dict[str, str]:
+        """For each key, the first shard along the ring from it whose backlog is within bounds.
+
+        Shards whose load could not be probed are passed over.
+        """
+        loads = await self._loads_now()
+        placed: dict[str, str] = {}
+        for key in keys:
+            if key in placed:
+                continue
+            order = self.ring.preference(key)
+            known = [load for shard in order if (load := loads.get(shard)) is not None]
+            shard = order[0]
+            if known:
+                bound = max(
+                    math.ceil(self.load_factor * (sum(known) + 1) / len(known)), self.load_slack
+                )
+                shard = next(
+                    (s for s in order if (load := loads.get(s)) is not None and load < bound),
+                    order[0],
+                )
+                # Counted until the next probe, so a burst spreads instead of piling up.
+                loads[shard] = (loads.get(shard) or 0) + 1
+            self._stats["placed_on_owner" if shard == order[0] else "spilled"] += 1
+            placed[key] = shard
+        return placed
+
+    async def _place_urls(self, urls: Sequence[str]) -> dict[str, str]:
+        """``_place`` for the keys of video URLs, spilling only work the owner does not have.
+
+        A URL that would spill is first looked up on its owner, and one the owner
+        already holds a transcript or an active job for is sent there instead,
+        so no other shard transcribes it a second time. When the owner cannot be
+        reached the spill stands.
+        """
+        keys = [_shard_key(url) for url in urls]
+        placed = await self._place(keys)
+        spilled: dict[str, dict[str, str]] = {}
+        for key, url in zip(keys, urls):
+            owner = self.ring.owner(key)
+            if placed[key] != owner:
+                spilled.setdefault(owner, {}).setdefault(key, url)
+        if not spilled:
+            return placed
+        owners = list(spilled)
+        responses = await self._fan_out(
+            owners,
+            "find_transcriptions",
+            [{"urls": list(spilled[owner].values())} for owner in owners],
+        )
+        for owner, response in zip(owners, responses):
+            if "error" in response:
+                continue
+            for key, result in zip(spilled[owner], response["results"]):
+                if "error" not in result:
+                    self._unspill(placed[key])
+                    placed[key] = owner
+        return placed
+
+    def _unspill(self, shard: str) -> None:
+        """Take back a placement on ``shard`` that went to the owner after all."""
+        if (load := self._loads.get(shard)) is not None:
+            self._loads[shard] = max(load - 1, 0)
+        self._stats["spilled"] -= 1
+        self._stats["placed_on_owner"] += 1
+
+    async def _transcribe_many(self, args: dict[str, Any]) -> dict[str, Any]:
+        urls = args.get("urls")
+        if not isinstance(urls, list) or not urls or len(urls) > _MAX_BATCH:
+            return await self._call(self.shards[0], "transcribe_many", args)
+        keys = [_shard_key(str(url)) for url in urls]
+        placed = await self._place_urls([str(url) for url in urls])
+        groups: dict[str, list[int]] = {}
+        for index, key in enumerate(keys):
+            groups.setdefault(placed[key], []).append(index)
+        shards = list(groups)
+        responses = await self._fan_out(
+            shards,
+            "transcribe_many",
+            [{**args, "urls": [urls[i] for i in groups[shard]]} for shard in shards],
+        )
+        results: list[Any] = [None] * len(urls)
+        for shard, response in zip(shards, responses):
+            if response.get("error") == _UNAVAILABLE:
+                for index in groups[shard]:
+                    results[index] = {**response, "url": urls[index]}
+                continue
+            if "error" in response:
+                return response
+            for index, result in zip(groups[shard], response["results"]):
+                results[index] = result
+        merged: dict[str, Any] = {
+            field: sum(int(response.get(field, 0)) for response in responses)
+            for field in ("enqueued", "already_completed", "already_active")
+        }
+        return {"count": len(urls), **merged, "results": results}
+
+    async def _locate(self, name: str, args: dict[str, Any], missing: str) -> dict[str, Any]:
+        """Ask the owner of the key first, the rest only if it does not know it or is down.
+
+        Lookups by job, playlist or subscription ID have no key and ask every shard.
+        """
+        key = str(args.get("video_id") or "")
+        if not key:
+            return _pick(await self._fan_out(self.shards, name, args), missing)
+        order = self.ring.preference(key)
+        first = await self._call(order[0], name, args)
+        if first.get("error") not in (missing, _UNAVAILABLE):
+            return first
+        self._stats["fallbacks"] += 1
+        return _pick([first, *await self._fan_out(order[1:], name, args)], missing)
+
+    async def _per_item(
+        self, name: str, args: dict[str, Any], items_key: str, id_field: str, missing: str
+    ) -> dict[str, Any]:
+        """Batched ``_locate``: items go to their owners, misses to every other shard.
+
+        An item no reachable shard holds is reported as ``shard_unavailable`` when
+        some shard could not be asked, since it may be there.
+        """
+        items = args.get(items_key)
+        if not isinstance(items, list) or not items or len(items) > _MAX_BATCH:
+            return await self._call(self.shards[0], name, args)
+        results: list[dict[str, Any]] = [{"error": missing, id_field: item} for item in items]
+        if items_key == "video_ids":
+            groups: dict[str, list[int]] = {}
+            for index, item in enumerate(items):
+                groups.setdefault(self.ring.owner(str(item)), []).append(index)
+            shards = list(groups)
+            responses = await self._fan_out(
+                shards, name, [{**args, items_key: [items[i] for i in groups[s]]} for s in shards]
+            )
+            for shard, response in zip(shards, responses):
+                if response.get("error") == _UNAVAILABLE:
+                    continue
+                if "error" in response:
+                    return response
+                for index, result in zip(groups[shard], response["results"]):
+                    results[index] = result
+        remaining = [i for i, result in enumerate(results) if result.get("error") == missing]
+        if remaining:
+            if items_key == "video_ids":
+                self._stats["fallbacks"] += 1
+            responses = await self._fan_out(
+                self.shards, name, {**args, items_key: [items[i] for i in remaining]}
+            )
+            for response in responses:
+                if "error" in response and response["error"] != _UNAVAILABLE:
+                    return response
+            for position, index in enumerate(remaining):
+                found = [
+                    {**r, id_field: items[index]} if "error" in r else r["results"][position]
+                    for r in responses
+                ]
+                results[index] = _pick([results[index], *found], missing)
+        return {"count": len(results), "results": results}
+
+    async def _merged(
+        self, name: str, args: dict[str, Any], items_key: str, sort_key: str
+    ) -> dict[str, Any]:
+        """One page merged from every shard that still has results.
+
+        The cursor maps each such shard to the backend cursor of the last item
+        served from it, so its next page starts right after that item. Items
+        without a cursor of their own, such as semantic matches, are counted
+        instead: the cursor then also holds how many items of the page it starts
+        at were already served. Merging stops where a shard with more results
+        runs out of fetched ones, so no item is skipped.
+        """
+        limit = int(args.get("limit") or 10)
+        # bm25 ranks lower first; similarity and recency higher first.
+        descending = sort_key != "score" or args.get("mode") == "semantic"
+        positions: dict[str, tuple[str | None, int]] = {s: (None, 0) for s in self.shards}
+        if args.get("cursor") is not None:
+            try:
+                positions = {
+                    shard: (position[0], int(position[1]))
+                    for shard, position in _unpack(str(args["cursor"])).items()
+                    if shard in self.pools
+                }
+            except (ValueError, TypeError, IndexError) as exc:
+                return {"error": "invalid_cursor", "message": str(exc)}
+        shards = list(positions)
+        base = {k: v for k, v in args.items() if k not in ("cursor", "if_none_match")}
+        shard_args: list[dict[str, Any]] = []
+        for shard in shards:
+            shard_cursor, skip = positions[shard]
+            call_args = {**base, "limit": limit + skip}
+            if shard_cursor is not None:
+                call_args["cursor"] = shard_cursor
+            shard_args.append(call_args)
+
+        pages: list[dict[str, Any]] | None = None
+        if isinstance(args.get("if_none_match"), str):
+            try:
+                etags = _unpack(args["if_none_match"])
+            except (ValueError, TypeError):
+                etags = {}
+            if all(isinstance(etags.get(shard), str) for shard in shards):
+                pages = await self._fan_out(
+                    shards,
+                    name,
+                    [{**a, "if_none_match": etags[s]} for s, a in zip(shards, shard_args)],
+                )
+                if all(page.get("not_modified") for page in pages):
+                    return {"not_modified": True, "etag": args["if_none_match"]}
+                stale = [i for i, page in enumerate(pages) if page.get("not_modified")]
+                refetched = await self._fan_out(
+                    [shards[i] for i in stale], name, [shard_args[i] for i in stale]
+                )
+                for i, page in zip(stale, refetched):
+                    pages[i] = page
+        if pages is None:
+            pages = await self._fan_out(shards, name, shard_args)
+        for page in pages:
+            if "error" in page and page["error"] != _UNAVAILABLE:
+                return page
+        reachable, unavailable = _reachable(shards, pages)
+        if not reachable:
+            return pages[0]
+
+        candidates = [
+            page.get(items_key, [])[positions[s][1] :] if "error" not in page else []
+            for s, page in zip(shards, pages)
+        ]
+        more = [page.get("next_cursor") is not None for page in pages]
+        used = [0] * len(shards)
+        merged: list[dict[str, Any]] = []
+        while len(merged) < limit:
+            if any(more[i] and used[i] == len(candidates[i]) for i in range(len(shards))):
+                break
+            heads = [i for i in range(len(shards)) if used[i] < len(candidates[i])]
+            if not heads:
+                break
+            pick = min if not descending else max
+            best = pick(heads, key=lambda i: candidates[i][used[i]][sort_key])
+            # Shard cursors mean nothing to the caller, whose cursor is the merged one.
+            merged.append({k: v for k, v in candidates[best][used[best]].items() if k != "cursor"})
+            used[best] += 1
+
+        next_positions: dict[str, tuple[str | None, int]] = {}
+        for i, shard in enumerate(shards):
+            if shard in unavailable:
+                # Asked again from where it was on the next page.
+                next_positions[shard] = positions[shard]
+            elif used[i] < len(candidates[i]):
+                last = candidates[i][used[i] - 1] if used[i] else {}
+                if isinstance(last.get("cursor"), str):
+                    next_positions[shard] = (last["cursor"], 0)
+                else:
+                    next_positions[shard] = (positions[shard][0], positions[shard][1] + used[i])
+            elif more[i]:
+                next_positions[shard] = (pages[i]["next_cursor"], 0)
+
+        response = dict(pages[reachable[0]])
+        response[items_key] = merged
+        if "count" in response:
+            response["count"] = len(merged)
+        if "next_cursor" in response:
+            response["next_cursor"] = _pack(next_positions) if next_positions else None
+        facets = [page["facets"] for page in pages if "facets" in page]
+        if facets:
+            response["facets"] = _merge_facets(facets)
+        if "pending" in response:
+            response["pending"] = [item for page in pages for item in page.get("pending", [])]
+        # A page missing a shard has no etag, so it is never cached or revalidated.
+        if all(isinstance(page.get("etag"), str) for page in pages):
+            response["etag"] = _pack({s: page["etag"] for s, page in zip(shards, pages)})
+        else:
+            response.pop("etag", None)
+        if unavailable:
+            response["unavailable_shards"] = unavailable
+        return response
+
+    async def _list_subscriptions(self, args: dict[str, Any]) -> dict[str, Any]:
+        responses = await self._fan_out(self.shards, "list_subscriptions", args)
+        for response in responses:
+            if "error" in response and response["error"] != _UNAVAILABLE:
+                return response
+        reachable, unavailable = _reachable(self.shards, responses)
+        if not reachable:
+            return responses[0]
+        subscriptions = [s for i in reachable for s in responses[i]["subscriptions"]]
+        result: dict[str, Any] = {"count": len(subscriptions), "subscriptions": subscriptions}
+        if unavailable:
+            result["unavailable_shards"] = unavailable
+        return result
+
+
+_router = ShardRouter(
+    BACKEND_URLS,
+    lambda url: BackendPool(
+        partial(_make_backend_client, url),
+        size=BACKEND_POOL_SIZE,
+        keepalive_seconds=BACKEND_KEEPALIVE_SECONDS,
+        idle_timeout_seconds=BACKEND_IDLE_TIMEOUT_SECONDS,
+        acquire_timeout_seconds=BACKEND_ACQUIRE_TIMEOUT_SECONDS,
+    ),
+    _probe_backend_load,
+    replicas=SHARD_VIRTUAL_NODES,
+    load_factor=SHARD_LOAD_FACTOR,
+    load_slack=SHARD_LOAD_SLACK,
+    load_ttl_seconds=SHARD_LOAD_TTL_SECONDS,
+)
+
+
+_cache = ResponseCache(
+    {
+        "read_transcript": CACHE_TRANSCRIPT_TTL_SECONDS,
+        "get_metadata": CACHE_METADATA_TTL_SECONDS,
+        "search": CACHE_SEARCH_TTL_SECONDS,
+        "list_transcripts": CACHE_SEARCH_TTL_SECONDS,
+    },
+    max_entries=CACHE_MAX_ENTRIES,
+)
+
+
+async def _call_backend(name: str, args: dict[str, Any]) -> dict[str, Any]:
+    """Call a backend tool, through the response cache for the tools it covers."""
+    return await _cache.call(name, args, _forward)
+
+
+async def _forward(name: str, args: dict[str, Any]) -> dict[str, Any]:
+    """Call a backend tool on a pooled session of the shard or shards it routes to."""
+    return await _router.call_tool(name, args)
 
 
 mcp = FastMCP("yt-dlp-mcp")
@@ -52,24 +948,95 @@ async def transcribe(url: str) -> dict[str, Any]:
     Returns:
         Job status with job_id for tracking, or completed transcript info if deduplicated.
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool("transcribe", {"url": url})
-        return _extract_result(result)
+    return await _call_backend("transcribe", {"url": url})
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+async def transcribe_many(urls: list[str]) -> dict[str, Any]:
+    """Queue several videos for transcription in one call.
+
+    Args:
+        urls: Video URLs to transcribe (at most 100)
+
+    Returns:
+        One transcribe result per URL, in order; repeated URLs share one job.
+    """
+    return await _call_backend("transcribe_many", {"urls": urls})
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
 async def transcribe_playlist(url: str) -> dict[str, Any]:
-    """Queue all videos in a playlist for transcription.
+    """Queue all videos in a playlist or channel for transcription.
+
+    The listing runs in the background and enqueues videos in batches as they
+    are found, with dedup applied per-video; an interrupted listing resumes.
 
     Args:
         url: Playlist URL (YouTube playlist, channel, etc.)
 
     Returns:
-        List of enqueued jobs (one per video), with dedup applied per-video.
+        A playlist_id to follow with playlist_status().
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool("transcribe_playlist", {"url": url})
-        return _extract_result(result)
+    return await _call_backend("transcribe_playlist", {"url": url})
+
+
+@mcp.tool(annotations=_ro)
+async def playlist_status(
+    playlist_id: str, limit: int = 100, cursor: str | None = None
+) -> dict[str, Any]:
+    """Get the progress of a playlist import and the videos it has enqueued.
+
+    Args:
+        playlist_id: The playlist_id returned from transcribe_playlist()
+        limit: Maximum number of videos to return (default: 100, max: 500)
+        cursor: next_cursor from a previous call, to fetch the following videos
+
+    Returns:
+        Import status and counts, plus one page of videos with their job_id.
+    """
+    args: dict[str, Any] = {"playlist_id": playlist_id, "limit": limit}
+    args.update(_filter_args(cursor=cursor))
+
+    return await _call_backend("playlist_status", args)
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+async def subscribe(
+    url: str, interval_hours: float = 24, backfill: bool = False
+) -> dict[str, Any]:
+    """Follow a channel or playlist and transcribe its new videos as they appear.
+
+    Args:
+        url: Channel or playlist URL
+        interval_hours: Hours between syncs (default: 24, min: 0.25)
+        backfill: Also transcribe videos already published (up to the per-sync cap)
+
+    Returns:
+        The subscription_id and its settings; an existing subscription is reused.
+    """
+    args = {"url": url, "interval_hours": interval_hours, "backfill": backfill}
+    return await _call_backend("subscribe", args)
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+async def unsubscribe(subscription_id: str) -> dict[str, Any]:
+    """Stop syncing a subscription; jobs it already queued are kept.
+
+    Args:
+        subscription_id: The subscription_id returned from subscribe()
+    """
+    return await _call_backend("unsubscribe", {"subscription_id": subscription_id})
+
+
+@mcp.tool(annotations=_ro)
+async def list_subscriptions() -> dict[str, Any]:
+    """List subscriptions with their sync statistics.
+
+    Returns:
+        Per subscription: totals, the last sync's listed/new/enqueued counts and
+        duration, and when it last synced and will sync next.
+    """
+    return await _call_backend("list_subscriptions", {})
 
 
 @mcp.tool(annotations=_ro)
@@ -82,25 +1049,107 @@ async def job_status(job_id: str) -> dict[str, Any]:
     Returns:
         Current job status including: queued, downloading, transcribing, completed, or failed.
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool("job_status", {"job_id": job_id})
-        return _extract_result(result)
+    return await _call_backend("job_status", {"job_id": job_id})
 
 
 @mcp.tool(annotations=_ro)
-async def search(query: str, limit: int = 10) -> dict[str, Any]:
+async def job_status_many(job_ids: list[str]) -> dict[str, Any]:
+    """Get the status of several transcription jobs in one call.
+
+    Args:
+        job_ids: Job IDs returned from transcribe() or transcribe_many() (at most 100)
+
+    Returns:
+        One job_status result per ID, in order.
+    """
+    return await _call_backend("job_status_many", {"job_ids": job_ids})
+
+
+@mcp.tool(annotations=_ro)
+async def search(
+    query: str,
+    limit: int = 10,
+    platform: str | None = None,
+    channel: str | None = None,
+    upload_date_from: str | None = None,
+    upload_date_to: str | None = None,
+    min_duration: float | None = None,
+    max_duration: float | None = None,
+    facets: bool = True,
+    cursor: str | None = None,
+    mode: str = "lexical",
+) -> dict[str, Any]:
     """Search transcripts by content.
 
     Args:
         query: Search query string
         limit: Maximum number of results (default: 10)
+        platform: Only transcripts from this platform (e.g. "Youtube")
+        channel: Only transcripts from this channel
+        upload_date_from: Earliest upload date, YYYYMMDD or YYYY-MM-DD
+        upload_date_to: Latest upload date, YYYYMMDD or YYYY-MM-DD
+        min_duration: Minimum duration in seconds
+        max_duration: Maximum duration in seconds
+        facets: Include platform/channel/year counts over all matches (default: true)
+        cursor: next_cursor from a previous call, to fetch the following page
+        mode: "lexical" for full-text ranking (default) or "semantic" for vector similarity
 
     Returns:
-        Matching transcripts with relevance scores.
+        Matching transcripts with relevance scores, next_cursor, plus facet counts.
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool("search", {"query": query, "limit": limit})
-        return _extract_result(result)
+    args: dict[str, Any] = {"query": query, "limit": limit, "facets": facets, "mode": mode}
+    args.update(
+        _filter_args(
+            platform=platform,
+            channel=channel,
+            upload_date_from=upload_date_from,
+            upload_date_to=upload_date_to,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            cursor=cursor,
+        )
+    )
+
+    return await _call_backend("search", args)
+
+
+@mcp.tool(annotations=_ro)
+async def search_segments(
+    query: str,
+    limit: int = 10,
+    context: int = 1,
+    video_id: str | None = None,
+) -> dict[str, Any]:
+    """Search individual transcript segments and return timestamped hits.
+
+    Args:
+        query: Full-text search query
+        limit: Maximum number of hits (default: 10, max: 50)
+        context: Neighbouring segments to include on each side (default: 1, max: 5)
+        video_id: Restrict the search to one transcript
+
+    Returns:
+        Matching segments with start/end seconds, speaker, and surrounding context.
+    """
+    args: dict[str, Any] = {"query": query, "limit": limit, "context": context}
+    if video_id is not None:
+        args["video_id"] = video_id
+
+    return await _call_backend("search_segments", args)
+
+
+@mcp.tool(annotations=_ro)
+async def related_transcripts(video_id: str, limit: int = 10) -> dict[str, Any]:
+    """Find transcripts whose content is most similar to a given transcript.
+
+    Args:
+        video_id: The transcript to compare against
+        limit: Maximum number of results (default: 10, max: 50)
+
+    Returns:
+        Transcript metadata with a similarity score, most similar first.
+    """
+    return await _call_backend("related_transcripts", {"video_id": video_id, "limit": limit})
 
 
 @mcp.tool(annotations=_ro)
@@ -108,6 +1157,12 @@ async def list_transcripts(
     platform: str | None = None,
     channel: str | None = None,
     limit: int = 20,
+    upload_date_from: str | None = None,
+    upload_date_to: str | None = None,
+    min_duration: float | None = None,
+    max_duration: float | None = None,
+    facets: bool = False,
+    cursor: str | None = None,
 ) -> dict[str, Any]:
     """List available transcripts.
 
@@ -115,34 +1170,97 @@ async def list_transcripts(
         platform: Filter by platform (e.g., "youtube")
         channel: Filter by channel name
         limit: Maximum number of results (default: 20)
+        upload_date_from: Earliest upload date, YYYYMMDD or YYYY-MM-DD
+        upload_date_to: Latest upload date, YYYYMMDD or YYYY-MM-DD
+        min_duration: Minimum duration in seconds
+        max_duration: Maximum duration in seconds
+        facets: Include platform/channel/year counts over all matches (default: false)
+        cursor: next_cursor from a previous call, to fetch the following page
 
     Returns:
-        List of transcript metadata.
+        List of transcript metadata and next_cursor.
     """
-    args: dict[str, Any] = {"limit": limit}
-    if platform is not None:
-        args["platform"] = platform
-    if channel is not None:
-        args["channel"] = channel
+    args: dict[str, Any] = {"limit": limit, "facets": facets}
+    args.update(
+        _filter_args(
+            platform=platform,
+            channel=channel,
+            upload_date_from=upload_date_from,
+            upload_date_to=upload_date_to,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            cursor=cursor,
+        )
+    )
 
-    async with _backend_session() as backend:
-        result = await backend.call_tool("list_transcripts", args)
-        return _extract_result(result)
+    return await _call_backend("list_transcripts", args)
 
 
 @mcp.tool(annotations=_ro)
-async def read_transcript(video_id: str) -> dict[str, Any]:
-    """Read a transcript by video ID. Returns full speaker-diarized markdown.
+async def read_transcript(
+    video_id: str,
+    format: str = "markdown",
+    start_time: float | None = None,
+    end_time: float | None = None,
+    offset: int | None = None,
+    limit: int | None = None,
+    max_tokens: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    """Read a transcript by video ID, by default as speaker-diarized markdown.
+
+    Without window arguments the whole transcript is returned. With any of them
+    only the selected segments are returned, plus next_cursor while more remain.
 
     Args:
         video_id: The video ID to read
+        format: "markdown" (default), "text", "json", "srt" or "vtt"
+        start_time: Start of a time window in seconds
+        end_time: End of a time window in seconds
+        offset: Index of the first segment to return (overrides start_time)
+        limit: Maximum number of segments to return
+        max_tokens: Approximate token budget for the returned text
+        cursor: next_cursor from a previous call, to continue the same window
 
     Returns:
-        Full markdown transcript with speaker labels and timestamps.
+        The transcript in the requested format, plus the window served.
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool("read_transcript", {"video_id": video_id})
-        return _extract_result(result)
+    args: dict[str, Any] = {"video_id": video_id, "format": format}
+    args.update(
+        _filter_args(
+            start_time=start_time,
+            end_time=end_time,
+            offset=offset,
+            limit=limit,
+            max_tokens=max_tokens,
+            cursor=cursor,
+        )
+    )
+
+    return await _call_backend("read_transcript", args)
+
+
+@mcp.tool(annotations=_ro)
+async def read_transcripts(
+    video_ids: list[str],
+    format: str = "markdown",
+    max_tokens: int | None = None,
+) -> dict[str, Any]:
+    """Read several transcripts in one call.
+
+    Args:
+        video_ids: The video IDs to read (at most 100)
+        format: "markdown" (default), "text", "json", "srt" or "vtt"
+        max_tokens: Approximate token budget per transcript; a transcript cut short
+            carries next_cursor for read_transcript to continue
+
+    Returns:
+        One read_transcript result per video ID, in order.
+    """
+    args: dict[str, Any] = {"video_ids": video_ids, "format": format}
+    args.update(_filter_args(max_tokens=max_tokens))
+
+    return await _call_backend("read_transcripts", args)
 
 
 @mcp.tool(annotations=_ro)
@@ -156,9 +1274,7 @@ async def yt_search(query: str, limit: int = 10) -> dict[str, Any]:
     Returns:
         Matching YouTube videos with title, channel, duration, and view count.
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool("yt_search", {"query": query, "limit": limit})
-        return _extract_result(result)
+    return await _call_backend("yt_search", {"query": query, "limit": limit})
 
 
 @mcp.tool(annotations=_ro)
@@ -171,9 +1287,7 @@ async def get_metadata(url: str) -> dict[str, Any]:
     Returns:
         Complete video metadata from yt-dlp.
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool("get_metadata", {"url": url})
-        return _extract_result(result)
+    return await _call_backend("get_metadata", {"url": url})
 
 
 @mcp.tool(annotations=_ro)
@@ -188,11 +1302,51 @@ async def get_comments(url: str, limit: int = 20, sort: str = "top") -> dict[str
     Returns:
         Video comments with author, text, likes, and timestamps.
     """
-    async with _backend_session() as backend:
-        result = await backend.call_tool(
-            "get_comments", {"url": url, "limit": limit, "sort": sort}
-        )
-        return _extract_result(result)
+    return await _call_backend("get_comments", {"url": url, "limit": limit, "sort": sort})
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+async def ingest_comments(url: str) -> dict[str, Any]:
+    """Store a video's comments so they can be searched with search_comments.
+
+    Comments are fetched in the background and refreshed daily, so this returns at once.
+
+    Args:
+        url: The video URL (YouTube, etc.)
+
+    Returns:
+        A source_id with its status and stored comment count; an existing source is reused.
+    """
+    return await _call_backend("ingest_comments", {"url": url})
+
+
+@mcp.tool(annotations=_ro)
+async def search_comments(
+    query: str,
+    video_id: str | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    """Full-text search over comments stored with ingest_comments.
+
+    Args:
+        query: Full-text search query
+        video_id: Only comments of this video
+        limit: Maximum number of results (default: 20, max: 50)
+        cursor: next_cursor from a previous call, to fetch the following page
+
+    Returns:
+        Ranked comments with snippets, next_cursor when more remain, and the
+        sources still waiting for their first fetch.
+    """
+    args: dict[str, Any] = {"query": query, "limit": limit}
+    args.update(_filter_args(video_id=video_id, cursor=cursor))
+    return await _call_backend("search_comments", args)
+
+
+def _filter_args(**filters: Any) -> dict[str, Any]:
+    """Drop unset filters and cursors so the backend applies its own defaults."""
+    return {key: value for key, value in filters.items() if value is not None}
 
 
 def _extract_result(result: Any) -> dict[str, Any]:
@@ -202,8 +1356,6 @@ def _extract_result(result: Any) -> dict[str, Any]:
     if hasattr(result, "content") and result.content:
         first = result.content[0]
         if hasattr(first, "text"):
-            import json
-
             try:
                 return json.loads(first.text)
             except json.JSONDecodeError:
@@ -223,8 +1375,8 @@ def cli() -> None:
     port = int(os.environ.get("PORT", "8000"))
     path = os.environ.get("MCP_PATH", "/mcp")
 
-    logging.info("Starting yt-dlp-mcp frontend on %s:%s%s", host, port, path)
-    logging.info("Backend URL: %s", BACKEND_URL)
+    logger.info("Starting yt-dlp-mcp frontend on %s:%s%s", host, port, path)
+    logger.info("Backend shards: %s", ", ".join(_router.shards))
 
     mcp.run(transport="http", host=host, port=port, path=path)
 
@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Self
+
+import httpx
+import pytest
+from fastmcp.exceptions import ToolError
+
+from server import BackendBusyError, BackendPool
+
+
+class FakeSession:
+    """Stands in for a backend client; a broken one fails like a dropped session."""
+
+    def __init__(self, backend: "FakeBackend") -> None:
+        self.backend = backend
+        self.broken = False
+        self.closed = False
+
+    async def __aenter__(self) -> Self:
+        self.backend.sessions.append(self)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.closed = True
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> dict[str, Any]:
+        if self.broken:
+            raise httpx.ReadError("session dropped")
+        await self.backend.gate.wait()
+        if name == "fail":
+            raise ToolError("tool failed")
+        return {"name": name, **args}
+
+    async def ping(self) -> None:
+        if self.broken:
+            raise httpx.ReadError("session dropped")
+
+
+class FakeBackend:
+    def __init__(self) -> None:
+        self.sessions: list[FakeSession] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    def pool(self, **kwargs: Any) -> BackendPool:
+        return BackendPool(lambda: FakeSession(self), **kwargs)  # type: ignore[arg-type, return-value]
+
+
+def test_sessions_are_reused_and_reconnected() -> None:
+    async def run() -> None:
+        backend = FakeBackend()
+        pool = backend.pool(size=2)
+        assert await pool.call_tool("echo", {"value": 1}) == {"name": "echo", "value": 1}
+        await pool.call_tool("echo", {"value": 2})
+        assert len(backend.sessions) == 1
+
+        # A tool error leaves the session usable.
+        with pytest.raises(ToolError):
+            await pool.call_tool("fail", {})
+        assert pool.stats()["idle"] == 1
+
+        backend.sessions[0].broken = True
+        assert await pool.call_tool("echo", {"value": 3}) == {"name": "echo", "value": 3}
+        assert backend.sessions[0].closed
+        assert len(backend.sessions) == 2
+        stats = pool.stats()
+        assert (stats["opened"], stats["reused"], stats["reconnects"]) == (2, 3, 1)
+        await pool.close()
+        assert backend.sessions[1].closed
+
+    asyncio.run(run())
+
+
+def test_calls_beyond_the_pool_size_wait_then_are_rejected() -> None:
+    async def run() -> None:
+        backend = FakeBackend()
+        backend.gate.clear()
+        pool = backend.pool(size=1, acquire_timeout_seconds=0.05)
+        first = asyncio.create_task(pool.call_tool("echo", {"value": 1}))
+        await asyncio.sleep(0)
+        with pytest.raises(BackendBusyError):
+            await pool.call_tool("echo", {"value": 2})
+        backend.gate.set()
+        assert await first == {"name": "echo", "value": 1}
+        assert pool.stats()["rejected"] == 1
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_keepalive_closes_failed_and_expired_sessions() -> None:
+    async def run() -> None:
+        backend = FakeBackend()
+        backend.gate.clear()
+        pool = backend.pool(size=3, keepalive_seconds=0.02, idle_timeout_seconds=0.2)
+        calls = [asyncio.create_task(pool.call_tool("echo", {"value": i})) for i in range(3)]
+        await asyncio.sleep(0)
+        backend.gate.set()
+        await asyncio.gather(*calls)
+        assert pool.stats()["idle"] == 3
+
+        backend.sessions[0].broken = True
+        await asyncio.sleep(0.05)
+        assert [session.closed for session in backend.sessions] == [True, False, False]
+        assert pool.stats()["idle"] == 2
+
+        await asyncio.sleep(0.3)
+        assert all(session.closed for session in backend.sessions)
+        assert pool.stats()["idle"] == 0
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_sessions_beyond_the_pool_size_are_closed() -> None:
+    async def run() -> None:
+        backend = FakeBackend()
+        pool = backend.pool(size=1)
+        await pool.call_tool("echo", {"value": 1})
+        # Only reachable when keepalive hands pinged sessions back meanwhile.
+        pool._checkin(await pool._open())
+        assert not backend.sessions[1].closed
+        await pool.close()
+        assert [session.closed for session in backend.sessions] == [True, True]
+        assert pool.stats()["closed"] == 2
+
+    asyncio.run(run())
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from server import ResponseCache
+
+
+class FakeBackend:
+    """Answers with a body and an etag per version, honouring if_none_match."""
+
+    def __init__(self) -> None:
+        self.version = 1
+        self.error: dict[str, Any] | None = None
+        self.calls: list[dict[str, Any]] = []
+
+    async def forward(self, name: str, args: dict[str, Any]) -> dict[str, Any]:
+        self.calls.append(args)
+        if self.error is not None:
+            return self.error
+        etag = f"v{self.version}"
+        if args.get("if_none_match") == etag:
+            return {"not_modified": True, "etag": etag}
+        return {"video_id": args["video_id"], "text": f"version {self.version}", "etag": etag}
+
+
+def test_fresh_results_are_served_and_stale_ones_revalidated(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    async def run() -> None:
+        backend = FakeBackend()
+        cache = ResponseCache({"read_transcript": 60})
+        args = {"video_id": "a"}
+        first = await cache.call("read_transcript", args, backend.forward)
+        assert await cache.call("read_transcript", args, backend.forward) == first
+        assert len(backend.calls) == 1
+
+        # Past the TTL the etag is sent along and not_modified renews the entry.
+        now[0] += 61
+        assert await cache.call("read_transcript", args, backend.forward) == first
+        assert backend.calls[-1] == {"video_id": "a", "if_none_match": "v1"}
+        now[0] += 30
+        await cache.call("read_transcript", args, backend.forward)
+        assert len(backend.calls) == 2
+
+        # A changed result replaces the entry.
+        backend.version = 2
+        now[0] += 61
+        second = await cache.call("read_transcript", args, backend.forward)
+        assert second["text"] == "version 2"
+        assert await cache.call("read_transcript", args, backend.forward) == second
+        assert cache.stats() == {
+            "hits": 3,
+            "revalidated": 1,
+            "misses": 2,
+            "entries": 1,
+            "hit_rate": 0.6667,
+        }
+
+    asyncio.run(run())
+
+
+def test_errors_and_uncached_tools_always_reach_the_backend() -> None:
+    async def run() -> None:
+        backend = FakeBackend()
+        cache = ResponseCache({"read_transcript": 60}, max_entries=1)
+        backend.error = {"error": "busy", "retry_after": 1, "etag": "v1"}
+        for _ in range(2):
+            assert (await cache.call("read_transcript", {"video_id": "a"}, backend.forward))[
+                "error"
+            ] == "busy"
+        backend.error = None
+        for _ in range(2):
+            await cache.call("job_status", {"video_id": "a"}, backend.forward)
+        assert len(backend.calls) == 4
+        assert cache.stats()["entries"] == 0
+
+        # At most max_entries results are kept, least recently used evicted first.
+        await cache.call("read_transcript", {"video_id": "a"}, backend.forward)
+        await cache.call("read_transcript", {"video_id": "b"}, backend.forward)
+        await cache.call("read_transcript", {"video_id": "a"}, backend.forward)
+        assert len(backend.calls) == 7
+        assert cache.stats()["entries"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,406 @@
+import asyncio
+import hashlib
+from typing import Any
+
+import httpx
+import pytest
+
+from server import HashRing, ShardRouter, _merge_facets, _shard_key
+
+
+def _score(video_id: str) -> float:
+    """A stable stand-in for a bm25 rank, lower first."""
+    return int.from_bytes(hashlib.blake2b(video_id.encode(), digest_size=4).digest(), "big")
+
+
+class FakeShard:
+    """A backend shard held in memory, served through the pool interface."""
+
+    def __init__(self) -> None:
+        self.transcripts: dict[str, dict[str, Any]] = {}
+        self.jobs: dict[str, str] = {}
+        self.queued: dict[str, str] = {}
+        self.subscriptions: list[dict[str, Any]] = []
+        self.backlog = 0
+        self.down = False
+        self.generation = 0
+        self.item_cursors = True
+        self.rows_served = 0
+        self.calls: list[str] = []
+
+    def add(self, video_id: str, tick: int) -> None:
+        self.generation += 1
+        self.transcripts[video_id] = {
+            "video_id": video_id,
+            "channel": f"channel {tick % 3}",
+            "score": _score(video_id),
+            "transcribed_at": f"2026-01-01 00:00:{tick:06d}",
+        }
+        self.jobs[f"job-{video_id}"] = video_id
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> dict[str, Any]:
+        self.calls.append(name)
+        if self.down:
+            raise httpx.ConnectError("connection refused")
+        await asyncio.sleep(0)
+        if name in ("search", "list_transcripts"):
+            return self._page(name, args)
+        if name == "read_transcripts":
+            return {"results": [self._read(str(v)) for v in args["video_ids"]]}
+        if name == "job_status_many":
+            return {"results": [self._job(str(j)) for j in args["job_ids"]]}
+        if name == "job_status":
+            return self._job(str(args["job_id"]))
+        if name == "list_subscriptions":
+            return {"count": len(self.subscriptions), "subscriptions": self.subscriptions}
+        if name == "transcribe":
+            return self._transcribe(str(args["url"]), create=True)
+        if name in ("transcribe_many", "find_transcriptions"):
+            create = name == "transcribe_many"
+            results = [
+                {"url": url, **self._transcribe(str(url), create=create)} for url in args["urls"]
+            ]
+            response: dict[str, Any] = {"count": len(results), "results": results}
+            if create:
+                response["enqueued"] = sum(not r["deduplicated"] for r in results)
+                response["already_completed"] = sum(r["status"] == "completed" for r in results)
+                response["already_active"] = len(results) - sum(
+                    response[field] for field in ("enqueued", "already_completed")
+                )
+            return response
+        raise AssertionError(f"unexpected tool {name}")
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+    def _read(self, video_id: str) -> dict[str, Any]:
+        if video_id not in self.transcripts:
+            return {"error": "transcript_not_found", "video_id": video_id}
+        return self.transcripts[video_id]
+
+    def _transcribe(self, url: str, *, create: bool) -> dict[str, Any]:
+        video_id = _shard_key(url)
+        if video_id in self.transcripts:
+            return {"status": "completed", "deduplicated": True, "video_id": video_id}
+        if video_id in self.queued:
+            return {"job_id": self.queued[video_id], "status": "queued", "deduplicated": True}
+        if not create:
+            return {"error": "transcription_not_found"}
+        self.queued[video_id] = f"job-{video_id}"
+        return {"job_id": self.queued[video_id], "status": "queued", "deduplicated": False}
+
+    def _job(self, job_id: str) -> dict[str, Any]:
+        if job_id not in self.jobs:
+            return {"error": "job_not_found", "job_id": job_id}
+        return {"job_id": job_id, "status": "completed", "video_id": self.jobs[job_id]}
+
+    def _page(self, name: str, args: dict[str, Any]) -> dict[str, Any]:
+        etag = f"g{self.generation}"
+        if args.get("if_none_match") == etag:
+            return {"not_modified": True, "etag": etag}
+        if name == "search":
+            items_key = "results"
+            rows = sorted(self.transcripts.values(), key=lambda row: row["score"])
+        else:
+            items_key = "items"
+            rows = sorted(
+                self.transcripts.values(), key=lambda row: row["transcribed_at"], reverse=True
+            )
+        offset = int(args.get("cursor") or 0)
+        # Clamped as the backend clamps search pages.
+        limit = min(int(args["limit"]), 50)
+        page = rows[offset : offset + limit]
+        if self.item_cursors:
+            page = [{**row, "cursor": str(offset + n)} for n, row in enumerate(page, start=1)]
+        self.rows_served += len(page)
+        more = offset + limit < len(rows)
+        response: dict[str, Any] = {
+            "count": len(page),
+            items_key: page,
+            "next_cursor": str(offset + limit) if more else None,
+            "etag": etag,
+        }
+        if name == "search":
+            channels: dict[str, int] = {}
+            for row in rows:
+                channels[row["channel"]] = channels.get(row["channel"], 0) + 1
+            response["facets"] = {
+                "channel": [{"value": value, "count": n} for value, n in channels.items()]
+            }
+        return response
+
+
+def _router(count: int = 3, **kwargs: Any) -> tuple[ShardRouter, dict[str, FakeShard]]:
+    shards = {f"http://shard{i}/mcp": FakeShard() for i in range(count)}
+
+    async def probe(shard: str) -> int:
+        if shards[shard].down:
+            raise httpx.ConnectError("connection refused")
+        return shards[shard].backlog
+
+    router = ShardRouter(
+        list(shards),
+        shards.__getitem__,  # type: ignore[arg-type]
+        probe,
+        replicas=64,
+        load_ttl_seconds=0,
+        **kwargs,
+    )
+    return router, shards
+
+
+def _populate(router: ShardRouter, shards: dict[str, FakeShard], count: int) -> list[str]:
+    video_ids = [f"vid{i:03d}" for i in range(count)]
+    for tick, video_id in enumerate(video_ids, start=1):
+        shards[router.ring.owner(video_id)].add(video_id, tick)
+    return video_ids
+
+
+async def _walk(router: ShardRouter, name: str, items_key: str, limit: int) -> list[str]:
+    seen: list[str] = []
+    cursor: str | None = None
+    while True:
+        args: dict[str, Any] = {"query": "q", "limit": limit}
+        if cursor is not None:
+            args["cursor"] = cursor
+        page = await router.call_tool(name, args)
+        assert "error" not in page, page
+        seen.extend(item["video_id"] for item in page[items_key])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_hash_ring_moves_only_the_keys_a_new_shard_takes() -> None:
+    keys = [f"key{i}" for i in range(4000)]
+    before = HashRing(["a", "b", "c"], replicas=128)
+    after = HashRing(["a", "b", "c", "d"], replicas=128)
+    moved = [key for key in keys if before.owner(key) != after.owner(key)]
+    assert all(after.owner(key) == "d" for key in moved)
+    assert 0.15 < len(moved) / len(keys) < 0.35
+
+    preference = after.preference("key1")
+    assert preference[0] == after.owner("key1")
+    assert sorted(preference) == ["a", "b", "c", "d"]
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_place_spills_past_backlogged_and_unreachable_shards() -> None:
+    async def run() -> None:
+        router, shards = _router(load_slack=5)
+        busy, down, idle = list(shards)
+        shards[busy].backlog = 500
+        shards[down].down = True
+        keys = [f"key{i}" for i in range(60)]
+        placed = await router._place(keys)
+        assert set(placed.values()) == {idle}
+        stats = router.stats()
+        assert stats["placed_on_owner"] + stats["spilled"] == 60
+        assert stats["spilled"] == sum(1 for key in keys if router.ring.owner(key) != idle)
+
+        # Placements within one probe count toward the bound, so a burst spreads.
+        shards[busy].backlog = 0
+        shards[down].down = False
+        placed = await router._place(keys)
+        counts = [list(placed.values()).count(shard) for shard in shards]
+        assert max(counts) <= 25
+
+    asyncio.run(run())
+
+
+def test_videos_the_owner_holds_are_not_spilled() -> None:
+    async def run() -> None:
+        router, shards = _router(load_slack=5)
+        home = router.ring.owner("done")
+        done, busy, fresh = (
+            next(f"{name}{i}" for i in range(1000) if router.ring.owner(f"{name}{i}") == home)
+            for name in ("done", "busy", "fresh")
+        )
+        owner = shards[home]
+        owner.add(done, 1)
+        owner.queued[busy] = f"job-{busy}"
+        owner.backlog = 500
+        urls = [f"https://www.youtube.com/watch?v={video_id}" for video_id in (done, busy, fresh)]
+
+        single = await router.call_tool("transcribe", {"url": urls[0]})
+        assert single == {"status": "completed", "deduplicated": True, "video_id": done}
+        response = await router.call_tool("transcribe_many", {"urls": urls})
+        assert [r["deduplicated"] for r in response["results"]] == [True, True, False]
+        assert response["results"][1]["job_id"] == f"job-{busy}"
+        counts = ("enqueued", "already_completed", "already_active")
+        assert [response[field] for field in counts] == [1, 1, 1]
+
+        # Only the new video spilled, and nothing was queued on two shards.
+        assert fresh not in owner.queued
+        assert sorted(v for shard in shards.values() for v in shard.queued) == sorted([busy, fresh])
+        assert router.stats()["spilled"] == 1
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("item_cursors", [True, False])
+def test_merged_pages_follow_one_global_order(item_cursors: bool) -> None:
+    async def run() -> None:
+        router, shards = _router()
+        for shard in shards.values():
+            shard.item_cursors = item_cursors
+        video_ids = _populate(router, shards, 40)
+        assert all(shard.transcripts for shard in shards.values())
+
+        by_score = sorted(video_ids, key=_score)
+        by_recency = list(reversed(video_ids))
+        for limit in (1, 7, 40):
+            assert await _walk(router, "search", "results", limit) == by_score
+            assert await _walk(router, "list_transcripts", "items", limit) == by_recency
+
+        page = await router.call_tool("search", {"query": "q", "limit": 5})
+        assert page["count"] == 5
+        assert sum(entry["count"] for entry in page["facets"]["channel"]) == 40
+        assert await router.call_tool("search", {"query": "q", "cursor": "!"}) == {
+            "error": "invalid_cursor",
+            "message": "Malformed cursor",
+        }
+
+    asyncio.run(run())
+
+
+def test_merged_pages_read_each_shard_once() -> None:
+    async def run() -> None:
+        router, shards = _router(2)
+        _populate(router, shards, 400)
+        for name, items_key in (("search", "results"), ("list_transcripts", "items")):
+            for shard in shards.values():
+                shard.rows_served = 0
+            assert len(await _walk(router, name, items_key, 10)) == 400
+            # A shard resumes after the last item served from it, so each page
+            # reads at most one page's worth from every shard.
+            assert sum(shard.rows_served for shard in shards.values()) <= 2 * (400 + 10)
+
+    asyncio.run(run())
+
+
+def test_merged_etag_revalidates_per_shard() -> None:
+    async def run() -> None:
+        router, shards = _router()
+        _populate(router, shards, 12)
+        args = {"query": "q", "limit": 5}
+        first = await router.call_tool("search", args)
+        revalidated = await router.call_tool("search", {**args, "if_none_match": first["etag"]})
+        assert revalidated == {"not_modified": True, "etag": first["etag"]}
+
+        changed = next(iter(shards.values()))
+        changed.add("new", 999)
+        for shard in shards.values():
+            shard.calls.clear()
+        page = await router.call_tool("search", {**args, "if_none_match": first["etag"]})
+        assert page["etag"] != first["etag"]
+        # The changed shard answers with its page; the others are asked again for theirs.
+        assert changed.calls == ["search"]
+        assert all(s.calls == ["search"] * 2 for s in shards.values() if s is not changed)
+        assert page == await router.call_tool("search", args)
+
+    asyncio.run(run())
+
+
+def test_per_item_lookups_find_items_off_their_owner() -> None:
+    async def run() -> None:
+        router, shards = _router()
+        owner = router.ring.owner("spilled")
+        other = next(shard for shard in shards if shard != owner)
+        shards[other].add("spilled", 1)
+        shards[owner].add("home", 2)
+
+        response = await router.call_tool(
+            "read_transcripts", {"video_ids": ["spilled", "nowhere", "home"]}
+        )
+        assert [item.get("video_id") for item in response["results"]] == [
+            "spilled",
+            "nowhere",
+            "home",
+        ]
+        assert response["results"][1]["error"] == "transcript_not_found"
+
+        response = await router.call_tool(
+            "job_status_many", {"job_ids": ["job-spilled", "job-missing"]}
+        )
+        assert response["results"] == [
+            {"job_id": "job-spilled", "status": "completed", "video_id": "spilled"},
+            {"error": "job_not_found", "job_id": "job-missing"},
+        ]
+
+    asyncio.run(run())
+
+
+def test_unreachable_shard_is_left_out_of_fan_outs() -> None:
+    async def run() -> None:
+        router, shards = _router()
+        video_ids = _populate(router, shards, 30)
+        down = router.ring.owner(video_ids[0])
+        shards[down].down = True
+        for shard in shards.values():
+            shard.subscriptions = [{"id": shard}]
+        reachable = sorted(
+            (v for v in video_ids if router.ring.owner(v) != down), key=_score
+        )
+
+        page = await router.call_tool("search", {"query": "q", "limit": 50})
+        assert [item["video_id"] for item in page["results"]] == reachable
+        assert page["unavailable_shards"] == [down]
+        assert "etag" not in page
+        # The missing shard is asked again from the start on the next page.
+        shards[down].down = False
+        follow = await router.call_tool("search", {"query": "q", "cursor": page["next_cursor"]})
+        assert len(follow["results"]) == len(video_ids) - len(reachable)
+        shards[down].down = True
+
+        subscriptions = await router.call_tool("list_subscriptions", {})
+        assert subscriptions["count"] == 2
+        assert subscriptions["unavailable_shards"] == [down]
+
+        found = await router.call_tool("job_status", {"job_id": f"job-{reachable[0]}"})
+        assert found["status"] == "completed"
+        lost = await router.call_tool("read_transcripts", {"video_ids": [video_ids[0]]})
+        assert lost["results"] == [
+            {
+                "error": "shard_unavailable",
+                "shard": down,
+                "message": "connection refused",
+                "video_id": video_ids[0],
+            }
+        ]
+        missing = await router.call_tool("job_status_many", {"job_ids": ["job-none"]})
+        assert missing["results"][0]["job_id"] == "job-none"
+
+        for shard in shards.values():
+            shard.down = True
+        assert (await router.call_tool("search", {"query": "q"}))["error"] == "shard_unavailable"
+
+    asyncio.run(run())
+
+
+def test_merge_facets_adds_counts_across_shards() -> None:
+    merged = _merge_facets(
+        [
+            {
+                "channel": [{"value": "a", "count": 3}, {"value": "b", "count": 1}],
+                "year": [{"value": "2024", "count": 2}],
+            },
+            {
+                "channel": [{"value": "b", "count": 4}, {"value": "c", "count": 2}],
+                "year": [{"value": "2025", "count": 1}, {"value": None, "count": 1}],
+            },
+        ]
+    )
+    assert merged == {
+        # Trimmed to the longest per-shard list, as the backend trims its own.
+        "channel": [{"value": "b", "count": 5}, {"value": "a", "count": 3}],
+        "year": [
+            {"value": "2025", "count": 1},
+            {"value": "2024", "count": 2},
+            {"value": None, "count": 1},
+        ],
+    }